@@ -131,6 +131,16 @@ async def get_conversation_statistics(params: Dict[str, Any]):
     
     return result
 
+@router.get("/subscribers/statistics")
+async def get_subscription_statistics():
+    """
+    Get queue statistics for conversation subscribers.
+    
+    Returns:
+        Per-subscriber queue length, lag, and delivered, dropped and coalesced event counts
+    """
+    return communication_framework.get_subscription_statistics()
+
 @router.websocket("/ws/{subscriber_id}")
 async def websocket_endpoint(websocket: WebSocket, subscriber_id: str):
     """
@@ -159,9 +169,14 @@ async def websocket_endpoint(websocket: WebSocket, subscriber_id: str):
                     # Update subscription filters
                     filters = message.get("filters", {})
                     
-                    # Unsubscribe and resubscribe with new filters
+                    # Unsubscribe and resubscribe with new filters and queue settings
                     await communication_framework.unsubscribe_from_conversations(subscriber_id)
-                    result = await communication_framework.subscribe_to_conversations(subscriber_id, filters)
+                    result = await communication_framework.subscribe_to_conversations(
+                        subscriber_id,
+                        filters,
+                        max_queue_size=message.get("max_queue_size"),
+                        overflow_policy=message.get("overflow_policy")
+                    )
                     
                     # Send confirmation
                     await websocket.send_json({
@@ -18,15 +18,20 @@
 This module implements the core A2A framework that enables agents to discover
 each other's capabilities, establish trust, and communicate securely."""
 
-from typing import Dict, Any, List, Optional, Union, Callable, Type
+from typing import Dict, Any, List, Optional, Union, Callable, Type, Set, Tuple
 import logging
 import asyncio
 import uuid
 from datetime import datetime
+from collections import deque
 import json
 import hashlib
 import base64
 import math
+import os
+import re
+import bisect
+import heapq
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +61,31 @@ class Capability:
         self.created_at = datetime.now().isoformat()
         self.updated_at = datetime.now().isoformat()
         
+        # Callbacks notified after the capability changes, such as registry indexes
+        self._change_listeners: List[Callable[['Capability'], None]] = []
+        
+    def add_change_listener(self, listener: Callable[['Capability'], None]) -> None:
+        """Add a callback notified after the capability changes.
+        
+        Args:
+            listener: Callback receiving the changed capability"""
+        if listener not in self._change_listeners:
+            self._change_listeners.append(listener)
+            
+    def remove_change_listener(self, listener: Callable[['Capability'], None]) -> None:
+        """Remove a change callback.
+        
+        Args:
+            listener: Callback to remove"""
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+            
+    def _notify_changed(self) -> None:
+        """Mark the capability as updated and notify the change listeners."""
+        self.updated_at = datetime.now().isoformat()
+        for listener in list(self._change_listeners):
+            listener(self)
+            
     def add_semantic_tag(self, tag: str) -> None:
         """Add a semantic tag to the capability.
         
@@ -63,7 +93,7 @@ class Capability:
             tag: Semantic tag to add"""
         if tag not in self.semantic_tags:
             self.semantic_tags.append(tag)
-            self.updated_at = datetime.now().isoformat()
+            self._notify_changed()
             
     def update_performance_metric(self, metric_name: str, value: Any) -> None:
         """Update a performance metric.
@@ -72,7 +102,7 @@ class Capability:
             metric_name: Name of the metric to update
             value: New value for the metric"""
         self.performance_metrics[metric_name] = value
-        self.updated_at = datetime.now().isoformat()
+        self._notify_changed()
         
     def update_parameter(self, param_name: str, value: Any) -> None:
         """Update a capability parameter.
@@ -81,7 +111,7 @@ class Capability:
             param_name: Name of the parameter to update
             value: New value for the parameter"""
         self.parameters[param_name] = value
-        self.updated_at = datetime.now().isoformat()
+        self._notify_changed()
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert the capability to a dictionary.
@@ -129,6 +159,238 @@ class Capability:
             
         return capability
 
+class CapabilityIndex:
+    """Inverted indexes over registered capabilities.
+    
+    Capabilities are indexed by semantic tag, by the tokens of their lowercased
+    name and description, by parameter name and by performance metric, with
+    numeric metric values kept sorted for range lookups. The indexes narrow a
+    search down to candidate capabilities, which are then checked against the
+    full criteria."""
+    
+    TOKEN_PATTERN = re.compile(r"\w+")
+    
+    def __init__(self):
+        """Initialize empty indexes."""
+        # Indexed snapshot of each capability, used to remove it from the indexes
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        
+        self.tag_index: Dict[str, Set[str]] = {}
+        self.name_token_index: Dict[str, Set[str]] = {}
+        self.description_token_index: Dict[str, Set[str]] = {}
+        self.parameter_index: Dict[str, Set[str]] = {}
+        self.metric_index: Dict[str, Set[str]] = {}
+        
+        # Sorted numeric metric values and the capability IDs at the same positions
+        self.metric_values: Dict[str, List[float]] = {}
+        self.metric_ids: Dict[str, List[str]] = {}
+        
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Split text into lowercase word tokens.
+        
+        Args:
+            text: Text to tokenize
+            
+        Returns:
+            List of tokens"""
+        return cls.TOKEN_PATTERN.findall(text.lower())
+        
+    @staticmethod
+    def _is_number(value: Any) -> bool:
+        """Check whether a value can be kept in a numeric range index."""
+        return isinstance(value, (int, float)) and not math.isnan(value)
+        
+    @staticmethod
+    def _add_posting(index: Dict[str, Set[str]], key: str, capability_id: str) -> None:
+        """Add a capability to an index entry."""
+        index.setdefault(key, set()).add(capability_id)
+        
+    @staticmethod
+    def _remove_posting(index: Dict[str, Set[str]], key: str, capability_id: str) -> None:
+        """Remove a capability from an index entry."""
+        postings = index.get(key)
+        if postings is not None:
+            postings.discard(capability_id)
+            if not postings:
+                del index[key]
+                
+    def add(self, capability: Capability) -> None:
+        """Index a capability, replacing any previous version of it.
+        
+        Args:
+            capability: Capability to index"""
+        capability_id = capability.capability_id
+        self.remove(capability_id)
+        
+        name = capability.name.lower()
+        description = capability.description.lower()
+        entry = {
+            "name": name,
+            "description": description,
+            "name_tokens": set(self.tokenize(name)),
+            "description_tokens": set(self.tokenize(description)),
+            "tags": set(capability.semantic_tags),
+            "parameters": set(capability.parameters),
+            "metrics": dict(capability.performance_metrics)
+        }
+        
+        for tag in entry["tags"]:
+            self._add_posting(self.tag_index, tag, capability_id)
+        for token in entry["name_tokens"]:
+            self._add_posting(self.name_token_index, token, capability_id)
+        for token in entry["description_tokens"]:
+            self._add_posting(self.description_token_index, token, capability_id)
+        for param_name in entry["parameters"]:
+            self._add_posting(self.parameter_index, param_name, capability_id)
+            
+        for metric_name, value in entry["metrics"].items():
+            self._add_posting(self.metric_index, metric_name, capability_id)
+            if self._is_number(value):
+                values = self.metric_values.setdefault(metric_name, [])
+                ids = self.metric_ids.setdefault(metric_name, [])
+                position = bisect.bisect_right(values, value)
+                values.insert(position, value)
+                ids.insert(position, capability_id)
+                
+        self.entries[capability_id] = entry
+        
+    def remove(self, capability_id: str) -> None:
+        """Remove a capability from the indexes.
+        
+        Args:
+            capability_id: ID of the capability to remove"""
+        entry = self.entries.pop(capability_id, None)
+        if entry is None:
+            return
+            
+        for tag in entry["tags"]:
+            self._remove_posting(self.tag_index, tag, capability_id)
+        for token in entry["name_tokens"]:
+            self._remove_posting(self.name_token_index, token, capability_id)
+        for token in entry["description_tokens"]:
+            self._remove_posting(self.description_token_index, token, capability_id)
+        for param_name in entry["parameters"]:
+            self._remove_posting(self.parameter_index, param_name, capability_id)
+            
+        for metric_name, value in entry["metrics"].items():
+            self._remove_posting(self.metric_index, metric_name, capability_id)
+            if self._is_number(value):
+                values = self.metric_values[metric_name]
+                ids = self.metric_ids[metric_name]
+                start = bisect.bisect_left(values, value)
+                end = bisect.bisect_right(values, value)
+                position = ids.index(capability_id, start, end)
+                del values[position]
+                del ids[position]
+                if not values:
+                    del self.metric_values[metric_name]
+                    del self.metric_ids[metric_name]
+                    
+    def lowered_text(self, capability: Capability) -> Tuple[str, str]:
+        """Get the lowercased name and description of a capability.
+        
+        Args:
+            capability: Capability
+            
+        Returns:
+            Tuple of lowercased name and description"""
+        entry = self.entries.get(capability.capability_id)
+        if entry is None:
+            return capability.name.lower(), capability.description.lower()
+        return entry["name"], entry["description"]
+        
+    def _keyword_candidates(self, token_index: Dict[str, Set[str]], keyword: str) -> Set[str]:
+        """Get the capabilities whose text may contain a keyword.
+        
+        Keywords match substrings, so every word of the keyword must be part
+        of an indexed token. Only the token vocabulary is scanned.
+        
+        Args:
+            token_index: Token index to search
+            keyword: Keyword to find
+            
+        Returns:
+            Candidate capability IDs"""
+        keyword_tokens = self.tokenize(keyword)
+        if not keyword_tokens:
+            # Keywords without word characters are checked on every capability
+            return set(self.entries)
+            
+        candidates = None
+        for keyword_token in keyword_tokens:
+            matches = set()
+            for token, capability_ids in token_index.items():
+                if keyword_token in token:
+                    matches.update(capability_ids)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                break
+                
+        return candidates
+        
+    def _metric_candidates(self, metric_name: str, required_value: Any) -> Set[str]:
+        """Get the capabilities that may meet a performance requirement.
+        
+        Args:
+            metric_name: Name of the metric
+            required_value: Required value or dictionary of min, max and equals
+            
+        Returns:
+            Candidate capability IDs"""
+        if isinstance(required_value, dict):
+            minimum = required_value.get("min")
+            maximum = required_value.get("max")
+            if self._is_number(minimum) or self._is_number(maximum):
+                values = self.metric_values.get(metric_name, [])
+                ids = self.metric_ids.get(metric_name, [])
+                start = bisect.bisect_left(values, minimum) if self._is_number(minimum) else 0
+                end = bisect.bisect_right(values, maximum) if self._is_number(maximum) else len(values)
+                return set(ids[start:end])
+                
+        return self.metric_index.get(metric_name, set())
+        
+    def candidates(self, criteria: Dict[str, Any]) -> Set[str]:
+        """Get the capabilities that may match search criteria.
+        
+        Args:
+            criteria: Search criteria including tags, keywords, parameters, and performance requirements
+            
+        Returns:
+            Candidate capability IDs"""
+        candidate_sets = []
+        
+        # Any of the tags and any of the keywords must match
+        tags = criteria.get("tags", [])
+        if tags:
+            candidate_sets.append(set().union(*(self.tag_index.get(tag, set()) for tag in tags)))
+            
+        for token_index, field in ((self.name_token_index, "name_keywords"),
+                                   (self.description_token_index, "description_keywords")):
+            keywords = criteria.get(field, [])
+            if keywords:
+                candidate_sets.append(set().union(*(self._keyword_candidates(token_index, k) for k in keywords)))
+                
+        # All of the parameters and performance requirements must match
+        for param_name in criteria.get("parameters", {}):
+            candidate_sets.append(self.parameter_index.get(param_name, set()))
+            
+        for metric_name, required_value in criteria.get("performance", {}).items():
+            candidate_sets.append(self._metric_candidates(metric_name, required_value))
+            
+        if not candidate_sets:
+            return set(self.entries)
+            
+        # Intersect starting from the smallest set
+        candidate_sets.sort(key=len)
+        candidates = set(candidate_sets[0])
+        for candidate_set in candidate_sets[1:]:
+            if not candidates:
+                break
+            candidates &= candidate_set
+            
+        return candidates
+
 class CapabilityRegistry:
     """Registry for agent capabilities.
     
@@ -145,6 +407,11 @@ class CapabilityRegistry:
         self.agent_capabilities: Dict[str, List[str]] = {}
         self.capability_expiry_days = self.config.get("capability_expiry_days", 30)
         
+        # Capability indexes and agents of each capability
+        self.index = CapabilityIndex()
+        self.capability_agents: Dict[str, List[str]] = {}
+        self._agent_positions: Dict[str, int] = {}
+        
         logger.info("Capability Registry initialized")
         
     async def register_capability(self, agent_id: str, capability: Capability) -> Dict[str, Any]:
@@ -158,15 +425,22 @@ class CapabilityRegistry:
         Returns:
             Registration result
         """
-        # Store the capability
+        # Store and index the capability, reindexing it whenever it changes
+        previous = self.capabilities.get(capability.capability_id)
+        if previous is not None and previous is not capability:
+            previous.remove_change_listener(self.index.add)
         self.capabilities[capability.capability_id] = capability
+        self.index.add(capability)
+        capability.add_change_listener(self.index.add)
         
         # Associate with the agent
         if agent_id not in self.agent_capabilities:
             self.agent_capabilities[agent_id] = []
+            self._agent_positions[agent_id] = len(self._agent_positions)
             
         if capability.capability_id not in self.agent_capabilities[agent_id]:
             self.agent_capabilities[agent_id].append(capability.capability_id)
+            self.capability_agents.setdefault(capability.capability_id, []).append(agent_id)
             
         logger.info(f"Registered capability {capability.capability_id} for agent {agent_id}")
         
@@ -196,15 +470,12 @@ class CapabilityRegistry:
             
         # Remove the capability from the agent
         self.agent_capabilities[agent_id].remove(capability_id)
-        
-        # Check if any other agents have this capability
-        other_agents_have_capability = any(
-            capability_id in caps for agent, caps in self.agent_capabilities.items() if agent != agent_id
-        )
+        self._remove_capability_agent(capability_id, agent_id)
         
         # If no other agents have this capability, remove it from the registry
-        if not other_agents_have_capability and capability_id in self.capabilities:
-            del self.capabilities[capability_id]
+        if capability_id not in self.capability_agents and capability_id in self.capabilities:
+            self.capabilities.pop(capability_id).remove_change_listener(self.index.add)
+            self.index.remove(capability_id)
             
         logger.info(f"Unregistered capability {capability_id} for agent {agent_id}")
         
@@ -223,45 +494,102 @@ class CapabilityRegistry:
         Returns:
             List of matching agents and their capabilities
         """
+        agent_matches = {}
+        
+        # Only score the capabilities found through the indexes
+        for capability, score in self._score_candidates(criteria):
+            for agent_id in self.capability_agents.get(capability.capability_id, []):
+                agent_matches.setdefault(agent_id, []).append({
+                    "capability_id": capability.capability_id,
+                    "name": capability.name,
+                    "match_score": score
+                })
+                
+        # Keep agents in registration order and their matches sorted by score
         matching_agents = {}
+        for agent_id in sorted(agent_matches, key=self._agent_positions.get):
+            capability_ids = self.agent_capabilities[agent_id]
+            agent_matches[agent_id].sort(
+                key=lambda x: (-x["match_score"], capability_ids.index(x["capability_id"]))
+            )
+            matching_agents[agent_id] = agent_matches[agent_id]
+            
+        return {
+            "success": True,
+            "matching_agents": matching_agents,
+            "count": len(matching_agents)
+        }
+        
+    async def find_top_capabilities(self, criteria: Dict[str, Any], top_k: int = 10) -> Dict[str, Any]:
+        """
+        Find the best matching agent capabilities.
+        
+        Args:
+            criteria: Search criteria including tags, parameters, and performance requirements
+            top_k: Maximum number of matches to return
+            
+        Returns:
+            Agent capabilities ranked by match score
+        """
+        matches = (
+            {
+                "agent_id": agent_id,
+                "capability_id": capability.capability_id,
+                "name": capability.name,
+                "match_score": score
+            }
+            for capability, score in self._score_candidates(criteria)
+            for agent_id in self.capability_agents.get(capability.capability_id, [])
+        )
+        
+        top_matches = heapq.nlargest(top_k, matches, key=lambda x: x["match_score"])
+        
+        return {
+            "success": True,
+            "matches": top_matches,
+            "count": len(top_matches)
+        }
+        
+    def _score_candidates(self, criteria: Dict[str, Any]) -> List[Tuple[Capability, float]]:
+        """Score the indexed candidate capabilities that match search criteria.
         
-        # Extract search criteria
+        Args:
+            criteria: Search criteria
+            
+        Returns:
+            List of matching capabilities and their match scores"""
         tags = criteria.get("tags", [])
         name_keywords = criteria.get("name_keywords", [])
         description_keywords = criteria.get("description_keywords", [])
         required_parameters = criteria.get("parameters", {})
         performance_requirements = criteria.get("performance", {})
         
-        # Check each agent's capabilities
-        for agent_id, capability_ids in self.agent_capabilities.items():
-            agent_matches = []
-            
-            for capability_id in capability_ids:
-                capability = self.capabilities.get(capability_id)
-                if not capability:
-                    continue
-                    
-                # Check if capability matches the criteria
-                if self._capability_matches_criteria(capability, tags, name_keywords, 
-                                                    description_keywords, required_parameters, 
-                                                    performance_requirements):
-                    agent_matches.append({
-                        "capability_id": capability_id,
-                        "name": capability.name,
-                        "match_score": self._calculate_match_score(capability, criteria)
-                    })
-                    
-            if agent_matches:
-                # Sort matches by score
-                agent_matches.sort(key=lambda x: x["match_score"], reverse=True)
-                matching_agents[agent_id] = agent_matches
+        scored = []
+        for capability_id in self.index.candidates(criteria):
+            capability = self.capabilities.get(capability_id)
+            if not capability:
+                continue
                 
-        return {
-            "success": True,
-            "matching_agents": matching_agents,
-            "count": len(matching_agents)
-        }
+            # Check if capability matches the criteria
+            if self._capability_matches_criteria(capability, tags, name_keywords, 
+                                                description_keywords, required_parameters, 
+                                                performance_requirements):
+                scored.append((capability, self._calculate_match_score(capability, criteria)))
+                
+        return scored
         
+    def _remove_capability_agent(self, capability_id: str, agent_id: str) -> None:
+        """Remove an agent from the agents of a capability.
+        
+        Args:
+            capability_id: ID of the capability
+            agent_id: ID of the agent"""
+        agents = self.capability_agents.get(capability_id)
+        if agents and agent_id in agents:
+            agents.remove(agent_id)
+            if not agents:
+                del self.capability_agents[capability_id]
+                
     def _capability_matches_criteria(self, capability: Capability, 
                                     tags: List[str], 
                                     name_keywords: List[str],
@@ -280,16 +608,18 @@ class CapabilityRegistry:
             
         Returns:
             Whether the capability matches the criteria"""
+        name, description = self.index.lowered_text(capability)
+        
         # Check tags
         if tags and not any(tag in capability.semantic_tags for tag in tags):
             return False
             
         # Check name keywords
-        if name_keywords and not any(keyword.lower() in capability.name.lower() for keyword in name_keywords):
+        if name_keywords and not any(keyword.lower() in name for keyword in name_keywords):
             return False
             
         # Check description keywords
-        if description_keywords and not any(keyword.lower() in capability.description.lower() for keyword in description_keywords):
+        if description_keywords and not any(keyword.lower() in description for keyword in description_keywords):
             return False
             
         # Check required parameters
@@ -342,6 +672,7 @@ class CapabilityRegistry:
         Returns:
             Match score (0-1)"""
         score_components = []
+        name, description = self.index.lowered_text(capability)
         
         # Score tags
         tags = criteria.get("tags", [])
@@ -353,14 +684,14 @@ class CapabilityRegistry:
         # Score name keywords
         name_keywords = criteria.get("name_keywords", [])
         if name_keywords:
-            name_matches = sum(1 for keyword in name_keywords if keyword.lower() in capability.name.lower())
+            name_matches = sum(1 for keyword in name_keywords if keyword.lower() in name)
             name_score = name_matches / len(name_keywords)
             score_components.append(("name", name_score, 0.2))
             
         # Score description keywords
         description_keywords = criteria.get("description_keywords", [])
         if description_keywords:
-            desc_matches = sum(1 for keyword in description_keywords if keyword.lower() in capability.description.lower())
+            desc_matches = sum(1 for keyword in description_keywords if keyword.lower() in description)
             desc_score = desc_matches / len(description_keywords)
             score_components.append(("description", desc_score, 0.1))
             
@@ -497,6 +828,9 @@ class CapabilityRegistry:
                 
         capability.updated_at = datetime.now().isoformat()
         
+        # Reindex the updated capability
+        self.index.add(capability)
+        
         logger.info(f"Updated capability {capability_id} for agent {agent_id}")
         
         return {
@@ -524,12 +858,13 @@ class CapabilityRegistry:
                 
                 if age_seconds > expiry_seconds:
                     # Remove from all agents
-                    for agent_id in list(self.agent_capabilities.keys()):
-                        if capability_id in self.agent_capabilities[agent_id]:
-                            self.agent_capabilities[agent_id].remove(capability_id)
-                            
+                    for agent_id in self.capability_agents.pop(capability_id, []):
+                        self.agent_capabilities[agent_id].remove(capability_id)
+                        
                     # Remove from capabilities
                     del self.capabilities[capability_id]
+                    capability.remove_change_listener(self.index.add)
+                    self.index.remove(capability_id)
                     
                     expired_capabilities.append(capability_id)
             except (ValueError, TypeError):
@@ -544,11 +879,91 @@ class CapabilityRegistry:
             "expired_capabilities": expired_capabilities
         }
 
+class TrustAggregate:
+    """Running trust aggregate for interactions from one agent to another.
+    
+    Interaction outcomes are combined into exponentially decayed sums, so
+    recording an interaction and computing the score are O(1). Only the most
+    recent interactions are kept, in a fixed-size ring buffer of compact
+    (timestamp, interaction_type, outcome, context) records."""
+    
+    OUTCOME_SCORES = {"success": 1.0, "partial": 0.5}
+    
+    def __init__(self, source_agent: str, target_agent: str, history_size: int = 100):
+        """Initialize an empty aggregate.
+        
+        Args:
+            source_agent: ID of the source agent
+            target_agent: ID of the target agent
+            history_size: Number of recent interactions to keep"""
+        self.source_agent = source_agent
+        self.target_agent = target_agent
+        self.weighted_sum = 0.0
+        self.total_weight = 0.0
+        self.count = 0
+        self.history = deque(maxlen=history_size)
+        
+    def add(self, outcome: str, retention: float, timestamp: str,
+            interaction_type: str, context: Dict[str, Any]) -> None:
+        """Add an interaction.
+        
+        Args:
+            outcome: Outcome of the interaction ("success", "failure", "partial")
+            retention: Weight kept by earlier interactions (1 - decay factor)
+            timestamp: ISO timestamp of the interaction
+            interaction_type: Type of interaction
+            context: Context information"""
+        self.weighted_sum = self.weighted_sum * retention + self.OUTCOME_SCORES.get(outcome, 0.0)
+        self.total_weight = self.total_weight * retention + 1.0
+        self.count += 1
+        self.history.append((timestamp, interaction_type, outcome, context))
+        
+    def score(self) -> Optional[float]:
+        """Get the decayed average outcome score.
+        
+        Returns:
+            Score (0-1), or None if there are no interactions"""
+        return self.weighted_sum / self.total_weight if self.total_weight > 0 else None
+        
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the aggregate to a dictionary.
+        
+        Returns:
+            Dictionary representation of the aggregate"""
+        return {
+            "source_agent": self.source_agent,
+            "target_agent": self.target_agent,
+            "weighted_sum": self.weighted_sum,
+            "total_weight": self.total_weight,
+            "count": self.count,
+            "history": [list(record) for record in self.history]
+        }
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], history_size: int = 100) -> 'TrustAggregate':
+        """Create an aggregate from a dictionary.
+        
+        Args:
+            data: Dictionary representation of the aggregate
+            history_size: Number of recent interactions to keep
+            
+        Returns:
+            The created aggregate"""
+        aggregate = cls(data["source_agent"], data["target_agent"], history_size)
+        aggregate.weighted_sum = data["weighted_sum"]
+        aggregate.total_weight = data["total_weight"]
+        aggregate.count = data["count"]
+        aggregate.history.extend(tuple(record) for record in data.get("history", []))
+        return aggregate
+
 class TrustManager:
     """Manages trust and reputation between agents.
     
     The trust manager tracks interactions between agents and calculates
-    trust scores based on interaction outcomes."""
+    trust scores based on interaction outcomes. Scores are kept up to date
+    incrementally as interactions are recorded."""
+    
+    SNAPSHOT_VERSION = 1
     
     def __init__(self, config: Dict[str, Any] = None):
         """Initialize the trust manager.
@@ -557,16 +972,57 @@ class TrustManager:
             config: Configuration settings"""
         self.config = config or {}
         self.trust_scores: Dict[str, Dict[str, float]] = {}
-        self.interaction_history: Dict[str, List[Dict[str, Any]]] = {}
+        self.interaction_history: Dict[str, TrustAggregate] = {}
+        
+        # Running sums of the trust scores given to each agent
+        self.reputation_sums: Dict[str, float] = {}
+        self.reputation_counts: Dict[str, int] = {}
         
         # Default configuration
         self.default_trust_score = self.config.get("default_trust_score", 0.7)
         self.min_interactions = self.config.get("min_interactions", 5)
         self.decay_factor = self.config.get("decay_factor", 0.05)
         self.max_history_per_pair = self.config.get("max_history_per_pair", 100)
+        self.snapshot_path = self.config.get("snapshot_path")
+        
+        # Weight kept by earlier interactions each time a new one is recorded
+        self.retention = min(1.0, max(0.0, 1.0 - self.decay_factor))
         
+        # Restore trust state from a previous run
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.load_snapshot()
+            
         logger.info("Trust Manager initialized")
         
+    def _record(self, source_agent: str, target_agent: str, interaction_type: str,
+                outcome: str, context: Optional[Dict[str, Any]] = None,
+                timestamp: Optional[str] = None) -> float:
+        """Add an interaction to the pair aggregate and update the trust score.
+        
+        Args:
+            source_agent: ID of the source agent
+            target_agent: ID of the target agent
+            interaction_type: Type of interaction
+            outcome: Outcome of the interaction
+            context: Optional context information
+            timestamp: Optional ISO timestamp, defaults to now
+            
+        Returns:
+            Updated trust score"""
+        pair_key = f"{source_agent}:{target_agent}"
+        
+        aggregate = self.interaction_history.get(pair_key)
+        if aggregate is None:
+            aggregate = TrustAggregate(source_agent, target_agent, self.max_history_per_pair)
+            self.interaction_history[pair_key] = aggregate
+            
+        aggregate.add(outcome, self.retention, timestamp or datetime.now().isoformat(),
+                      interaction_type, context or {})
+        
+        score = self._score_from_aggregate(aggregate)
+        self._set_trust_score(source_agent, target_agent, score)
+        return score
+        
     async def record_interaction(self, source_agent: str, target_agent: str, 
                                 interaction_type: str, outcome: str, 
                                 context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -583,31 +1039,7 @@ class TrustManager:
         Returns:
             Recording result
         """
-        # Create interaction record
-        interaction = {
-            "source_agent": source_agent,
-            "target_agent": target_agent,
-            "interaction_type": interaction_type,
-            "outcome": outcome,
-            "context": context or {},
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # Create pair key for history
-        pair_key = f"{source_agent}:{target_agent}"
-        
-        # Add to history
-        if pair_key not in self.interaction_history:
-            self.interaction_history[pair_key] = []
-            
-        self.interaction_history[pair_key].append(interaction)
-        
-        # Limit history size
-        if len(self.interaction_history[pair_key]) > self.max_history_per_pair:
-            self.interaction_history[pair_key] = self.interaction_history[pair_key][-self.max_history_per_pair:]
-            
-        # Update trust score
-        await self.calculate_trust_score(source_agent, target_agent)
+        self._record(source_agent, target_agent, interaction_type, outcome, context)
         
         logger.info(f"Recorded {outcome} {interaction_type} interaction from {source_agent} to {target_agent}")
         
@@ -616,6 +1048,48 @@ class TrustManager:
             "message": "Interaction recorded successfully"
         }
         
+    async def record_interactions(self, interactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Record several interactions between agents in order.
+        
+        Args:
+            interactions: Interaction records with source_agent, target_agent,
+                interaction_type, outcome, and optional context and timestamp
+                
+        Returns:
+            Recording result
+        """
+        recorded = 0
+        errors = []
+        
+        for index, interaction in enumerate(interactions):
+            missing = [
+                field for field in ("source_agent", "target_agent", "interaction_type", "outcome")
+                if field not in interaction
+            ]
+            if missing:
+                errors.append({"index": index, "message": f"Missing fields: {', '.join(missing)}"})
+                continue
+                
+            self._record(
+                interaction["source_agent"],
+                interaction["target_agent"],
+                interaction["interaction_type"],
+                interaction["outcome"],
+                interaction.get("context"),
+                interaction.get("timestamp")
+            )
+            recorded += 1
+            
+        logger.info(f"Recorded {recorded} interactions")
+        
+        return {
+            "success": not errors,
+            "message": f"Recorded {recorded} of {len(interactions)} interactions",
+            "recorded": recorded,
+            "errors": errors
+        }
+        
     async def calculate_trust_score(self, source_agent: str, target_agent: str) -> float:
         """
         Calculate the trust score between two agents.
@@ -628,66 +1102,75 @@ class TrustManager:
             Trust score (0-1)
         """
         pair_key = f"{source_agent}:{target_agent}"
+        score = self._score_from_aggregate(self.interaction_history.get(pair_key))
         
-        # If no interactions, use default score
-        if pair_key not in self.interaction_history or not self.interaction_history[pair_key]:
-            score = self.default_trust_score
-        else:
-            interactions = self.interaction_history[pair_key]
-            
-            # If fewer than minimum interactions, blend with default score
-            if len(interactions) < self.min_interactions:
-                blend_factor = len(interactions) / self.min_interactions
-                calculated_score = self._calculate_from_interactions(interactions)
-                score = (calculated_score * blend_factor) + (self.default_trust_score * (1 - blend_factor))
-            else:
-                score = self._calculate_from_interactions(interactions)
-                
         # Store the score
-        if source_agent not in self.trust_scores:
-            self.trust_scores[source_agent] = {}
-            
-        self.trust_scores[source_agent][target_agent] = score
+        self._set_trust_score(source_agent, target_agent, score)
         
         return score
         
-    def _calculate_from_interactions(self, interactions: List[Dict[str, Any]]) -> float:
-        """Calculate trust score from interaction history.
+    def _score_from_aggregate(self, aggregate: Optional[TrustAggregate]) -> float:
+        """Calculate a trust score from a pair aggregate.
         
         Args:
-            interactions: List of interaction records
+            aggregate: Pair aggregate, or None if the agents never interacted
             
         Returns:
             Trust score (0-1)"""
-        if not interactions:
+        # If no interactions, use default score
+        if aggregate is None or aggregate.count == 0:
             return self.default_trust_score
             
-        # Sort by timestamp
-        sorted_interactions = sorted(interactions, key=lambda x: x["timestamp"])
-        
-        # Calculate time-weighted score
-        total_weight = 0
-        weighted_sum = 0
-        
-        for i, interaction in enumerate(sorted_interactions):
-            # More recent interactions have higher weight
-            recency_weight = 1.0 - (self.decay_factor * (len(sorted_interactions) - i - 1))
-            recency_weight = max(0.1, recency_weight)  # Ensure minimum weight
-            
-            # Convert outcome to score
-            if interaction["outcome"] == "success":
-                outcome_score = 1.0
-            elif interaction["outcome"] == "partial":
-                outcome_score = 0.5
-            else:  # failure
-                outcome_score = 0.0
-                
-            # Apply weight
-            weighted_sum += outcome_score * recency_weight
-            total_weight += recency_weight
+        calculated_score = aggregate.score()
+        
+        # If fewer than minimum interactions, blend with default score
+        if aggregate.count < self.min_interactions:
+            blend_factor = aggregate.count / self.min_interactions
+            return (calculated_score * blend_factor) + (self.default_trust_score * (1 - blend_factor))
+            
+        return calculated_score
+        
+    def _set_trust_score(self, source_agent: str, target_agent: str, score: float) -> None:
+        """Store a trust score and update the reputation sums of the target agent.
+        
+        Args:
+            source_agent: ID of the source agent
+            target_agent: ID of the target agent
+            score: Trust score"""
+        targets = self.trust_scores.setdefault(source_agent, {})
+        previous = targets.get(target_agent)
+        
+        if previous is None:
+            self.reputation_counts[target_agent] = self.reputation_counts.get(target_agent, 0) + 1
+            previous = 0.0
             
-        # Calculate final score
-        return weighted_sum / total_weight if total_weight > 0 else self.default_trust_score
+        self.reputation_sums[target_agent] = self.reputation_sums.get(target_agent, 0.0) + score - previous
+        targets[target_agent] = score
+        
+    def get_interaction_history(self, source_agent: str, target_agent: str) -> List[Dict[str, Any]]:
+        """Get the recent interactions from one agent to another.
+        
+        Args:
+            source_agent: ID of the source agent
+            target_agent: ID of the target agent
+            
+        Returns:
+            List of interaction records, oldest first"""
+        aggregate = self.interaction_history.get(f"{source_agent}:{target_agent}")
+        if aggregate is None:
+            return []
+            
+        return [
+            {
+                "source_agent": source_agent,
+                "target_agent": target_agent,
+                "interaction_type": interaction_type,
+                "outcome": outcome,
+                "context": context,
+                "timestamp": timestamp
+            }
+            for timestamp, interaction_type, outcome, context in aggregate.history
+        ]
         
     async def get_trust_score(self, source_agent: str, target_agent: str) -> Dict[str, Any]:
         """
@@ -707,8 +1190,8 @@ class TrustManager:
             score = self.trust_scores[source_agent][target_agent]
             
         # Get interaction count
-        pair_key = f"{source_agent}:{target_agent}"
-        interaction_count = len(self.interaction_history.get(pair_key, []))
+        aggregate = self.interaction_history.get(f"{source_agent}:{target_agent}")
+        interaction_count = aggregate.count if aggregate else 0
         
         return {
             "success": True,
@@ -727,17 +1210,12 @@ class TrustManager:
         Returns:
             Reputation information
         """
-        # Collect all trust scores for this agent
-        scores = []
+        # Average the trust scores given to this agent from the running sums
+        rating_count = self.reputation_counts.get(agent_id, 0)
         
-        for source, targets in self.trust_scores.items():
-            if agent_id in targets:
-                scores.append(targets[agent_id])
-                
-        # Calculate average reputation
-        if scores:
-            reputation = sum(scores) / len(scores)
-            confidence = min(1.0, len(scores) / 5)  # Confidence based on number of agents rating this agent
+        if rating_count:
+            reputation = self.reputation_sums[agent_id] / rating_count
+            confidence = min(1.0, rating_count / 5)  # Confidence based on number of agents rating this agent
         else:
             reputation = self.default_trust_score
             confidence = 0.0
@@ -745,13 +1223,15 @@ class TrustManager:
         return {
             "success": True,
             "reputation": reputation,
-            "rating_count": len(scores),
+            "rating_count": rating_count,
             "confidence": confidence
         }
         
     async def update_trust_model(self) -> Dict[str, Any]:
         """
-        Update all trust scores based on interaction history.
+        Update all trust scores from the interaction aggregates.
+        
+        Also saves a snapshot of the trust state if a snapshot path is configured.
         
         Returns:
             Update result
@@ -759,17 +1239,136 @@ class TrustManager:
         updated_count = 0
         
         # Recalculate all trust scores
-        for pair_key in self.interaction_history:
-            source_agent, target_agent = pair_key.split(":")
-            await self.calculate_trust_score(source_agent, target_agent)
+        for aggregate in self.interaction_history.values():
+            score = self._score_from_aggregate(aggregate)
+            self._set_trust_score(aggregate.source_agent, aggregate.target_agent, score)
             updated_count += 1
             
+        self._rebuild_reputation_sums()
+        
+        if self.snapshot_path:
+            self.save_snapshot()
+            
         logger.info(f"Updated {updated_count} trust relationships")
         
         return {
             "success": True,
             "message": f"Updated {updated_count} trust relationships"
         }
+        
+    def _rebuild_reputation_sums(self) -> None:
+        """Recompute the reputation sums from the stored trust scores."""
+        self.reputation_sums = {}
+        self.reputation_counts = {}
+        
+        for targets in self.trust_scores.values():
+            for target_agent, score in targets.items():
+                self.reputation_sums[target_agent] = self.reputation_sums.get(target_agent, 0.0) + score
+                self.reputation_counts[target_agent] = self.reputation_counts.get(target_agent, 0) + 1
+                
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the trust state as a JSON-serializable dictionary.
+        
+        Returns:
+            Snapshot of trust scores and interaction aggregates"""
+        return {
+            "version": self.SNAPSHOT_VERSION,
+            "created_at": datetime.now().isoformat(),
+            "trust_scores": {source: dict(targets) for source, targets in self.trust_scores.items()},
+            "pairs": [aggregate.to_dict() for aggregate in self.interaction_history.values()]
+        }
+        
+    def restore(self, snapshot: Dict[str, Any]) -> bool:
+        """Replace the trust state with a snapshot.
+        
+        Args:
+            snapshot: Snapshot created by snapshot()
+            
+        Returns:
+            True if the snapshot was restored"""
+        if snapshot.get("version") != self.SNAPSHOT_VERSION:
+            logger.error(f"Unsupported trust snapshot version: {snapshot.get('version')}")
+            return False
+            
+        try:
+            interaction_history = {}
+            for data in snapshot.get("pairs", []):
+                aggregate = TrustAggregate.from_dict(data, self.max_history_per_pair)
+                interaction_history[f"{aggregate.source_agent}:{aggregate.target_agent}"] = aggregate
+                
+            trust_scores = {
+                source: dict(targets) for source, targets in snapshot.get("trust_scores", {}).items()
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Invalid trust snapshot: {str(e)}")
+            return False
+            
+        self.interaction_history = interaction_history
+        self.trust_scores = trust_scores
+        self._rebuild_reputation_sums()
+        
+        logger.info(f"Restored trust state for {len(interaction_history)} agent pairs")
+        return True
+        
+    def save_snapshot(self, path: Optional[str] = None) -> bool:
+        """Save a snapshot of the trust state to a file.
+        
+        The snapshot is written to a temporary file first and then renamed,
+        so an interrupted save leaves the previous snapshot intact.
+        
+        Args:
+            path: Snapshot file path, defaults to the configured snapshot path
+            
+        Returns:
+            True if the snapshot was saved"""
+        path = path or self.snapshot_path
+        if not path:
+            logger.error("No trust snapshot path configured")
+            return False
+            
+        temp_path = f"{path}.tmp"
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            
+            # Contexts that are not JSON-serializable are stored as strings
+            with open(temp_path, "w") as f:
+                json.dump(self.snapshot(), f, default=str)
+            os.replace(temp_path, path)
+            
+            return True
+        except Exception as e:
+            logger.error(f"Error saving trust snapshot: {str(e)}")
+            
+            # Do not leave a partial snapshot behind
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return False
+            
+    def load_snapshot(self, path: Optional[str] = None) -> bool:
+        """Restore the trust state from a snapshot file.
+        
+        Args:
+            path: Snapshot file path, defaults to the configured snapshot path
+            
+        Returns:
+            True if the snapshot was loaded"""
+        path = path or self.snapshot_path
+        if not path:
+            logger.error("No trust snapshot path configured")
+            return False
+            
+        try:
+            with open(path, "r") as f:
+                snapshot = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading trust snapshot: {str(e)}")
+            return False
+            
+        return self.restore(snapshot)
 
 class SecurityManager:
     """Manages security for agent communications.
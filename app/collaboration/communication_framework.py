@@ -18,23 +18,37 @@
 This module provides the communication framework that enables agents to communicate with each other."""
 
 from typing import Dict, Any, List, Optional, Union
+from collections import deque
 import logging
 import asyncio
 import json
 from datetime import datetime
 import uuid
 
+from .message_store import MessageStore, field_index
+
 logger = logging.getLogger(__name__)
 
 class AgentCommunicationFramework:
     """Communication framework that enables agents to communicate with each other."""
     
-    def __init__(self):
-        """Initialize the Agent Communication Framework."""
-        self.message_queue = []
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        Initialize the Agent Communication Framework.
+        
+        Args:
+            config: Configuration settings, including:
+                - max_history_size: Maximum number of messages kept in memory
+                - max_queue_size: Maximum number of queued messages
+                - history_spill_path: Optional log file receiving messages evicted from history
+        """
+        self.config = config or {}
+        self.max_history_size = self.config.get("max_history_size", 1000)
+        self.message_queue = deque(maxlen=self.config.get("max_queue_size", 1000))
         self.subscribers = {}
-        self.message_history = []
+        self.message_history = self._create_message_history()
         self.pending_responses = {}  # Track pending responses for request-response pattern
+        self.response_times = deque(maxlen=self.max_history_size)  # Seconds until each completed response
         self.communication_patterns = {
             "request_response": self._handle_request_response,
             "broadcast": self._handle_broadcast,
@@ -43,6 +57,33 @@ class AgentCommunicationFramework:
         
         logger.info("Agent Communication Framework initialized")
     
+    def _create_message_history(self) -> MessageStore:
+        """
+        Create the bounded message history.
+        
+        Returns:
+            Message store indexed by sender, recipient, pattern and topic
+        """
+        return MessageStore(
+            capacity=self.max_history_size,
+            indexes={
+                "from": field_index("from"),
+                "to": field_index("to"),
+                "pattern": field_index("pattern"),
+                "topic": field_index("topic")
+            },
+            spill_path=self.config.get("history_spill_path")
+        )
+    
+    def _record_message(self, message: Dict[str, Any]) -> None:
+        """
+        Add a message to the message history.
+        
+        Args:
+            message: Message to record
+        """
+        self.message_history.append(message)
+    
     async def send_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send a message from one agent to another.
@@ -74,7 +115,7 @@ class AgentCommunicationFramework:
         self.message_queue.append(message)
         
         # Add to message history
-        self.message_history.append(message)
+        self._record_message(message)
         
         # Determine communication pattern
         pattern = message.get("pattern", "request_response")
@@ -115,7 +156,9 @@ class AgentCommunicationFramework:
             timeout = message.get("timeout", 300)  # Default 5 minutes
             if timeout > 0:
                 # Schedule timeout check
-                asyncio.create_task(self._check_response_timeout(message["id"], timeout))
+                self.pending_responses[message["id"]]["timeout_task"] = asyncio.create_task(
+                    self._check_response_timeout(message["id"], timeout)
+                )
         
         # Route the message to the recipient agent
         # In a real implementation, this would use a message broker or direct call
@@ -162,8 +205,8 @@ class AgentCommunicationFramework:
         await asyncio.sleep(timeout)
         
         if message_id in self.pending_responses and self.pending_responses[message_id]["status"] == "pending":
-            # Response timed out
-            self.pending_responses[message_id]["status"] = "timeout"
+            # Response timed out; stop tracking the request
+            del self.pending_responses[message_id]
             logger.warning(f"Response for message {message_id} timed out after {timeout} seconds")
     
     async def _handle_broadcast(self, message: Dict[str, Any]) -> Dict[str, Any]:
@@ -324,33 +367,19 @@ class AgentCommunicationFramework:
             Message history
         """
         filters = params.get("filters", {})
-        
-        # Apply filters
-        filtered_history = self.message_history
-        
-        if "from" in filters:
-            filtered_history = [msg for msg in filtered_history if msg.get("from") == filters["from"]]
-        
-        if "to" in filters:
-            filtered_history = [msg for msg in filtered_history if msg.get("to") == filters["to"]]
-        
-        if "pattern" in filters:
-            filtered_history = [msg for msg in filtered_history if msg.get("pattern") == filters["pattern"]]
-        
-        if "topic" in filters:
-            filtered_history = [msg for msg in filtered_history if msg.get("topic") == filters["topic"]]
-        
-        if "start_time" in filters:
-            start_time = filters["start_time"]
-            filtered_history = [msg for msg in filtered_history if msg.get("timestamp", "") >= start_time]
-        
-        if "end_time" in filters:
-            end_time = filters["end_time"]
-            filtered_history = [msg for msg in filtered_history if msg.get("timestamp", "") <= end_time]
-        
-        # Limit results
         limit = params.get("limit", 100)
-        filtered_history = filtered_history[-limit:]
+        
+        # Look up the most recent matches through the history indexes
+        index_filters = {
+            key: filters[key] for key in ("from", "to", "pattern", "topic") if key in filters
+        }
+        filtered_history = self.message_history.query(
+            index_filters,
+            start_time=filters.get("start_time"),
+            end_time=filters.get("end_time"),
+            limit=limit,
+            latest=True
+        )
         
         return {
             "success": True,
@@ -416,12 +445,16 @@ class AgentCommunicationFramework:
             "pattern": "response"
         }
         
-        # Update pending response
-        self.pending_responses[request_id]["response"] = response
-        self.pending_responses[request_id]["status"] = "completed"
+        # Complete the pending response and keep only its response time
+        pending = self.pending_responses.pop(request_id)
+        timeout_task = pending.get("timeout_task")
+        if timeout_task:
+            timeout_task.cancel()
+        request_time = datetime.fromisoformat(request["timestamp"])
+        self.response_times.append((datetime.fromisoformat(response["timestamp"]) - request_time).total_seconds())
         
         # Add to message history
-        self.message_history.append(response)
+        self._record_message(response)
         
         # Route the response to the original sender
         await self._route_message_to_agent(request["from"], response)
@@ -505,13 +538,7 @@ class AgentCommunicationFramework:
                         agent_received_counts[agent] = agent_received_counts.get(agent, 0) + 1
         
         # Calculate response times for request-response patterns
-        response_times = []
-        for request_id, data in self.pending_responses.items():
-            if data["status"] == "completed" and data["response"]:
-                request_time = datetime.fromisoformat(data["request"]["timestamp"])
-                response_time = datetime.fromisoformat(data["response"]["timestamp"])
-                delta = (response_time - request_time).total_seconds()
-                response_times.append(delta)
+        response_times = list(self.response_times)
         
         avg_response_time = sum(response_times) / len(response_times) if response_times else 0
         
@@ -19,13 +19,15 @@ This module extends the base communication framework to provide comprehensive
 monitoring of all agent conversations in real-time."""
 
 from typing import Dict, Any, List, Optional
+from collections import Counter
 import logging
 import json
-import asyncio
 import datetime
 from uuid import uuid4
 
 from ..collaboration.communication_framework import AgentCommunicationFramework
+from ..collaboration.message_store import MessageStore, field_index
+from ..collaboration.subscription_router import SubscriptionRouter
 
 logger = logging.getLogger(__name__)
 
@@ -45,14 +47,43 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
         
         # Initialize conversation tracking
         self.conversations = {}
-        self.message_history = []
-        self.subscribers = []
         
-        # Maximum history size
-        self.max_history_size = (config or {}).get("max_history_size", 1000)
+        # Route conversation events to bounded subscriber queues
+        self.subscription_router = SubscriptionRouter(
+            max_queue_size=self.config.get("subscriber_queue_size", 1000),
+            overflow_policy=self.config.get("subscriber_overflow_policy", "drop_oldest")
+        )
         
         logger.info("Enhanced communication framework initialized")
     
+    def _create_message_history(self) -> MessageStore:
+        """Create the bounded conversation history.
+        
+        Returns:
+            Message store indexed by sender, recipient, agent and conversation"""
+        self.statistics = ConversationStatistics()
+        
+        return MessageStore(
+            capacity=self.max_history_size,
+            indexes={
+                "sender": field_index("sender"),
+                "recipient": field_index("recipient"),
+                "agent": lambda msg: (msg["sender"], msg["recipient"]),
+                "conversation_id": field_index("conversation_id")
+            },
+            spill_path=self.config.get("history_spill_path"),
+            on_evict=self.statistics.remove
+        )
+    
+    def _record_message(self, message: Dict[str, Any]) -> None:
+        """Skip recording base framework messages.
+        
+        Messages are tracked in the enhanced format by _track_message.
+        
+        Args:
+            message: Message sent through the base framework"""
+        pass
+    
     async def send_message(self, sender: str, recipient: str, message: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send a message from one agent to another with enhanced tracking.
@@ -84,8 +115,14 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
         # Broadcast to subscribers
         await self._broadcast_message_event(enhanced_message, "sent")
         
-        # Call parent implementation to handle actual delivery
-        result = await super().send_message(sender, recipient, message)
+        # Call parent implementation to handle actual delivery; replies arrive as new
+        # messages, so no pending response is tracked
+        result = await super().send_message({
+            "from": sender,
+            "to": recipient,
+            "content": message,
+            "response_expected": False
+        })
         
         # Update tracking with delivery status
         enhanced_message["delivery_status"] = "delivered" if result.get("success", False) else "failed"
@@ -139,7 +176,12 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
             await self._broadcast_message_event(enhanced_message, "sent")
             
             # Call parent implementation for this recipient
-            result = await super().send_message(sender, recipient, message)
+            result = await super().send_message({
+                "from": sender,
+                "to": recipient,
+                "content": message,
+                "response_expected": False
+            })
             
             # Update tracking with delivery status
             enhanced_message["delivery_status"] = "delivered" if result.get("success", False) else "failed"
@@ -165,25 +207,28 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
             "delivery_results": delivery_results
         }
     
-    async def subscribe_to_conversations(self, subscriber_id: str, filters: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def subscribe_to_conversations(self, subscriber_id: str, filters: Dict[str, Any] = None,
+                                         max_queue_size: Optional[int] = None,
+                                         overflow_policy: Optional[str] = None) -> Dict[str, Any]:
         """
         Subscribe to conversation events.
         
         Args:
             subscriber_id: Unique identifier for the subscriber
             filters: Optional filters for the subscription
+            max_queue_size: Optional maximum number of queued events
+            overflow_policy: Optional queue overflow policy (drop_oldest, drop_newest or coalesce)
             
         Returns:
             Subscription result
         """
-        subscription = {
-            "subscriber_id": subscriber_id,
-            "filters": filters or {},
-            "subscribed_at": datetime.datetime.now().isoformat(),
-            "queue": asyncio.Queue()
-        }
-        
-        self.subscribers.append(subscription)
+        try:
+            self.subscription_router.subscribe(subscriber_id, filters, max_queue_size, overflow_policy)
+        except ValueError as e:
+            return {
+                "success": False,
+                "message": str(e)
+            }
         
         logger.info(f"New subscriber: {subscriber_id}")
         
@@ -203,11 +248,7 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
         Returns:
             Unsubscription result
         """
-        initial_count = len(self.subscribers)
-        
-        self.subscribers = [s for s in self.subscribers if s["subscriber_id"] != subscriber_id]
-        
-        if len(self.subscribers) < initial_count:
+        if self.subscription_router.unsubscribe(subscriber_id):
             logger.info(f"Subscriber removed: {subscriber_id}")
             return {
                 "success": True,
@@ -219,40 +260,42 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
                 "message": f"Subscriber {subscriber_id} not found"
             }
     
-    async def get_conversation_events(self, subscriber_id: str, timeout: float = 0.1) -> List[Dict[str, Any]]:
+    async def get_conversation_events(self, subscriber_id: str, timeout: float = 0.1,
+                                      max_events: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get conversation events for a subscriber.
         
         Args:
             subscriber_id: Subscriber ID
             timeout: Timeout in seconds
+            max_events: Optional maximum number of events to return
             
         Returns:
             List of conversation events
         """
         # Find the subscriber
-        subscription = next((s for s in self.subscribers if s["subscriber_id"] == subscriber_id), None)
+        subscription = self.subscription_router.get(subscriber_id)
         
         if not subscription:
             logger.warning(f"Subscriber {subscriber_id} not found")
             return []
         
-        # Get events from the queue
-        events = []
-        try:
-            # Try to get at least one event
-            event = await asyncio.wait_for(subscription["queue"].get(), timeout)
-            events.append(event)
-            
-            # Get any additional events without waiting
-            while not subscription["queue"].empty():
-                events.append(subscription["queue"].get_nowait())
-                
-        except asyncio.TimeoutError:
-            # No events available within timeout
-            pass
-        
-        return events
+        # Wait for at least one event, then take the queued events
+        return await subscription.get_events(timeout, max_events)
+    
+    def get_subscription_statistics(self) -> Dict[str, Any]:
+        """
+        Get queue statistics for conversation subscribers.
+        
+        Returns:
+            Per-subscriber queue length, lag, and delivered, dropped and coalesced event counts
+        """
+        return {
+            "success": True,
+            "message": "Subscription statistics retrieved",
+            "subscriber_count": len(self.subscription_router),
+            "subscribers": self.subscription_router.get_stats()
+        }
     
     async def get_conversation_history(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -268,16 +311,15 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
         limit = params.get("limit", 100)
         offset = params.get("offset", 0)
         
-        # Apply filters
-        filtered_history = self._filter_message_history(filters)
-        
-        # Apply pagination
-        paginated_history = filtered_history[offset:offset + limit]
+        # Apply filters and pagination
+        query = self._history_query(filters)
+        total = self.message_history.count(**query)
+        paginated_history = self.message_history.query(limit=limit, offset=offset, **query)
         
         return {
             "success": True,
             "message": "Conversation history retrieved",
-            "total": len(filtered_history),
+            "total": total,
             "limit": limit,
             "offset": offset,
             "history": paginated_history
@@ -296,30 +338,32 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
         time_range = params.get("time_range", "all")
         grouping = params.get("grouping", "agent")
         
-        # Filter history by time range
-        if time_range == "all":
-            filtered_history = self.message_history
+        # Parse time range
+        now = datetime.datetime.now()
+        
+        if time_range == "last_hour":
+            start_time = now - datetime.timedelta(hours=1)
+        elif time_range == "last_day":
+            start_time = now - datetime.timedelta(days=1)
+        elif time_range == "last_week":
+            start_time = now - datetime.timedelta(weeks=1)
         else:
-            # Parse time range
-            now = datetime.datetime.now()
-            
-            if time_range == "last_hour":
-                start_time = now - datetime.timedelta(hours=1)
-            elif time_range == "last_day":
-                start_time = now - datetime.timedelta(days=1)
-            elif time_range == "last_week":
-                start_time = now - datetime.timedelta(weeks=1)
-            else:
-                # Default to all
-                filtered_history = self.message_history
-                start_time = None
-            
-            if start_time:
-                start_time_str = start_time.isoformat()
-                filtered_history = [
-                    msg for msg in self.message_history
-                    if msg.get("timestamp", "") >= start_time_str
-                ]
+            # Default to all
+            start_time = None
+        
+        if start_time is None:
+            # Statistics over the whole history are maintained incrementally
+            return {
+                "success": True,
+                "message": "Conversation statistics retrieved",
+                "time_range": time_range,
+                "grouping": grouping,
+                "total_messages": len(self.message_history),
+                "statistics": self.statistics.get_statistics(grouping, self.message_history)
+            }
+        
+        # Only scan the time buckets in range
+        filtered_history = self.message_history.query(start_time=start_time.isoformat())
         
         # Calculate statistics based on grouping
         if grouping == "agent":
@@ -346,12 +390,9 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
         
         Args:
             message: Message to track"""
-        # Add to history
+        # Add to history, evicting the oldest message if it is full
         self.message_history.append(message)
-        
-        # Trim history if needed
-        if len(self.message_history) > self.max_history_size:
-            self.message_history = self.message_history[-self.max_history_size:]
+        self.statistics.add(message)
         
         # Update conversation tracking
         conversation_id = message["conversation_id"]
@@ -396,93 +437,48 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
             "message": message
         }
         
-        for subscription in self.subscribers:
-            # Check if the event matches the subscription filters
-            if self._event_matches_filters(event, subscription["filters"]):
-                await subscription["queue"].put(event)
+        # Queue the event for matching subscribers without waiting on them
+        self.subscription_router.publish(event)
     
-    def _event_matches_filters(self, event: Dict[str, Any], filters: Dict[str, Any]) -> bool:
-        """Check if an event matches subscription filters.
+    def _filter_message_history(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Filter message history based on filters.
         
         Args:
-            event: Event to check
             filters: Filters to apply
             
         Returns:
-            True if the event matches the filters"""
-        if not filters:
-            return True
-        
-        message = event["message"]
-        
-        # Check agent filters
-        if "agent_id" in filters:
-            agent_id = filters["agent_id"]
-            if message["sender"] != agent_id and message["recipient"] != agent_id:
-                return False
-        
-        # Check conversation filter
-        if "conversation_id" in filters:
-            if message["conversation_id"] != filters["conversation_id"]:
-                return False
-        
-        # Check event type filter
-        if "event_types" in filters:
-            if event["event_type"] not in filters["event_types"]:
-                return False
-        
-        return True
+            Filtered message history"""
+        return self.message_history.query(**self._history_query(filters))
     
-    def _filter_message_history(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Filter message history based on filters.
+    def _history_query(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate history filters into a message store query.
         
         Args:
             filters: Filters to apply
             
         Returns:
-            Filtered message history"""
-        filtered_history = self.message_history
+            Message store query arguments"""
+        index_filters = {}
         
-        # Filter by agent
+        # Filter by agent and conversation through the indexes
         if "agent_id" in filters:
-            agent_id = filters["agent_id"]
-            filtered_history = [
-                msg for msg in filtered_history
-                if msg["sender"] == agent_id or msg["recipient"] == agent_id
-            ]
+            index_filters["agent"] = filters["agent_id"]
         
-        # Filter by conversation
         if "conversation_id" in filters:
-            conversation_id = filters["conversation_id"]
-            filtered_history = [
-                msg for msg in filtered_history
-                if msg["conversation_id"] == conversation_id
-            ]
-        
-        # Filter by time range
-        if "start_time" in filters:
-            start_time = filters["start_time"]
-            filtered_history = [
-                msg for msg in filtered_history
-                if msg["timestamp"] >= start_time
-            ]
-        
-        if "end_time" in filters:
-            end_time = filters["end_time"]
-            filtered_history = [
-                msg for msg in filtered_history
-                if msg["timestamp"] <= end_time
-            ]
+            index_filters["conversation_id"] = filters["conversation_id"]
         
         # Filter by content
+        predicate = None
         if "content_contains" in filters:
             content_contains = filters["content_contains"].lower()
-            filtered_history = [
-                msg for msg in filtered_history
-                if content_contains in json.dumps(msg["content"]).lower()
-            ]
+            predicate = lambda msg: content_contains in json.dumps(msg["content"]).lower()
         
-        return filtered_history
+        return {
+            "filters": index_filters,
+            "start_time": filters.get("start_time"),
+            "end_time": filters.get("end_time"),
+            "predicate": predicate
+        }
     
     def _calculate_agent_statistics(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate statistics grouped by agent.
@@ -612,3 +608,130 @@ class EnhancedCommunicationFramework(AgentCommunicationFramework):
             del stats["conversations"]
         
         return hourly_stats
+
+
+class ConversationStatistics:
+    """Conversation statistics maintained as messages enter and leave the history.
+    
+    Counts are adjusted for every tracked and evicted message, so statistics
+    over the whole history do not require rescanning it."""
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.agents = {}
+        self.conversations = {}
+        self.hours = {}
+    
+    def add(self, message: Dict[str, Any]) -> None:
+        """Count a message added to the history.
+        
+        Args:
+            message: Tracked message"""
+        self._update(message, 1)
+    
+    def remove(self, message: Dict[str, Any]) -> None:
+        """Discount a message evicted from the history.
+        
+        Args:
+            message: Evicted message"""
+        self._update(message, -1)
+    
+    def _update(self, message: Dict[str, Any], delta: int) -> None:
+        """Adjust the counts of a message.
+        
+        Args:
+            message: Message to count
+            delta: 1 for added messages, -1 for removed messages"""
+        sender = message["sender"]
+        recipient = message["recipient"]
+        conv_id = message["conversation_id"]
+        hour_key = datetime.datetime.fromisoformat(message["timestamp"]).strftime("%Y-%m-%d %H:00")
+        
+        # Agent statistics
+        for agent_id, field in ((sender, "sent"), (recipient, "received")):
+            stats = self.agents.setdefault(agent_id, {"sent": 0, "received": 0, "conversations": Counter()})
+            stats[field] += delta
+            self._adjust(stats["conversations"], conv_id, delta)
+            if stats["sent"] == 0 and stats["received"] == 0:
+                del self.agents[agent_id]
+        
+        # Conversation statistics
+        stats = self.conversations.setdefault(conv_id, {"message_count": 0, "participants": Counter()})
+        stats["message_count"] += delta
+        self._adjust(stats["participants"], sender, delta)
+        self._adjust(stats["participants"], recipient, delta)
+        if stats["message_count"] == 0:
+            del self.conversations[conv_id]
+        
+        # Hourly statistics
+        stats = self.hours.setdefault(hour_key, {
+            "message_count": 0,
+            "senders": Counter(),
+            "recipients": Counter(),
+            "conversations": Counter()
+        })
+        stats["message_count"] += delta
+        self._adjust(stats["senders"], sender, delta)
+        self._adjust(stats["recipients"], recipient, delta)
+        self._adjust(stats["conversations"], conv_id, delta)
+        if stats["message_count"] == 0:
+            del self.hours[hour_key]
+    
+    @staticmethod
+    def _adjust(counter: Counter, key: Any, delta: int) -> None:
+        """Adjust a count, removing keys that drop to zero.
+        
+        Args:
+            counter: Counter to adjust
+            key: Key to adjust
+            delta: Count change"""
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+    
+    def get_statistics(self, grouping: str, history: MessageStore) -> Dict[str, Any]:
+        """Get statistics in the format of the _calculate_* methods.
+        
+        Args:
+            grouping: Statistics grouping (agent, conversation or time)
+            history: Message history the statistics were counted from
+            
+        Returns:
+            Statistics for the grouping"""
+        if grouping == "conversation":
+            conversation_stats = {}
+            for conv_id, stats in self.conversations.items():
+                first_message = history.oldest("conversation_id", conv_id)["timestamp"]
+                last_message = history.newest("conversation_id", conv_id)["timestamp"]
+                first_time = datetime.datetime.fromisoformat(first_message)
+                last_time = datetime.datetime.fromisoformat(last_message)
+                conversation_stats[conv_id] = {
+                    "message_count": stats["message_count"],
+                    "participants": list(stats["participants"]),
+                    "first_message": first_message,
+                    "last_message": last_message,
+                    "participant_count": len(stats["participants"]),
+                    "duration_seconds": (last_time - first_time).total_seconds()
+                }
+            return conversation_stats
+        
+        if grouping == "time":
+            return {
+                hour: {
+                    "message_count": stats["message_count"],
+                    "unique_sender_count": len(stats["senders"]),
+                    "unique_recipient_count": len(stats["recipients"]),
+                    "conversation_count": len(stats["conversations"])
+                }
+                for hour, stats in self.hours.items()
+            }
+        
+        # Default to agent grouping
+        return {
+            agent_id: {
+                "sent": stats["sent"],
+                "received": stats["received"],
+                "conversation_count": len(stats["conversations"])
+            }
+            for agent_id, stats in self.agents.items()
+        }
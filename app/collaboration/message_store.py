@@ -0,0 +1,523 @@
+# TORONTO AI TEAM AGENT - PROPRIETARY
+#
+# Copyright (c) 2025 TORONTO AI
+# Creator: David Tadeusz Chudak
+# All Rights Reserved
+#
+# This file is part of the TORONTO AI TEAM AGENT software.
+#
+# This software is based on OpenManus (Copyright (c) 2025 manna_and_poem),
+# which is licensed under the MIT License. The original license is included
+# in the LICENSE file in the root directory of this project.
+#
+# This software has been substantially modified with proprietary enhancements.
+
+
+"""Bounded message store for the communication frameworks.
+
+This module provides a fixed-capacity ring buffer of messages with secondary
+indexes and time buckets for history queries, and an optional on-disk log of
+evicted messages that can be queried by time range."""
+
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator
+from collections import deque
+from datetime import datetime
+import bisect
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Function returning the index keys of a message
+IndexFunction = Callable[[Dict[str, Any]], Iterable[Any]]
+
+
+def field_index(field: str) -> IndexFunction:
+    """
+    Create an index function keyed by a message field.
+    
+    List values are indexed as tuples so that they can be looked up by value.
+    
+    Args:
+        field: Message field name
+        
+    Returns:
+        Index function
+    """
+    def keys(message: Dict[str, Any]) -> Iterable[Any]:
+        value = message.get(field)
+        if value is None:
+            return ()
+        return (index_key(value),)
+    
+    return keys
+
+
+def index_key(value: Any) -> Any:
+    """
+    Convert a field value to a hashable index key.
+    
+    Args:
+        value: Field value
+        
+    Returns:
+        Index key
+    """
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+class MessageSpillLog:
+    """Append-only JSON lines log of messages evicted from a MessageStore."""
+    
+    # Record the offset of every Nth message for seeking by time
+    SPARSE_INDEX_INTERVAL = 256
+    
+    def __init__(self, path: str, timestamp_field: str = "timestamp"):
+        """
+        Initialize the spill log.
+        
+        Args:
+            path: Path to the log file
+            timestamp_field: Message field holding the ISO timestamp
+        """
+        self.path = path
+        self.timestamp_field = timestamp_field
+        self.count = 0
+        self._lock = threading.Lock()
+        
+        # Sparse (timestamp, offset) index over the chronologically ordered log
+        self._index_times: List[str] = []
+        self._index_offsets: List[int] = []
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        self._load()
+        self._file = open(path, "ab")
+    
+    def _load(self) -> None:
+        """Build the sparse index of an existing log."""
+        if not os.path.exists(self.path):
+            return
+        
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    timestamp = json.loads(line).get(self.timestamp_field, "")
+                except json.JSONDecodeError:
+                    timestamp = None
+                if timestamp is not None:
+                    self._add_to_index(timestamp, offset)
+                offset += len(line)
+    
+    def _add_to_index(self, timestamp: str, offset: int) -> None:
+        """Count a message and index every Nth one."""
+        if self.count % self.SPARSE_INDEX_INTERVAL == 0:
+            self._index_times.append(timestamp)
+            self._index_offsets.append(offset)
+        self.count += 1
+    
+    def append(self, message: Dict[str, Any]) -> None:
+        """
+        Append an evicted message.
+        
+        Args:
+            message: Message to append
+        """
+        line = (json.dumps(message, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._add_to_index(message.get(self.timestamp_field, ""), offset)
+    
+    def query(self, start_time: Optional[str] = None, end_time: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get spilled messages in a time range.
+        
+        Args:
+            start_time: ISO start time (inclusive)
+            end_time: ISO end time (inclusive)
+            limit: Maximum number of messages to return
+            
+        Returns:
+            Messages in chronological order
+        """
+        with self._lock:
+            self._file.flush()
+            offset = 0
+            if start_time is not None:
+                # Start at the last indexed message before start_time
+                position = bisect.bisect_left(self._index_times, start_time) - 1
+                if position >= 0:
+                    offset = self._index_offsets[position]
+        
+        messages = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                timestamp = message.get(self.timestamp_field, "")
+                if start_time is not None and timestamp < start_time:
+                    continue
+                if end_time is not None and timestamp > end_time:
+                    break
+                messages.append(message)
+                if limit is not None and len(messages) >= limit:
+                    break
+        
+        return messages
+    
+    def close(self) -> None:
+        """Close the log file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class MessageStore:
+    """
+    Fixed-capacity ring buffer of messages with secondary indexes.
+    
+    Each message gets an increasing sequence number. Index and time bucket
+    entries are deques of sequence numbers in insertion order, so evicting the
+    oldest message only pops from the left of the deques it appears in.
+    Queries start from the smallest matching index instead of scanning the
+    whole history.
+    """
+    
+    def __init__(self, capacity: int = 1000,
+                 indexes: Optional[Dict[str, IndexFunction]] = None,
+                 timestamp_field: str = "timestamp",
+                 bucket_seconds: int = 3600,
+                 spill_path: Optional[str] = None,
+                 on_evict: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize the message store.
+        
+        Args:
+            capacity: Maximum number of messages kept in memory
+            indexes: Index name to function returning the index keys of a message
+            timestamp_field: Message field holding the ISO timestamp
+            bucket_seconds: Width of the time buckets used for time range queries
+            spill_path: Optional path of a log receiving evicted messages
+            on_evict: Optional callback receiving each evicted message
+        """
+        self.capacity = max(1, capacity)
+        self.indexes = indexes or {}
+        self.timestamp_field = timestamp_field
+        self.bucket_seconds = bucket_seconds
+        self.on_evict = on_evict
+        self.spill_log = MessageSpillLog(spill_path, timestamp_field) if spill_path else None
+        
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        self._next_seq = 0
+        self._evicted = 0
+        self._index_data: Dict[str, Dict[Any, deque]] = {name: {} for name in self.indexes}
+        self._buckets: Dict[int, deque] = {}
+        self._bucket_keys: List[int] = []
+    
+    def __len__(self) -> int:
+        """Get the number of messages in memory."""
+        return self._next_seq - self._first_seq
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the messages in memory from oldest to newest."""
+        for seq in range(self._first_seq, self._next_seq):
+            yield self._slots[seq % self.capacity]
+    
+    @property
+    def _first_seq(self) -> int:
+        """Get the sequence number of the oldest message in memory."""
+        return max(0, self._next_seq - self.capacity)
+    
+    @property
+    def evicted_count(self) -> int:
+        """Get the number of messages evicted from memory."""
+        return self._evicted
+    
+    def _bucket(self, message: Dict[str, Any]) -> Optional[int]:
+        """Get the time bucket of a message."""
+        try:
+            timestamp = datetime.fromisoformat(message[self.timestamp_field])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return int(timestamp.timestamp()) // self.bucket_seconds
+    
+    def append(self, message: Dict[str, Any]) -> None:
+        """
+        Add a message, evicting the oldest one if the store is full.
+        
+        Args:
+            message: Message to add
+        """
+        if len(self) == self.capacity:
+            self._evict_oldest()
+        
+        seq = self._next_seq
+        self._slots[seq % self.capacity] = message
+        self._next_seq += 1
+        
+        for name, keys in self.indexes.items():
+            index = self._index_data[name]
+            for key in set(keys(message)):
+                index.setdefault(key, deque()).append(seq)
+        
+        bucket = self._bucket(message)
+        if bucket is not None:
+            if bucket not in self._buckets:
+                self._buckets[bucket] = deque()
+                bisect.insort(self._bucket_keys, bucket)
+            self._buckets[bucket].append(seq)
+    
+    def _evict_oldest(self) -> None:
+        """Evict the oldest message and remove it from the indexes."""
+        seq = self._first_seq
+        message = self._slots[seq % self.capacity]
+        self._slots[seq % self.capacity] = None
+        self._evicted += 1
+        
+        for name, keys in self.indexes.items():
+            index = self._index_data[name]
+            for key in set(keys(message)):
+                entries = index.get(key)
+                if entries and entries[0] == seq:
+                    entries.popleft()
+                    if not entries:
+                        del index[key]
+        
+        bucket = self._bucket(message)
+        entries = self._buckets.get(bucket)
+        if entries and entries[0] == seq:
+            entries.popleft()
+            if not entries:
+                del self._buckets[bucket]
+                self._bucket_keys.remove(bucket)
+        
+        if self.spill_log:
+            try:
+                self.spill_log.append(message)
+            except Exception as e:
+                logger.error(f"Error spilling evicted message: {str(e)}")
+        
+        if self.on_evict:
+            self.on_evict(message)
+    
+    def _get(self, seq: int) -> Dict[str, Any]:
+        """Get a message in memory by sequence number."""
+        return self._slots[seq % self.capacity]
+    
+    def _candidates(self, filters: Dict[str, Any], start_time: Optional[str],
+                    end_time: Optional[str]) -> Iterable[int]:
+        """
+        Get the sequence numbers to examine for a query, oldest first.
+        
+        Args:
+            filters: Index name to key filters
+            start_time: ISO start time (inclusive)
+            end_time: ISO end time (inclusive)
+            
+        Returns:
+            Candidate sequence numbers
+        """
+        smallest = None
+        for name, value in filters.items():
+            entries = self._index_data[name].get(index_key(value), ())
+            if smallest is None or len(entries) < len(smallest):
+                smallest = entries
+        
+        if start_time is None and end_time is None:
+            return smallest if smallest is not None else range(self._first_seq, self._next_seq)
+        
+        # Narrow the time range to its buckets
+        low = 0
+        high = len(self._bucket_keys)
+        try:
+            if start_time is not None:
+                start_bucket = int(datetime.fromisoformat(start_time).timestamp()) // self.bucket_seconds
+                low = bisect.bisect_left(self._bucket_keys, start_bucket)
+            if end_time is not None:
+                end_bucket = int(datetime.fromisoformat(end_time).timestamp()) // self.bucket_seconds
+                high = bisect.bisect_right(self._bucket_keys, end_bucket)
+        except ValueError:
+            # Times that are not ISO timestamps are compared as strings below
+            return smallest if smallest is not None else range(self._first_seq, self._next_seq)
+        
+        bucket_count = sum(len(self._buckets[key]) for key in self._bucket_keys[low:high])
+        if smallest is not None and len(smallest) <= bucket_count:
+            return smallest
+        
+        seqs = [seq for key in self._bucket_keys[low:high] for seq in self._buckets[key]]
+        seqs.sort()
+        return seqs
+    
+    def _matches(self, message: Dict[str, Any], filters: Dict[str, Any],
+                 start_time: Optional[str], end_time: Optional[str],
+                 predicate: Optional[Callable[[Dict[str, Any]], bool]]) -> bool:
+        """Check whether a message matches a query."""
+        for name, value in filters.items():
+            if index_key(value) not in set(self.indexes[name](message)):
+                return False
+        
+        timestamp = message.get(self.timestamp_field, "")
+        if start_time is not None and timestamp < start_time:
+            return False
+        if end_time is not None and timestamp > end_time:
+            return False
+        
+        return predicate is None or predicate(message)
+    
+    def iter_matching(self, filters: Optional[Dict[str, Any]] = None,
+                      start_time: Optional[str] = None,
+                      end_time: Optional[str] = None,
+                      predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over messages in memory matching a query, oldest first.
+        
+        Args:
+            filters: Index name to key filters, all of which must match
+            start_time: ISO start time (inclusive)
+            end_time: ISO end time (inclusive)
+            predicate: Optional additional condition on messages
+            
+        Returns:
+            Iterator over matching messages
+        """
+        filters = filters or {}
+        unknown = [name for name in filters if name not in self.indexes]
+        if unknown:
+            raise ValueError(f"Unknown message store indexes: {unknown}")
+        
+        for seq in list(self._candidates(filters, start_time, end_time)):
+            if seq < self._first_seq:
+                continue
+            message = self._get(seq)
+            if self._matches(message, filters, start_time, end_time, predicate):
+                yield message
+    
+    def query(self, filters: Optional[Dict[str, Any]] = None,
+              start_time: Optional[str] = None,
+              end_time: Optional[str] = None,
+              predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+              limit: Optional[int] = None,
+              offset: int = 0,
+              latest: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get messages in memory matching a query.
+        
+        Args:
+            filters: Index name to key filters, all of which must match
+            start_time: ISO start time (inclusive)
+            end_time: ISO end time (inclusive)
+            predicate: Optional additional condition on messages
+            limit: Maximum number of messages to return
+            offset: Number of matching messages to skip
+            latest: Whether to return the newest matches instead of the oldest
+            
+        Returns:
+            Matching messages in chronological order
+        """
+        matches = self.iter_matching(filters, start_time, end_time, predicate)
+        
+        if latest:
+            if limit is None:
+                results = list(matches)
+                return results[:len(results) - offset] if offset else results
+            window = deque(maxlen=limit + offset)
+            window.extend(matches)
+            results = list(window)
+            return results[:len(results) - offset] if offset else results
+        
+        results = []
+        for position, message in enumerate(matches):
+            if position < offset:
+                continue
+            results.append(message)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+    
+    def count(self, filters: Optional[Dict[str, Any]] = None,
+              start_time: Optional[str] = None,
+              end_time: Optional[str] = None,
+              predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> int:
+        """
+        Count messages in memory matching a query.
+        
+        Args:
+            filters: Index name to key filters, all of which must match
+            start_time: ISO start time (inclusive)
+            end_time: ISO end time (inclusive)
+            predicate: Optional additional condition on messages
+            
+        Returns:
+            Number of matching messages
+        """
+        filters = filters or {}
+        if len(filters) == 1 and start_time is None and end_time is None and predicate is None:
+            name, value = next(iter(filters.items()))
+            if name not in self.indexes:
+                raise ValueError(f"Unknown message store indexes: {[name]}")
+            return len(self._index_data[name].get(index_key(value), ()))
+        if not filters and start_time is None and end_time is None and predicate is None:
+            return len(self)
+        return sum(1 for _ in self.iter_matching(filters, start_time, end_time, predicate))
+    
+    def oldest(self, index: str, key: Any) -> Optional[Dict[str, Any]]:
+        """
+        Get the oldest message in memory with an index key.
+        
+        Args:
+            index: Index name
+            key: Index key
+            
+        Returns:
+            The message, or None if there is none
+        """
+        entries = self._index_data[index].get(index_key(key))
+        return self._get(entries[0]) if entries else None
+    
+    def newest(self, index: str, key: Any) -> Optional[Dict[str, Any]]:
+        """
+        Get the newest message in memory with an index key.
+        
+        Args:
+            index: Index name
+            key: Index key
+            
+        Returns:
+            The message, or None if there is none
+        """
+        entries = self._index_data[index].get(index_key(key))
+        return self._get(entries[-1]) if entries else None
+    
+    def query_spilled(self, start_time: Optional[str] = None,
+                      end_time: Optional[str] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get evicted messages from the spill log in a time range.
+        
+        Args:
+            start_time: ISO start time (inclusive)
+            end_time: ISO end time (inclusive)
+            limit: Maximum number of messages to return
+            
+        Returns:
+            Messages in chronological order, empty if there is no spill log
+        """
+        if not self.spill_log:
+            return []
+        return self.spill_log.query(start_time, end_time, limit)
+    
+    def close(self) -> None:
+        """Close the spill log."""
+        if self.spill_log:
+            self.spill_log.close()
@@ -0,0 +1,386 @@
+# TORONTO AI TEAM AGENT - PROPRIETARY
+#
+# Copyright (c) 2025 TORONTO AI
+# Creator: David Tadeusz Chudak
+# All Rights Reserved
+#
+# This file is part of the TORONTO AI TEAM AGENT software.
+#
+# This software is based on OpenManus (Copyright (c) 2025 manna_and_poem),
+# which is licensed under the MIT License. The original license is included
+# in the LICENSE file in the root directory of this project.
+#
+# This software has been substantially modified with proprietary enhancements.
+
+
+"""Subscription router for conversation events.
+
+This module routes conversation events to subscribers through an index of
+their filters, and buffers them in bounded per-subscriber queues so that slow
+subscribers never hold up message sending."""
+
+from typing import Dict, Any, List, Optional, Set
+from collections import deque
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Queue overflow policies
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+COALESCE = "coalesce"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+
+class Subscription:
+    """
+    Subscriber with a bounded event queue.
+    
+    When the queue is full, the drop_oldest policy discards the oldest queued
+    event and drop_newest discards the incoming one. The coalesce policy
+    replaces a queued event about the same message with the newer event, so a
+    lagging subscriber receives the latest state of each message, and
+    otherwise drops the oldest event.
+    """
+    
+    def __init__(self, subscriber_id: str, filters: Dict[str, Any],
+                 max_queue_size: int = 1000, overflow_policy: str = DROP_OLDEST):
+        """
+        Initialize the subscription.
+        
+        Args:
+            subscriber_id: Unique identifier for the subscriber
+            filters: Subscription filters (agent_id, conversation_id, event_types)
+            max_queue_size: Maximum number of queued events
+            overflow_policy: Policy applied when the queue is full
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        
+        self.subscriber_id = subscriber_id
+        self.filters = filters
+        self.max_queue_size = max(1, max_queue_size)
+        self.overflow_policy = overflow_policy
+        self.subscribed_at = datetime.now().isoformat()
+        self.event_types = set(filters["event_types"]) if "event_types" in filters else None
+        
+        # Queue entries are [coalesce key, enqueue time, event]
+        self._queue = deque()
+        self._queued_by_key: Dict[Any, List[Any]] = {}
+        self._ready = asyncio.Event()
+        
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+    
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """
+        Check if an event matches the subscription filters.
+        
+        Args:
+            event: Event to check
+            
+        Returns:
+            True if the event matches the filters
+        """
+        message = event["message"]
+        
+        # Check agent filters
+        if "agent_id" in self.filters:
+            agent_id = self.filters["agent_id"]
+            if message["sender"] != agent_id and message["recipient"] != agent_id:
+                return False
+        
+        # Check conversation filter
+        if "conversation_id" in self.filters:
+            if message["conversation_id"] != self.filters["conversation_id"]:
+                return False
+        
+        # Check event type filter
+        if self.event_types is not None and event["event_type"] not in self.event_types:
+            return False
+        
+        return True
+    
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue an event without waiting.
+        
+        Args:
+            event: Event to queue
+            
+        Returns:
+            True if the event was queued or coalesced, False if it was dropped
+        """
+        key = event["message"].get("message_id")
+        
+        if self.overflow_policy == COALESCE and key is not None and key in self._queued_by_key:
+            # Replace the queued event, keeping its position and enqueue time
+            self._queued_by_key[key][2] = event
+            self.coalesced += 1
+            return True
+        
+        if len(self._queue) >= self.max_queue_size:
+            self.dropped += 1
+            if self.overflow_policy == DROP_NEWEST:
+                return False
+            self._pop()
+        
+        entry = [key, time.monotonic(), event]
+        self._queue.append(entry)
+        if self.overflow_policy == COALESCE and key is not None:
+            self._queued_by_key[key] = entry
+        self.published += 1
+        self._ready.set()
+        return True
+    
+    def _pop(self) -> Dict[str, Any]:
+        """Remove and return the oldest queued event."""
+        entry = self._queue.popleft()
+        if self._queued_by_key.get(entry[0]) is entry:
+            del self._queued_by_key[entry[0]]
+        return entry[2]
+    
+    def drain(self, max_events: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Remove and return queued events without waiting.
+        
+        Args:
+            max_events: Maximum number of events to return
+            
+        Returns:
+            Queued events, oldest first
+        """
+        count = len(self._queue) if max_events is None else min(max_events, len(self._queue))
+        events = [self._pop() for _ in range(count)]
+        self.delivered += len(events)
+        if not self._queue:
+            self._ready.clear()
+        return events
+    
+    async def get_events(self, timeout: float = 0.1, max_events: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Wait for at least one event and return the queued events.
+        
+        Args:
+            timeout: Timeout in seconds
+            max_events: Maximum number of events to return
+            
+        Returns:
+            Queued events, empty if none arrived within the timeout
+        """
+        if not self._queue:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                # No events available within timeout
+                return []
+        
+        return self.drain(max_events)
+    
+    def close(self) -> None:
+        """Discard queued events and wake up waiting consumers."""
+        self._queue.clear()
+        self._queued_by_key.clear()
+        self._ready.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics.
+        
+        Returns:
+            Queue length, lag and event counters
+        """
+        lag_seconds = time.monotonic() - self._queue[0][1] if self._queue else 0.0
+        
+        return {
+            "subscriber_id": self.subscriber_id,
+            "subscribed_at": self.subscribed_at,
+            "overflow_policy": self.overflow_policy,
+            "max_queue_size": self.max_queue_size,
+            "queued": len(self._queue),
+            "lag_seconds": lag_seconds,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced
+        }
+
+
+class SubscriptionRouter:
+    """
+    Router delivering conversation events to matching subscriptions.
+    
+    Subscriptions are indexed by their agent_id or conversation_id filter and
+    then by event type, so publishing an event only visits the subscriptions
+    that can match it. Publishing never waits on subscribers.
+    """
+    
+    def __init__(self, max_queue_size: int = 1000, overflow_policy: str = DROP_OLDEST):
+        """
+        Initialize the subscription router.
+        
+        Args:
+            max_queue_size: Default maximum number of queued events per subscriber
+            overflow_policy: Default policy applied when a subscriber queue is full
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.subscriptions: Dict[str, Subscription] = {}
+        
+        # (filter field, value) -> event type (None for all types) -> subscriber IDs
+        self._index: Dict[tuple, Dict[Optional[str], Set[str]]] = {}
+    
+    def __len__(self) -> int:
+        """Get the number of subscriptions."""
+        return len(self.subscriptions)
+    
+    def _index_keys(self, subscription: Subscription) -> List[tuple]:
+        """
+        Get the index entries of a subscription.
+        
+        Args:
+            subscription: Subscription to index
+            
+        Returns:
+            List of ((filter field, value), event type) entries
+        """
+        filters = subscription.filters
+        if "agent_id" in filters:
+            key = ("agent_id", filters["agent_id"])
+        elif "conversation_id" in filters:
+            key = ("conversation_id", filters["conversation_id"])
+        else:
+            key = ("all", None)
+        
+        event_types = subscription.event_types if subscription.event_types is not None else [None]
+        return [(key, event_type) for event_type in event_types]
+    
+    def subscribe(self, subscriber_id: str, filters: Optional[Dict[str, Any]] = None,
+                  max_queue_size: Optional[int] = None,
+                  overflow_policy: Optional[str] = None) -> Subscription:
+        """
+        Add a subscription, replacing any existing one with the same ID.
+        
+        Args:
+            subscriber_id: Unique identifier for the subscriber
+            filters: Optional subscription filters
+            max_queue_size: Optional maximum number of queued events
+            overflow_policy: Optional policy applied when the queue is full
+            
+        Returns:
+            The new subscription
+        """
+        subscription = Subscription(
+            subscriber_id,
+            filters or {},
+            max_queue_size=max_queue_size or self.max_queue_size,
+            overflow_policy=overflow_policy or self.overflow_policy
+        )
+        
+        self.unsubscribe(subscriber_id)
+        self.subscriptions[subscriber_id] = subscription
+        
+        for key, event_type in self._index_keys(subscription):
+            self._index.setdefault(key, {}).setdefault(event_type, set()).add(subscriber_id)
+        
+        return subscription
+    
+    def unsubscribe(self, subscriber_id: str) -> bool:
+        """
+        Remove a subscription.
+        
+        Args:
+            subscriber_id: Subscriber ID to remove
+            
+        Returns:
+            True if the subscription existed
+        """
+        subscription = self.subscriptions.pop(subscriber_id, None)
+        if subscription is None:
+            return False
+        
+        for key, event_type in self._index_keys(subscription):
+            by_type = self._index[key]
+            by_type[event_type].discard(subscriber_id)
+            if not by_type[event_type]:
+                del by_type[event_type]
+            if not by_type:
+                del self._index[key]
+        
+        subscription.close()
+        return True
+    
+    def get(self, subscriber_id: str) -> Optional[Subscription]:
+        """
+        Get a subscription.
+        
+        Args:
+            subscriber_id: Subscriber ID
+            
+        Returns:
+            The subscription, or None if it does not exist
+        """
+        return self.subscriptions.get(subscriber_id)
+    
+    def _candidates(self, event: Dict[str, Any]) -> Set[str]:
+        """
+        Get the IDs of subscriptions that may match an event.
+        
+        Args:
+            event: Event to route
+            
+        Returns:
+            Candidate subscriber IDs
+        """
+        message = event["message"]
+        keys = [
+            ("all", None),
+            ("agent_id", message["sender"]),
+            ("agent_id", message["recipient"]),
+            ("conversation_id", message["conversation_id"])
+        ]
+        
+        candidates = set()
+        for key in keys:
+            by_type = self._index.get(key)
+            if by_type:
+                candidates.update(by_type.get(None, ()))
+                candidates.update(by_type.get(event["event_type"], ()))
+        return candidates
+    
+    def publish(self, event: Dict[str, Any]) -> int:
+        """
+        Queue an event for every matching subscription.
+        
+        Args:
+            event: Event with event_type and message
+            
+        Returns:
+            Number of subscriptions the event was queued for
+        """
+        queued = 0
+        for subscriber_id in self._candidates(event):
+            subscription = self.subscriptions[subscriber_id]
+            if subscription.matches(event) and subscription.offer(event):
+                queued += 1
+        return queued
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get queue statistics for all subscriptions.
+        
+        Returns:
+            Subscriber ID to queue statistics
+        """
+        return {
+            subscriber_id: subscription.get_stats()
+            for subscriber_id, subscription in self.subscriptions.items()
+        }
@@ -6,13 +6,19 @@ of the context extension system to provide an almost limitless context window.
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Union, Tuple
+import re
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable, Iterator
 
 from app.context_extension.vector_db_manager import VectorDatabaseManager
 from app.context_extension.hierarchical_processor import HierarchicalProcessor
 from app.context_extension.recursive_summarizer import RecursiveSummarizer
 from app.context_extension.memory_manager import MemoryManager
 from app.context_extension.multi_agent_context import MultiAgentContextDistributor
+from app.core.tokenizer import get_tokenizer
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -32,7 +38,10 @@ class ContextWindowManager:
         recursive_summarizer_config: Optional[Dict[str, Any]] = None,
         memory_manager_config: Optional[Dict[str, Any]] = None,
         multi_agent_config: Optional[Dict[str, Any]] = None,
-        enable_all_components: bool = True
+        enable_all_components: bool = True,
+        max_workers: int = 4,
+        max_in_flight: int = 4,
+        tokenizer: Optional[str] = None
     ):
         """
         Initialize the ContextWindowManager.
@@ -44,8 +53,24 @@ class ContextWindowManager:
             memory_manager_config: Configuration for the Memory Manager
             multi_agent_config: Configuration for the Multi-Agent Context Distributor
             enable_all_components: Whether to enable all components
+            max_workers: Number of threads running independent pipeline stages
+            max_in_flight: Maximum number of documents processed at once by process_documents
+            tokenizer: Name of the registered tokenizer used to budget context (None for
+                the default tokenizer); also used by the Recursive Summarizer if set
         """
         self.enable_all_components = enable_all_components
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.token_counter = get_tokenizer(tokenizer)
+        
+        # Pipeline stage executor, created on first use
+        self._stage_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._distribution_lock = threading.Lock()
+        
+        if tokenizer is not None:
+            recursive_summarizer_config = dict(recursive_summarizer_config or {})
+            recursive_summarizer_config.setdefault("token_counter", self.token_counter)
         
         # Initialize components
         self.vector_db = self._init_vector_db(vector_db_config)
@@ -141,6 +166,11 @@ class ContextWindowManager:
         """
         Process a document through the context extension system.
         
+        The document is split into paragraphs and words once, and the result is
+        shared by all stages. The hierarchical processor, recursive summarizer,
+        vector database and multi-agent distributor run concurrently; the memory
+        manager stores the summary once it is available.
+        
         Args:
             document: Document to process
             document_id: Optional document ID
@@ -157,68 +187,84 @@ class ContextWindowManager:
         }
         
         try:
-            # Detect document type if not provided
-            if document_type is None:
-                document_type = self._detect_document_type(document)
+            # Detect the document type and split the document once
+            prepared = self._prepare_document(document, document_type)
+            document_type = prepared["document_type"]
             
-            # Process with Hierarchical Processor
-            hierarchical_chunks = self.hierarchical_processor.process_document(document, document_type)
+            # Generate the document ID up front so all stages use the same one
+            if document_id is None:
+                document_id = str(uuid.uuid4())
+            
+            metadata = dict(metadata) if metadata else {}
+            metadata["document_type"] = document_type
+            metadata["hierarchical"] = True
+            metadata["summary_available"] = True
+            metadata["document_id"] = document_id
+            
+            # Run the independent stages concurrently
+            executor = self._get_stage_executor()
+            hierarchical_future = executor.submit(
+                self.hierarchical_processor.process_document, document, document_type, prepared["paragraphs"]
+            )
+            summary_future = executor.submit(
+                self.recursive_summarizer.get_hierarchical_summary, document, prepared["paragraphs"]
+            )
+            vector_future = executor.submit(
+                self.vector_db.store_document, document, metadata, document_id, prepared["words"]
+            )
+            futures = [hierarchical_future, summary_future, vector_future]
+            
+            distribution_future = None
+            if self.enable_all_components:
+                distribution_future = executor.submit(
+                    self._distribute_document, document, document_type, prepared["paragraphs"]
+                )
+                futures.append(distribution_future)
+            
+            # Store the summary in the Memory Manager as soon as it is ready
+            summary_result = summary_future.result()
+            memory_item = {
+                "type": "document",
+                "content": summary_result["summary"],
+                "document_id": document_id,
+                "document_type": document_type,
+                "metadata": metadata
+            }
+            memory_id = self.memory_manager.add_to_long_term_memory(memory_item)
+            
+            wait(futures)
+            
+            hierarchical_chunks = hierarchical_future.result()
             result["components"]["hierarchical_processor"] = {
                 "status": "success",
                 "chunks": len(hierarchical_chunks["chunks"]),
                 "hierarchy_levels": len(set(node["level"] for node in hierarchical_chunks["hierarchy"]))
             }
             
-            # Generate recursive summary
-            summary_result = self.recursive_summarizer.get_hierarchical_summary(document)
             result["components"]["recursive_summarizer"] = {
                 "status": "success",
                 "summary_levels": summary_result["level"] + 1,
                 "compression_ratio": summary_result["compression_ratio"]
             }
             
-            # Store in Vector Database
-            if metadata is None:
-                metadata = {}
-            
-            metadata["document_type"] = document_type
-            metadata["hierarchical"] = True
-            metadata["summary_available"] = True
-            
-            chunk_ids = self.vector_db.store_document(document, metadata, document_id)
+            chunk_ids = vector_future.result()
             result["components"]["vector_db"] = {
                 "status": "success",
                 "chunk_ids": len(chunk_ids)
             }
             
-            # Store in Memory Manager
-            memory_item = {
-                "type": "document",
-                "content": summary_result["summary"],
-                "document_id": document_id,
-                "document_type": document_type,
-                "metadata": metadata
-            }
-            
-            memory_id = self.memory_manager.add_to_long_term_memory(memory_item)
             result["components"]["memory_manager"] = {
                 "status": "success",
                 "memory_id": memory_id
             }
             
-            # Distribute to agents if multi-agent is enabled
-            if self.enable_all_components:
-                agent_assignments = self.multi_agent_distributor.distribute_context(document, document_type)
+            if distribution_future is not None:
+                agent_assignments = distribution_future.result()
                 result["components"]["multi_agent_distributor"] = {
                     "status": "success",
                     "agent_count": len(agent_assignments)
                 }
             
-            # Set document ID in result
-            if document_id is None:
-                import uuid
-                document_id = str(uuid.uuid4())
-            
             result["document_id"] = document_id
             
             logger.info(f"Successfully processed document {document_id}")
@@ -230,12 +276,110 @@ class ContextWindowManager:
         
         return result
     
+    def process_documents(
+        self,
+        documents: Iterable[Union[str, Dict[str, Any]]],
+        max_in_flight: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process a stream of documents.
+        
+        Documents are read from the iterable lazily and at most max_in_flight of
+        them are processed at once: no further document is read until the oldest
+        one has finished, so memory use stays bounded for arbitrarily long streams.
+        
+        Args:
+            documents: Documents to process, either as text or as dictionaries with
+                the arguments of process_document (document, document_id,
+                document_type, metadata)
+            max_in_flight: Maximum number of documents processed at once
+                (defaults to the manager's max_in_flight)
+        
+        Returns:
+            Iterator over processing results, in input order
+        """
+        max_in_flight = max(1, max_in_flight or self.max_in_flight)
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="ContextWindowDocument") as executor:
+            for item in documents:
+                if isinstance(item, str):
+                    item = {"document": item}
+                pending.append(executor.submit(self.process_document, **item))
+                
+                # Apply back-pressure once the in-flight limit is reached
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().result()
+            
+            while pending:
+                yield pending.popleft().result()
+    
+    def _prepare_document(self, document: str, document_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Split a document once for all pipeline stages.
+        
+        Args:
+            document: Document to prepare
+            document_type: Optional document type
+        
+        Returns:
+            Dictionary with the document type, paragraphs and words
+        """
+        if document_type is None:
+            document_type = self._detect_document_type(document)
+        
+        return {
+            "document_type": document_type,
+            "paragraphs": re.split(r'\n\s*\n', document),
+            "words": document.split()
+        }
+    
+    def _distribute_document(self, document: str, document_type: str, paragraphs: List[str]) -> Dict[str, str]:
+        """
+        Distribute a document to agents, one document at a time.
+        
+        Args:
+            document: Document to distribute
+            document_type: Type of document
+            paragraphs: Paragraphs of the document
+        
+        Returns:
+            Dictionary mapping agent IDs to assigned context segments
+        """
+        with self._distribution_lock:
+            return self.multi_agent_distributor.distribute_context(document, document_type, paragraphs)
+    
+    def _get_stage_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the pipeline stage executor, creating it if needed.
+        
+        Returns:
+            Thread pool executor
+        """
+        with self._executor_lock:
+            if self._stage_executor is None:
+                self._stage_executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="ContextWindowStage"
+                )
+            return self._stage_executor
+    
+    def close(self):
+        """Shut down the pipeline thread pools."""
+        with self._executor_lock:
+            if self._stage_executor is not None:
+                self._stage_executor.shutdown(wait=True)
+                self._stage_executor = None
+        
+        self.recursive_summarizer.close()
+    
     def retrieve_context(
         self,
         query: str,
         context_type: str = "combined",
         max_results: int = 5,
-        filter_metadata: Optional[Dict[str, Any]] = None
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Retrieve context based on a query.
@@ -245,19 +389,24 @@ class ContextWindowManager:
             context_type: Type of context to retrieve (vector, memory, hierarchical, summary, combined)
             max_results: Maximum number of results to return
             filter_metadata: Optional metadata filter
+            max_tokens: Optional token budget of the context; results are added in
+                rank order until the next one no longer fits
         
         Returns:
-            Retrieved context with metadata
+            Retrieved context with metadata and its token count
         """
         result = {
             "status": "success",
             "query": query,
             "context_type": context_type,
             "context": "",
+            "token_count": 0,
             "sources": []
         }
         
         try:
+            context_pieces = []
+            
             if context_type == "vector" or context_type == "combined":
                 # Retrieve from Vector Database
                 vector_results = self.vector_db.retrieve_relevant_context(query, max_results, filter_metadata)
@@ -269,7 +418,7 @@ class ContextWindowManager:
                     })
                     
                     if context_type == "vector":
-                        result["context"] = "\n\n".join(item["text"] for item in vector_results)
+                        context_pieces = [item["text"] for item in vector_results]
             
             if context_type == "memory" or context_type == "combined":
                 # Retrieve from Memory Manager
@@ -282,7 +431,7 @@ class ContextWindowManager:
                     })
                     
                     if context_type == "memory":
-                        result["context"] = "\n\n".join(item["item"].get("content", "") for item in memory_results)
+                        context_pieces = [item["item"].get("content", "") for item in memory_results]
             
             if context_type == "combined":
                 # Combine results from all sources
@@ -297,7 +446,11 @@ class ContextWindowManager:
                     if "content" in item["item"]:
                         combined_context.append(item["item"]["content"])
                 
-                result["context"] = "\n\n".join(combined_context)
+                context_pieces = combined_context
+            
+            context_pieces, token_count = self._fit_to_token_budget(context_pieces, max_tokens)
+            result["context"] = "\n\n".join(context_pieces)
+            result["token_count"] = token_count
             
             logger.info(f"Successfully retrieved context for query: {query}")
         
@@ -308,6 +461,35 @@ class ContextWindowManager:
         
         return result
     
+    def _fit_to_token_budget(self, pieces: List[str], max_tokens: Optional[int]) -> Tuple[List[str], int]:
+        """
+        Select the leading context pieces that fit a token budget.
+        
+        Args:
+            pieces: Context pieces in rank order
+            max_tokens: Token budget (None for no limit)
+        
+        Returns:
+            Tuple of (selected pieces, token count of the joined pieces)
+        """
+        if max_tokens is None:
+            # Nothing to trim, so only the joined context is counted
+            return list(pieces), self.token_counter.count_tokens("\n\n".join(pieces))
+        
+        counts = self.token_counter.count_tokens_many(pieces)
+        separator_tokens = self.token_counter.count_tokens("\n\n")
+        
+        selected = []
+        total = 0
+        for piece, count in zip(pieces, counts):
+            cost = count + (separator_tokens if selected else 0)
+            if total + cost > max_tokens:
+                break
+            selected.append(piece)
+            total += cost
+        
+        return selected, total
+    
     def get_sliding_context_window(
         self,
         query: str,
@@ -506,10 +688,12 @@ class ContextWindowManager:
         status = {
             "vector_db": {
                 "type": self.vector_db.db_provider,
-                "embedding_model": self.vector_db.embedding_model
+                "embedding_model": self.vector_db.embedding_model,
+                "embeddings": self.vector_db.get_embedding_stats()
             },
             "memory_manager": self.memory_manager.get_memory_stats(),
-            "multi_agent": self.multi_agent_distributor.get_system_status() if self.enable_all_components else {"enabled": False}
+            "multi_agent": self.multi_agent_distributor.get_system_status() if self.enable_all_components else {"enabled": False},
+            "tokenizer": self.token_counter.get_stats()
         }
         
         return status
@@ -524,8 +708,6 @@ class ContextWindowManager:
         Returns:
             Detected document type
         """
-        import re
-        
         # Check for code indicators
         code_patterns = [
             r'def\s+\w+\s*\(.*\)\s*:',  # Python function
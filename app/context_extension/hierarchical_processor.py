@@ -44,13 +44,19 @@ class HierarchicalProcessor:
         
         logger.info(f"Initialized HierarchicalProcessor with max_chunk_size={max_chunk_size}")
     
-    def process_document(self, document: str, document_type: Optional[str] = None) -> Dict[str, Any]:
+    def process_document(
+        self,
+        document: str,
+        document_type: Optional[str] = None,
+        paragraphs: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Process a document into a hierarchical structure.
         
         Args:
             document: Document to process
             document_type: Optional document type (code, text, markdown, etc.)
+            paragraphs: Optional paragraphs of the document, if already split
         
         Returns:
             Hierarchical representation of the document
@@ -60,7 +66,7 @@ class HierarchicalProcessor:
             document_type = self._detect_document_type(document)
         
         # Analyze document structure
-        structure = self._analyze_document_structure(document, document_type)
+        structure = self._analyze_document_structure(document, document_type, paragraphs)
         
         # Create hierarchical representation
         hierarchical_chunks = self._create_hierarchical_representation(document, structure)
@@ -110,13 +116,19 @@ class HierarchicalProcessor:
         # Default to text
         return "text"
     
-    def _analyze_document_structure(self, document: str, document_type: str) -> Dict[str, Any]:
+    def _analyze_document_structure(
+        self,
+        document: str,
+        document_type: str,
+        paragraphs: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze the structure of a document.
         
         Args:
             document: Document to analyze
             document_type: Type of document
+            paragraphs: Optional paragraphs of the document, if already split
         
         Returns:
             Document structure information
@@ -132,7 +144,7 @@ class HierarchicalProcessor:
         elif document_type == "markdown":
             structure = self._analyze_markdown_structure(document, structure)
         else:  # text
-            structure = self._analyze_text_structure(document, structure)
+            structure = self._analyze_text_structure(document, structure, paragraphs)
         
         return structure
     
@@ -334,19 +346,26 @@ class HierarchicalProcessor:
         
         return structure
     
-    def _analyze_text_structure(self, document: str, structure: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_text_structure(
+        self,
+        document: str,
+        structure: Dict[str, Any],
+        paragraphs: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze the structure of plain text.
         
         Args:
             document: Text document to analyze
             structure: Initial structure dictionary
+            paragraphs: Optional paragraphs of the document, if already split
         
         Returns:
             Updated structure dictionary
         """
         # Split by paragraphs (double newlines)
-        paragraphs = re.split(r'\n\s*\n', document)
+        if paragraphs is None:
+            paragraphs = re.split(r'\n\s*\n', document)
         
         current_pos = 0
         for i, paragraph in enumerate(paragraphs):
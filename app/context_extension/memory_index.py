@@ -0,0 +1,384 @@
+"""
+Inverted index for memory search.
+
+This module provides the MemoryIndex used by the MemoryManager to search memory
+items without scanning them. Items in the hot tiers (short-term and working
+memory) are indexed in memory, while persistent tiers (long-term and episodic
+memory) are indexed in an on-disk SQLite postings table, so a query only
+touches the postings of its terms and loads just the top-ranked items.
+"""
+
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Field weights applied to term frequencies (BM25F-style)
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "content": 1.0,
+    "text": 1.0,
+    "metadata": 1.0
+}
+
+# Memory types whose postings are kept in memory
+HOT_SOURCES = ("short_term", "working")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of tokens
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def extract_terms(item: Dict[str, Any]) -> Tuple[Dict[str, float], int]:
+    """
+    Compute weighted term frequencies for the searchable fields of an item.
+    
+    Args:
+        item: Memory item
+        
+    Returns:
+        Tuple of (term -> weighted frequency, number of tokens)
+    """
+    field_texts = []
+    for field in ("content", "text", "title"):
+        if isinstance(item.get(field), str):
+            field_texts.append((field, item[field]))
+    if isinstance(item.get("tags"), list):
+        field_texts.extend(("tags", tag) for tag in item["tags"] if isinstance(tag, str))
+    if isinstance(item.get("metadata"), dict):
+        field_texts.extend(("metadata", value) for value in item["metadata"].values() if isinstance(value, str))
+    
+    weighted: Dict[str, float] = {}
+    length = 0
+    for field, text in field_texts:
+        weight = FIELD_WEIGHTS[field]
+        for term, count in Counter(tokenize(text)).items():
+            weighted[term] = weighted.get(term, 0.0) + weight * count
+            length += count
+    
+    return weighted, length
+
+class MemoryIndex:
+    """
+    Tokenized inverted index over memory items with BM25 ranking.
+    
+    Documents are identified by (source, item ID). Relevance is the BM25 score
+    over field-weighted term frequencies, multiplied by a recency factor that
+    decays over days.
+    """
+    
+    def __init__(self, index_path: str, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the MemoryIndex.
+        
+        Args:
+            index_path: Path of the SQLite file holding the persistent postings
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.index_path = index_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        
+        # Hot tier: (source, id) -> (term frequencies, length, timestamp)
+        self._hot_documents: Dict[Tuple[str, str], Tuple[Dict[str, float], int, Optional[float]]] = {}
+        self._hot_postings: Dict[str, Dict[Tuple[str, str], float]] = {}
+        self._hot_length = 0
+        
+        # Persistent tier
+        self._connection = sqlite3.connect(index_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                source TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                timestamp REAL,
+                PRIMARY KEY (source, item_id)
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                source TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                frequency REAL NOT NULL,
+                PRIMARY KEY (term, source, item_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_by_document ON postings (source, item_id);
+            CREATE INDEX IF NOT EXISTS documents_by_timestamp ON documents (timestamp);
+            """
+        )
+        self._connection.commit()
+        
+        # Corpus statistics of the persistent tier
+        row = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents").fetchone()
+        self._cold_count = row[0]
+        self._cold_length = row[1]
+    
+    def add(self, source: str, item: Dict[str, Any]):
+        """
+        Index an item, replacing any previous version with the same ID.
+        
+        Args:
+            source: Memory type of the item
+            item: Memory item with an "id" field
+        """
+        terms, length = extract_terms(item)
+        timestamp = item.get("timestamp")
+        key = (source, item["id"])
+        
+        with self._lock:
+            if source in HOT_SOURCES:
+                self._remove_hot(key)
+                self._hot_documents[key] = (terms, length, timestamp)
+                for term, frequency in terms.items():
+                    self._hot_postings.setdefault(term, {})[key] = frequency
+                self._hot_length += length
+                return
+            
+            with self._connection:
+                self._remove_cold(key)
+                self._connection.execute(
+                    "INSERT INTO documents (source, item_id, length, timestamp) VALUES (?, ?, ?, ?)",
+                    (source, item["id"], length, timestamp)
+                )
+                self._connection.executemany(
+                    "INSERT INTO postings (term, source, item_id, frequency) VALUES (?, ?, ?, ?)",
+                    [(term, source, item["id"], frequency) for term, frequency in terms.items()]
+                )
+            self._cold_count += 1
+            self._cold_length += length
+    
+    def remove(self, source: str, item_id: str) -> bool:
+        """
+        Remove an item from the index.
+        
+        Args:
+            source: Memory type of the item
+            item_id: ID of the item
+            
+        Returns:
+            True if the item was indexed
+        """
+        key = (source, item_id)
+        with self._lock:
+            if source in HOT_SOURCES:
+                return self._remove_hot(key)
+            
+            with self._connection:
+                return self._remove_cold(key)
+    
+    def _remove_hot(self, key: Tuple[str, str]) -> bool:
+        """
+        Remove a document from the in-memory postings.
+        
+        Args:
+            key: (source, item ID)
+            
+        Returns:
+            True if the document was indexed
+        """
+        document = self._hot_documents.pop(key, None)
+        if document is None:
+            return False
+        
+        terms, length, _ = document
+        for term in terms:
+            postings = self._hot_postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._hot_postings[term]
+        self._hot_length -= length
+        return True
+    
+    def _remove_cold(self, key: Tuple[str, str]) -> bool:
+        """
+        Remove a document from the on-disk postings. Must run inside a transaction.
+        
+        Args:
+            key: (source, item ID)
+            
+        Returns:
+            True if the document was indexed
+        """
+        row = self._connection.execute(
+            "SELECT length FROM documents WHERE source = ? AND item_id = ?", key
+        ).fetchone()
+        if row is None:
+            return False
+        
+        self._connection.execute("DELETE FROM postings WHERE source = ? AND item_id = ?", key)
+        self._connection.execute("DELETE FROM documents WHERE source = ? AND item_id = ?", key)
+        self._cold_count -= 1
+        self._cold_length -= row[0]
+        return True
+    
+    def search(
+        self,
+        query: str,
+        sources: Iterable[str],
+        max_results: int = 10,
+        now: Optional[float] = None
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Rank indexed items for a query.
+        
+        Args:
+            query: Search query
+            sources: Memory types to search
+            max_results: Maximum number of results to return
+            now: Reference time for recency (None for the current time)
+            
+        Returns:
+            List of (source, item ID, score) tuples, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        sources = set(sources)
+        if not terms or not sources or max_results <= 0:
+            return []
+        
+        now = now if now is not None else time.time()
+        
+        with self._lock:
+            total_documents = len(self._hot_documents) + self._cold_count
+            if total_documents == 0:
+                return []
+            average_length = max((self._hot_length + self._cold_length) / total_documents, 1e-9)
+            
+            # Gather postings: term -> [(key, frequency)]
+            postings: Dict[str, List[Tuple[Tuple[str, str], float]]] = {term: [] for term in terms}
+            for term in terms:
+                postings[term].extend(self._hot_postings.get(term, {}).items())
+            
+            # Length and timestamp of matching persistent documents
+            document_info: Dict[Tuple[str, str], Tuple[int, Optional[float]]] = {}
+            
+            placeholders = ",".join("?" for _ in terms)
+            rows = self._connection.execute(
+                f"""
+                SELECT p.term, p.source, p.item_id, p.frequency, d.length, d.timestamp
+                FROM postings p JOIN documents d ON d.source = p.source AND d.item_id = p.item_id
+                WHERE p.term IN ({placeholders})
+                """,
+                terms
+            ).fetchall()
+            for term, source, item_id, frequency, length, timestamp in rows:
+                key = (source, item_id)
+                postings[term].append((key, frequency))
+                document_info[key] = (length, timestamp)
+            
+            # Score documents from the requested sources
+            scores: Dict[Tuple[str, str], float] = {}
+            for term, entries in postings.items():
+                document_frequency = len(entries)
+                if document_frequency == 0:
+                    continue
+                idf = math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+                
+                for key, frequency in entries:
+                    if key[0] not in sources:
+                        continue
+                    if key in self._hot_documents:
+                        length = self._hot_documents[key][1]
+                    else:
+                        length = document_info[key][0]
+                    norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+            
+            # Apply recency decay
+            results = []
+            for key, score in scores.items():
+                if key in self._hot_documents:
+                    timestamp = self._hot_documents[key][2]
+                else:
+                    timestamp = document_info[key][1]
+                if isinstance(timestamp, (int, float)):
+                    recency_score = 1.0 / (1.0 + max(now - timestamp, 0) / (24 * 60 * 60))  # Decay over days
+                    score *= (1.0 + recency_score)
+                results.append((key[0], key[1], score))
+        
+        results.sort(key=lambda result: result[2], reverse=True)
+        return results[:max_results]
+    
+    def expired(self, cutoff: float, sources: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        List persistent items older than a cutoff time.
+        
+        Args:
+            cutoff: Timestamp before which items are expired
+            sources: Memory types to check
+            
+        Returns:
+            List of (source, item ID) tuples
+        """
+        sources = list(sources)
+        if not sources:
+            return []
+        
+        placeholders = ",".join("?" for _ in sources)
+        with self._lock:
+            return [
+                (source, item_id) for source, item_id in self._connection.execute(
+                    f"SELECT source, item_id FROM documents WHERE timestamp < ? AND source IN ({placeholders})",
+                    [cutoff] + sources
+                )
+            ]
+    
+    def persistent_ids(self, source: str) -> List[str]:
+        """
+        List the IDs of persistent items indexed for a memory type.
+        
+        Args:
+            source: Memory type
+            
+        Returns:
+            List of item IDs
+        """
+        with self._lock:
+            return [row[0] for row in self._connection.execute(
+                "SELECT item_id FROM documents WHERE source = ?", (source,)
+            )]
+    
+    def count(self, source: Optional[str] = None) -> int:
+        """
+        Count indexed items.
+        
+        Args:
+            source: Memory type to count (None for all)
+            
+        Returns:
+            Number of indexed items
+        """
+        with self._lock:
+            if source is None:
+                return len(self._hot_documents) + self._cold_count
+            if source in HOT_SOURCES:
+                return sum(1 for key in self._hot_documents if key[0] == source)
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM documents WHERE source = ?", (source,)
+            ).fetchone()[0]
+    
+    def close(self):
+        """Close the on-disk index."""
+        with self._lock:
+            self._connection.close()
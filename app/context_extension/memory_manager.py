@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional, Union, Tuple
 import json
 import os
 
+from app.context_extension.memory_index import MemoryIndex
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,9 @@ class MemoryManager:
     
     This class provides methods for storing and retrieving information from different
     memory types, including short-term, working, long-term, and episodic memory.
+    
+    All memory types are covered by an inverted index that is updated as items
+    are added and cleaned up, so searches only touch items containing a query term.
     """
     
     def __init__(
@@ -56,6 +61,10 @@ class MemoryManager:
         os.makedirs(os.path.join(storage_dir, "long_term"), exist_ok=True)
         os.makedirs(os.path.join(storage_dir, "episodic"), exist_ok=True)
         
+        # Inverted index over all memory types
+        self.index = MemoryIndex(os.path.join(storage_dir, "memory_index.sqlite3"))
+        self._sync_index()
+        
         logger.info(f"Initialized MemoryManager with storage_dir={storage_dir}")
     
     def add_to_short_term_memory(self, item: Dict[str, Any]) -> str:
@@ -78,11 +87,13 @@ class MemoryManager:
         
         # Add to short-term memory
         self.short_term_memory.append(item)
+        self.index.add("short_term", item)
         
         # Trim if over capacity
         if len(self.short_term_memory) > self.short_term_capacity:
             # Move oldest item to long-term memory
             oldest_item = self.short_term_memory.pop(0)
+            self.index.remove("short_term", oldest_item["id"])
             self.add_to_long_term_memory(oldest_item)
         
         logger.debug(f"Added item {item['id']} to short-term memory")
@@ -108,11 +119,13 @@ class MemoryManager:
         
         # Add to working memory
         self.working_memory.append(item)
+        self.index.add("working", item)
         
         # Trim if over capacity
         if len(self.working_memory) > self.working_memory_capacity:
             # Remove oldest item
-            self.working_memory.pop(0)
+            oldest_item = self.working_memory.pop(0)
+            self.index.remove("working", oldest_item["id"])
         
         logger.debug(f"Added item {item['id']} to working memory")
         return item["id"]
@@ -139,6 +152,7 @@ class MemoryManager:
         file_path = os.path.join(self.storage_dir, "long_term", f"{item['id']}.json")
         with open(file_path, "w") as f:
             json.dump(item, f)
+        self.index.add("long_term", item)
         
         logger.debug(f"Added item {item['id']} to long-term memory")
         return item["id"]
@@ -172,6 +186,7 @@ class MemoryManager:
         file_path = os.path.join(self.storage_dir, "episodic", f"{episode['id']}.json")
         with open(file_path, "w") as f:
             json.dump(episode, f)
+        self.index.add("episodic", episode)
         
         logger.debug(f"Added episode {episode['id']} to episodic memory")
         return episode["id"]
@@ -282,6 +297,10 @@ class MemoryManager:
         """
         Search across memory types.
         
+        Items are ranked by BM25 relevance of the query terms (weighting titles
+        and tags above content) with a bonus for recent items. Only the
+        top-ranked long-term and episodic items are loaded from disk.
+        
         Args:
             query: Search query
             memory_types: Types of memory to search
@@ -290,133 +309,84 @@ class MemoryManager:
         Returns:
             List of matching memory items
         """
+        sources = [memory_type for memory_type in memory_types
+                   if memory_type != "episodic" or self.enable_episodic_memory]
+        
         results = []
+        for source, item_id, score in self.index.search(query, sources, max_results):
+            item = self._load_indexed_item(source, item_id)
+            if item:
+                results.append({"item": item, "source": source})
         
-        # Search short-term memory
-        if "short_term" in memory_types:
-            for item in self.short_term_memory:
-                if self._matches_query(item, query):
-                    results.append({"item": item, "source": "short_term"})
-        
-        # Search working memory
-        if "working" in memory_types:
-            for item in self.working_memory:
-                if self._matches_query(item, query):
-                    results.append({"item": item, "source": "working"})
-        
-        # Search long-term memory
-        if "long_term" in memory_types:
-            long_term_items = self._list_long_term_memory()
-            for item in long_term_items:
-                if self._matches_query(item, query):
-                    results.append({"item": item, "source": "long_term"})
-        
-        # Search episodic memory
-        if "episodic" in memory_types and self.enable_episodic_memory:
-            for episode in self.episodic_memory:
-                if self._matches_query(episode, query):
-                    results.append({"item": episode, "source": "episodic"})
-            
-            # Also search disk for older episodes
-            episodic_items = self._list_episodic_memory()
-            for item in episodic_items:
-                if item not in self.episodic_memory and self._matches_query(item, query):
-                    results.append({"item": item, "source": "episodic"})
-        
-        # Sort by relevance and limit results
-        results.sort(key=lambda x: self._relevance_score(x["item"], query), reverse=True)
-        return results[:max_results]
+        return results
     
-    def _matches_query(self, item: Dict[str, Any], query: str) -> bool:
+    def _load_indexed_item(self, source: str, item_id: str) -> Dict[str, Any]:
         """
-        Check if an item matches a query.
+        Load an item found through the index.
         
         Args:
-            item: Memory item to check
-            query: Query to match against
+            source: Memory type of the item
+            item_id: ID of the item
         
         Returns:
-            True if the item matches the query
-        """
-        query_lower = query.lower()
-        
-        # Check content field
-        if "content" in item and isinstance(item["content"], str):
-            if query_lower in item["content"].lower():
-                return True
-        
-        # Check text field
-        if "text" in item and isinstance(item["text"], str):
-            if query_lower in item["text"].lower():
-                return True
-        
-        # Check title field
-        if "title" in item and isinstance(item["title"], str):
-            if query_lower in item["title"].lower():
-                return True
-        
-        # Check tags
-        if "tags" in item and isinstance(item["tags"], list):
-            for tag in item["tags"]:
-                if isinstance(tag, str) and query_lower in tag.lower():
-                    return True
-        
-        # Check metadata
-        if "metadata" in item and isinstance(item["metadata"], dict):
-            for key, value in item["metadata"].items():
-                if isinstance(value, str) and query_lower in value.lower():
-                    return True
-        
-        return False
-    
-    def _relevance_score(self, item: Dict[str, Any], query: str) -> float:
+            Memory item, or an empty dictionary if it no longer exists
         """
-        Calculate relevance score of an item for a query.
+        if source in ("short_term", "working"):
+            items = self.short_term_memory if source == "short_term" else self.working_memory
+            return next((item for item in items if item["id"] == item_id), {})
         
-        Args:
-            item: Memory item to score
-            query: Query to score against
+        if source == "episodic":
+            # Prefer the in-memory copy
+            for episode in self.episodic_memory:
+                if episode["id"] == item_id:
+                    return episode
         
-        Returns:
-            Relevance score (higher is more relevant)
-        """
-        query_terms = query.lower().split()
-        score = 0.0
-        
-        # Check content field
-        if "content" in item and isinstance(item["content"], str):
-            content_lower = item["content"].lower()
-            for term in query_terms:
-                score += content_lower.count(term) * 1.0
-        
-        # Check text field
-        if "text" in item and isinstance(item["text"], str):
-            text_lower = item["text"].lower()
-            for term in query_terms:
-                score += text_lower.count(term) * 1.0
-        
-        # Check title field (higher weight)
-        if "title" in item and isinstance(item["title"], str):
-            title_lower = item["title"].lower()
-            for term in query_terms:
-                score += title_lower.count(term) * 3.0
-        
-        # Check tags (higher weight)
-        if "tags" in item and isinstance(item["tags"], list):
-            for tag in item["tags"]:
-                if isinstance(tag, str):
-                    tag_lower = tag.lower()
-                    for term in query_terms:
-                        if term in tag_lower:
-                            score += 2.0
-        
-        # Recency bonus
-        if "timestamp" in item:
-            time_diff = time.time() - item["timestamp"]
-            recency_score = 1.0 / (1.0 + time_diff / (24 * 60 * 60))  # Decay over days
-            score *= (1.0 + recency_score)
-        
-        return score
+        file_path = os.path.join(self.storage_dir, source, f"{item_id}.json")
+        try:
+            with open(file_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # Removed outside the manager
+            self.index.remove(source, item_id)
+        except Exception as e:
+            logger.error(f"Error loading {file_path}: {str(e)}")
+        return {}
+    
+    def _sync_index(self):
+        """
+        Bring the persistent index in line with the files in storage.
+        
+        Files written without the index (e.g. by an older version) are indexed
+        and entries for files that no longer exist are dropped. Only the
+        directory listings are compared; files are read only when missing
+        from the index.
+        """
+        for source in ("long_term", "episodic"):
+            directory = os.path.join(self.storage_dir, source)
+            try:
+                file_ids = {filename[:-5] for filename in os.listdir(directory) if filename.endswith(".json")}
+            except Exception as e:
+                logger.error(f"Error listing {source} memory: {str(e)}")
+                continue
+            
+            indexed_ids = set(self.index.persistent_ids(source))
+            
+            for item_id in indexed_ids - file_ids:
+                self.index.remove(source, item_id)
+            
+            missing_ids = file_ids - indexed_ids
+            for item_id in missing_ids:
+                file_path = os.path.join(directory, f"{item_id}.json")
+                try:
+                    with open(file_path, "r") as f:
+                        item = json.load(f)
+                    item["id"] = item_id
+                    self.index.add(source, item)
+                except Exception as e:
+                    logger.error(f"Error indexing {file_path}: {str(e)}")
+            
+            if missing_ids:
+                logger.info(f"Indexed {len(missing_ids)} {source} memory items")
     
     def _list_long_term_memory(self) -> List[Dict[str, Any]]:
         """
@@ -473,52 +443,36 @@ class MemoryManager:
         """
         Clean up old memory items.
         
+        Expired items are found through the index by timestamp, so item files
+        are not read.
+        
         Returns:
             Tuple of (long_term_removed, episodic_removed)
         """
         long_term_removed = 0
         episodic_removed = 0
         
-        # Clean up long-term memory
-        try:
-            for filename in os.listdir(os.path.join(self.storage_dir, "long_term")):
-                if filename.endswith(".json"):
-                    file_path = os.path.join(self.storage_dir, "long_term", filename)
-                    try:
-                        with open(file_path, "r") as f:
-                            item = json.load(f)
-                            
-                            # Check if item is too old
-                            if "timestamp" in item:
-                                age_days = (time.time() - item["timestamp"]) / (24 * 60 * 60)
-                                if age_days > self.long_term_retention_days:
-                                    os.remove(file_path)
-                                    long_term_removed += 1
-                    except Exception as e:
-                        logger.error(f"Error processing {file_path}: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error cleaning up long-term memory: {str(e)}")
+        cutoff = time.time() - self.long_term_retention_days * 24 * 60 * 60
+        sources = ["long_term"] + (["episodic"] if self.enable_episodic_memory else [])
         
-        # Clean up episodic memory
-        if self.enable_episodic_memory:
+        removed_episodes = set()
+        for source, item_id in self.index.expired(cutoff, sources):
+            file_path = os.path.join(self.storage_dir, source, f"{item_id}.json")
             try:
-                for filename in os.listdir(os.path.join(self.storage_dir, "episodic")):
-                    if filename.endswith(".json"):
-                        file_path = os.path.join(self.storage_dir, "episodic", filename)
-                        try:
-                            with open(file_path, "r") as f:
-                                episode = json.load(f)
-                                
-                                # Check if episode is too old
-                                if "timestamp" in episode:
-                                    age_days = (time.time() - episode["timestamp"]) / (24 * 60 * 60)
-                                    if age_days > self.long_term_retention_days:
-                                        os.remove(file_path)
-                                        episodic_removed += 1
-                        except Exception as e:
-                            logger.error(f"Error processing {file_path}: {str(e)}")
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                    if source == "long_term":
+                        long_term_removed += 1
+                    else:
+                        episodic_removed += 1
+                        removed_episodes.add(item_id)
+                self.index.remove(source, item_id)
             except Exception as e:
-                logger.error(f"Error cleaning up episodic memory: {str(e)}")
+                logger.error(f"Error processing {file_path}: {str(e)}")
+        
+        if removed_episodes:
+            self.episodic_memory = [episode for episode in self.episodic_memory
+                                    if episode["id"] not in removed_episodes]
         
         logger.info(f"Cleaned up memory: removed {long_term_removed} long-term items and {episodic_removed} episodes")
         return (long_term_removed, episodic_removed)
@@ -6,11 +6,18 @@ context processing across specialized agents, enabling efficient handling of ext
 large projects.
 """
 
+import asyncio
 import logging
 import threading
 import queue
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Union, Tuple, Callable
 
+from app.core.performance import PerformanceMetric
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -27,7 +34,8 @@ class MultiAgentContextDistributor:
         max_agents: int = 5,
         coordinator_role: str = "coordinator",
         specialization_enabled: bool = True,
-        sync_interval: float = 1.0
+        sync_interval: float = 1.0,
+        max_workers: int = 8
     ):
         """
         Initialize the MultiAgentContextDistributor.
@@ -37,21 +45,39 @@ class MultiAgentContextDistributor:
             coordinator_role: Role of the coordinator agent
             specialization_enabled: Whether to enable agent specialization
             sync_interval: Interval for context synchronization in seconds
+            max_workers: Number of threads processing tasks of synchronous agents
         """
         self.max_agents = max_agents
         self.coordinator_role = coordinator_role
         self.specialization_enabled = specialization_enabled
         self.sync_interval = sync_interval
+        self.max_workers = max_workers
         
         # Initialize agent registry
         self.agents = {}
         self.agent_specializations = {}
         self.agent_contexts = {}
         
-        # Initialize task queue
+        # Initialize task queue (holds tasks submitted while processing is stopped)
         self.task_queue = queue.Queue()
         self.results = {}
         
+        # Per-agent task queues; each agent processes one task at a time
+        self.agent_queues: Dict[str, deque] = {}
+        self._active_agents = set()
+        self._futures: Dict[str, Future] = {}
+        self._queued_at: Dict[str, float] = {}
+        self._task_lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        
+        # Task statistics
+        self._wait_time = PerformanceMetric("task_wait_time", "multi_agent_context")
+        self._processing_time = PerformanceMetric("task_processing_time", "multi_agent_context")
+        self._max_queue_depth: Dict[str, int] = {}
+        self._failed_count = 0
+        
         # Initialize synchronization
         self.sync_event = threading.Event()
         self.sync_thread = None
@@ -127,6 +153,14 @@ class MultiAgentContextDistributor:
         if agent_id in self.agent_contexts:
             del self.agent_contexts[agent_id]
         
+        # Reassign tasks queued for the agent
+        with self._task_lock:
+            pending_tasks = self.agent_queues.pop(agent_id, deque())
+            self._max_queue_depth.pop(agent_id, None)
+            for task in pending_tasks:
+                task.pop("assigned_agent", None)
+                self._route_task(task)
+        
         logger.info(f"Unregistered agent {agent_id}")
         return True
     
@@ -174,13 +208,19 @@ class MultiAgentContextDistributor:
         
         return self.agent_contexts[agent_id]["current_context"]
     
-    def distribute_context(self, context: str, context_type: str = "general") -> Dict[str, str]:
+    def distribute_context(
+        self,
+        context: str,
+        context_type: str = "general",
+        paragraphs: Optional[List[str]] = None
+    ) -> Dict[str, str]:
         """
         Distribute context across agents based on specialization.
         
         Args:
             context: Context to distribute
             context_type: Type of context (code, document, conversation, etc.)
+            paragraphs: Optional paragraphs of the context, if already split
         
         Returns:
             Dictionary mapping agent IDs to assigned context segments
@@ -193,7 +233,7 @@ class MultiAgentContextDistributor:
         coordinator_id = self._identify_coordinator()
         
         # Segment context
-        context_segments = self._segment_context(context, context_type)
+        context_segments = self._segment_context(context, context_type, paragraphs)
         
         # Assign segments to agents
         assignments = {}
@@ -255,13 +295,19 @@ class MultiAgentContextDistributor:
         
         return None
     
-    def _segment_context(self, context: str, context_type: str) -> List[Dict[str, Any]]:
+    def _segment_context(
+        self,
+        context: str,
+        context_type: str,
+        paragraphs: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Segment context into manageable pieces.
         
         Args:
             context: Context to segment
             context_type: Type of context
+            paragraphs: Optional paragraphs of the context, if already split
         
         Returns:
             List of context segments with metadata
@@ -351,7 +397,8 @@ class MultiAgentContextDistributor:
             
             # If no segments were found, split by paragraphs
             if not segments:
-                paragraphs = re.split(r'\n\s*\n', context)
+                if paragraphs is None:
+                    paragraphs = re.split(r'\n\s*\n', context)
                 
                 for i, paragraph in enumerate(paragraphs):
                     if paragraph.strip():
@@ -412,7 +459,8 @@ class MultiAgentContextDistributor:
             import re
             
             # Try to split by paragraphs
-            paragraphs = re.split(r'\n\s*\n', context)
+            if paragraphs is None:
+                paragraphs = re.split(r'\n\s*\n', context)
             
             current_segment = []
             current_size = 0
@@ -596,6 +644,10 @@ class MultiAgentContextDistributor:
         """
         Submit a task for processing.
         
+        While processing is running, the task is queued for its agent right away
+        and started as soon as the agent is free. Use get_task_future to wait for
+        the result.
+        
         Args:
             task: Task to process
             agent_id: Specific agent to assign the task to, or None for auto-assignment
@@ -606,12 +658,10 @@ class MultiAgentContextDistributor:
         """
         # Generate task ID if not provided
         if "id" not in task:
-            import uuid
             task["id"] = str(uuid.uuid4())
         
         # Add timestamp if not provided
         if "timestamp" not in task:
-            import time
             task["timestamp"] = time.time()
         
         # Add callback if provided
@@ -625,20 +675,27 @@ class MultiAgentContextDistributor:
                 return task["id"]
             
             task["assigned_agent"] = agent_id
-            self.agent_contexts[agent_id]["assigned_tasks"].append(task["id"])
         
-        # Add to task queue
-        self.task_queue.put(task)
+        with self._task_lock:
+            self._futures[task["id"]] = Future()
+            self._queued_at[task["id"]] = time.time()
+            
+            if self.running:
+                self._route_task(task)
+            else:
+                # Add to task queue until processing starts
+                self.task_queue.put(task)
         
         logger.info(f"Submitted task {task['id']}")
         return task["id"]
     
-    def get_task_result(self, task_id: str) -> Optional[Dict[str, Any]]:
+    def get_task_result(self, task_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """
         Get the result of a task.
         
         Args:
             task_id: ID of the task
+            timeout: Seconds to wait for a pending task (None returns immediately)
         
         Returns:
             Task result, or None if not available
@@ -646,6 +703,36 @@ class MultiAgentContextDistributor:
         if task_id in self.results:
             return self.results[task_id]
         
+        if timeout is not None:
+            future = self._futures.get(task_id)
+            if future is not None:
+                try:
+                    return future.result(timeout=timeout)
+                except Exception:
+                    return None
+        
+        return None
+    
+    def get_task_future(self, task_id: str) -> Optional[Future]:
+        """
+        Get a future resolving to the result of a task.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            Future for the task result, or None if the task is unknown
+        """
+        with self._task_lock:
+            future = self._futures.get(task_id)
+            if future is not None:
+                return future
+            
+            if task_id in self.results:
+                future = Future()
+                future.set_result(self.results[task_id])
+                return future
+        
         return None
     
     def start_processing(self) -> bool:
@@ -659,7 +746,24 @@ class MultiAgentContextDistributor:
             logger.warning("Already running")
             return False
         
-        self.running = True
+        with self._task_lock:
+            self.running = True
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="MultiAgentContextWorker"
+            )
+            
+            # Queue tasks submitted while processing was stopped
+            while True:
+                try:
+                    task = self.task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._route_task(task)
+                self.task_queue.task_done()
+            
+            for agent_id in list(self.agent_queues):
+                self._dispatch_agent(agent_id)
         
         # Start synchronization thread
         self.sync_thread = threading.Thread(target=self._sync_loop)
@@ -673,6 +777,9 @@ class MultiAgentContextDistributor:
         """
         Stop processing tasks and synchronizing context.
         
+        Tasks that are already running finish; queued tasks stay queued until
+        processing is started again.
+        
         Returns:
             True if stopped successfully
         """
@@ -680,21 +787,25 @@ class MultiAgentContextDistributor:
             logger.warning("Not running")
             return False
         
-        self.running = False
+        with self._task_lock:
+            self.running = False
+            executor = self._executor
+            self._executor = None
+        
         self.sync_event.set()
         
         if self.sync_thread:
             self.sync_thread.join(timeout=5.0)
         
+        if executor is not None:
+            executor.shutdown(wait=False)
+        
         logger.info("Stopped processing")
         return True
     
     def _sync_loop(self):
         """Synchronization loop for context sharing."""
         while self.running:
-            # Process tasks
-            self._process_tasks()
-            
             # Synchronize context
             self._synchronize_context()
             
@@ -702,67 +813,202 @@ class MultiAgentContextDistributor:
             self.sync_event.wait(timeout=self.sync_interval)
             self.sync_event.clear()
     
-    def _process_tasks(self):
-        """Process tasks in the queue."""
+    def _route_task(self, task: Dict[str, Any]):
+        """
+        Queue a task for its agent and start it if the agent is free.
+        
+        Must be called with the task lock held.
+        
+        Args:
+            task: Task to route
+        """
+        # Determine agent to process task
+        agent_id = task.get("assigned_agent")
+        if not agent_id or agent_id not in self.agents:
+            # Auto-assign based on specialization
+            agent_id = self._assign_task_to_agent(task)
+        
+        if not agent_id:
+            logger.warning(f"No suitable agent found for task {task['id']}")
+            self._failed_count += 1
+            self._finish_task(task, {
+                "status": "failed",
+                "error": "No suitable agent found"
+            })
+            return
+        
+        task["assigned_agent"] = agent_id
+        self.agent_contexts[agent_id]["assigned_tasks"].append(task["id"])
+        
+        agent_queue = self.agent_queues.setdefault(agent_id, deque())
+        agent_queue.append(task)
+        self._max_queue_depth[agent_id] = max(self._max_queue_depth.get(agent_id, 0), len(agent_queue))
+        
+        self._dispatch_agent(agent_id)
+    
+    def _dispatch_agent(self, agent_id: str):
+        """
+        Start the next queued task of an agent if the agent is free.
+        
+        Must be called with the task lock held.
+        
+        Args:
+            agent_id: ID of the agent
+        """
+        if not self.running or agent_id in self._active_agents:
+            return
+        
+        agent_queue = self.agent_queues.get(agent_id)
+        if not agent_queue:
+            return
+        
+        task = agent_queue.popleft()
+        self._active_agents.add(agent_id)
+        
+        queued_at = self._queued_at.pop(task["id"], None)
+        if queued_at is not None:
+            self._wait_time.record_call(time.time() - queued_at)
+        
+        agent = self.agents[agent_id]
+        process_task = getattr(agent, "process_task", None)
+        
+        if asyncio.iscoroutinefunction(process_task):
+            # Coroutine agents run on the distributor's event loop
+            asyncio.run_coroutine_threadsafe(self._run_task_async(agent_id, task), self._get_event_loop())
+        else:
+            self._executor.submit(self._run_task, agent_id, task)
+    
+    def _run_task(self, agent_id: str, task: Dict[str, Any]):
+        """
+        Process a task with a synchronous agent.
+        
+        Args:
+            agent_id: ID of the agent
+            task: Task to process
+        """
+        start_time = time.time()
         try:
-            # Process up to 10 tasks per cycle
-            for _ in range(10):
-                if self.task_queue.empty():
-                    break
-                
-                # Get task
-                task = self.task_queue.get_nowait()
-                
-                # Determine agent to process task
-                agent_id = task.get("assigned_agent")
-                if not agent_id or agent_id not in self.agents:
-                    # Auto-assign based on specialization
-                    agent_id = self._assign_task_to_agent(task)
-                
-                if not agent_id:
-                    logger.warning(f"No suitable agent found for task {task['id']}")
-                    self.results[task["id"]] = {
-                        "status": "failed",
-                        "error": "No suitable agent found"
-                    }
-                    continue
-                
-                # Process task
-                try:
-                    agent = self.agents[agent_id]
-                    
-                    # Call agent's process_task method if available
-                    if hasattr(agent, "process_task"):
-                        result = agent.process_task(task)
-                    else:
-                        # Mock processing
-                        result = {
-                            "status": "completed",
-                            "result": f"Processed by agent {agent_id}"
-                        }
-                    
-                    # Store result
-                    self.results[task["id"]] = result
-                    
-                    # Call callback if provided
-                    if "callback" in task and callable(task["callback"]):
-                        task["callback"](task["id"], result)
-                    
-                    logger.info(f"Processed task {task['id']} with agent {agent_id}")
-                
-                except Exception as e:
-                    logger.error(f"Error processing task {task['id']} with agent {agent_id}: {str(e)}")
-                    self.results[task["id"]] = {
-                        "status": "failed",
-                        "error": str(e)
-                    }
-                
-                finally:
-                    # Mark task as done
-                    self.task_queue.task_done()
+            agent = self.agents.get(agent_id)
+            
+            # Call agent's process_task method if available
+            if hasattr(agent, "process_task"):
+                result = agent.process_task(task)
+            else:
+                # Mock processing
+                result = {
+                    "status": "completed",
+                    "result": f"Processed by agent {agent_id}"
+                }
+            error = None
         
         except Exception as e:
-            logger.error(f"Error in task processing loop: {str(e)}")
+            logger.error(f"Error processing task {task['id']} with agent {agent_id}: {str(e)}")
+            result = {
+                "status": "failed",
+                "error": str(e)
+            }
+            error = e
+        
+        self._complete_task(agent_id, task, result, time.time() - start_time, error)
+    
+    async def _run_task_async(self, agent_id: str, task: Dict[str, Any]):
+        """
+        Process a task with a coroutine agent.
+        
+        Args:
+            agent_id: ID of the agent
+            task: Task to process
+        """
+        start_time = time.time()
+        try:
+            result = await self.agents[agent_id].process_task(task)
+            error = None
+        
+        except Exception as e:
+            logger.error(f"Error processing task {task['id']} with agent {agent_id}: {str(e)}")
+            result = {
+                "status": "failed",
+                "error": str(e)
+            }
+            error = e
+        
+        self._complete_task(agent_id, task, result, time.time() - start_time, error)
+    
+    def _complete_task(
+        self,
+        agent_id: str,
+        task: Dict[str, Any],
+        result: Dict[str, Any],
+        duration: float,
+        error: Optional[Exception] = None
+    ):
+        """
+        Record a finished task and start the agent's next task.
+        
+        Args:
+            agent_id: ID of the agent
+            task: Finished task
+            result: Task result
+            duration: Processing time in seconds
+            error: Exception raised by the agent, if any
+        """
+        with self._task_lock:
+            self._processing_time.record_call(duration, error)
+            if error is not None:
+                self._failed_count += 1
+            
+            context = self.agent_contexts.get(agent_id)
+            if context is not None and task["id"] in context["assigned_tasks"]:
+                context["assigned_tasks"].remove(task["id"])
+            
+            self._active_agents.discard(agent_id)
+            self._dispatch_agent(agent_id)
+        
+        self._finish_task(task, result)
+        logger.info(f"Processed task {task['id']} with agent {agent_id}")
+    
+    def _finish_task(self, task: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Store a task result, call the task callback and resolve its future.
+        
+        Args:
+            task: Finished task
+            result: Task result
+        """
+        self.results[task["id"]] = result
+        self._queued_at.pop(task["id"], None)
+        
+        # Call callback if provided
+        if "callback" in task and callable(task["callback"]):
+            try:
+                task["callback"](task["id"], result)
+            except Exception as e:
+                logger.error(f"Error in callback of task {task['id']}: {str(e)}")
+        
+        future = self._futures.pop(task["id"], None)
+        if future is not None:
+            future.set_result(result)
+    
+    def _get_event_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the event loop running coroutine agents, starting it if needed.
+        
+        The loop runs in a daemon thread for the lifetime of the distributor, so
+        coroutine tasks still running when processing stops can complete.
+        
+        Returns:
+            Event loop
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever,
+                name="MultiAgentContextLoop",
+                daemon=True
+            )
+            self._loop_thread.start()
+        
+        return self._loop
     
     def _assign_task_to_agent(self, task: Dict[str, Any]) -> Optional[str]:
         """
@@ -877,15 +1123,25 @@ class MultiAgentContextDistributor:
         Get the current status of the system.
         
         Returns:
-            Dictionary with system status information
-        """
-        status = {
-            "agents": len(self.agents),
-            "running": self.running,
-            "pending_tasks": self.task_queue.qsize(),
-            "completed_tasks": len(self.results),
-            "agent_loads": {}
-        }
+            Dictionary with system status information, including per-agent queue
+            depths and task wait and processing time statistics (in seconds)
+        """
+        with self._task_lock:
+            queue_depths = {agent_id: len(agent_queue) for agent_id, agent_queue in self.agent_queues.items()}
+            
+            status = {
+                "agents": len(self.agents),
+                "running": self.running,
+                "pending_tasks": self.task_queue.qsize() + sum(queue_depths.values()),
+                "active_tasks": len(self._active_agents),
+                "completed_tasks": len(self.results),
+                "failed_tasks": self._failed_count,
+                "agent_loads": {},
+                "queue_depths": queue_depths,
+                "max_queue_depths": dict(self._max_queue_depth),
+                "wait_time": self._wait_time.get_stats(),
+                "processing_time": self._processing_time.get_stats()
+            }
         
         for agent_id in self.agents:
             status["agent_loads"][agent_id] = self.get_agent_load(agent_id)
@@ -5,10 +5,17 @@ This module provides the Recursive Summarization Pipeline, which creates multi-l
 summaries to maintain high-level understanding while allowing access to details.
 """
 
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Union, Tuple
 import re
 
+from app.core.tokenizer import TokenCounter, HuggingFaceTokenizer, get_tokenizer
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -28,7 +35,11 @@ class RecursiveSummarizer:
         min_size: int = 100,
         compression_ratio: float = 0.3,
         max_recursion_depth: int = 5,
-        preserve_key_info: bool = True
+        preserve_key_info: bool = True,
+        map_reduce: bool = False,
+        max_workers: int = 4,
+        cache_size: int = 10000,
+        token_counter: Optional[Union[str, TokenCounter]] = None
     ):
         """
         Initialize the RecursiveSummarizer.
@@ -41,6 +52,13 @@ class RecursiveSummarizer:
             compression_ratio: Target compression ratio for summarization
             max_recursion_depth: Maximum recursion depth for summarization
             preserve_key_info: Whether to preserve key information in summaries
+            map_reduce: Whether to summarize the chunks of each level concurrently
+            max_workers: Number of worker threads used in map-reduce mode
+            cache_size: Maximum number of chunk summaries and token counts to cache
+                (0 disables caching)
+            token_counter: Token counter, or the name of a registered tokenizer, used to
+                measure text (defaults to the summarization model's tokenizer if one is
+                loaded, and to the default tokenizer otherwise)
         """
         self.model = model
         self.tokenizer = tokenizer
@@ -49,11 +67,24 @@ class RecursiveSummarizer:
         self.compression_ratio = compression_ratio
         self.max_recursion_depth = max_recursion_depth
         self.preserve_key_info = preserve_key_info
+        self.map_reduce = map_reduce
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        
+        # Chunk summaries keyed by content hash
+        self._summary_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Timing of each level of the most recent summarize() call
+        self.last_level_timings: List[Dict[str, Any]] = []
         
         # Initialize model and tokenizer if not provided
         if self.model is None or self.tokenizer is None:
             self._initialize_model_and_tokenizer()
         
+        self.token_counter = self._init_token_counter(token_counter)
+        
         logger.info(f"Initialized RecursiveSummarizer with target_size={target_size}")
     
     def _initialize_model_and_tokenizer(self):
@@ -76,13 +107,64 @@ class RecursiveSummarizer:
             self.model = MockSummarizationModel()
             self.tokenizer = MockTokenizer()
     
-    def summarize(self, text: str, recursion_depth: int = 0) -> Dict[str, Any]:
+    def _init_token_counter(self, token_counter: Optional[Union[str, TokenCounter]]) -> TokenCounter:
+        """
+        Initialize the token counter.
+        
+        Args:
+            token_counter: Token counter, name of a registered tokenizer, or None
+        
+        Returns:
+            Token counter
+        """
+        if isinstance(token_counter, TokenCounter):
+            return token_counter
+        
+        if token_counter is None and hasattr(self.tokenizer, "encode") and not isinstance(self.tokenizer, MockTokenizer):
+            # Measure text with the tokenizer of the summarization model
+            return TokenCounter(HuggingFaceTokenizer(self.tokenizer), cache_size=self.cache_size)
+        
+        return get_tokenizer(token_counter)
+    
+    def summarize(self, text: str, recursion_depth: int = 0, paragraphs: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Recursively summarize text.
         
+        Chunk summaries are cached by content hash, so summarizing an edited
+        document again only summarizes the chunks that changed. In map-reduce
+        mode the chunks of each level are summarized concurrently.
+        
+        Args:
+            text: Text to summarize
+            recursion_depth: Current recursion depth
+            paragraphs: Optional paragraphs of the text, if already split
+        
+        Returns:
+            Dictionary containing the summary and metadata, including
+            "level_timings" with the chunk count, cache hits and seconds spent
+            per recursion level
+        """
+        level_timings = []
+        result = self._summarize(text, recursion_depth, level_timings, paragraphs)
+        result["level_timings"] = level_timings
+        self.last_level_timings = level_timings
+        return result
+    
+    def _summarize(
+        self,
+        text: str,
+        recursion_depth: int,
+        level_timings: List[Dict[str, Any]],
+        paragraphs: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Recursively summarize text, recording the timing of each level.
+        
         Args:
             text: Text to summarize
             recursion_depth: Current recursion depth
+            level_timings: List that level timings are appended to
+            paragraphs: Optional paragraphs of the text, if already split
         
         Returns:
             Dictionary containing the summary and metadata
@@ -101,30 +183,42 @@ class RecursiveSummarizer:
                 "children": []
             }
         
+        start_time = time.time()
+        
         # Chunk the text
-        chunks = self._chunk_text(text)
+        chunks = self._chunk_text(text, paragraphs)
         
         # Summarize each chunk
+        summaries, cached_count = self._summarize_chunks(chunks)
+        
         chunk_summaries = []
-        for chunk in chunks:
-            # Summarize the chunk
-            summary = self._summarize_chunk(chunk)
+        for chunk, summary in zip(chunks, summaries):
+            summary_token_count = self._count_tokens(summary)
+            chunk_token_count = self._count_tokens(chunk)
             
             # Add to chunk summaries
             chunk_summaries.append({
                 "summary": summary,
                 "original_text": chunk,
-                "token_count": self._count_tokens(summary),
-                "original_token_count": self._count_tokens(chunk),
-                "compression_ratio": self._count_tokens(summary) / max(1, self._count_tokens(chunk))
+                "token_count": summary_token_count,
+                "original_token_count": chunk_token_count,
+                "compression_ratio": summary_token_count / max(1, chunk_token_count)
             })
         
+        level_timings.append({
+            "level": recursion_depth,
+            "chunks": len(chunks),
+            "cached_chunks": cached_count,
+            "seconds": time.time() - start_time
+        })
+        
         # Combine chunk summaries
         combined_summary = " ".join([cs["summary"] for cs in chunk_summaries])
+        combined_token_count = self._count_tokens(combined_summary)
         
         # If combined summary is still too large, recursively summarize
-        if self._count_tokens(combined_summary) > self.target_size:
-            result = self.summarize(combined_summary, recursion_depth + 1)
+        if combined_token_count > self.target_size:
+            result = self._summarize(combined_summary, recursion_depth + 1, level_timings)
             
             # Add chunk summaries as children
             result["children"] = chunk_summaries
@@ -135,13 +229,126 @@ class RecursiveSummarizer:
         return {
             "summary": combined_summary,
             "original_text": text,
-            "token_count": self._count_tokens(combined_summary),
+            "token_count": combined_token_count,
             "original_token_count": token_count,
-            "compression_ratio": self._count_tokens(combined_summary) / token_count,
+            "compression_ratio": combined_token_count / token_count,
             "recursion_depth": recursion_depth + 1,
             "children": chunk_summaries
         }
     
+    def _summarize_chunks(self, chunks: List[str]) -> Tuple[List[str], int]:
+        """
+        Summarize chunks, using cached summaries where available.
+        
+        Args:
+            chunks: Text chunks to summarize
+        
+        Returns:
+            Tuple of (summaries in chunk order, number of cache hits)
+        """
+        summaries: List[Optional[str]] = [None] * len(chunks)
+        pending: Dict[str, List[int]] = {}
+        
+        for i, chunk in enumerate(chunks):
+            key = self._summary_cache_key(chunk)
+            cached = self._cache_get(self._summary_cache, key)
+            if cached is not None:
+                summaries[i] = cached
+            else:
+                # Identical chunks are only summarized once
+                pending.setdefault(key, []).append(i)
+        
+        cached_count = len(chunks) - sum(len(indices) for indices in pending.values())
+        
+        # Map: summarize the chunks that are not cached
+        jobs = [(key, chunks[indices[0]]) for key, indices in pending.items()]
+        if self.map_reduce and len(jobs) > 1:
+            results = list(self._get_executor().map(lambda job: self._summarize_chunk(job[1]), jobs))
+        else:
+            results = [self._summarize_chunk(chunk) for _, chunk in jobs]
+        
+        for (key, _), summary in zip(jobs, results):
+            for i in pending[key]:
+                summaries[i] = summary
+        
+        return summaries, cached_count
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the thread pool used in map-reduce mode, creating it if needed.
+        
+        Returns:
+            Thread pool executor
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="RecursiveSummarizer"
+            )
+        return self._executor
+    
+    def close(self):
+        """Shut down the map-reduce thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def clear_cache(self):
+        """Clear the cached chunk summaries and token counts."""
+        with self._cache_lock:
+            self._summary_cache.clear()
+        self.token_counter.clear_cache()
+    
+    def _summary_cache_key(self, chunk: str) -> str:
+        """
+        Build the cache key of a chunk summary.
+        
+        The key covers the chunk content and the settings that affect its summary.
+        
+        Args:
+            chunk: Text chunk
+        
+        Returns:
+            Cache key
+        """
+        digest = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+        return f"{digest}:{self.target_size}:{self.min_size}:{self.compression_ratio}:{self.preserve_key_info}"
+    
+    def _cache_get(self, cache: OrderedDict, key: Any) -> Any:
+        """
+        Look up a cached value, marking it as recently used.
+        
+        Args:
+            cache: Cache to look in
+            key: Cache key
+        
+        Returns:
+            Cached value, or None if not cached
+        """
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any):
+        """
+        Store a value, evicting the least recently used entries beyond cache_size.
+        
+        Args:
+            cache: Cache to store in
+            key: Cache key
+            value: Value to store
+        """
+        if self.cache_size <= 0:
+            return
+        
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+    
     def _count_tokens(self, text: str) -> int:
         """
         Count the number of tokens in text.
@@ -152,24 +359,22 @@ class RecursiveSummarizer:
         Returns:
             Number of tokens
         """
-        if hasattr(self.tokenizer, "encode"):
-            return len(self.tokenizer.encode(text))
-        else:
-            # Fallback to simple word count
-            return len(text.split())
+        return self.token_counter.count_tokens(text)
     
-    def _chunk_text(self, text: str) -> List[str]:
+    def _chunk_text(self, text: str, paragraphs: Optional[List[str]] = None) -> List[str]:
         """
         Chunk text into manageable pieces.
         
         Args:
             text: Text to chunk
+            paragraphs: Optional paragraphs of the text, if already split
         
         Returns:
             List of text chunks
         """
         # Try to chunk by paragraphs first
-        paragraphs = re.split(r'\n\s*\n', text)
+        if paragraphs is None:
+            paragraphs = re.split(r'\n\s*\n', text)
         
         # If we have very few paragraphs, split by sentences
         if len(paragraphs) < 3:
@@ -193,9 +398,9 @@ class RecursiveSummarizer:
         current_chunk = []
         current_size = 0
         
-        for element in elements:
-            element_size = self._count_tokens(element)
-            
+        element_sizes = self.token_counter.count_tokens_many(elements)
+        
+        for element, element_size in zip(elements, element_sizes):
             if current_size + element_size <= self.target_size:
                 # Add to current chunk
                 current_chunk.append(element)
@@ -217,7 +422,7 @@ class RecursiveSummarizer:
     
     def _summarize_chunk(self, chunk: str) -> str:
         """
-        Summarize a single chunk of text.
+        Summarize a single chunk of text, caching the summary by content hash.
         
         Args:
             chunk: Text chunk to summarize
@@ -225,67 +430,86 @@ class RecursiveSummarizer:
         Returns:
             Summarized text
         """
+        # Check if chunk is already small enough
+        if self._count_tokens(chunk) <= self.target_size:
+            return chunk
+        
+        key = self._summary_cache_key(chunk)
+        cached = self._cache_get(self._summary_cache, key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Check if chunk is already small enough
-            if self._count_tokens(chunk) <= self.target_size:
-                return chunk
-            
-            # Determine target length
-            target_length = max(self.min_size, int(self._count_tokens(chunk) * self.compression_ratio))
-            
-            # Extract key information if enabled
-            key_info = self._extract_key_information(chunk) if self.preserve_key_info else ""
+            summary = self._generate_summary(chunk)
+        except Exception as e:
+            logger.error(f"Error summarizing chunk: {str(e)}")
+            # Return a truncated version of the chunk as fallback (not cached)
+            return chunk[:self.target_size * 4]  # Rough character estimate
+        
+        self._cache_put(self._summary_cache, key, summary)
+        return summary
+    
+    def _generate_summary(self, chunk: str) -> str:
+        """
+        Generate the summary of a chunk that exceeds the target size.
+        
+        Args:
+            chunk: Text chunk to summarize
+        
+        Returns:
+            Summarized text
+        """
+        # Determine target length
+        target_length = max(self.min_size, int(self._count_tokens(chunk) * self.compression_ratio))
+        
+        # Extract key information if enabled
+        key_info = self._extract_key_information(chunk) if self.preserve_key_info else ""
+        
+        # Generate summary
+        if hasattr(self.model, "generate") and hasattr(self.tokenizer, "encode"):
+            # Use transformer model
+            inputs = self.tokenizer.encode(chunk, return_tensors="pt", max_length=1024, truncation=True)
             
-            # Generate summary
-            if hasattr(self.model, "generate") and hasattr(self.tokenizer, "encode"):
-                # Use transformer model
-                inputs = self.tokenizer.encode(chunk, return_tensors="pt", max_length=1024, truncation=True)
-                
-                summary_ids = self.model.generate(
-                    inputs,
-                    max_length=target_length,
-                    min_length=self.min_size,
-                    length_penalty=2.0,
-                    num_beams=4,
-                    early_stopping=True
-                )
-                
-                summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-            else:
-                # Use mock model
-                summary = self.model.generate_summary(chunk, target_length)
+            summary_ids = self.model.generate(
+                inputs,
+                max_length=target_length,
+                min_length=self.min_size,
+                length_penalty=2.0,
+                num_beams=4,
+                early_stopping=True
+            )
             
-            # Combine key information with summary if needed
-            if key_info and self.preserve_key_info:
-                # Ensure we don't exceed target length
-                combined_length = self._count_tokens(key_info) + self._count_tokens(summary)
-                if combined_length > target_length:
-                    # Reduce summary length to make room for key info
-                    new_summary_target = target_length - self._count_tokens(key_info)
-                    if new_summary_target > self.min_size:
-                        # Regenerate shorter summary
-                        if hasattr(self.model, "generate"):
-                            summary_ids = self.model.generate(
-                                inputs,
-                                max_length=new_summary_target,
-                                min_length=self.min_size,
-                                length_penalty=2.0,
-                                num_beams=4,
-                                early_stopping=True
-                            )
-                            summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-                        else:
-                            summary = self.model.generate_summary(chunk, new_summary_target)
-                
-                # Combine key info with summary
-                summary = key_info + "\n\n" + summary
+            summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+        else:
+            # Use mock model
+            summary = self.model.generate_summary(chunk, target_length)
+        
+        # Combine key information with summary if needed
+        if key_info and self.preserve_key_info:
+            # Ensure we don't exceed target length
+            combined_length = self._count_tokens(key_info) + self._count_tokens(summary)
+            if combined_length > target_length:
+                # Reduce summary length to make room for key info
+                new_summary_target = target_length - self._count_tokens(key_info)
+                if new_summary_target > self.min_size:
+                    # Regenerate shorter summary
+                    if hasattr(self.model, "generate"):
+                        summary_ids = self.model.generate(
+                            inputs,
+                            max_length=new_summary_target,
+                            min_length=self.min_size,
+                            length_penalty=2.0,
+                            num_beams=4,
+                            early_stopping=True
+                        )
+                        summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+                    else:
+                        summary = self.model.generate_summary(chunk, new_summary_target)
             
-            return summary
+            # Combine key info with summary
+            summary = key_info + "\n\n" + summary
         
-        except Exception as e:
-            logger.error(f"Error summarizing chunk: {str(e)}")
-            # Return a truncated version of the chunk as fallback
-            return chunk[:self.target_size * 4]  # Rough character estimate
+        return summary
     
     def _extract_key_information(self, text: str) -> str:
         """
@@ -390,18 +614,19 @@ class RecursiveSummarizer:
         
         return code_blocks + indented_code
     
-    def get_hierarchical_summary(self, text: str) -> Dict[str, Any]:
+    def get_hierarchical_summary(self, text: str, paragraphs: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Generate a hierarchical summary of text.
         
         Args:
             text: Text to summarize
+            paragraphs: Optional paragraphs of the text, if already split
         
         Returns:
             Hierarchical summary structure
         """
         # Generate the recursive summary
-        summary_result = self.summarize(text)
+        summary_result = self.summarize(text, paragraphs=paragraphs)
         
         # Format as hierarchical structure
         hierarchical_summary = self._format_hierarchical_summary(summary_result)
@@ -10,6 +10,8 @@ import logging
 from typing import List, Dict, Any, Optional, Union, Tuple
 import numpy as np
 
+from app.core.embedding_service import EmbeddingService, EmbeddingCache
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -28,7 +30,9 @@ class VectorDatabaseManager:
         collection_name: str = "toronto_agent_context",
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
-        similarity_threshold: float = 0.75
+        similarity_threshold: float = 0.75,
+        embedding_batch_size: int = 32,
+        embedding_cache_dir: Optional[str] = None
     ):
         """
         Initialize the VectorDatabaseManager.
@@ -40,6 +44,9 @@ class VectorDatabaseManager:
             chunk_size: Size of chunks for document segmentation
             chunk_overlap: Overlap between chunks to maintain context
             similarity_threshold: Threshold for similarity search
+            embedding_batch_size: Maximum number of texts per embedding model call
+            embedding_cache_dir: Directory of the persistent embedding cache
+                (None keeps cached embeddings in memory only)
         """
         self.db_provider = db_provider
         self.embedding_model = embedding_model
@@ -52,6 +59,17 @@ class VectorDatabaseManager:
         self.db = self._initialize_db()
         self.model = self._load_embedding_model()
         
+        # Embeddings are batched and cached by content hash
+        model_name = self.embedding_model
+        if isinstance(self.model, MockEmbeddingModel):
+            model_name = f"mock:{model_name}"
+        self.embedding_service = EmbeddingService(
+            self._embed_batch,
+            model_name,
+            batch_size=embedding_batch_size,
+            cache=EmbeddingCache(embedding_cache_dir)
+        )
+        
         logger.info(f"Initialized VectorDatabaseManager with {db_provider} and {embedding_model}")
     
     def _initialize_db(self) -> Any:
@@ -144,10 +162,42 @@ class VectorDatabaseManager:
             # Return a mock model for development/testing
             return MockEmbeddingModel()
     
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts with the embedding model.
+        
+        Args:
+            texts: List of texts to embed
+        
+        Returns:
+            List of embeddings (each embedding is a list of floats)
+        """
+        if isinstance(self.model, MockEmbeddingModel):
+            return self.model.encode(texts)
+        
+        if "sentence-transformers" in self.embedding_model:
+            embeddings = self.model.encode(texts)
+            return embeddings.tolist() if isinstance(embeddings, np.ndarray) else embeddings
+        
+        elif "openai" in self.embedding_model.lower():
+            response = self.model.Embedding.create(
+                input=texts,
+                model="text-embedding-ada-002"
+            )
+            data = sorted(response["data"], key=lambda item: item["index"])
+            return [item["embedding"] for item in data]
+        
+        else:
+            logger.error(f"Unsupported embedding model: {self.embedding_model}")
+            raise ValueError(f"Unsupported embedding model: {self.embedding_model}")
+    
     def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of texts.
         
+        Embeddings are looked up in the embedding cache first; the remaining
+        texts are embedded in batches.
+        
         Args:
             texts: List of texts to generate embeddings for
         
@@ -155,44 +205,27 @@ class VectorDatabaseManager:
             List of embeddings (each embedding is a list of floats)
         """
         try:
-            if isinstance(self.model, MockEmbeddingModel):
-                return self.model.encode(texts)
-            
-            if "sentence-transformers" in self.embedding_model:
-                embeddings = self.model.encode(texts)
-                return embeddings.tolist() if isinstance(embeddings, np.ndarray) else embeddings
-            
-            elif "openai" in self.embedding_model.lower():
-                embeddings = []
-                for text in texts:
-                    response = self.model.Embedding.create(
-                        input=text,
-                        model="text-embedding-ada-002"
-                    )
-                    embeddings.append(response["data"][0]["embedding"])
-                return embeddings
-            
-            else:
-                logger.error(f"Unsupported embedding model: {self.embedding_model}")
-                raise ValueError(f"Unsupported embedding model: {self.embedding_model}")
+            return [embedding.tolist() for embedding in self.embedding_service.embed(texts)]
         
         except Exception as e:
             logger.error(f"Error generating embeddings: {str(e)}")
             # Return mock embeddings for development/testing
             return [MockEmbeddingModel().encode_single(text) for text in texts]
     
-    def _semantic_chunking(self, document: str) -> List[str]:
+    def _semantic_chunking(self, document: str, words: Optional[List[str]] = None) -> List[str]:
         """
         Chunk a document semantically based on content and structure.
         
         Args:
             document: Document to chunk
+            words: Optional words of the document, if already split
         
         Returns:
             List of chunks
         """
         # Simple chunking by tokens (words) with overlap
-        words = document.split()
+        if words is None:
+            words = document.split()
         chunks = []
         
         for i in range(0, len(words), self.chunk_size - self.chunk_overlap):
@@ -205,7 +238,8 @@ class VectorDatabaseManager:
         self,
         document: str,
         metadata: Optional[Dict[str, Any]] = None,
-        document_id: Optional[str] = None
+        document_id: Optional[str] = None,
+        words: Optional[List[str]] = None
     ) -> List[str]:
         """
         Store a document in the vector database.
@@ -214,6 +248,7 @@ class VectorDatabaseManager:
             document: Document to store
             metadata: Optional metadata for the document
             document_id: Optional document ID
+            words: Optional words of the document, if already split
         
         Returns:
             List of chunk IDs
@@ -231,7 +266,7 @@ class VectorDatabaseManager:
         metadata["document_id"] = document_id
         
         # Chunk the document
-        chunks = self._semantic_chunking(document)
+        chunks = self._semantic_chunking(document, words)
         
         # Generate embeddings
         embeddings = self._generate_embeddings(chunks)
@@ -418,6 +453,15 @@ class VectorDatabaseManager:
         
         return context_window.strip()
     
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        """
+        Get embedding cache and batching statistics.
+        
+        Returns:
+            Dictionary with embedding statistics, including the cache hit rate
+        """
+        return self.embedding_service.get_stats()
+    
     def delete_document(self, document_id: str) -> bool:
         """
         Delete a document from the vector database.
@@ -16,12 +16,20 @@
 
 This module provides caching mechanisms for improving performance of database operations and API calls."""
 
+import asyncio
+import hashlib
 import logging
 import time
 import threading
 import json
 import pickle
 import os
+import sys
+import heapq
+import itertools
+import struct
+import zlib
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Callable, Tuple, List, Union, TypeVar, Generic
 from functools import wraps
 from datetime import datetime, timedelta
@@ -30,17 +38,28 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')  # Generic type for cache values
 
+DEFAULT_NUM_SHARDS = 16
+DEFAULT_COMPACTION_CHECK_INTERVAL = 5.0
+
+# Sentinel distinguishing a cache miss from a cached None
+_MISSING = object()
+
+# Persistent cache log records are framed as (payload length, CRC32)
+LOG_RECORD_HEADER = struct.Struct(">II")
+
 class CacheEntry(Generic[T]):
     """Cache entry with value and metadata."""
     
-    def __init__(self, value: T, expiry: Optional[float] = None):
+    def __init__(self, value: T, expiry: Optional[float] = None, size: int = 0):
         """Initialize a cache entry.
         
         Args:
             value: Cached value
-            expiry: Expiry timestamp (None for no expiry)"""
+            expiry: Expiry timestamp (None for no expiry)
+            size: Approximate size of the value in bytes"""
         self.value = value
         self.expiry = expiry
+        self.size = size
         self.created_at = time.time()
         self.last_accessed = self.created_at
         self.access_count = 0
@@ -59,21 +78,80 @@ class CacheEntry(Generic[T]):
         self.last_accessed = time.time()
         self.access_count += 1
 
+class _CacheShard:
+    """A lock-striped partition of a Cache.
+    
+    Entries are kept in an OrderedDict in least- to most-recently-used order
+    and expiring entries are tracked in a min-heap keyed on expiry time."""
+    
+    def __init__(self, index: int):
+        """Initialize the shard.
+        
+        Args:
+            index: Position of the shard in its cache"""
+        self.index = index
+        self.lock = threading.RLock()
+        self.entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        # Insertion-ordered creation times for cheap oldest/newest stats
+        self.created: Dict[str, float] = {}
+        self.expiry_heap: List[Tuple[float, int, str, CacheEntry]] = []
+        self.last_cleanup = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
 class Cache:
-    """In-memory cache with expiry and eviction policies."""
+    """In-memory cache with expiry and eviction policies.
+    
+    Keys are spread over ``num_shards`` independently locked shards so that
+    concurrent callers rarely contend. Each shard evicts in LRU order in O(1)
+    and expires entries through a TTL min-heap, so neither operation scans
+    the whole cache. The cache is bounded by entry count and, optionally, by
+    the approximate total size of its values in bytes."""
     
-    def __init__(self, max_size: int = 1000, cleanup_interval: int = 60):
+    def __init__(self, max_size: int = 1000, cleanup_interval: int = 60, num_shards: Optional[int] = None,
+                 max_bytes: Optional[int] = None, size_fn: Optional[Callable[[Any], int]] = None):
         """Initialize the cache.
         
         Args:
             max_size: Maximum number of entries in the cache
-            cleanup_interval: Interval in seconds for cleanup of expired entries"""
-        self._cache: Dict[str, CacheEntry] = {}
+            cleanup_interval: Interval in seconds for cleanup of expired entries
+            num_shards: Number of lock stripes (None for up to DEFAULT_NUM_SHARDS, one per 64 entries)
+            max_bytes: Maximum approximate size of all cached values in bytes (None for no limit)
+            size_fn: Function estimating the size of a value in bytes (defaults to sys.getsizeof)"""
+        if num_shards is None:
+            num_shards = min(DEFAULT_NUM_SHARDS, max(1, max_size // 64))
+        
         self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._size_fn = size_fn or sys.getsizeof
         self._cleanup_interval = cleanup_interval
-        self._lock = threading.RLock()
+        self._num_shards = max(1, num_shards)
+        self._shards = [_CacheShard(i) for i in range(self._num_shards)]
         self._last_cleanup = time.time()
-        logger.info(f"Initialized cache with max_size={max_size}, cleanup_interval={cleanup_interval}")
+        
+        # Global totals, guarded by a lock that is only ever taken while
+        # already holding at most one shard lock
+        self._totals_lock = threading.Lock()
+        self._size = 0
+        self._bytes = 0
+        self._sequence = itertools.count()
+        
+        logger.info(f"Initialized cache with max_size={max_size}, cleanup_interval={cleanup_interval}, "
+                    f"num_shards={self._num_shards}")
+    
+    @property
+    def _cache(self) -> Dict[str, CacheEntry]:
+        """Snapshot of all entries across shards."""
+        snapshot = {}
+        for shard in self._shards:
+            with shard.lock:
+                snapshot.update(shard.entries)
+        return snapshot
+    
+    def __len__(self) -> int:
+        return self._size
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a value from the cache.
@@ -84,23 +162,27 @@ class Cache:
             
         Returns:
             Cached value or default"""
-        with self._lock:
+        shard = self._shard_for(key)
+        with shard.lock:
             # Check if cleanup is needed
-            self._maybe_cleanup()
+            self._maybe_cleanup(shard)
             
-            # Check if key exists
-            if key not in self._cache:
+            entry = shard.entries.get(key)
+            if entry is None:
+                shard.misses += 1
                 return default
             
-            entry = self._cache[key]
-            
             # Check if entry is expired
             if entry.is_expired():
-                del self._cache[key]
+                self._remove(shard, key)
+                shard.expirations += 1
+                shard.misses += 1
                 return default
             
             # Record access
+            shard.entries.move_to_end(key)
             entry.access()
+            shard.hits += 1
             
             return entry.value
     
@@ -111,24 +193,32 @@ class Cache:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds (None for no expiry)"""
-        with self._lock:
+        # Calculate expiry
+        expiry = None
+        if ttl is not None:
+            expiry = time.time() + ttl
+        
+        # Create entry
+        size = self._size_fn(value) if self._max_bytes is not None else 0
+        entry = CacheEntry(value, expiry, size)
+        
+        shard = self._shard_for(key)
+        with shard.lock:
             # Check if cleanup is needed
-            self._maybe_cleanup()
+            self._maybe_cleanup(shard)
             
-            # Calculate expiry
-            expiry = None
-            if ttl is not None:
-                expiry = time.time() + ttl
+            if key in shard.entries:
+                self._remove(shard, key)
             
-            # Create entry
-            entry = CacheEntry(value, expiry)
+            # Values larger than the whole byte budget are never cached
+            if self._max_bytes is not None and size > self._max_bytes:
+                logger.debug(f"Not caching {key}: {size} bytes exceeds max_bytes={self._max_bytes}")
+                return
             
-            # Check if cache is full
-            if len(self._cache) >= self._max_size and key not in self._cache:
-                self._evict()
-            
-            # Set entry
-            self._cache[key] = entry
+            self._insert(shard, key, entry)
+        
+        # Evict outside the shard lock so shards are never locked in pairs
+        self._enforce_bounds(shard)
     
     def delete(self, key: str) -> bool:
         """Delete a value from the cache.
@@ -138,81 +228,220 @@ class Cache:
             
         Returns:
             True if key was found and deleted, False otherwise"""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
+        shard = self._shard_for(key)
+        with shard.lock:
+            if key in shard.entries:
+                self._remove(shard, key)
                 return True
             return False
     
     def clear(self) -> None:
         """Clear the cache."""
-        with self._lock:
-            self._cache.clear()
-            logger.info("Cache cleared")
+        for shard in self._shards:
+            with shard.lock:
+                for key in list(shard.entries):
+                    self._remove(shard, key)
+                shard.expiry_heap.clear()
+        logger.info("Cache cleared")
+    
+    def _shard_for(self, key: str) -> _CacheShard:
+        """Get the shard responsible for a key.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cache shard"""
+        return self._shards[hash(key) % self._num_shards]
+    
+    def _insert(self, shard: _CacheShard, key: str, entry: CacheEntry) -> None:
+        """Insert an entry into a shard. The shard lock must be held.
+        
+        Args:
+            shard: Cache shard
+            key: Cache key
+            entry: Cache entry"""
+        shard.entries[key] = entry
+        shard.created[key] = entry.created_at
+        if entry.expiry is not None:
+            heapq.heappush(shard.expiry_heap, (entry.expiry, next(self._sequence), key, entry))
+        
+        with self._totals_lock:
+            self._size += 1
+            self._bytes += entry.size
+    
+    def _remove(self, shard: _CacheShard, key: str) -> CacheEntry:
+        """Remove an entry from a shard. The shard lock must be held.
+        
+        Stale expiry heap items are discarded lazily during cleanup.
+        
+        Args:
+            shard: Cache shard
+            key: Cache key
+            
+        Returns:
+            Removed cache entry"""
+        entry = shard.entries.pop(key)
+        del shard.created[key]
+        
+        with self._totals_lock:
+            self._size -= 1
+            self._bytes -= entry.size
+        
+        return entry
     
-    def _maybe_cleanup(self) -> None:
-        """Perform cleanup if needed."""
+    def _over_capacity(self) -> bool:
+        """Check whether the cache exceeds its entry or byte bounds.
+        
+        Returns:
+            True if entries must be evicted, False otherwise"""
+        if self._size > self._max_size:
+            return True
+        return self._max_bytes is not None and self._bytes > self._max_bytes
+    
+    def _enforce_bounds(self, preferred: _CacheShard) -> None:
+        """Evict entries until the cache is within its bounds.
+        
+        Eviction starts with the least recently used entries of the shard
+        that was just written to, never evicting its newest entry, and moves
+        on to the following shards if that is not enough.
+        
+        Args:
+            preferred: Shard to evict from first"""
+        for offset in range(self._num_shards):
+            if not self._over_capacity():
+                return
+            
+            shard = self._shards[(preferred.index + offset) % self._num_shards]
+            keep = 1 if offset == 0 else 0
+            with shard.lock:
+                while self._over_capacity() and len(shard.entries) > keep:
+                    self._evict(shard)
+    
+    def _evict(self, shard: _CacheShard) -> None:
+        """Evict the least recently used entry of a shard. The shard lock must be held.
+        
+        Args:
+            shard: Cache shard"""
+        lru_key = next(iter(shard.entries))
+        self._remove(shard, lru_key)
+        shard.evictions += 1
+        logger.debug(f"Evicted cache entry: {lru_key}")
+    
+    def _maybe_cleanup(self, shard: _CacheShard) -> None:
+        """Perform cleanup of a shard if needed. The shard lock must be held.
+        
+        Args:
+            shard: Cache shard"""
         now = time.time()
-        if now - self._last_cleanup > self._cleanup_interval:
-            self._cleanup()
+        if now - shard.last_cleanup > self._cleanup_interval:
+            self._cleanup(shard)
+            shard.last_cleanup = now
             self._last_cleanup = now
     
-    def _cleanup(self) -> None:
-        """Clean up expired entries."""
-        keys_to_delete = []
-        for key, entry in self._cache.items():
-            if entry.is_expired():
-                keys_to_delete.append(key)
+    def _cleanup(self, shard: _CacheShard) -> None:
+        """Clean up expired entries of a shard. The shard lock must be held.
         
-        for key in keys_to_delete:
-            del self._cache[key]
+        Args:
+            shard: Cache shard"""
+        now = time.time()
+        heap = shard.expiry_heap
+        expired = 0
         
-        if keys_to_delete:
-            logger.debug(f"Cleaned up {len(keys_to_delete)} expired cache entries")
-    
-    def _evict(self) -> None:
-        """Evict entries based on policy."""
-        # Find least recently used entry
-        lru_key = None
-        lru_time = float('inf')
+        while heap and heap[0][0] < now:
+            _, _, key, entry = heapq.heappop(heap)
+            # Skip heap items whose entry was replaced or removed since
+            if shard.entries.get(key) is entry:
+                self._remove(shard, key)
+                expired += 1
         
-        for key, entry in self._cache.items():
-            if entry.last_accessed < lru_time:
-                lru_key = key
-                lru_time = entry.last_accessed
+        # Drop stale heap items once they dominate the heap
+        if len(heap) > 2 * len(shard.entries) + 64:
+            shard.expiry_heap = [item for item in heap if shard.entries.get(item[2]) is item[3]]
+            heapq.heapify(shard.expiry_heap)
         
-        if lru_key:
-            del self._cache[lru_key]
-            logger.debug(f"Evicted cache entry: {lru_key}")
+        shard.expirations += expired
+        if expired:
+            logger.debug(f"Cleaned up {expired} expired cache entries")
     
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics.
         
         Returns:
             Cache statistics"""
-        with self._lock:
-            return {
-                "size": len(self._cache),
-                "max_size": self._max_size,
-                "cleanup_interval": self._cleanup_interval,
-                "last_cleanup": self._last_cleanup,
-                "hit_count": sum(entry.access_count for entry in self._cache.values()),
-                "oldest_entry": min((entry.created_at for entry in self._cache.values()), default=None),
-                "newest_entry": max((entry.created_at for entry in self._cache.values()), default=None)
-            }
+        hits = misses = evictions = expirations = 0
+        oldest = newest = None
+        
+        for shard in self._shards:
+            with shard.lock:
+                hits += shard.hits
+                misses += shard.misses
+                evictions += shard.evictions
+                expirations += shard.expirations
+                if shard.created:
+                    shard_oldest = next(iter(shard.created.values()))
+                    shard_newest = next(reversed(shard.created.values()))
+                    oldest = shard_oldest if oldest is None else min(oldest, shard_oldest)
+                    newest = shard_newest if newest is None else max(newest, shard_newest)
+        
+        lookups = hits + misses
+        return {
+            "size": self._size,
+            "max_size": self._max_size,
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "num_shards": self._num_shards,
+            "cleanup_interval": self._cleanup_interval,
+            "last_cleanup": self._last_cleanup,
+            "hit_count": hits,
+            "miss_count": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "eviction_count": evictions,
+            "expired_count": expirations,
+            "oldest_entry": oldest,
+            "newest_entry": newest
+        }
 
 class PersistentCache(Cache):
-    """Persistent cache that saves to disk."""
+    """Persistent cache that saves to disk.
+    
+    Every write is appended to ``cache.log`` as a small checksummed record
+    instead of re-pickling the whole cache. A background thread folds the
+    log into ``cache.snapshot`` once it grows past ``compaction_threshold``
+    bytes; the snapshot is written to a temporary file and atomically renamed
+    into place, so a crash at any point leaves a loadable snapshot plus a
+    replayable log. Torn records at the end of the log are discarded on load.
+    
+    With ``flush_interval`` set, writes are coalesced in memory (last write
+    per key wins) and appended on that timer instead of on every call."""
     
-    def __init__(self, cache_dir: str, max_size: int = 1000, cleanup_interval: int = 60):
+    def __init__(self, cache_dir: str, max_size: int = 1000, cleanup_interval: int = 60,
+                 flush_interval: Optional[float] = None, compaction_threshold: int = 4 * 1024 * 1024,
+                 sync_writes: bool = False):
         """Initialize the persistent cache.
         
         Args:
             cache_dir: Directory to store cache files
             max_size: Maximum number of entries in the cache
-            cleanup_interval: Interval in seconds for cleanup of expired entries"""
+            cleanup_interval: Interval in seconds for cleanup of expired entries
+            flush_interval: Seconds between coalesced log writes (None to append on every write)
+            compaction_threshold: Log size in bytes that triggers a snapshot
+            sync_writes: Whether to fsync the log after each append"""
         super().__init__(max_size, cleanup_interval)
         self._cache_dir = cache_dir
+        self._flush_interval = flush_interval
+        self._compaction_threshold = compaction_threshold
+        self._sync_writes = sync_writes
+        
+        self._snapshot_file = os.path.join(cache_dir, "cache.snapshot")
+        self._log_file = os.path.join(cache_dir, "cache.log")
+        self._rotated_log_file = os.path.join(cache_dir, "cache.log.old")
+        
+        # Serializes writers so the log order matches the in-memory order
+        self._write_lock = threading.RLock()
+        self._pending: 'OrderedDict[str, Tuple]' = OrderedDict()
+        self._log = None
+        self._log_size = 0
         
         # Create cache directory if it doesn't exist
         os.makedirs(cache_dir, exist_ok=True)
@@ -220,6 +449,10 @@ class PersistentCache(Cache):
         # Load cache from disk
         self._load()
         
+        self._stop_event = threading.Event()
+        self._worker = threading.Thread(target=self._background_loop, name="persistent-cache", daemon=True)
+        self._worker.start()
+        
         logger.info(f"Initialized persistent cache in {cache_dir}")
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
@@ -229,8 +462,10 @@ class PersistentCache(Cache):
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds (None for no expiry)"""
-        super().set(key, value, ttl)
-        self._save()
+        expiry = time.time() + ttl if ttl is not None else None
+        with self._write_lock:
+            super().set(key, value, ttl)
+            self._record(key, ("set", key, value, expiry))
     
     def delete(self, key: str) -> bool:
         """Delete a value from the cache.
@@ -240,45 +475,285 @@ class PersistentCache(Cache):
             
         Returns:
             True if key was found and deleted, False otherwise"""
-        result = super().delete(key)
-        if result:
-            self._save()
-        return result
+        with self._write_lock:
+            result = super().delete(key)
+            if result:
+                self._record(key, ("delete", key))
+            return result
     
     def clear(self) -> None:
         """Clear the cache."""
-        super().clear()
-        self._save()
+        with self._write_lock:
+            super().clear()
+            self._pending.clear()
+            self._record(None, ("clear",))
     
-    def _save(self) -> None:
-        """Save the cache to disk."""
+    def flush(self) -> None:
+        """Append coalesced writes to the log."""
+        with self._write_lock:
+            if not self._pending:
+                return
+            records = list(self._pending.values())
+            self._pending.clear()
+            self._append(records)
+    
+    def compact(self) -> None:
+        """Fold the log into a fresh snapshot.
+        
+        Only log rotation happens under the write lock; the snapshot itself is
+        written without blocking writers."""
+        with self._write_lock:
+            self.flush()
+            if self._log_size == 0:
+                return
+            
+            entries = {key: (entry.value, entry.expiry) for key, entry in self._cache.items()}
+            self._close_log()
+            os.replace(self._log_file, self._rotated_log_file)
+            self._open_log()
+        
+        self._write_snapshot(entries)
+        os.remove(self._rotated_log_file)
+        logger.debug(f"Compacted persistent cache to {len(entries)} entries")
+    
+    def _write_snapshot(self, entries: Dict[str, Tuple]) -> None:
+        """Atomically replace the snapshot file.
+        
+        Args:
+            entries: Mapping of key to (value, expiry)"""
+        temp_file = f"{self._snapshot_file}.tmp"
+        with open(temp_file, "wb") as f:
+            pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self._snapshot_file)
+    
+    def close(self) -> None:
+        """Stop background work and flush pending writes."""
+        self._stop_event.set()
+        if self._worker.is_alive() and self._worker is not threading.current_thread():
+            self._worker.join()
+        with self._write_lock:
+            self.flush()
+            self._close_log()
+    
+    def _record(self, key: Optional[str], record: Tuple) -> None:
+        """Queue or append a log record. The write lock must be held.
+        
+        Args:
+            key: Cache key the record applies to (None for clear)
+            record: Log record"""
+        if self._flush_interval is None:
+            self._append([record])
+            return
+        
+        # Later writes to a key supersede earlier pending ones
+        if key is not None:
+            self._pending.pop(key, None)
+            self._pending[key] = record
+        else:
+            self._append([record])
+    
+    def _append(self, records: List[Tuple]) -> None:
+        """Append records to the log. The write lock must be held.
+        
+        Args:
+            records: Log records"""
         try:
-            cache_file = os.path.join(self._cache_dir, "cache.pickle")
-            with open(cache_file, "wb") as f:
-                pickle.dump(self._cache, f)
-            logger.debug("Cache saved to disk")
+            data = b"".join(self._frame(record) for record in records)
+            self._log.write(data)
+            self._log.flush()
+            if self._sync_writes:
+                os.fsync(self._log.fileno())
+            self._log_size += len(data)
         except Exception as e:
             logger.error(f"Error saving cache to disk: {str(e)}")
     
+    def _frame(self, record: Tuple) -> bytes:
+        """Serialize a log record with a length and checksum header.
+        
+        Args:
+            record: Log record
+            
+        Returns:
+            Framed record bytes"""
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        return LOG_RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+    
+    def _open_log(self) -> None:
+        """Open the log for appending."""
+        self._log = open(self._log_file, "ab")
+        self._log_size = self._log.tell()
+    
+    def _close_log(self) -> None:
+        """Close the log file handle."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+    
+    def _background_loop(self) -> None:
+        """Flush coalesced writes and compact the log until closed."""
+        interval = self._flush_interval or DEFAULT_COMPACTION_CHECK_INTERVAL
+        while not self._stop_event.wait(interval):
+            try:
+                self.flush()
+                if self._log_size > self._compaction_threshold:
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Error in persistent cache background task: {str(e)}")
+    
+    def _replay(self, path: str, entries: Dict[str, Tuple], truncate: bool) -> None:
+        """Apply the records of a log file to a snapshot.
+        
+        Args:
+            path: Log file path
+            entries: Mapping of key to (value, expiry) to update in place
+            truncate: Whether to cut a torn tail off the file"""
+        if not os.path.exists(path):
+            return
+        
+        valid_size = 0
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(LOG_RECORD_HEADER.size)
+                if len(header) < LOG_RECORD_HEADER.size:
+                    break
+                length, checksum = LOG_RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                
+                record = pickle.loads(payload)
+                if record[0] == "set":
+                    entries[record[1]] = (record[2], record[3])
+                elif record[0] == "delete":
+                    entries.pop(record[1], None)
+                elif record[0] == "clear":
+                    entries.clear()
+                valid_size = f.tell()
+        
+        if truncate and valid_size < os.path.getsize(path):
+            logger.warning(f"Discarding torn records at the end of {path}")
+            with open(path, "r+b") as f:
+                f.truncate(valid_size)
+    
     def _load(self) -> None:
         """Load the cache from disk."""
+        entries: Dict[str, Tuple] = {}
+        legacy_file = os.path.join(self._cache_dir, "cache.pickle")
+        migrate_legacy = False
+        
         try:
-            cache_file = os.path.join(self._cache_dir, "cache.pickle")
-            if os.path.exists(cache_file):
-                with open(cache_file, "rb") as f:
-                    self._cache = pickle.load(f)
-                logger.info(f"Loaded {len(self._cache)} cache entries from disk")
+            if os.path.exists(self._snapshot_file):
+                with open(self._snapshot_file, "rb") as f:
+                    entries = pickle.load(f)
+            elif os.path.exists(legacy_file):
+                # Whole-cache pickle written by earlier versions
+                with open(legacy_file, "rb") as f:
+                    entries = {key: (entry.value, entry.expiry) for key, entry in pickle.load(f).items()}
+                migrate_legacy = True
+            
+            # A rotated log only survives if a crash interrupted compaction
+            self._replay(self._rotated_log_file, entries, truncate=False)
+            self._replay(self._log_file, entries, truncate=True)
         except Exception as e:
             logger.error(f"Error loading cache from disk: {str(e)}")
-            self._cache = {}
+            entries = {}
+        
+        now = time.time()
+        for key, (value, expiry) in entries.items():
+            if expiry is not None and expiry <= now:
+                continue
+            size = self._size_fn(value) if self._max_bytes is not None else 0
+            shard = self._shard_for(key)
+            with shard.lock:
+                self._insert(shard, key, CacheEntry(value, expiry, size))
+            self._enforce_bounds(shard)
+        
+        # Finish an interrupted compaction or a legacy migration by writing
+        # a snapshot before any log is discarded
+        if os.path.exists(self._rotated_log_file) or migrate_legacy:
+            self._write_snapshot(entries)
+            if os.path.exists(self._rotated_log_file):
+                os.remove(self._rotated_log_file)
+            open(self._log_file, "wb").close()
+            if migrate_legacy:
+                os.remove(legacy_file)
+        
+        self._open_log()
+        
+        logger.info(f"Loaded {len(self)} cache entries from disk")
 
-def cached(ttl: Optional[int] = None, key_fn: Optional[Callable] = None, cache_instance: Optional[Cache] = None):
+class _StaleableValue:
+    """Cached result with a freshness deadline for stale-while-revalidate."""
+    
+    __slots__ = ("value", "fresh_until")
+    
+    def __init__(self, value: Any, fresh_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+
+class _InFlightCall:
+    """A synchronous call in progress that concurrent callers wait on."""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+def _stable_repr(value: Any) -> str:
+    """Build a deterministic, type-tagged representation of a value.
+    
+    Args:
+        value: Value to represent
+        
+    Returns:
+        Representation that is equal for equal arguments across processes"""
+    if value is None or isinstance(value, (str, bytes, int, float, bool)):
+        return f"{type(value).__name__}:{value!r}"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{','.join(_stable_repr(item) for item in value)}]"
+    if isinstance(value, dict):
+        items = sorted(f"{_stable_repr(k)}={_stable_repr(v)}" for k, v in value.items())
+        return f"dict{{{','.join(items)}}}"
+    if isinstance(value, (set, frozenset)):
+        return f"{type(value).__name__}{{{','.join(sorted(_stable_repr(item) for item in value))}}}"
+    return f"{type(value).__module__}.{type(value).__qualname__}:{value!r}"
+
+def make_cache_key(func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> str:
+    """Derive a cache key for a function call.
+    
+    The arguments are serialized deterministically and hashed with SHA-256,
+    so keys are stable across processes and collisions are negligible.
+    
+    Args:
+        func: Called function
+        args: Positional arguments
+        kwargs: Keyword arguments
+        
+    Returns:
+        Cache key"""
+    payload = _stable_repr(tuple(args)) + "|" + _stable_repr(dict(kwargs))
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{func.__module__}.{func.__qualname__}:{digest}"
+
+def cached(ttl: Optional[int] = None, key_fn: Optional[Callable] = None, cache_instance: Optional[Cache] = None,
+           stale_ttl: Optional[int] = None, cache_none: bool = True, negative_ttl: Optional[int] = None):
     """Decorator for caching function results.
     
+    Works for both regular and ``async def`` functions. Concurrent misses for
+    the same key are coalesced into a single underlying call whose result (or
+    exception) is shared with every waiter. With ``stale_ttl`` set, a value
+    older than ``ttl`` is still served for up to ``stale_ttl`` more seconds
+    while a single background call refreshes it.
+    
     Args:
         ttl: Time to live in seconds (None for no expiry)
         key_fn: Function to generate cache key from function arguments
         cache_instance: Cache instance to use (None for default)
+        stale_ttl: Seconds a value may be served stale while it is refreshed (None to disable)
+        cache_none: Whether None results are cached as negative results
+        negative_ttl: Time to live in seconds for None results (None to use ttl)
         
     Returns:
         Decorated function"""
@@ -287,27 +762,140 @@ def cached(ttl: Optional[int] = None, key_fn: Optional[Callable] = None, cache_i
         cache_instance = _default_cache
     
     def decorator(func):
+        inflight: Dict[str, _InFlightCall] = {}
+        async_inflight: Dict[Tuple[int, str], 'asyncio.Task'] = {}
+        inflight_lock = threading.Lock()
+        
+        def make_key(args: Tuple, kwargs: Dict[str, Any]) -> str:
+            if key_fn:
+                return key_fn(*args, **kwargs)
+            return make_cache_key(func, args, kwargs)
+        
+        def lookup(key: str) -> Tuple[bool, Any, bool]:
+            # Returns (hit, value, stale)
+            stored = cache_instance.get(key, _MISSING)
+            if stored is _MISSING:
+                return False, None, False
+            if isinstance(stored, _StaleableValue):
+                return True, stored.value, time.time() >= stored.fresh_until
+            return True, stored, False
+        
+        def store(key: str, result: Any) -> None:
+            if result is None and not cache_none:
+                return
+            entry_ttl = negative_ttl if result is None and negative_ttl is not None else ttl
+            if stale_ttl is not None and entry_ttl is not None:
+                stored = _StaleableValue(result, time.time() + entry_ttl)
+                cache_instance.set(key, stored, entry_ttl + stale_ttl)
+            else:
+                cache_instance.set(key, result, entry_ttl)
+        
+        if asyncio.iscoroutinefunction(func):
+            async def call_and_store(key: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+                result = await func(*args, **kwargs)
+                store(key, result)
+                return result
+            
+            def start_call(key: str, args: Tuple, kwargs: Dict[str, Any]) -> 'asyncio.Task':
+                # Must be called with inflight_lock held
+                loop = asyncio.get_running_loop()
+                flight_key = (id(loop), key)
+                task = async_inflight.get(flight_key)
+                if task is None:
+                    task = loop.create_task(call_and_store(key, args, kwargs))
+                    async_inflight[flight_key] = task
+                    
+                    def finished(done: 'asyncio.Task') -> None:
+                        with inflight_lock:
+                            if async_inflight.get(flight_key) is done:
+                                del async_inflight[flight_key]
+                    
+                    task.add_done_callback(finished)
+                return task
+            
+            def log_refresh_error(task: 'asyncio.Task') -> None:
+                if not task.cancelled() and task.exception() is not None:
+                    logger.warning(f"Background refresh of {func.__qualname__} failed: {task.exception()}")
+            
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Generate cache key
+                key = make_key(args, kwargs)
+                
+                # Try to get from cache
+                hit, value, stale = lookup(key)
+                if hit and not stale:
+                    return value
+                
+                with inflight_lock:
+                    task = start_call(key, args, kwargs)
+                
+                if hit:
+                    # Serve the stale value while the refresh runs
+                    task.add_done_callback(log_refresh_error)
+                    return value
+                
+                # Shield so one cancelled caller does not cancel the shared call
+                return await asyncio.shield(task)
+            
+            return async_wrapper
+        
+        def call_as_leader(key: str, flight: _InFlightCall, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+            try:
+                result = func(*args, **kwargs)
+                store(key, result)
+                flight.result = result
+                return result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with inflight_lock:
+                    inflight.pop(key, None)
+                flight.event.set()
+        
+        def refresh_in_background(key: str, flight: _InFlightCall, args: Tuple, kwargs: Dict[str, Any]) -> None:
+            try:
+                call_as_leader(key, flight, args, kwargs)
+            except Exception as e:
+                logger.warning(f"Background refresh of {func.__qualname__} failed: {str(e)}")
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Generate cache key
-            if key_fn:
-                key = key_fn(*args, **kwargs)
-            else:
-                # Default key generation
-                key = f"{func.__module__}.{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+            key = make_key(args, kwargs)
             
             # Try to get from cache
-            cached_value = cache_instance.get(key)
-            if cached_value is not None:
-                return cached_value
+            hit, value, stale = lookup(key)
+            if hit and not stale:
+                return value
             
-            # Call function
-            result = func(*args, **kwargs)
+            with inflight_lock:
+                flight = inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = inflight[key] = _InFlightCall()
             
-            # Cache result
-            cache_instance.set(key, result, ttl)
+            if hit:
+                # Serve the stale value, refreshing once in the background
+                if leader:
+                    threading.Thread(
+                        target=refresh_in_background,
+                        args=(key, flight, args, kwargs),
+                        name=f"refresh-{func.__qualname__}",
+                        daemon=True
+                    ).start()
+                return value
             
-            return result
+            if not leader:
+                # Wait for the call already in progress
+                flight.event.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+            
+            return call_as_leader(key, flight, args, kwargs)
+        
         return wrapper
     return decorator
 
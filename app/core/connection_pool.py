@@ -17,16 +17,93 @@
 This module provides connection pooling for database and API connections
 to improve performance and resource utilization."""
 
+import asyncio
+import bisect
+import inspect
 import logging
 import time
 import threading
 import queue
-from typing import Dict, Any, Optional, Callable, List, TypeVar, Generic, Union
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, Optional, Callable, List, TypeVar, Generic, Union, Deque, Iterator, AsyncIterator, Sequence
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')  # Generic type for connection objects
 
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of latencies in seconds."""
+    
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        """Initialize the histogram.
+        
+        Args:
+            buckets: Upper bounds of the buckets in seconds (None for defaults)"""
+        self._bounds = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, value: float) -> None:
+        """Record a latency.
+        
+        Args:
+            value: Latency in seconds"""
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+    
+    def percentile(self, percentile: float) -> float:
+        """Estimate a percentile as the upper bound of the bucket containing it.
+        
+        Args:
+            percentile: Percentile between 0 and 100
+            
+        Returns:
+            Estimated latency in seconds (0.0 if nothing was recorded)"""
+        with self._lock:
+            return self._percentile(percentile)
+    
+    def _percentile(self, percentile: float) -> float:
+        if self._count == 0:
+            return 0.0
+        rank = max(1, int(round(percentile / 100.0 * self._count)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                if index < len(self._bounds):
+                    return min(self._bounds[index], self._max)
+                break
+        return self._max
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a summary of the recorded latencies.
+        
+        Returns:
+            Count, sum, mean, max, estimated percentiles and bucket counts"""
+        with self._lock:
+            labels = [str(bound) for bound in self._bounds] + ["+Inf"]
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "mean": self._sum / self._count if self._count else 0.0,
+                "max": self._max,
+                "p50": self._percentile(50),
+                "p95": self._percentile(95),
+                "p99": self._percentile(99),
+                "buckets": dict(zip(labels, self._counts))
+            }
+
 class PooledConnection(Generic[T]):
     """Wrapper for a pooled connection with metadata."""
     
@@ -53,7 +130,12 @@ class PooledConnection(Generic[T]):
         self.in_use = False
 
 class ConnectionPool(Generic[T]):
-    """Generic connection pool for database and API connections."""
+    """Generic connection pool for database and API connections.
+    
+    Idle connections are kept in a LIFO deque and checked-out connections in
+    a dictionary keyed by identity, so checkout and return are O(1). The lock
+    is only held for bookkeeping: creating, validating and cleaning up
+    connections happens outside of it."""
     
     def __init__(
         self, 
@@ -89,11 +171,23 @@ class ConnectionPool(Generic[T]):
         self._block = block
         self._timeout = timeout
         
-        self._pool: List[PooledConnection[T]] = []
+        # Idle connections (most recently returned on the right) and
+        # checked-out connections keyed by id() of the raw connection; a
+        # factory may hand out the same object more than once
+        self._idle: Deque[PooledConnection[T]] = deque()
+        self._in_use: Dict[int, List[PooledConnection[T]]] = {}
+        self._in_use_count = 0
+        # Connections owned by the pool, including ones being created
+        self._size = 0
+        self._waiters = 0
         self._lock = threading.RLock()
         self._condition = threading.Condition(self._lock)
         self._running = True
         
+        # Latency histograms
+        self._wait_time = LatencyHistogram()
+        self._checkout_latency = LatencyHistogram()
+        
         # Start maintenance thread
         self._maintenance_thread = threading.Thread(
             target=self._maintenance_loop,
@@ -109,13 +203,33 @@ class ConnectionPool(Generic[T]):
     
     def _initialize(self) -> None:
         """Initialize the pool with minimum connections."""
-        with self._lock:
-            for _ in range(self._min_size):
-                try:
-                    connection = self._create_connection()
-                    self._pool.append(connection)
-                except Exception as e:
-                    logger.error(f"Error creating initial connection: {str(e)}")
+        self._replenish()
+    
+    def _replenish(self) -> None:
+        """Create idle connections until the pool holds min_size connections."""
+        while True:
+            with self._lock:
+                if not self._running or self._size >= self._min_size:
+                    return
+                self._size += 1
+            
+            try:
+                pooled_conn = self._create_connection()
+            except Exception as e:
+                logger.error(f"Error creating initial connection: {str(e)}")
+                self._release_slot()
+                return
+            
+            with self._lock:
+                if self._running:
+                    self._idle.append(pooled_conn)
+                    self._condition.notify()
+                    continue
+                self._size -= 1
+            
+            # Pool was shut down while the connection was being created
+            self._cleanup_connection(pooled_conn)
+            return
     
     def _create_connection(self) -> PooledConnection[T]:
         """Create a new connection.
@@ -153,6 +267,100 @@ class ConnectionPool(Generic[T]):
         except Exception as e:
             logger.error(f"Error cleaning up connection: {str(e)}")
     
+    def _track(self, pooled_conn: PooledConnection[T]) -> None:
+        """Record a checked-out connection. Must be called with the lock held.
+        
+        Args:
+            pooled_conn: Pooled connection"""
+        self._in_use.setdefault(id(pooled_conn.connection), []).append(pooled_conn)
+        self._in_use_count += 1
+    
+    def _untrack(self, connection: T) -> Optional[PooledConnection[T]]:
+        """Forget a checked-out connection. Must be called with the lock held.
+        
+        Args:
+            connection: Connection object
+            
+        Returns:
+            Pooled connection, or None if the connection is not checked out"""
+        entries = self._in_use.get(id(connection))
+        if not entries:
+            return None
+        pooled_conn = entries.pop()
+        if not entries:
+            del self._in_use[id(connection)]
+        self._in_use_count -= 1
+        return pooled_conn
+    
+    def _release_slot(self) -> None:
+        """Give back a slot reserved for a connection that no longer exists."""
+        with self._lock:
+            self._size -= 1
+            self._condition.notify()
+    
+    def _discard(self, pooled_conn: PooledConnection[T]) -> None:
+        """Remove a checked-out connection from the pool and clean it up.
+        
+        Args:
+            pooled_conn: Pooled connection"""
+        with self._lock:
+            if self._untrack(pooled_conn.connection) is None:
+                # Already dropped by shutdown
+                return
+            self._size -= 1
+            self._condition.notify()
+        self._cleanup_connection(pooled_conn)
+    
+    def _reserve(self, deadline: float) -> Optional[PooledConnection[T]]:
+        """Check out an idle connection or reserve a slot for a new one.
+        
+        Args:
+            deadline: time.monotonic() value after which waiting times out
+            
+        Returns:
+            Checked-out connection, or None if a slot was reserved"""
+        wait_start = None
+        try:
+            with self._lock:
+                while True:
+                    # Check if pool is running
+                    if not self._running:
+                        raise RuntimeError("Connection pool is shut down")
+                    
+                    # Prefer the most recently used connection
+                    if self._idle:
+                        pooled_conn = self._idle.pop()
+                        pooled_conn.mark_used()
+                        self._track(pooled_conn)
+                        return pooled_conn
+                    
+                    # No available connection, create new if possible
+                    if self._size < self._max_size:
+                        self._size += 1
+                        return None
+                    
+                    # Pool is full and all connections are in use
+                    if not self._block:
+                        raise queue.Empty("No connection available")
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Timeout waiting for connection")
+                    
+                    if wait_start is None:
+                        wait_start = time.monotonic()
+                    
+                    # Wait for a connection or a free slot
+                    self._waiters += 1
+                    try:
+                        self._condition.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+        
+        finally:
+            if wait_start is not None:
+                self._wait_time.record(time.monotonic() - wait_start)
+    
     def get_connection(self) -> T:
         """Get a connection from the pool.
         
@@ -162,58 +370,43 @@ class ConnectionPool(Generic[T]):
         Raises:
             queue.Empty: If no connection is available and block is False
             TimeoutError: If timeout occurs while waiting for a connection"""
-        with self._lock:
-            # Check if pool is running
-            if not self._running:
-                raise RuntimeError("Connection pool is shut down")
-            
-            # Try to get an available connection
-            for i, pooled_conn in enumerate(self._pool):
-                if not pooled_conn.in_use:
-                    # Validate connection
-                    if self._validate_connection(pooled_conn):
-                        pooled_conn.mark_used()
-                        return pooled_conn.connection
-                    else:
-                        # Remove invalid connection
+        start_time = time.monotonic()
+        deadline = start_time + self._timeout
+        
+        try:
+            while True:
+                pooled_conn = self._reserve(deadline)
+                
+                if pooled_conn is None:
+                    # Create the connection outside the lock
+                    try:
+                        pooled_conn = self._create_connection()
+                    except Exception:
+                        self._release_slot()
+                        raise
+                    
+                    with self._lock:
+                        if not self._running:
+                            self._size -= 1
+                            shut_down = True
+                        else:
+                            pooled_conn.mark_used()
+                            self._track(pooled_conn)
+                            shut_down = False
+                    
+                    if shut_down:
                         self._cleanup_connection(pooled_conn)
-                        self._pool.pop(i)
-            
-            # No available connection, create new if possible
-            if len(self._pool) < self._max_size:
-                try:
-                    pooled_conn = self._create_connection()
-                    pooled_conn.mark_used()
-                    self._pool.append(pooled_conn)
+                        raise RuntimeError("Connection pool is shut down")
                     return pooled_conn.connection
-                except Exception as e:
-                    logger.error(f"Error creating new connection: {str(e)}")
-            
-            # Pool is full and all connections are in use
-            if not self._block:
-                raise queue.Empty("No connection available")
-            
-            # Wait for a connection to become available
-            start_time = time.time()
-            while True:
-                # Wait for notification
-                self._condition.wait(self._timeout)
                 
-                # Check if timeout occurred
-                if time.time() - start_time > self._timeout:
-                    raise TimeoutError("Timeout waiting for connection")
+                # Validate reused connections outside the lock
+                if self._validate_connection(pooled_conn):
+                    return pooled_conn.connection
                 
-                # Try to get an available connection
-                for pooled_conn in self._pool:
-                    if not pooled_conn.in_use:
-                        # Validate connection
-                        if self._validate_connection(pooled_conn):
-                            pooled_conn.mark_used()
-                            return pooled_conn.connection
-                        else:
-                            # Remove invalid connection
-                            self._cleanup_connection(pooled_conn)
-                            self._pool.remove(pooled_conn)
+                # Remove invalid connection and try again
+                self._discard(pooled_conn)
+        finally:
+            self._checkout_latency.record(time.monotonic() - start_time)
     
     def return_connection(self, connection: T) -> None:
         """Return a connection to the pool.
@@ -222,15 +415,37 @@ class ConnectionPool(Generic[T]):
             connection: Connection object"""
         with self._lock:
             # Find the pooled connection
-            for pooled_conn in self._pool:
-                if pooled_conn.connection is connection:
-                    pooled_conn.mark_returned()
-                    # Notify waiters
-                    self._condition.notify()
-                    return
+            pooled_conn = self._untrack(connection)
+            if pooled_conn is None:
+                # Connection not found in pool
+                logger.warning("Returned connection not found in pool")
+                return
+            
+            pooled_conn.mark_returned()
             
-            # Connection not found in pool
-            logger.warning("Returned connection not found in pool")
+            if self._running and time.time() - pooled_conn.created_at <= self._max_age:
+                self._idle.append(pooled_conn)
+                # Notify waiters
+                self._condition.notify()
+                return
+            
+            # Retire connections that are too old
+            self._size -= 1
+            self._condition.notify()
+        
+        self._cleanup_connection(pooled_conn)
+    
+    @contextmanager
+    def connection(self) -> Iterator[T]:
+        """Check out a connection for the duration of a ``with`` block.
+        
+        Yields:
+            Connection object"""
+        connection = self.get_connection()
+        try:
+            yield connection
+        finally:
+            self.return_connection(connection)
     
     def _maintenance_loop(self) -> None:
         """Maintenance loop for the connection pool."""
@@ -252,56 +467,54 @@ class ConnectionPool(Generic[T]):
                 return
             
             now = time.time()
+            keep = deque()
             to_remove = []
             
             # Check for idle and old connections
-            for pooled_conn in self._pool:
-                if pooled_conn.in_use:
-                    continue
-                
-                # Check if connection is too old
-                if now - pooled_conn.created_at > self._max_age:
+            for pooled_conn in self._idle:
+                # Check if connection is too old or idle for too long
+                if (now - pooled_conn.created_at > self._max_age or
+                        now - pooled_conn.last_used > self._max_idle_time):
                     to_remove.append(pooled_conn)
-                    continue
-                
-                # Check if connection is idle for too long
-                if now - pooled_conn.last_used > self._max_idle_time:
-                    to_remove.append(pooled_conn)
-                    continue
-            
-            # Remove connections
-            for pooled_conn in to_remove:
-                self._cleanup_connection(pooled_conn)
-                self._pool.remove(pooled_conn)
+                else:
+                    keep.append(pooled_conn)
             
-            # Create new connections if needed
-            while len(self._pool) < self._min_size:
-                try:
-                    pooled_conn = self._create_connection()
-                    self._pool.append(pooled_conn)
-                except Exception as e:
-                    logger.error(f"Error creating connection during maintenance: {str(e)}")
-                    break
-            
-            if to_remove:
-                logger.debug(f"Removed {len(to_remove)} connections during maintenance")
+            self._idle = keep
+            self._size -= len(to_remove)
+        
+        # Remove connections
+        for pooled_conn in to_remove:
+            self._cleanup_connection(pooled_conn)
+        
+        # Create new connections if needed
+        self._replenish()
+        
+        if to_remove:
+            logger.debug(f"Removed {len(to_remove)} connections during maintenance")
     
     def shutdown(self) -> None:
         """Shut down the connection pool."""
         with self._lock:
             self._running = False
             
-            # Clean up all connections
-            for pooled_conn in self._pool:
-                self._cleanup_connection(pooled_conn)
+            connections = list(self._idle)
+            for entries in self._in_use.values():
+                connections.extend(entries)
             
             # Clear pool
-            self._pool.clear()
+            self._idle.clear()
+            self._in_use.clear()
+            self._in_use_count = 0
+            self._size = 0
             
             # Notify all waiters
             self._condition.notify_all()
-            
-            logger.info("Connection pool shut down")
+        
+        # Clean up all connections
+        for pooled_conn in connections:
+            self._cleanup_connection(pooled_conn)
+        
+        logger.info("Connection pool shut down")
     
     def stats(self) -> Dict[str, Any]:
         """Get connection pool statistics.
@@ -309,15 +522,427 @@ class ConnectionPool(Generic[T]):
         Returns:
             Connection pool statistics"""
         with self._lock:
-            in_use = sum(1 for conn in self._pool if conn.in_use)
-            return {
-                "total": len(self._pool),
-                "in_use": in_use,
-                "available": len(self._pool) - in_use,
-                "min_size": self._min_size,
-                "max_size": self._max_size,
-                "running": self._running
-            }
+            in_use = self._in_use_count
+            available = len(self._idle)
+            waiting = self._waiters
+            running = self._running
+        return {
+            "total": in_use + available,
+            "in_use": in_use,
+            "available": available,
+            "waiting": waiting,
+            "min_size": self._min_size,
+            "max_size": self._max_size,
+            "running": running,
+            "wait_time": self._wait_time.snapshot(),
+            "checkout_latency": self._checkout_latency.snapshot()
+        }
+
+class AsyncConnectionPool(Generic[T]):
+    """Connection pool for asyncio code such as aiohttp sessions.
+    
+    The factory, validator and cleanup callables may be plain functions or
+    coroutine functions. Blocking work should be done in coroutine functions
+    since plain callables run on the event loop. The pool fills up to
+    ``min_size`` on first use, or explicitly through ``start()`` or
+    ``async with pool``."""
+    
+    def __init__(
+        self, 
+        factory: Callable[[], Any], 
+        validator: Callable[[T], Any] = None,
+        cleanup: Callable[[T], Any] = None,
+        min_size: int = 1, 
+        max_size: int = 10, 
+        max_idle_time: int = 300,
+        max_age: int = 3600,
+        block: bool = True,
+        timeout: float = 30.0,
+        maintenance_interval: float = 60.0
+    ):
+        """Initialize the connection pool.
+        
+        Args:
+            factory: Function or coroutine function to create new connections
+            validator: Function or coroutine function to validate connections (None for no validation)
+            cleanup: Function or coroutine function to clean up connections (None for no cleanup)
+            min_size: Minimum number of connections in the pool
+            max_size: Maximum number of connections in the pool
+            max_idle_time: Maximum time in seconds a connection can be idle
+            max_age: Maximum age in seconds for a connection
+            block: Whether to wait when getting a connection if none available
+            timeout: Timeout in seconds when waiting
+            maintenance_interval: Seconds between maintenance runs"""
+        self._factory = factory
+        self._validator = validator or (lambda conn: True)
+        self._cleanup = cleanup or (lambda conn: None)
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_idle_time = max_idle_time
+        self._max_age = max_age
+        self._block = block
+        self._timeout = timeout
+        self._maintenance_interval = maintenance_interval
+        
+        self._idle: Deque[PooledConnection[T]] = deque()
+        self._in_use: Dict[int, List[PooledConnection[T]]] = {}
+        self._in_use_count = 0
+        self._size = 0
+        self._waiters = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._started = False
+        self._running = True
+        
+        # Latency histograms
+        self._wait_time = LatencyHistogram()
+        self._checkout_latency = LatencyHistogram()
+    
+    async def __aenter__(self) -> 'AsyncConnectionPool[T]':
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.shutdown()
+    
+    @staticmethod
+    async def _call(func: Callable, *args) -> Any:
+        """Call a function, awaiting the result if it is awaitable.
+        
+        Args:
+            func: Function or coroutine function
+            *args: Positional arguments
+            
+        Returns:
+            Result of the call"""
+        result = func(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    def _get_condition(self) -> asyncio.Condition:
+        """Get the condition guarding the pool, creating it on the running loop.
+        
+        Returns:
+            Pool condition"""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    async def start(self) -> None:
+        """Fill the pool to min_size and start periodic maintenance."""
+        if self._started:
+            return
+        self._started = True
+        
+        await self._replenish()
+        
+        if self._maintenance_interval:
+            self._maintenance_task = asyncio.get_running_loop().create_task(self._maintenance_loop())
+        
+        logger.info(f"Initialized async connection pool with min_size={self._min_size}, max_size={self._max_size}")
+    
+    async def _replenish(self) -> None:
+        """Create idle connections until the pool holds min_size connections."""
+        condition = self._get_condition()
+        while self._running and self._size < self._min_size:
+            self._size += 1
+            try:
+                pooled_conn = await self._create_connection()
+            except Exception as e:
+                logger.error(f"Error creating initial connection: {str(e)}")
+                await self._release_slot()
+                return
+            
+            if not self._running:
+                self._size -= 1
+                await self._cleanup_connection(pooled_conn)
+                return
+            
+            async with condition:
+                self._idle.append(pooled_conn)
+                condition.notify()
+    
+    async def _create_connection(self) -> PooledConnection[T]:
+        """Create a new connection.
+        
+        Returns:
+            Pooled connection"""
+        try:
+            connection = await self._call(self._factory)
+            return PooledConnection(connection)
+        except Exception as e:
+            logger.error(f"Error creating connection: {str(e)}")
+            raise
+    
+    async def _validate_connection(self, pooled_conn: PooledConnection[T]) -> bool:
+        """Validate a connection.
+        
+        Args:
+            pooled_conn: Pooled connection
+            
+        Returns:
+            True if valid, False otherwise"""
+        try:
+            return bool(await self._call(self._validator, pooled_conn.connection))
+        except Exception as e:
+            logger.error(f"Error validating connection: {str(e)}")
+            return False
+    
+    async def _cleanup_connection(self, pooled_conn: PooledConnection[T]) -> None:
+        """Clean up a connection.
+        
+        Args:
+            pooled_conn: Pooled connection"""
+        try:
+            await self._call(self._cleanup, pooled_conn.connection)
+        except Exception as e:
+            logger.error(f"Error cleaning up connection: {str(e)}")
+    
+    def _track(self, pooled_conn: PooledConnection[T]) -> None:
+        """Record a checked-out connection.
+        
+        Args:
+            pooled_conn: Pooled connection"""
+        self._in_use.setdefault(id(pooled_conn.connection), []).append(pooled_conn)
+        self._in_use_count += 1
+    
+    def _untrack(self, connection: T) -> Optional[PooledConnection[T]]:
+        """Forget a checked-out connection.
+        
+        Args:
+            connection: Connection object
+            
+        Returns:
+            Pooled connection, or None if the connection is not checked out"""
+        entries = self._in_use.get(id(connection))
+        if not entries:
+            return None
+        pooled_conn = entries.pop()
+        if not entries:
+            del self._in_use[id(connection)]
+        self._in_use_count -= 1
+        return pooled_conn
+    
+    async def _release_slot(self) -> None:
+        """Give back a slot reserved for a connection that no longer exists."""
+        condition = self._get_condition()
+        async with condition:
+            self._size -= 1
+            condition.notify()
+    
+    async def _reserve(self, deadline: float) -> Optional[PooledConnection[T]]:
+        """Check out an idle connection or reserve a slot for a new one.
+        
+        Args:
+            deadline: Event loop time after which waiting times out
+            
+        Returns:
+            Checked-out connection, or None if a slot was reserved"""
+        loop = asyncio.get_running_loop()
+        condition = self._get_condition()
+        wait_start = None
+        try:
+            async with condition:
+                while True:
+                    if not self._running:
+                        raise RuntimeError("Connection pool is shut down")
+                    
+                    if self._idle:
+                        pooled_conn = self._idle.pop()
+                        pooled_conn.mark_used()
+                        self._track(pooled_conn)
+                        return pooled_conn
+                    
+                    if self._size < self._max_size:
+                        self._size += 1
+                        return None
+                    
+                    if not self._block:
+                        raise queue.Empty("No connection available")
+                    
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Timeout waiting for connection")
+                    
+                    if wait_start is None:
+                        wait_start = loop.time()
+                    
+                    self._waiters += 1
+                    try:
+                        await asyncio.wait_for(condition.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        raise TimeoutError("Timeout waiting for connection")
+                    finally:
+                        self._waiters -= 1
+        
+        finally:
+            if wait_start is not None:
+                self._wait_time.record(loop.time() - wait_start)
+    
+    async def get_connection(self) -> T:
+        """Get a connection from the pool.
+        
+        Returns:
+            Connection object
+            
+        Raises:
+            queue.Empty: If no connection is available and block is False
+            TimeoutError: If timeout occurs while waiting for a connection"""
+        if not self._started:
+            await self.start()
+        
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        deadline = start_time + self._timeout
+        
+        try:
+            while True:
+                pooled_conn = await self._reserve(deadline)
+                
+                if pooled_conn is None:
+                    try:
+                        pooled_conn = await self._create_connection()
+                    except BaseException:
+                        await self._release_slot()
+                        raise
+                    
+                    if not self._running:
+                        self._size -= 1
+                        await self._cleanup_connection(pooled_conn)
+                        raise RuntimeError("Connection pool is shut down")
+                    
+                    pooled_conn.mark_used()
+                    self._track(pooled_conn)
+                    return pooled_conn.connection
+                
+                if await self._validate_connection(pooled_conn):
+                    return pooled_conn.connection
+                
+                # Remove invalid connection and try again
+                if self._untrack(pooled_conn.connection) is not None:
+                    await self._release_slot()
+                await self._cleanup_connection(pooled_conn)
+        finally:
+            self._checkout_latency.record(loop.time() - start_time)
+    
+    async def return_connection(self, connection: T) -> None:
+        """Return a connection to the pool.
+        
+        Args:
+            connection: Connection object"""
+        condition = self._get_condition()
+        async with condition:
+            pooled_conn = self._untrack(connection)
+            if pooled_conn is None:
+                logger.warning("Returned connection not found in pool")
+                return
+            
+            pooled_conn.mark_returned()
+            
+            if self._running and time.time() - pooled_conn.created_at <= self._max_age:
+                self._idle.append(pooled_conn)
+                condition.notify()
+                return
+            
+            # Retire connections that are too old
+            self._size -= 1
+            condition.notify()
+        
+        await self._cleanup_connection(pooled_conn)
+    
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[T]:
+        """Check out a connection for the duration of an ``async with`` block.
+        
+        Yields:
+            Connection object"""
+        connection = await self.get_connection()
+        try:
+            yield connection
+        finally:
+            await self.return_connection(connection)
+    
+    async def _maintenance_loop(self) -> None:
+        """Maintenance loop for the connection pool."""
+        while self._running:
+            try:
+                await asyncio.sleep(self._maintenance_interval)
+                await self._perform_maintenance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in maintenance loop: {str(e)}")
+    
+    async def _perform_maintenance(self) -> None:
+        """Perform maintenance on the connection pool."""
+        if not self._running:
+            return
+        
+        now = time.time()
+        keep = deque()
+        to_remove = []
+        
+        for pooled_conn in self._idle:
+            if (now - pooled_conn.created_at > self._max_age or
+                    now - pooled_conn.last_used > self._max_idle_time):
+                to_remove.append(pooled_conn)
+            else:
+                keep.append(pooled_conn)
+        
+        self._idle = keep
+        self._size -= len(to_remove)
+        
+        for pooled_conn in to_remove:
+            await self._cleanup_connection(pooled_conn)
+        
+        await self._replenish()
+        
+        if to_remove:
+            logger.debug(f"Removed {len(to_remove)} connections during maintenance")
+    
+    async def shutdown(self) -> None:
+        """Shut down the connection pool."""
+        self._running = False
+        
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+        
+        connections = list(self._idle)
+        for entries in self._in_use.values():
+            connections.extend(entries)
+        
+        self._idle.clear()
+        self._in_use.clear()
+        self._in_use_count = 0
+        self._size = 0
+        
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+        
+        for pooled_conn in connections:
+            await self._cleanup_connection(pooled_conn)
+        
+        logger.info("Async connection pool shut down")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics.
+        
+        Returns:
+            Connection pool statistics"""
+        return {
+            "total": self._in_use_count + len(self._idle),
+            "in_use": self._in_use_count,
+            "available": len(self._idle),
+            "waiting": self._waiters,
+            "min_size": self._min_size,
+            "max_size": self._max_size,
+            "running": self._running,
+            "wait_time": self._wait_time.snapshot(),
+            "checkout_latency": self._checkout_latency.snapshot()
+        }
 
 class ConnectionPoolManager:
     """Manager for multiple connection pools."""
@@ -0,0 +1,515 @@
+# TORONTO AI TEAM AGENT - PROPRIETARY
+#
+# Copyright (c) 2025 TORONTO AI
+# Creator: David Tadeusz Chudak
+# All Rights Reserved
+#
+# This file is part of the TORONTO AI TEAM AGENT software.
+#
+# This software is based on OpenManus (Copyright (c) 2025 manna_and_poem),
+# which is licensed under the MIT License. The original license is included
+# in the LICENSE file in the root directory of this project.
+#
+# This software has been substantially modified with proprietary enhancements.
+
+"""Embedding Service Module
+
+This module provides a shared embedding service that batches embedding requests
+and caches embeddings by content hash, so identical texts are embedded only once."""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Callable, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_INITIAL_CAPACITY = 1024
+DEFAULT_MAX_MEMORY_ENTRIES = 100000
+
+def make_embedding_key(model_name: str, text: str) -> str:
+    """Build the cache key of an embedding.
+    
+    Args:
+        model_name: Name of the embedding model
+        text: Embedded text
+        
+    Returns:
+        SHA-256 hex digest of the model name and text"""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """Content-hash keyed embedding cache.
+    
+    With a directory, embeddings are stored as rows of a memory-mapped float32
+    file (vectors.f32), with the key of each row appended to keys.txt, so the
+    cache survives restarts and large caches are paged in by the OS on demand.
+    Without a directory, embeddings are kept in a bounded in-memory LRU."""
+    
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        initial_capacity: int = DEFAULT_INITIAL_CAPACITY,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES
+    ):
+        """Initialize the embedding cache.
+        
+        Args:
+            directory: Directory of the persistent store (None for in-memory only)
+            initial_capacity: Initial number of rows of the memory-mapped store
+            max_memory_entries: Maximum number of embeddings kept in memory
+                when no directory is given"""
+        self.directory = directory
+        self.initial_capacity = max(1, initial_capacity)
+        self.max_memory_entries = max_memory_entries
+        self._lock = threading.RLock()
+        
+        # In-memory store
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
+        # Persistent store
+        self._rows: Dict[str, int] = {}
+        self._dimension: Optional[int] = None
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+    
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.json")
+    
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.f32")
+    
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.directory, "keys.txt")
+    
+    def _load(self) -> None:
+        """Open an existing persistent store."""
+        if not os.path.exists(self._meta_path) or not os.path.exists(self._vectors_path):
+            return
+        
+        try:
+            with open(self._meta_path, "r") as f:
+                meta = json.load(f)
+            self._dimension = int(meta["dimension"])
+            self._capacity = int(meta["capacity"])
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self._dimension)
+            )
+            
+            if os.path.exists(self._keys_path):
+                with open(self._keys_path, "r") as f:
+                    for line in f:
+                        # Ignore a torn final line from an interrupted write
+                        if not line.endswith("\n"):
+                            break
+                        key = line[:-1]
+                        if len(self._rows) >= self._capacity:
+                            break
+                        self._rows.setdefault(key, len(self._rows))
+            
+            logger.info(f"Loaded {len(self._rows)} cached embeddings from {self.directory}")
+        except Exception as e:
+            logger.error(f"Error loading embedding cache from {self.directory}: {str(e)}")
+            self._rows = {}
+            self._dimension = None
+            self._capacity = 0
+            self._vectors = None
+    
+    def _write_meta(self) -> None:
+        """Write the store metadata atomically."""
+        temp_path = self._meta_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"dimension": self._dimension, "capacity": self._capacity}, f)
+        os.replace(temp_path, self._meta_path)
+    
+    def _ensure_capacity(self, rows: int) -> None:
+        """Grow the memory-mapped store to hold at least the given number of rows.
+        
+        Args:
+            rows: Required number of rows"""
+        if rows <= self._capacity:
+            return
+        
+        capacity = max(self._capacity, self.initial_capacity)
+        while capacity < rows:
+            capacity *= 2
+        
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self._dimension * 4)
+        
+        self._capacity = capacity
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self._dimension)
+        )
+        self._write_meta()
+    
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings.
+        
+        Args:
+            keys: Embedding keys
+            
+        Returns:
+            List with the cached embedding of each key, or None if not cached"""
+        with self._lock:
+            if not self.directory:
+                results = []
+                for key in keys:
+                    vector = self._memory.get(key)
+                    if vector is not None:
+                        self._memory.move_to_end(key)
+                    results.append(vector)
+                return results
+            
+            results = []
+            for key in keys:
+                row = self._rows.get(key)
+                results.append(None if row is None else np.array(self._vectors[row]))
+            return results
+    
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> int:
+        """Store embeddings.
+        
+        Args:
+            keys: Embedding keys
+            vectors: Embeddings, one row per key
+            
+        Returns:
+            Number of embeddings stored"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        
+        with self._lock:
+            if not self.directory:
+                for key, vector in zip(keys, vectors):
+                    self._memory[key] = vector
+                    self._memory.move_to_end(key)
+                while len(self._memory) > self.max_memory_entries:
+                    self._memory.popitem(last=False)
+                return len(keys)
+            
+            if self._dimension is None:
+                self._dimension = int(vectors.shape[1])
+            elif vectors.shape[1] != self._dimension:
+                logger.warning(
+                    f"Not caching embeddings of dimension {vectors.shape[1]} in a cache of dimension {self._dimension}"
+                )
+                return 0
+            
+            seen = set()
+            new_keys = []
+            new_rows = []
+            for key, vector in zip(keys, vectors):
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+            
+            if not new_keys:
+                return 0
+            
+            start = len(self._rows)
+            self._ensure_capacity(start + len(new_keys))
+            self._vectors[start:start + len(new_keys)] = np.stack(new_rows)
+            self._vectors.flush()
+            
+            # Keys are appended after their vectors are flushed
+            with open(self._keys_path, "a") as f:
+                f.write("".join(f"{key}\n" for key in new_keys))
+            
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = start + offset
+            
+            return len(new_keys)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._rows) if self.directory else len(self._memory)
+    
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._memory.clear()
+            if self.directory:
+                self._rows = {}
+                self._vectors = None
+                self._dimension = None
+                self._capacity = 0
+                for path in (self._vectors_path, self._keys_path, self._meta_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+    
+    def close(self) -> None:
+        """Flush the persistent store."""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+class EmbeddingService:
+    """Batching, caching front end for an embedding model.
+    
+    Texts are looked up in the cache by content hash first. Misses are embedded
+    in batches of at most batch_size texts. With max_batch_delay > 0, misses from
+    concurrent callers are coalesced by a background thread, which waits up to
+    max_batch_delay seconds to fill a batch before calling the model."""
+    
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Any],
+        model_name: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_delay: float = 0.0
+    ):
+        """Initialize the embedding service.
+        
+        Args:
+            embed_fn: Function embedding a list of texts, returning one vector per text
+            model_name: Name of the embedding model, part of the cache key
+            batch_size: Maximum number of texts per model call
+            cache: Embedding cache (defaults to an in-memory cache)
+            max_batch_delay: Seconds to wait for concurrent requests to fill a batch
+                (0 embeds in the calling thread)"""
+        self.embed_fn = embed_fn
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.max_batch_delay = max_batch_delay
+        
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._hits = 0
+        self._misses = 0
+        self._batches = 0
+        self._embedded = 0
+        self._model_time = 0.0
+        
+        # Micro-batching state
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Future]]]" = queue.Queue()
+        self._batcher: Optional[threading.Thread] = None
+        self._batcher_lock = threading.Lock()
+        self._running = False
+    
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Embed texts, using cached embeddings where available.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of float32 embeddings, one per text"""
+        if not texts:
+            return []
+        
+        keys = [make_embedding_key(self.model_name, text) for text in texts]
+        results = self.cache.get_many(keys)
+        
+        # Distinct texts that are not cached
+        missing: "OrderedDict[str, str]" = OrderedDict()
+        for key, text, vector in zip(keys, texts, results):
+            if vector is None:
+                missing.setdefault(key, text)
+        
+        hits = sum(1 for vector in results if vector is not None)
+        with self._stats_lock:
+            self._requests += len(texts)
+            self._hits += hits
+            self._misses += len(texts) - hits
+        
+        if missing:
+            if self.max_batch_delay > 0:
+                embedded = self._embed_coalesced(missing)
+            else:
+                embedded = self._embed_direct(missing)
+            
+            results = [vector if vector is not None else embedded[key] for key, vector in zip(keys, results)]
+        
+        return results
+    
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Float32 embedding"""
+        return self.embed([text])[0]
+    
+    def _embed_direct(self, missing: "OrderedDict[str, str]") -> Dict[str, np.ndarray]:
+        """Embed texts in the calling thread, in batches of batch_size.
+        
+        Args:
+            missing: Key -> text of the texts to embed
+            
+        Returns:
+            Key -> embedding"""
+        items = list(missing.items())
+        embedded = {}
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            vectors = self._call_model([text for _, text in batch], [key for key, _ in batch])
+            for (key, _), vector in zip(batch, vectors):
+                embedded[key] = vector
+        return embedded
+    
+    def _embed_coalesced(self, missing: "OrderedDict[str, str]") -> Dict[str, np.ndarray]:
+        """Embed texts through the micro-batching thread.
+        
+        Args:
+            missing: Key -> text of the texts to embed
+            
+        Returns:
+            Key -> embedding"""
+        self._ensure_batcher()
+        
+        futures = []
+        for key, text in missing.items():
+            future: Future = Future()
+            self._queue.put((key, text, future))
+            futures.append((key, future))
+        
+        return {key: future.result() for key, future in futures}
+    
+    def _call_model(self, texts: List[str], keys: List[str]) -> np.ndarray:
+        """Embed a batch with the model and cache the result.
+        
+        Args:
+            texts: Texts to embed
+            keys: Cache keys of the texts
+            
+        Returns:
+            Float32 array with one row per text"""
+        start_time = time.time()
+        vectors = np.asarray(self.embed_fn(texts), dtype=np.float32)
+        elapsed = time.time() - start_time
+        
+        if vectors.ndim != 2 or vectors.shape[0] != len(texts):
+            raise ValueError(f"Embedding model returned {vectors.shape[0] if vectors.ndim else 0} vectors for {len(texts)} texts")
+        
+        with self._stats_lock:
+            self._batches += 1
+            self._embedded += len(texts)
+            self._model_time += elapsed
+        
+        try:
+            self.cache.put_many(keys, vectors)
+        except Exception as e:
+            logger.error(f"Error caching embeddings: {str(e)}")
+        
+        return vectors
+    
+    def _ensure_batcher(self) -> None:
+        """Start the micro-batching thread if it is not running."""
+        with self._batcher_lock:
+            if self._batcher is not None and self._batcher.is_alive():
+                return
+            self._running = True
+            self._batcher = threading.Thread(target=self._batch_loop, name="EmbeddingBatcher", daemon=True)
+            self._batcher.start()
+    
+    def _batch_loop(self) -> None:
+        """Collect queued texts into batches and embed them."""
+        while self._running:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            
+            # Wait up to max_batch_delay for the batch to fill
+            pending: "OrderedDict[str, Tuple[str, List[Future]]]" = OrderedDict()
+            pending[item[0]] = (item[1], [item[2]])
+            deadline = time.time() + self.max_batch_delay
+            stop = False
+            while len(pending) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if item[0] in pending:
+                    pending[item[0]][1].append(item[2])
+                else:
+                    pending[item[0]] = (item[1], [item[2]])
+            
+            keys = list(pending)
+            try:
+                vectors = self._call_model([pending[key][0] for key in keys], keys)
+                for key, vector in zip(keys, vectors):
+                    for future in pending[key][1]:
+                        future.set_result(vector)
+            except Exception as e:
+                for key in keys:
+                    for future in pending[key][1]:
+                        future.set_exception(e)
+            
+            if stop:
+                break
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get embedding service statistics.
+        
+        Returns:
+            Dictionary with request, cache and batching statistics"""
+        with self._stats_lock:
+            return {
+                "model_name": self.model_name,
+                "requests": self._requests,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / self._requests if self._requests > 0 else 0.0,
+                "batches": self._batches,
+                "embedded": self._embedded,
+                "average_batch_size": self._embedded / self._batches if self._batches > 0 else 0.0,
+                "model_time": self._model_time,
+                "cache_size": len(self.cache)
+            }
+    
+    def close(self) -> None:
+        """Stop the micro-batching thread and flush the cache."""
+        with self._batcher_lock:
+            batcher = self._batcher
+            self._batcher = None
+        
+        if batcher is not None and batcher.is_alive():
+            self._running = False
+            self._queue.put(None)
+            batcher.join()
+        
+        # Fail requests that were queued after the batcher stopped
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[2].set_exception(RuntimeError("Embedding service closed"))
+        
+        self.cache.close()
@@ -18,37 +18,249 @@ This module provides utilities for monitoring and analyzing performance
 of database operations and API calls."""
 
 import logging
+import math
 import time
 import threading
 import json
 import os
+from collections import deque
 from typing import Dict, Any, List, Optional, Callable, Union
 from functools import wraps
 from datetime import datetime, timedelta
-import statistics
 
 logger = logging.getLogger(__name__)
 
+# Sliding windows reported by PerformanceMetric, in seconds
+DEFAULT_WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+
+class QuantileSketch:
+    """Mergeable, fixed-memory sketch for estimating latency percentiles.
+    
+    Values are counted in logarithmic buckets so every quantile estimate is
+    within ``relative_accuracy`` of the true value. When more than
+    ``max_buckets`` buckets are in use the lowest ones are collapsed, which
+    keeps memory bounded while preserving accuracy for the upper percentiles."""
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """Initialize the sketch.
+        
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates
+            max_buckets: Maximum number of buckets kept in memory"""
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+    
+    def add(self, value: float, count: int = 1) -> None:
+        """Add a value to the sketch.
+        
+        Args:
+            value: Value to add (values <= 0 are counted as zero)
+            count: Number of occurrences"""
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        
+        if value <= 0:
+            self.zero_count += count
+            return
+        
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + count
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+    
+    def _collapse(self) -> None:
+        """Merge the lowest buckets until at most max_buckets remain."""
+        keys = sorted(self._buckets)
+        excess = len(keys) - self.max_buckets
+        target = keys[excess]
+        for key in keys[:excess]:
+            self._buckets[target] += self._buckets.pop(key)
+    
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile.
+        
+        Args:
+            q: Quantile between 0 and 1
+            
+        Returns:
+            Estimated value (0.0 if the sketch is empty)"""
+        if self.count == 0:
+            return 0.0
+        
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        
+        seen = self.zero_count
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms
+                value = 2 * self._gamma ** key / (1 + self._gamma)
+                return min(max(value, self.min), self.max)
+        return self.max
+    
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Merge another sketch into this one.
+        
+        Args:
+            other: Sketch created with the same relative accuracy"""
+        if other.count == 0:
+            return
+        if abs(other._gamma - self._gamma) > 1e-12:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch to a JSON-compatible dictionary.
+        
+        Returns:
+            Serialized sketch"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(key): count for key, count in self._buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        """Deserialize a sketch.
+        
+        Args:
+            data: Dictionary produced by to_dict()
+            
+        Returns:
+            Sketch"""
+        sketch = cls(data.get("relative_accuracy", 0.01), data.get("max_buckets", 2048))
+        sketch._buckets = {int(key): count for key, count in data.get("buckets", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.min = data["min"] if data.get("min") is not None else float('inf')
+        sketch.max = data.get("max", 0.0)
+        return sketch
+
+class SlidingWindowSketch:
+    """Quantile sketch over a sliding time window.
+    
+    The window is split into a ring of slots, each holding its own sketch.
+    Slots older than the window are reset lazily, so memory stays bounded
+    and the window advances in steps of ``window / slots`` seconds."""
+    
+    def __init__(self, window: float, slots: int = 12, relative_accuracy: float = 0.01):
+        """Initialize the windowed sketch.
+        
+        Args:
+            window: Window length in seconds
+            slots: Number of slots the window is divided into
+            relative_accuracy: Relative accuracy of the slot sketches"""
+        self.window = window
+        self._slot_duration = window / slots
+        self._relative_accuracy = relative_accuracy
+        self._epochs = [-1] * slots
+        self._sketches = [QuantileSketch(relative_accuracy) for _ in range(slots)]
+    
+    def _slot(self, now: float) -> QuantileSketch:
+        epoch = int(now // self._slot_duration)
+        index = epoch % len(self._sketches)
+        if self._epochs[index] != epoch:
+            self._epochs[index] = epoch
+            self._sketches[index] = QuantileSketch(self._relative_accuracy)
+        return self._sketches[index]
+    
+    def add(self, value: float, now: float = None) -> None:
+        """Add a value at the given time.
+        
+        Args:
+            value: Value to add
+            now: Timestamp (None for the current time)"""
+        self._slot(now if now is not None else time.time()).add(value)
+    
+    def merge(self, sketch: QuantileSketch, now: float = None) -> None:
+        """Merge a sketch into the current slot.
+        
+        Args:
+            sketch: Sketch to merge
+            now: Timestamp (None for the current time)"""
+        self._slot(now if now is not None else time.time()).merge(sketch)
+    
+    def snapshot(self, now: float = None) -> QuantileSketch:
+        """Merge the slots that fall inside the window.
+        
+        Args:
+            now: Timestamp (None for the current time)
+            
+        Returns:
+            Sketch of the values recorded within the window"""
+        now = now if now is not None else time.time()
+        oldest = int(now // self._slot_duration) - len(self._sketches) + 1
+        merged = QuantileSketch(self._relative_accuracy)
+        for epoch, sketch in zip(self._epochs, self._sketches):
+            if epoch >= oldest:
+                merged.merge(sketch)
+        return merged
+
 class PerformanceMetric:
-    """Performance metric for a single operation."""
+    """Performance metric for a single operation.
     
-    def __init__(self, name: str, category: str = None):
+    Durations are summarized in fixed-memory quantile sketches, one for all
+    calls and one per sliding window, so memory use does not grow with the
+    number of calls. Only the most recent ``max_samples`` raw durations are
+    kept."""
+    
+    def __init__(self, name: str, category: str = None, windows: Dict[str, float] = None, max_samples: int = 100):
         """Initialize a performance metric.
         
         Args:
             name: Metric name
-            category: Metric category"""
+            category: Metric category
+            windows: Sliding windows as label -> seconds (None for 1m/5m/1h)
+            max_samples: Number of recent raw durations to keep"""
         self.name = name
         self.category = category or "default"
         self.calls = 0
         self.total_time = 0.0
         self.min_time = float('inf')
         self.max_time = 0.0
-        self.times = []
         self.errors = 0
         self.last_call_time = None
         self.last_error_time = None
         self.last_error = None
+        self._recent = deque(maxlen=max_samples)
+        self._sketch = QuantileSketch()
+        self._windows = {
+            label: SlidingWindowSketch(seconds)
+            for label, seconds in (windows or DEFAULT_WINDOWS).items()
+        }
+    
+    @property
+    def times(self) -> List[float]:
+        """Most recent call durations, oldest first."""
+        return list(self._recent)
     
     def record_call(self, duration: float, error: Exception = None) -> None:
         """Record a call to the operation.
@@ -56,18 +268,44 @@ class PerformanceMetric:
         Args:
             duration: Call duration in seconds
             error: Exception if call failed"""
+        now = time.time()
         self.calls += 1
         self.total_time += duration
         self.min_time = min(self.min_time, duration)
         self.max_time = max(self.max_time, duration)
-        self.times.append(duration)
-        self.last_call_time = time.time()
+        self._recent.append(duration)
+        self._sketch.add(duration)
+        for window in self._windows.values():
+            window.add(duration, now)
+        self.last_call_time = now
         
         if error:
             self.errors += 1
-            self.last_error_time = time.time()
+            self.last_error_time = now
             self.last_error = str(error)
     
+    def get_window_stats(self, now: float = None) -> Dict[str, Dict[str, Any]]:
+        """Get statistics for each sliding window.
+        
+        Args:
+            now: Timestamp (None for the current time)
+            
+        Returns:
+            Window label -> statistics"""
+        now = now if now is not None else time.time()
+        windows = {}
+        for label, window in self._windows.items():
+            sketch = window.snapshot(now)
+            windows[label] = {
+                "calls": sketch.count,
+                "avg_time": sketch.sum / sketch.count if sketch.count > 0 else 0,
+                "max_time": sketch.max,
+                "median_time": sketch.quantile(0.5),
+                "p95_time": sketch.quantile(0.95),
+                "p99_time": sketch.quantile(0.99)
+            }
+        return windows
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get performance statistics.
         
@@ -87,16 +325,108 @@ class PerformanceMetric:
         }
         
         # Calculate percentiles if we have enough data
-        if len(self.times) >= 10:
-            stats["median_time"] = statistics.median(self.times)
-            stats["p95_time"] = statistics.quantiles(self.times, n=20)[18]  # 95th percentile
-            stats["p99_time"] = statistics.quantiles(self.times, n=100)[98]  # 99th percentile
+        if self.calls >= 10:
+            stats["median_time"] = self._sketch.quantile(0.5)
+            stats["p95_time"] = self._sketch.quantile(0.95)
+            stats["p99_time"] = self._sketch.quantile(0.99)
+        
+        stats["windows"] = self.get_window_stats()
         
         if self.last_error:
             stats["last_error"] = self.last_error
             stats["last_error_time"] = self.last_error_time
         
         return stats
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a JSON-compatible snapshot that can be merged in another process.
+        
+        Returns:
+            Metric snapshot"""
+        now = time.time()
+        return {
+            "name": self.name,
+            "category": self.category,
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "min_time": self.min_time if self.calls > 0 else None,
+            "max_time": self.max_time,
+            "errors": self.errors,
+            "last_call_time": self.last_call_time,
+            "last_error_time": self.last_error_time,
+            "last_error": self.last_error,
+            "sketch": self._sketch.to_dict(),
+            "windows": {label: window.snapshot(now).to_dict() for label, window in self._windows.items()}
+        }
+    
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Merge a snapshot of the same operation into this metric.
+        
+        Window data from the snapshot is counted in the current slot of the
+        matching window.
+        
+        Args:
+            snapshot: Snapshot produced by snapshot()"""
+        if not snapshot.get("calls"):
+            return
+        
+        self.calls += snapshot["calls"]
+        self.total_time += snapshot.get("total_time", 0.0)
+        if snapshot.get("min_time") is not None:
+            self.min_time = min(self.min_time, snapshot["min_time"])
+        self.max_time = max(self.max_time, snapshot.get("max_time", 0.0))
+        self.errors += snapshot.get("errors", 0)
+        
+        if snapshot.get("last_call_time") is not None:
+            self.last_call_time = max(self.last_call_time or 0, snapshot["last_call_time"])
+        if snapshot.get("last_error_time") is not None and snapshot["last_error_time"] > (self.last_error_time or 0):
+            self.last_error_time = snapshot["last_error_time"]
+            self.last_error = snapshot.get("last_error")
+        
+        if "sketch" in snapshot:
+            self._sketch.merge(QuantileSketch.from_dict(snapshot["sketch"]))
+        
+        now = time.time()
+        for label, data in snapshot.get("windows", {}).items():
+            if label in self._windows:
+                self._windows[label].merge(QuantileSketch.from_dict(data), now)
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> 'PerformanceMetric':
+        """Create a metric from a snapshot.
+        
+        Args:
+            snapshot: Snapshot produced by snapshot()
+            
+        Returns:
+            Performance metric"""
+        metric = cls(snapshot["name"], snapshot.get("category"))
+        metric.merge(snapshot)
+        return metric
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value.
+    
+    Args:
+        value: Label value
+        
+    Returns:
+        Escaped label value"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the Prometheus text format.
+    
+    Args:
+        value: Sample value
+        
+    Returns:
+        Formatted value"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
 
 class PerformanceMonitor:
     """Performance monitor for tracking operation performance."""
@@ -120,19 +450,30 @@ class PerformanceMonitor:
             category: Metric category
             error: Exception if operation failed"""
         with self._lock:
-            # Check if we need to create a new metric
-            if name not in self._metrics:
-                # Check if we've reached the maximum number of metrics
-                if len(self._metrics) >= self._max_metrics:
-                    # Remove the least used metric
-                    least_used = min(self._metrics.items(), key=lambda x: x[1].calls)
-                    del self._metrics[least_used[0]]
-                
-                # Create new metric
-                self._metrics[name] = PerformanceMetric(name, category)
-            
             # Record the call
-            self._metrics[name].record_call(duration, error)
+            self._get_or_create(name, category).record_call(duration, error)
+    
+    def _get_or_create(self, name: str, category: str = None) -> PerformanceMetric:
+        """Get a metric, creating it if needed. Must be called with the lock held.
+        
+        Args:
+            name: Metric name
+            category: Metric category
+            
+        Returns:
+            Performance metric"""
+        # Check if we need to create a new metric
+        if name not in self._metrics:
+            # Check if we've reached the maximum number of metrics
+            if len(self._metrics) >= self._max_metrics:
+                # Remove the least used metric
+                least_used = min(self._metrics.items(), key=lambda x: x[1].calls)
+                del self._metrics[least_used[0]]
+            
+            # Create new metric
+            self._metrics[name] = PerformanceMetric(name, category)
+        
+        return self._metrics[name]
     
     def get_metrics(self, category: str = None) -> List[Dict[str, Any]]:
         """Get all performance metrics.
@@ -200,6 +541,110 @@ class PerformanceMonitor:
         except Exception as e:
             logger.error(f"Error exporting performance metrics to {file_path}: {str(e)}")
     
+    def snapshot(self, category: str = None) -> Dict[str, Any]:
+        """Get a mergeable snapshot of the performance metrics.
+        
+        Snapshots are JSON-compatible, so they can be collected from several
+        processes and combined with merge_snapshot().
+        
+        Args:
+            category: Filter by category
+            
+        Returns:
+            Monitor snapshot"""
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "metrics": [
+                    metric.snapshot() for metric in self._metrics.values()
+                    if category is None or metric.category == category
+                ]
+            }
+    
+    def merge_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Merge a snapshot, typically taken in another process, into this monitor.
+        
+        Args:
+            snapshot: Snapshot produced by snapshot()"""
+        with self._lock:
+            for metric_snapshot in snapshot.get("metrics", []):
+                metric = self._get_or_create(metric_snapshot["name"], metric_snapshot.get("category"))
+                metric.merge(metric_snapshot)
+    
+    def export_prometheus(self, category: str = None, prefix: str = "app_operation", openmetrics: bool = False) -> str:
+        """Render performance metrics in the Prometheus text exposition format.
+        
+        Args:
+            category: Filter by category
+            prefix: Metric name prefix
+            openmetrics: Whether to produce OpenMetrics text instead
+            
+        Returns:
+            Exposition text"""
+        duration = f"{prefix}_duration_seconds"
+        window_duration = f"{prefix}_window_duration_seconds"
+        errors = f"{prefix}_errors"
+        
+        duration_lines = [
+            f"# HELP {duration} Operation duration in seconds.",
+            f"# TYPE {duration} summary"
+        ]
+        window_lines = [
+            f"# HELP {window_duration} Operation duration in seconds over sliding windows.",
+            f"# TYPE {window_duration} gauge"
+        ]
+        error_lines = [
+            f"# HELP {errors if openmetrics else errors + '_total'} Failed operation calls.",
+            f"# TYPE {errors if openmetrics else errors + '_total'} counter"
+        ]
+        
+        with self._lock:
+            for metric in self._metrics.values():
+                if category is not None and metric.category != category:
+                    continue
+                
+                labels = f'name="{_escape_label(metric.name)}",category="{_escape_label(metric.category)}"'
+                for quantile in (0.5, 0.95, 0.99):
+                    value = metric._sketch.quantile(quantile)
+                    duration_lines.append(f'{duration}{{{labels},quantile="{quantile}"}} {_format_value(value)}')
+                duration_lines.append(f"{duration}_sum{{{labels}}} {_format_value(metric.total_time)}")
+                duration_lines.append(f"{duration}_count{{{labels}}} {metric.calls}")
+                
+                for label, window_stats in metric.get_window_stats().items():
+                    for quantile, key in ((0.5, "median_time"), (0.95, "p95_time"), (0.99, "p99_time")):
+                        window_lines.append(
+                            f'{window_duration}{{{labels},window="{label}",quantile="{quantile}"}} '
+                            f'{_format_value(window_stats[key])}'
+                        )
+                
+                error_lines.append(f"{errors}_total{{{labels}}} {metric.errors}")
+        
+        lines = duration_lines + window_lines + error_lines
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+    
+    def export_to_prometheus(self, file_path: str, category: str = None, openmetrics: bool = False) -> None:
+        """Export performance metrics to a Prometheus/OpenMetrics text file.
+        
+        The file can be picked up by the node exporter textfile collector.
+        
+        Args:
+            file_path: Output file path
+            category: Filter by category
+            openmetrics: Whether to produce OpenMetrics text instead"""
+        text = self.export_prometheus(category, openmetrics=openmetrics)
+        
+        try:
+            # Write atomically so scrapers never read a partial file
+            temp_path = f"{file_path}.tmp"
+            with open(temp_path, 'w') as f:
+                f.write(text)
+            os.replace(temp_path, file_path)
+            logger.info(f"Exported performance metrics to {file_path}")
+        except Exception as e:
+            logger.error(f"Error exporting performance metrics to {file_path}: {str(e)}")
+    
     def get_summary(self, category: str = None) -> Dict[str, Any]:
         """Get a summary of performance metrics.
         
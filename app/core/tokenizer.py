@@ -0,0 +1,646 @@
+# TORONTO AI TEAM AGENT - PROPRIETARY
+#
+# Copyright (c) 2025 TORONTO AI
+# Creator: David Tadeusz Chudak
+# All Rights Reserved
+#
+# This file is part of the TORONTO AI TEAM AGENT software.
+#
+# This software is based on OpenManus (Copyright (c) 2025 manna_and_poem),
+# which is licensed under the MIT License. The original license is included
+# in the LICENSE file in the root directory of this project.
+#
+# This software has been substantially modified with proprietary enhancements.
+
+"""Tokenizer Module
+
+This module provides token counting for model providers and the context extension
+system. Tokenizers are registered by name and wrapped in a TokenCounter that caches
+counts of repeated strings and counts batches of texts at once."""
+
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Optional, Callable, List, Sequence, Tuple, Union
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKENIZER = "default"
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_PIECE_CACHE_SIZE = 100000
+DEFAULT_TIKTOKEN_ENCODING = "cl100k_base"
+
+# Environment variable naming a BPE rank file used by the default tokenizer
+TOKENIZER_FILE_ENV = "TOKENIZER_BPE_FILE"
+
+# Texts up to this length are cached by value, longer texts by digest
+MAX_CACHE_KEY_LENGTH = 1024
+
+# Splits text into pieces that BPE merges never cross: contractions, words with
+# their leading space, numbers of up to three digits, punctuation runs and whitespace
+PRETOKENIZE_PATTERN = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+)
+
+def pretokenize(text: str) -> List[str]:
+    """Split text into pre-tokenization pieces.
+    
+    Args:
+        text: Text to split
+        
+    Returns:
+        List of pieces whose concatenation is the text"""
+    return PRETOKENIZE_PATTERN.findall(text)
+
+class Tokenizer:
+    """Base class of tokenizers."""
+    
+    name = "tokenizer"
+    
+    def encode(self, text: str) -> List[int]:
+        """Encode text to token IDs.
+        
+        Args:
+            text: Text to encode
+            
+        Returns:
+            List of token IDs"""
+        raise NotImplementedError
+    
+    def encode_batch(self, texts: Sequence[str]) -> List[List[int]]:
+        """Encode several texts to token IDs.
+        
+        Args:
+            texts: Texts to encode
+            
+        Returns:
+            List of token ID lists, one per text"""
+        return [self.encode(text) for text in texts]
+    
+    def count(self, text: str) -> int:
+        """Count the tokens of text.
+        
+        Args:
+            text: Text to count tokens for
+            
+        Returns:
+            Number of tokens"""
+        return len(self.encode(text))
+    
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        """Count the tokens of several texts.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Number of tokens of each text"""
+        return [len(ids) for ids in self.encode_batch(texts)]
+
+class ApproximateTokenizer(Tokenizer):
+    """Vocabulary-free tokenizer approximating a byte-level BPE.
+    
+    Text is pre-tokenized like a BPE tokenizer, and each piece is split into the
+    number of tokens a typical English BPE vocabulary produces for it: short
+    words are one token, longer words one token per few characters, numbers one
+    token per three digits and non-ASCII text roughly one token per character."""
+    
+    name = "approximate"
+    
+    def __init__(self, chars_per_token: float = 6.0):
+        """Initialize the approximate tokenizer.
+        
+        Args:
+            chars_per_token: Average number of ASCII letters per token in long words"""
+        self.chars_per_token = chars_per_token
+    
+    def _piece_tokens(self, piece: str) -> int:
+        """Estimate the number of tokens of a piece.
+        
+        Args:
+            piece: Pre-tokenization piece
+            
+        Returns:
+            Estimated number of tokens"""
+        stripped = piece.lstrip(" ")
+        if not stripped:
+            return 1
+        if not stripped.isascii():
+            return max(1, len(stripped))
+        if stripped.isalpha():
+            return max(1, -(-len(stripped) // int(self.chars_per_token)))
+        if stripped.isdigit():
+            return 1
+        if stripped.isspace():
+            return max(1, -(-len(stripped) // 16))
+        return max(1, -(-len(stripped) // 2))
+    
+    def encode(self, text: str) -> List[int]:
+        """Encode text to stable pseudo token IDs.
+        
+        Args:
+            text: Text to encode
+            
+        Returns:
+            List of token IDs, one per estimated token"""
+        ids = []
+        for piece in pretokenize(text):
+            count = self._piece_tokens(piece)
+            step = max(1, -(-len(piece) // count))
+            for start in range(0, count * step, step):
+                ids.append(zlib.crc32(piece[start:start + step].encode("utf-8")) & 0xFFFFFF)
+        return ids
+    
+    def count(self, text: str) -> int:
+        """Count the tokens of text.
+        
+        Args:
+            text: Text to count tokens for
+            
+        Returns:
+            Estimated number of tokens"""
+        return sum(self._piece_tokens(piece) for piece in pretokenize(text))
+    
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        """Count the tokens of several texts.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Estimated number of tokens of each text"""
+        return [self.count(text) for text in texts]
+
+class BPETokenizer(Tokenizer):
+    """Byte-level byte pair encoding tokenizer.
+    
+    The vocabulary maps byte sequences to merge ranks, in the format of tiktoken
+    rank files. Text is pre-tokenized and each piece is encoded by repeatedly
+    merging its lowest-ranked adjacent pair. Encoded pieces are memoized, so
+    the merge loop only runs for pieces not seen before. Vocabularies can be
+    loaded from a local rank file or trained on a corpus, so no network access
+    is needed."""
+    
+    def __init__(self, mergeable_ranks: Dict[bytes, int], name: str = "bpe",
+                 piece_cache_size: int = DEFAULT_PIECE_CACHE_SIZE):
+        """Initialize the BPE tokenizer.
+        
+        Args:
+            mergeable_ranks: Mapping of byte sequences to merge ranks, including all single bytes
+            name: Name of the tokenizer
+            piece_cache_size: Maximum number of memoized piece encodings"""
+        missing = [value for value in range(256) if bytes([value]) not in mergeable_ranks]
+        if missing:
+            raise ValueError(f"BPE vocabulary is missing {len(missing)} single-byte tokens")
+        
+        self.name = name
+        self.mergeable_ranks = mergeable_ranks
+        self.piece_cache_size = piece_cache_size
+        self._decoder = {rank: token for token, rank in mergeable_ranks.items()}
+        self._piece_cache: Dict[str, Tuple[int, ...]] = {}
+        self._piece_cache_lock = threading.Lock()
+    
+    @property
+    def vocab_size(self) -> int:
+        """Number of tokens in the vocabulary."""
+        return len(self.mergeable_ranks)
+    
+    def _merge_piece(self, data: bytes) -> Tuple[int, ...]:
+        """Encode the bytes of a piece by byte pair merging.
+        
+        Args:
+            data: UTF-8 bytes of the piece
+            
+        Returns:
+            Token IDs of the piece"""
+        rank = self.mergeable_ranks.get(data)
+        if rank is not None:
+            return (rank,)
+        
+        ranks = self.mergeable_ranks
+        parts = [data[i:i + 1] for i in range(len(data))]
+        while len(parts) > 1:
+            # Find the adjacent pair with the lowest merge rank
+            best_rank = None
+            best_index = -1
+            for i in range(len(parts) - 1):
+                pair_rank = ranks.get(parts[i] + parts[i + 1])
+                if pair_rank is not None and (best_rank is None or pair_rank < best_rank):
+                    best_rank = pair_rank
+                    best_index = i
+            if best_rank is None:
+                break
+            parts[best_index:best_index + 2] = [parts[best_index] + parts[best_index + 1]]
+        
+        return tuple(ranks[part] for part in parts)
+    
+    def encode(self, text: str) -> List[int]:
+        """Encode text to token IDs.
+        
+        Args:
+            text: Text to encode
+            
+        Returns:
+            List of token IDs"""
+        ids = []
+        cache = self._piece_cache
+        for piece in pretokenize(text):
+            encoded = cache.get(piece)
+            if encoded is None:
+                encoded = self._merge_piece(piece.encode("utf-8"))
+                with self._piece_cache_lock:
+                    if len(cache) >= self.piece_cache_size:
+                        # Evict the oldest memoized piece
+                        cache.pop(next(iter(cache)))
+                    cache[piece] = encoded
+            ids.extend(encoded)
+        return ids
+    
+    def decode(self, ids: Sequence[int]) -> str:
+        """Decode token IDs to text.
+        
+        Args:
+            ids: Token IDs to decode
+            
+        Returns:
+            Decoded text"""
+        return b"".join(self._decoder[token_id] for token_id in ids).decode("utf-8", errors="replace")
+    
+    @classmethod
+    def from_file(cls, path: str, name: Optional[str] = None) -> "BPETokenizer":
+        """Load a tokenizer from a tiktoken-format rank file.
+        
+        Each line of the file holds a base64-encoded token and its rank.
+        
+        Args:
+            path: Path of the rank file
+            name: Name of the tokenizer (defaults to the file name)
+            
+        Returns:
+            Loaded tokenizer"""
+        ranks = {}
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+        return cls(ranks, name=name or os.path.splitext(os.path.basename(path))[0])
+    
+    def save(self, path: str) -> None:
+        """Save the vocabulary as a tiktoken-format rank file.
+        
+        Args:
+            path: Path of the rank file"""
+        with open(path, "wb") as f:
+            for token, rank in sorted(self.mergeable_ranks.items(), key=lambda item: item[1]):
+                f.write(base64.b64encode(token) + b" " + str(rank).encode("ascii") + b"\n")
+    
+    @classmethod
+    def train(cls, texts: Sequence[str], vocab_size: int, name: str = "bpe") -> "BPETokenizer":
+        """Learn a BPE vocabulary from a corpus.
+        
+        Args:
+            texts: Training corpus
+            vocab_size: Target vocabulary size, at least 256
+            name: Name of the tokenizer
+            
+        Returns:
+            Trained tokenizer"""
+        if vocab_size < 256:
+            raise ValueError("vocab_size must be at least 256")
+        
+        ranks = {bytes([value]): value for value in range(256)}
+        piece_counts = Counter(piece.encode("utf-8") for text in texts for piece in pretokenize(text))
+        words = [([piece[i:i + 1] for i in range(len(piece))], count) for piece, count in piece_counts.items()]
+        
+        while len(ranks) < vocab_size:
+            pair_counts: Counter = Counter()
+            for parts, count in words:
+                for pair in zip(parts, parts[1:]):
+                    pair_counts[pair] += count
+            if not pair_counts:
+                break
+            
+            best = max(pair_counts, key=pair_counts.get)
+            merged = best[0] + best[1]
+            ranks[merged] = len(ranks)
+            
+            # Apply the merge to every word containing the pair
+            for parts, _ in words:
+                i = 0
+                while i < len(parts) - 1:
+                    if parts[i] == best[0] and parts[i + 1] == best[1]:
+                        parts[i:i + 2] = [merged]
+                    i += 1
+        
+        logger.info(f"Trained BPE tokenizer {name} with {len(ranks)} tokens")
+        return cls(ranks, name=name)
+
+class TiktokenTokenizer(Tokenizer):
+    """Tokenizer backed by a tiktoken encoding."""
+    
+    def __init__(self, encoding_name: str = DEFAULT_TIKTOKEN_ENCODING):
+        """Initialize the tiktoken tokenizer.
+        
+        Args:
+            encoding_name: Name of the tiktoken encoding"""
+        if tiktoken is None:
+            raise ImportError("tiktoken is required for TiktokenTokenizer. Please install with 'pip install tiktoken'")
+        self.name = f"tiktoken:{encoding_name}"
+        self.encoding = tiktoken.get_encoding(encoding_name)
+    
+    def encode(self, text: str) -> List[int]:
+        """Encode text to token IDs.
+        
+        Args:
+            text: Text to encode
+            
+        Returns:
+            List of token IDs"""
+        return self.encoding.encode_ordinary(text)
+    
+    def encode_batch(self, texts: Sequence[str]) -> List[List[int]]:
+        """Encode several texts to token IDs in parallel.
+        
+        Args:
+            texts: Texts to encode
+            
+        Returns:
+            List of token ID lists, one per text"""
+        return self.encoding.encode_ordinary_batch(list(texts))
+
+class HuggingFaceTokenizer(Tokenizer):
+    """Adapter for tokenizers with a Hugging Face style encode method."""
+    
+    def __init__(self, tokenizer: Any, name: Optional[str] = None):
+        """Initialize the adapter.
+        
+        Args:
+            tokenizer: Tokenizer with an encode(text) method
+            name: Name of the tokenizer (defaults to its class name)"""
+        self.tokenizer = tokenizer
+        self.name = name or type(tokenizer).__name__
+    
+    def encode(self, text: str) -> List[int]:
+        """Encode text to token IDs.
+        
+        Args:
+            text: Text to encode
+            
+        Returns:
+            List of token IDs"""
+        return list(self.tokenizer.encode(text))
+
+class TokenCounter:
+    """Token counter with an LRU cache of counts for repeated strings."""
+    
+    def __init__(self, tokenizer: Tokenizer, cache_size: int = DEFAULT_CACHE_SIZE):
+        """Initialize the token counter.
+        
+        Args:
+            tokenizer: Tokenizer to count with
+            cache_size: Maximum number of cached counts"""
+        self.tokenizer = tokenizer
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Union[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    @property
+    def name(self) -> str:
+        """Name of the tokenizer."""
+        return self.tokenizer.name
+    
+    def _cache_key(self, text: str) -> Union[str, bytes]:
+        """Get the cache key of a text.
+        
+        Args:
+            text: Text
+            
+        Returns:
+            The text itself, or a digest of long texts"""
+        if len(text) <= MAX_CACHE_KEY_LENGTH:
+            return text
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    def _store(self, key: Union[str, bytes], count: int) -> None:
+        """Cache a count. The lock must be held.
+        
+        Args:
+            key: Cache key
+            count: Number of tokens"""
+        self._cache[key] = count
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens of text.
+        
+        Args:
+            text: Text to count tokens for
+            
+        Returns:
+            Number of tokens"""
+        if not text:
+            return 0
+        
+        key = self._cache_key(text)
+        with self._lock:
+            count = self._cache.get(key)
+            if count is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return count
+            self._misses += 1
+        
+        count = self.tokenizer.count(text)
+        with self._lock:
+            self._store(key, count)
+        return count
+    
+    def count_tokens_many(self, texts: Sequence[str]) -> List[int]:
+        """Count the tokens of several texts.
+        
+        Cached counts are reused, duplicate texts are counted once, and the
+        remaining texts are counted in a single batch.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Number of tokens of each text"""
+        keys = [self._cache_key(text) if text else None for text in texts]
+        counts: Dict[Union[str, bytes], int] = {}
+        missing: Dict[Union[str, bytes], str] = {}
+        
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key is None or key in counts or key in missing:
+                    continue
+                count = self._cache.get(key)
+                if count is None:
+                    missing[key] = text
+                    self._misses += 1
+                else:
+                    self._cache.move_to_end(key)
+                    counts[key] = count
+                    self._hits += 1
+        
+        if missing:
+            new_counts = self.tokenizer.count_batch(list(missing.values()))
+            with self._lock:
+                for key, count in zip(missing, new_counts):
+                    counts[key] = count
+                    self._store(key, count)
+        
+        return [counts[key] if key is not None else 0 for key in keys]
+    
+    def encode(self, text: str) -> List[int]:
+        """Encode text to token IDs.
+        
+        Args:
+            text: Text to encode
+            
+        Returns:
+            List of token IDs"""
+        return self.tokenizer.encode(text)
+    
+    def clear_cache(self) -> None:
+        """Clear the cached counts."""
+        with self._lock:
+            self._cache.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+        
+        Returns:
+            Dictionary with the tokenizer name, cache size, hits, misses and hit rate"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "tokenizer": self.name,
+                "cache_size": len(self._cache),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+def _create_default_tokenizer() -> Tokenizer:
+    """Create the default tokenizer.
+    
+    Uses the BPE rank file named by the TOKENIZER_BPE_FILE environment variable,
+    then tiktoken if it is installed and its encoding can be loaded, and the
+    approximate tokenizer otherwise.
+    
+    Returns:
+        Default tokenizer"""
+    path = os.environ.get(TOKENIZER_FILE_ENV)
+    if path:
+        try:
+            return BPETokenizer.from_file(path)
+        except Exception as e:
+            logger.warning(f"Could not load BPE tokenizer from {path}: {str(e)}")
+    
+    if tiktoken is not None:
+        try:
+            return TiktokenTokenizer()
+        except Exception as e:
+            logger.warning(f"Could not load tiktoken encoding: {str(e)}")
+    
+    return ApproximateTokenizer()
+
+# Registry of tokenizer factories and the counters created from them
+_factories: Dict[str, Callable[[], Tokenizer]] = {
+    DEFAULT_TOKENIZER: _create_default_tokenizer,
+    ApproximateTokenizer.name: ApproximateTokenizer
+}
+_counters: Dict[str, TokenCounter] = {}
+_registry_lock = threading.Lock()
+
+def register_tokenizer(name: str, tokenizer: Union[Tokenizer, Callable[[], Tokenizer]]) -> None:
+    """Register a tokenizer under a name.
+    
+    Model providers look up their tokenizer by provider name ("claude", "gemini",
+    "grok3") and fall back to the default tokenizer, so registering one of these
+    names changes how that provider counts tokens.
+    
+    Args:
+        name: Name of the tokenizer
+        tokenizer: Tokenizer instance, or a factory creating it on first use"""
+    factory = tokenizer if not isinstance(tokenizer, Tokenizer) else (lambda: tokenizer)
+    with _registry_lock:
+        _factories[name] = factory
+        previous = _counters.pop(name, None)
+        if name == DEFAULT_TOKENIZER and previous is not None:
+            # Names resolved to the previous default tokenizer resolve again
+            for alias in [alias for alias, counter in _counters.items() if counter is previous]:
+                del _counters[alias]
+
+def get_tokenizer(name: Optional[str] = None) -> TokenCounter:
+    """Get the token counter of a registered tokenizer.
+    
+    Names of the form "tiktoken:<encoding>" use that tiktoken encoding. Unknown
+    names resolve to the default tokenizer.
+    
+    Args:
+        name: Name of the tokenizer (None for the default tokenizer)
+        
+    Returns:
+        Shared token counter"""
+    name = name or DEFAULT_TOKENIZER
+    with _registry_lock:
+        counter = _counters.get(name)
+        if counter is not None:
+            return counter
+        
+        factory = _factories.get(name)
+        if factory is None and name.startswith("tiktoken:"):
+            encoding_name = name.split(":", 1)[1]
+            factory = lambda: TiktokenTokenizer(encoding_name)
+        
+        if factory is None:
+            # Share the default counter, and its cache, under this name
+            counter = _counters.get(DEFAULT_TOKENIZER)
+            if counter is None:
+                counter = _counters[DEFAULT_TOKENIZER] = TokenCounter(_factories[DEFAULT_TOKENIZER]())
+        else:
+            counter = TokenCounter(factory())
+        
+        _counters[name] = counter
+        logger.debug(f"Using tokenizer {counter.name} for {name}")
+        return counter
+
+def count_tokens(text: str, tokenizer: Optional[str] = None) -> int:
+    """Count the tokens of text with a registered tokenizer.
+    
+    Args:
+        text: Text to count tokens for
+        tokenizer: Name of the tokenizer (None for the default tokenizer)
+        
+    Returns:
+        Number of tokens"""
+    return get_tokenizer(tokenizer).count_tokens(text)
+
+def count_tokens_many(texts: Sequence[str], tokenizer: Optional[str] = None) -> List[int]:
+    """Count the tokens of several texts with a registered tokenizer.
+    
+    Args:
+        texts: Texts to count tokens for
+        tokenizer: Name of the tokenizer (None for the default tokenizer)
+        
+    Returns:
+        Number of tokens of each text"""
+    return get_tokenizer(tokenizer).count_tokens_many(texts)
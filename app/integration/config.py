@@ -29,6 +29,8 @@ class JiraConfig:
     max_retries: int = 3
     timeout: int = 30
     sync_interval_minutes: int = 15
+    max_concurrency: int = 4
+    search_page_size: int = 100
     issue_types_mapping: Dict[str, str] = None
     status_mapping: Dict[str, str] = None
     priority_mapping: Dict[str, str] = None
@@ -46,6 +48,7 @@ class ConfluenceConfig:
     max_retries: int = 3
     timeout: int = 30
     sync_interval_minutes: int = 15
+    max_concurrency: int = 4
     content_type_mapping: Dict[str, str] = None
     label_mapping: Dict[str, str] = None
 
@@ -57,6 +60,9 @@ class IntegrationConfig:
     confluence: Optional[ConfluenceConfig] = None
     enabled_integrations: List[IntegrationType] = None
     sync_database_path: str = "integration_sync.db"
+    sync_batch_size: int = 100
+    sync_workers: int = 4
+    sync_result_chunk_size: int = 10
     log_level: str = "INFO"
     log_file: str = "integration.log"
 
@@ -86,7 +92,9 @@ def load_config_from_env() -> IntegrationConfig:
             webhook_secret=os.environ.get("JIRA_WEBHOOK_SECRET"),
             max_retries=int(os.environ.get("JIRA_MAX_RETRIES", "3")),
             timeout=int(os.environ.get("JIRA_TIMEOUT", "30")),
-            sync_interval_minutes=int(os.environ.get("JIRA_SYNC_INTERVAL", "15"))
+            sync_interval_minutes=int(os.environ.get("JIRA_SYNC_INTERVAL", "15")),
+            max_concurrency=int(os.environ.get("JIRA_MAX_CONCURRENCY", "4")),
+            search_page_size=int(os.environ.get("JIRA_SEARCH_PAGE_SIZE", "100"))
         )
     
     # Create Confluence config if enabled
@@ -100,7 +108,8 @@ def load_config_from_env() -> IntegrationConfig:
             webhook_secret=os.environ.get("CONFLUENCE_WEBHOOK_SECRET"),
             max_retries=int(os.environ.get("CONFLUENCE_MAX_RETRIES", "3")),
             timeout=int(os.environ.get("CONFLUENCE_TIMEOUT", "30")),
-            sync_interval_minutes=int(os.environ.get("CONFLUENCE_SYNC_INTERVAL", "15"))
+            sync_interval_minutes=int(os.environ.get("CONFLUENCE_SYNC_INTERVAL", "15")),
+            max_concurrency=int(os.environ.get("CONFLUENCE_MAX_CONCURRENCY", "4"))
         )
     
     return IntegrationConfig(
@@ -108,6 +117,9 @@ def load_config_from_env() -> IntegrationConfig:
         confluence=confluence_config,
         enabled_integrations=enabled_integrations,
         sync_database_path=os.environ.get("INTEGRATION_SYNC_DB", "integration_sync.db"),
+        sync_batch_size=int(os.environ.get("INTEGRATION_SYNC_BATCH_SIZE", "100")),
+        sync_workers=int(os.environ.get("INTEGRATION_SYNC_WORKERS", "4")),
+        sync_result_chunk_size=int(os.environ.get("INTEGRATION_SYNC_RESULT_CHUNK_SIZE", "10")),
         log_level=os.environ.get("INTEGRATION_LOG_LEVEL", "INFO"),
         log_file=os.environ.get("INTEGRATION_LOG_FILE", "integration.log")
     )
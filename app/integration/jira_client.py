@@ -9,6 +9,7 @@ All rights reserved."""
 import json
 import logging
 import time
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Union, Tuple
 import requests
 from requests.exceptions import RequestException, Timeout
@@ -277,6 +278,56 @@ class JiraApiClient:
         
         return response.get("issues", [])
     
+    def search_issues(
+        self, 
+        jql: str, 
+        start_at: int = 0, 
+        max_results: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Get one page of issues matching a JQL query.
+        
+        Args:
+            jql: JQL query string
+            start_at: Index of the first issue to return
+            max_results: Maximum number of issues to return
+            fields: Fields to return, or None for all navigable fields
+            
+        Returns:
+            Search result with the "issues" of the page and the "total" match count"""
+        params = {
+            "jql": jql,
+            "startAt": start_at,
+            "maxResults": max_results
+        }
+        if fields:
+            params["fields"] = ",".join(fields)
+        
+        status_code, response = self._make_request('GET', 'search', params=params)
+        
+        if status_code != 200:
+            raise JiraApiError("Failed to search issues", status_code, response)
+        
+        return response
+    
+    def get_issues_by_keys(self, issue_keys: List[str], page_size: int = 100) -> List[Dict[str, Any]]:
+        """Get several issues by key or ID with as few requests as possible.
+        
+        Args:
+            issue_keys: Issue keys or IDs
+            page_size: Maximum number of issues per request
+            
+        Returns:
+            List of the issues that were found"""
+        issues = []
+        for start in range(0, len(issue_keys), page_size):
+            chunk = issue_keys[start:start + page_size]
+            jql = f"issuekey in ({', '.join(chunk)})"
+            response = self.search_issues(jql, max_results=len(chunk))
+            issues.extend(response.get("issues", []))
+        
+        return issues
+    
     def get_issue(self, issue_key: str) -> Dict[str, Any]:
         """Get information about a specific issue.
         
@@ -13,11 +13,18 @@ import json
 import time
 import threading
 from typing import Dict, List, Optional, Any, Union, Tuple
-from datetime import datetime
-from queue import Queue, PriorityQueue
+from datetime import datetime, timedelta, timezone
+from queue import PriorityQueue, Empty
 import uuid
+from contextlib import contextmanager
 
-from .config import JiraConfig, ConfluenceConfig, IntegrationConfig
+try:
+    from zoneinfo import ZoneInfo
+    ZONEINFO_AVAILABLE = True
+except ImportError:
+    ZONEINFO_AVAILABLE = False
+
+from .config import JiraConfig, ConfluenceConfig, IntegrationConfig, IntegrationType
 from .jira_client import JiraApiClient
 from .confluence_client import ConfluenceApiClient
 from .models import (
@@ -30,6 +37,10 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# JQL reads dates in the Jira user's timezone, which is at most this far behind UTC.
+# Watermarks are moved back by it when the user's timezone is unknown.
+JQL_TIMEZONE_FALLBACK_OVERLAP = timedelta(hours=12)
+
 
 class SyncError(Exception):
     """Exception raised for synchronization errors."""
@@ -38,19 +49,116 @@ class SyncError(Exception):
 
 class SynchronizationDatabase:
     """Database for storing synchronization state and history.
-    Uses SQLite for persistence."""
+    Uses SQLite for persistence, with one WAL-mode connection per thread."""
+    
+    # Maximum number of bound parameters per IN (...) query
+    MAX_QUERY_PARAMETERS = 500
     
-    def __init__(self, db_path: str):
+    ENTITY_UPSERT_SQL = '''
+    INSERT INTO entities (
+        id, entity_type, external_id, internal_id, sync_direction,
+        last_sync_time, sync_status, sync_error, version, metadata, data
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        entity_type = excluded.entity_type,
+        external_id = excluded.external_id,
+        internal_id = excluded.internal_id,
+        sync_direction = excluded.sync_direction,
+        last_sync_time = excluded.last_sync_time,
+        sync_status = excluded.sync_status,
+        sync_error = excluded.sync_error,
+        version = excluded.version,
+        metadata = excluded.metadata,
+        data = excluded.data
+    '''
+    
+    SYNC_RECORD_INSERT_SQL = '''
+    INSERT INTO sync_records (
+        id, entity_id, entity_type, external_id, internal_id,
+        sync_direction, sync_time, sync_status, sync_error, changes, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    def __init__(self, db_path: str, timeout: float = 30.0):
         """Initialize the synchronization database.
         
         Args:
-            db_path: Path to the SQLite database file"""
+            db_path: Path to the SQLite database file, or ":memory:"
+            timeout: Seconds to wait for a lock held by another process"""
         self.db_path = db_path
+        self.timeout = timeout
+        
+        # Per-thread connections, tracked so that close() can release them all
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        
+        # SQLite allows a single writer, so writers of this process take turns
+        # here instead of retrying on a busy database
+        self._write_lock = threading.RLock()
+        
+        # An in-memory database is private to its connection, so all threads share one
+        self._shared_conn = self._connect() if db_path == ":memory:" else None
+        
         self._init_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database.
+        
+        Returns:
+            The SQLite connection"""
+        # close() may run on a different thread than the one using the connection
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        if self.db_path != ":memory:":
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, opening it on first use.
+        
+        Returns:
+            The SQLite connection"""
+        if self._shared_conn is not None:
+            return self._shared_conn
+        
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Run writes in a single transaction, committed on success.
+        
+        Yields:
+            The SQLite connection of the current thread"""
+        conn = self._get_connection()
+        with self._write_lock, conn:
+            yield conn
+    
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing synchronization database connection: {str(e)}")
+        
+        self._local = threading.local()
+        self._shared_conn = None
+    
     def _init_db(self) -> None:
         """Initialize the database schema if it doesn't exist."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_connection()
         cursor = conn.cursor()
         
         # Create entities table
@@ -88,86 +196,122 @@ class SynchronizationDatabase:
         )
         ''')
         
+        # Create sync_watermarks table for incremental synchronization
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_watermarks (
+            scope TEXT PRIMARY KEY,
+            watermark TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        ''')
+        
         # Create indices for faster lookups
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_entities_external_id ON entities (external_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_entities_internal_id ON entities (internal_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_entities_entity_type ON entities (entity_type)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_entities_sync_status ON entities (sync_status)')
         
+        # Composite indices matching the (entity_type, id) lookups
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_entities_type_external_id ON entities (entity_type, external_id)'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_entities_type_internal_id ON entities (entity_type, internal_id)'
+        )
+        
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_records_entity_id ON sync_records (entity_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_records_external_id ON sync_records (external_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sync_records_internal_id ON sync_records (internal_id)')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_sync_records_entity_time ON sync_records (entity_id, sync_time)'
+        )
         
         conn.commit()
-        conn.close()
+    
+    def _entity_row(self, entity: SyncEntity) -> Tuple:
+        """Build the entities row of an entity.
+        
+        Args:
+            entity: The entity
+            
+        Returns:
+            Row values in ENTITY_UPSERT_SQL column order"""
+        return (
+            entity.id,
+            entity.entity_type.value,
+            entity.external_id,
+            entity.internal_id,
+            entity.sync_direction.value,
+            entity.last_sync_time.isoformat() if entity.last_sync_time else None,
+            entity.sync_status.value,
+            entity.sync_error,
+            entity.version,
+            json.dumps(entity.metadata) if entity.metadata else '{}',
+            json.dumps(self._entity_to_dict(entity))
+        )
+    
+    def _sync_record_row(self, record: SyncRecord) -> Tuple:
+        """Build the sync_records row of a sync record.
+        
+        Args:
+            record: The sync record
+            
+        Returns:
+            Row values in SYNC_RECORD_INSERT_SQL column order"""
+        return (
+            record.id,
+            record.entity_id,
+            record.entity_type.value,
+            record.external_id,
+            record.internal_id,
+            record.sync_direction.value,
+            record.sync_time.isoformat(),
+            record.sync_status.value,
+            record.sync_error,
+            json.dumps(record.changes) if record.changes else '{}',
+            json.dumps(record.metadata) if record.metadata else '{}'
+        )
+    
+    def _rows_to_entities(self, rows: List[Tuple]) -> List[SyncEntity]:
+        """Convert rows holding the data column to entities.
+        
+        Args:
+            rows: Rows whose first column is the entity data
+            
+        Returns:
+            List of entities, skipping rows that cannot be converted"""
+        entities = []
+        for row in rows:
+            entity = self._dict_to_entity(json.loads(row[0]))
+            if entity:
+                entities.append(entity)
+        
+        return entities
     
     def save_entity(self, entity: SyncEntity) -> None:
         """Save an entity to the database.
         
         Args:
             entity: The entity to save"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._transaction() as conn:
+            conn.execute(self.ENTITY_UPSERT_SQL, self._entity_row(entity))
+    
+    def save_entities(self, entities: List[SyncEntity]) -> int:
+        """Save several entities in a single transaction.
         
-        # Convert entity to JSON for storage
-        entity_data = json.dumps(self._entity_to_dict(entity))
-        metadata = json.dumps(entity.metadata) if entity.metadata else '{}'
-        
-        # Check if entity already exists
-        cursor.execute('SELECT id FROM entities WHERE id = ?', (entity.id,))
-        exists = cursor.fetchone() is not None
-        
-        if exists:
-            # Update existing entity
-            cursor.execute('''
-            UPDATE entities SET
-                entity_type = ?,
-                external_id = ?,
-                internal_id = ?,
-                sync_direction = ?,
-                last_sync_time = ?,
-                sync_status = ?,
-                sync_error = ?,
-                version = ?,
-                metadata = ?,
-                data = ?
-            WHERE id = ?
-            ''', (
-                entity.entity_type.value,
-                entity.external_id,
-                entity.internal_id,
-                entity.sync_direction.value,
-                entity.last_sync_time.isoformat() if entity.last_sync_time else None,
-                entity.sync_status.value,
-                entity.sync_error,
-                entity.version,
-                metadata,
-                entity_data,
-                entity.id
-            ))
-        else:
-            # Insert new entity
-            cursor.execute('''
-            INSERT INTO entities (
-                id, entity_type, external_id, internal_id, sync_direction,
-                last_sync_time, sync_status, sync_error, version, metadata, data
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                entity.id,
-                entity.entity_type.value,
-                entity.external_id,
-                entity.internal_id,
-                entity.sync_direction.value,
-                entity.last_sync_time.isoformat() if entity.last_sync_time else None,
-                entity.sync_status.value,
-                entity.sync_error,
-                entity.version,
-                metadata,
-                entity_data
-            ))
+        Args:
+            entities: The entities to save
+            
+        Returns:
+            Number of entities saved"""
+        rows = [self._entity_row(entity) for entity in entities]
+        if not rows:
+            return 0
         
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            conn.executemany(self.ENTITY_UPSERT_SQL, rows)
+        
+        return len(rows)
     
     def get_entity(self, entity_id: str) -> Optional[SyncEntity]:
         """Get an entity by ID.
@@ -177,20 +321,36 @@ class SynchronizationDatabase:
             
         Returns:
             The entity if found, None otherwise"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT data FROM entities WHERE id = ?', (entity_id,))
+        cursor = self._get_connection().execute('SELECT data FROM entities WHERE id = ?', (entity_id,))
         result = cursor.fetchone()
         
-        conn.close()
-        
         if result:
             entity_data = json.loads(result[0])
             return self._dict_to_entity(entity_data)
         
         return None
     
+    def get_entities(self, entity_ids: List[str]) -> Dict[str, SyncEntity]:
+        """Get several entities by ID.
+        
+        Args:
+            entity_ids: The entity IDs
+            
+        Returns:
+            Dictionary mapping the IDs that were found to their entities"""
+        conn = self._get_connection()
+        unique_ids = list(dict.fromkeys(entity_ids))
+        entities = {}
+        
+        for start in range(0, len(unique_ids), self.MAX_QUERY_PARAMETERS):
+            chunk = unique_ids[start:start + self.MAX_QUERY_PARAMETERS]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(f'SELECT data FROM entities WHERE id IN ({placeholders})', chunk).fetchall()
+            for entity in self._rows_to_entities(rows):
+                entities[entity.id] = entity
+        
+        return entities
+    
     def get_entity_by_external_id(self, entity_type: EntityType, external_id: str) -> Optional[SyncEntity]:
         """Get an entity by external ID.
         
@@ -200,17 +360,12 @@ class SynchronizationDatabase:
             
         Returns:
             The entity if found, None otherwise"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
+        cursor = self._get_connection().execute(
             'SELECT data FROM entities WHERE entity_type = ? AND external_id = ?',
             (entity_type.value, external_id)
         )
         result = cursor.fetchone()
         
-        conn.close()
-        
         if result:
             entity_data = json.loads(result[0])
             return self._dict_to_entity(entity_data)
@@ -226,23 +381,47 @@ class SynchronizationDatabase:
             
         Returns:
             The entity if found, None otherwise"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
+        cursor = self._get_connection().execute(
             'SELECT data FROM entities WHERE entity_type = ? AND internal_id = ?',
             (entity_type.value, internal_id)
         )
         result = cursor.fetchone()
         
-        conn.close()
-        
         if result:
             entity_data = json.loads(result[0])
             return self._dict_to_entity(entity_data)
         
         return None
     
+    def get_entities_by_external_ids(
+        self, 
+        entity_type: EntityType, 
+        external_ids: List[str]
+    ) -> Dict[str, SyncEntity]:
+        """Get several entities by external ID.
+        
+        Args:
+            entity_type: The entity type
+            external_ids: The external IDs
+            
+        Returns:
+            Dictionary mapping the external IDs that were found to their entities"""
+        conn = self._get_connection()
+        unique_ids = list(dict.fromkeys(external_ids))
+        entities = {}
+        
+        for start in range(0, len(unique_ids), self.MAX_QUERY_PARAMETERS):
+            chunk = unique_ids[start:start + self.MAX_QUERY_PARAMETERS]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT data FROM entities WHERE entity_type = ? AND external_id IN ({placeholders})',
+                [entity_type.value] + chunk
+            ).fetchall()
+            for entity in self._rows_to_entities(rows):
+                entities[entity.external_id] = entity
+        
+        return entities
+    
     def get_entities_by_status(self, status: SyncStatus) -> List[SyncEntity]:
         """Get entities by sync status.
         
@@ -251,22 +430,23 @@ class SynchronizationDatabase:
             
         Returns:
             List of entities with the specified status"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT data FROM entities WHERE sync_status = ?', (status.value,))
-        results = cursor.fetchall()
-        
-        conn.close()
-        
-        entities = []
-        for result in results:
-            entity_data = json.loads(result[0])
-            entity = self._dict_to_entity(entity_data)
-            if entity:
-                entities.append(entity)
+        cursor = self._get_connection().execute(
+            'SELECT data FROM entities WHERE sync_status = ?', (status.value,)
+        )
+        return self._rows_to_entities(cursor.fetchall())
+    
+    def get_entity_ids_by_status(self, status: SyncStatus) -> List[str]:
+        """Get the IDs of entities by sync status, without loading the entities.
         
-        return entities
+        Args:
+            status: The sync status
+            
+        Returns:
+            List of IDs of entities with the specified status"""
+        cursor = self._get_connection().execute(
+            'SELECT id FROM entities WHERE sync_status = ?', (status.value,)
+        )
+        return [row[0] for row in cursor.fetchall()]
     
     def get_entities_by_type(self, entity_type: EntityType) -> List[SyncEntity]:
         """Get entities by type.
@@ -276,22 +456,10 @@ class SynchronizationDatabase:
             
         Returns:
             List of entities of the specified type"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT data FROM entities WHERE entity_type = ?', (entity_type.value,))
-        results = cursor.fetchall()
-        
-        conn.close()
-        
-        entities = []
-        for result in results:
-            entity_data = json.loads(result[0])
-            entity = self._dict_to_entity(entity_data)
-            if entity:
-                entities.append(entity)
-        
-        return entities
+        cursor = self._get_connection().execute(
+            'SELECT data FROM entities WHERE entity_type = ?', (entity_type.value,)
+        )
+        return self._rows_to_entities(cursor.fetchall())
     
     def delete_entity(self, entity_id: str) -> bool:
         """Delete an entity by ID.
@@ -301,49 +469,64 @@ class SynchronizationDatabase:
             
         Returns:
             True if the entity was deleted, False otherwise"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM entities WHERE id = ?', (entity_id,))
-        deleted = cursor.rowcount > 0
-        
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            cursor = conn.execute('DELETE FROM entities WHERE id = ?', (entity_id,))
         
-        return deleted
+        return cursor.rowcount > 0
     
     def save_sync_record(self, record: SyncRecord) -> None:
         """Save a sync record to the database.
         
         Args:
             record: The sync record to save"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._transaction() as conn:
+            conn.execute(self.SYNC_RECORD_INSERT_SQL, self._sync_record_row(record))
+    
+    def save_sync_records(self, records: List[SyncRecord]) -> int:
+        """Save several sync records in a single transaction.
         
-        changes = json.dumps(record.changes) if record.changes else '{}'
-        metadata = json.dumps(record.metadata) if record.metadata else '{}'
+        Args:
+            records: The sync records to save
+            
+        Returns:
+            Number of sync records saved"""
+        rows = [self._sync_record_row(record) for record in records]
+        if not rows:
+            return 0
         
-        cursor.execute('''
-        INSERT INTO sync_records (
-            id, entity_id, entity_type, external_id, internal_id,
-            sync_direction, sync_time, sync_status, sync_error, changes, metadata
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            record.id,
-            record.entity_id,
-            record.entity_type.value,
-            record.external_id,
-            record.internal_id,
-            record.sync_direction.value,
-            record.sync_time.isoformat(),
-            record.sync_status.value,
-            record.sync_error,
-            changes,
-            metadata
-        ))
+        with self._transaction() as conn:
+            conn.executemany(self.SYNC_RECORD_INSERT_SQL, rows)
         
-        conn.commit()
-        conn.close()
+        return len(rows)
+    
+    def get_watermark(self, scope: str) -> Optional[str]:
+        """Get the incremental synchronization watermark of a scope.
+        
+        Args:
+            scope: The scope, such as "jira_issues:PROJ"
+            
+        Returns:
+            The watermark if one was saved, None otherwise"""
+        cursor = self._get_connection().execute(
+            'SELECT watermark FROM sync_watermarks WHERE scope = ?', (scope,)
+        )
+        result = cursor.fetchone()
+        
+        return result[0] if result else None
+    
+    def set_watermark(self, scope: str, watermark: str) -> None:
+        """Save the incremental synchronization watermark of a scope.
+        
+        Args:
+            scope: The scope, such as "jira_issues:PROJ"
+            watermark: The watermark"""
+        with self._transaction() as conn:
+            conn.execute('''
+            INSERT INTO sync_watermarks (scope, watermark, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(scope) DO UPDATE SET
+                watermark = excluded.watermark,
+                updated_at = excluded.updated_at
+            ''', (scope, watermark, datetime.now().isoformat()))
     
     def get_sync_records(self, entity_id: str) -> List[SyncRecord]:
         """Get sync records for an entity.
@@ -353,10 +536,7 @@ class SynchronizationDatabase:
             
         Returns:
             List of sync records for the entity"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        cursor = self._get_connection().execute('''
         SELECT id, entity_id, entity_type, external_id, internal_id,
                sync_direction, sync_time, sync_status, sync_error, changes, metadata
         FROM sync_records
@@ -365,7 +545,6 @@ class SynchronizationDatabase:
         ''', (entity_id,))
         
         results = cursor.fetchall()
-        conn.close()
         
         records = []
         for result in results:
@@ -716,58 +895,188 @@ class SynchronizationManager:
     """Manager for synchronizing entities between TORONTO AI TEAM AGENT and Jira/Confluence.
     Handles scheduling, conflict resolution, and error handling."""
     
-    def __init__(self, config: IntegrationConfig):
+    def __init__(
+        self, 
+        config: IntegrationConfig,
+        jira_client: Optional[JiraApiClient] = None,
+        confluence_client: Optional[ConfluenceApiClient] = None
+    ):
         """Initialize the synchronization manager.
         
         Args:
-            config: Integration configuration"""
+            config: Integration configuration
+            jira_client: Jira client to use instead of one created from the configuration
+            confluence_client: Confluence client to use instead of one created from the configuration"""
         self.config = config
         self.db = SynchronizationDatabase(config.sync_database_path)
+        self.batch_size = max(1, config.sync_batch_size)
+        self.num_workers = max(1, config.sync_workers)
+        self.result_chunk_size = max(1, config.sync_result_chunk_size)
         
         # Initialize API clients if enabled
-        self.jira_client = None
-        self.confluence_client = None
+        self.jira_client = jira_client
+        self.confluence_client = confluence_client
+        enabled_integrations = config.enabled_integrations or []
         
-        if config.jira and config.jira in config.enabled_integrations:
+        if not self.jira_client and config.jira and IntegrationType.JIRA in enabled_integrations:
             self.jira_client = JiraApiClient(config.jira)
         
-        if config.confluence and config.confluence in config.enabled_integrations:
+        if not self.confluence_client and config.confluence and IntegrationType.CONFLUENCE in enabled_integrations:
             self.confluence_client = ConfluenceApiClient(config.confluence)
         
+        # Limit concurrent requests per remote system across all workers
+        self.remote_limits = {
+            remote: threading.BoundedSemaphore(self._remote_concurrency(remote))
+            for remote in ("jira", "confluence")
+        }
+        
         # Initialize synchronization queue
         self.sync_queue = PriorityQueue()
         
-        # Initialize worker thread
-        self.worker_thread = None
+        # Entities currently claimed by a worker
+        self._claimed = set()
+        self._claimed_lock = threading.Lock()
+        
+        # Throughput metrics
+        self._metrics_lock = threading.Lock()
+        self._reset_metrics()
+        
+        # Timezone JQL dates are read in, fetched on the first incremental pull
+        self._jira_timezone = None
+        self._jira_timezone_resolved = False
+        
+        # Initialize worker threads
+        self.worker_threads: List[threading.Thread] = []
         self.stop_event = threading.Event()
     
     def start(self) -> None:
         """Start the synchronization manager."""
-        if self.worker_thread and self.worker_thread.is_alive():
+        if any(thread.is_alive() for thread in self.worker_threads):
             logger.warning("Synchronization manager is already running")
             return
         
         self.stop_event.clear()
-        self.worker_thread = threading.Thread(target=self._worker_loop)
-        self.worker_thread.daemon = True
-        self.worker_thread.start()
-        
-        logger.info("Synchronization manager started")
+        self._reset_metrics()
+        self.recover_interrupted_entities()
+        self.worker_threads = []
+        for index in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"sync-worker-{index}")
+            thread.daemon = True
+            thread.start()
+            self.worker_threads.append(thread)
+        
+        # Periodically pull the issues of known Jira projects incrementally
+        if self.jira_client and self.config.jira:
+            thread = threading.Thread(target=self._jira_pull_loop, name="sync-jira-pull")
+            thread.daemon = True
+            thread.start()
+            self.worker_threads.append(thread)
+        
+        logger.info(f"Synchronization manager started with {self.num_workers} workers")
     
     def stop(self) -> None:
         """Stop the synchronization manager."""
-        if not self.worker_thread or not self.worker_thread.is_alive():
+        if not any(thread.is_alive() for thread in self.worker_threads):
             logger.warning("Synchronization manager is not running")
             return
         
         self.stop_event.set()
-        self.worker_thread.join(timeout=30)
+        for thread in self.worker_threads:
+            thread.join(timeout=30)
         
-        if self.worker_thread.is_alive():
-            logger.warning("Synchronization manager worker thread did not stop gracefully")
+        if any(thread.is_alive() for thread in self.worker_threads):
+            logger.warning("Synchronization manager worker threads did not stop gracefully")
         else:
             logger.info("Synchronization manager stopped")
     
+    def _reset_metrics(self) -> None:
+        """Reset the throughput metrics."""
+        with self._metrics_lock:
+            self._metrics = {
+                "synced": 0,
+                "failed": 0,
+                "pulled": 0,
+                "batches": 0,
+                "remote_calls": {"jira": 0, "confluence": 0}
+            }
+            self._metrics_started = time.monotonic()
+    
+    def _record_metric(self, name: str, count: int = 1) -> None:
+        """Add to a throughput counter.
+        
+        Args:
+            name: Counter name
+            count: Amount to add"""
+        with self._metrics_lock:
+            self._metrics[name] += count
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get throughput metrics since the manager was started.
+        
+        Returns:
+            Dictionary of counters, queue state and entities per second"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            metrics["remote_calls"] = dict(self._metrics["remote_calls"])
+            elapsed = time.monotonic() - self._metrics_started
+        
+        with self._claimed_lock:
+            in_progress = len(self._claimed)
+        
+        processed = metrics["synced"] + metrics["failed"] + metrics["pulled"]
+        metrics.update({
+            "workers": sum(1 for thread in self.worker_threads if thread.is_alive()),
+            "queue_size": self.sync_queue.qsize(),
+            "in_progress": in_progress,
+            "elapsed_seconds": elapsed,
+            "entities_per_second": processed / elapsed if elapsed > 0 else 0.0
+        })
+        return metrics
+    
+    def _remote_concurrency(self, remote: str) -> int:
+        """Get the maximum number of concurrent requests to a remote system.
+        
+        Args:
+            remote: Remote system name (jira or confluence)
+            
+        Returns:
+            The configured limit, or 4 if the remote is not configured"""
+        remote_config = self.config.jira if remote == "jira" else self.config.confluence
+        return max(1, remote_config.max_concurrency) if remote_config else 4
+    
+    @contextmanager
+    def _remote_slot(self, remote: str):
+        """Hold one of the concurrent request slots of a remote system.
+        
+        Args:
+            remote: Remote system name (jira or confluence)"""
+        with self.remote_limits[remote]:
+            with self._metrics_lock:
+                self._metrics["remote_calls"][remote] += 1
+            yield
+    
+    def recover_interrupted_entities(self) -> int:
+        """Return entities left IN_PROGRESS by an interrupted run to PENDING.
+        
+        Entities that are IN_PROGRESS are skipped when queued, so entities left in
+        that state by a crash would otherwise never be synchronized again.
+        
+        Returns:
+            Number of entities reset"""
+        with self._claimed_lock:
+            entities = [
+                entity for entity in self.db.get_entities_by_status(SyncStatus.IN_PROGRESS)
+                if entity.id not in self._claimed
+            ]
+        
+        for entity in entities:
+            entity.sync_status = SyncStatus.PENDING
+        count = self.db.save_entities(entities)
+        
+        if count:
+            logger.info(f"Reset {count} interrupted entities to PENDING")
+        return count
+    
     def queue_entity_for_sync(
         self, 
         entity: SyncEntity, 
@@ -872,13 +1181,12 @@ class SynchronizationManager:
         
         Returns:
             Number of entities queued"""
-        entities = self.db.get_entities_by_status(SyncStatus.PENDING)
-        count = 0
+        entity_ids = self.db.get_entity_ids_by_status(SyncStatus.PENDING)
         
-        for entity in entities:
-            self.sync_queue.put((1, entity.id))
-            count += 1
+        for entity_id in entity_ids:
+            self.sync_queue.put((1, entity_id))
         
+        count = len(entity_ids)
         logger.info(f"Queued {count} pending entities for synchronization")
         return count
     
@@ -891,76 +1199,431 @@ class SynchronizationManager:
             
         Returns:
             Number of entities queued"""
-        entities = self.db.get_entities_by_type(entity_type)
-        count = 0
+        entities = [
+            entity for entity in self.db.get_entities_by_type(entity_type)
+            if entity.sync_status != SyncStatus.IN_PROGRESS
+        ]
         
         for entity in entities:
-            if entity.sync_status != SyncStatus.IN_PROGRESS:
-                entity.sync_status = SyncStatus.PENDING
-                self.db.save_entity(entity)
-                self.sync_queue.put((priority, entity.id))
-                count += 1
+            entity.sync_status = SyncStatus.PENDING
+        self.db.save_entities(entities)
         
+        for entity in entities:
+            self.sync_queue.put((priority, entity.id))
+        
+        count = len(entities)
         logger.info(f"Queued {count} entities of type {entity_type.value} for synchronization")
         return count
     
-    def _worker_loop(self) -> None:
-        """Worker loop for processing the synchronization queue."""
-        logger.info("Synchronization worker thread started")
+    def _next_batch(self) -> List[str]:
+        """Take the next batch of entity IDs from the queue.
         
-        while not self.stop_event.is_set():
+        Waits up to one second for the first entity, then takes whatever else is
+        already queued, up to the configured batch size and an even share of the
+        queue per worker so that the other workers are kept busy.
+        
+        Returns:
+            List of entity IDs, empty if the queue stayed empty"""
+        try:
+            _, entity_id = self.sync_queue.get(timeout=1)
+        except Empty:
+            return []
+        
+        fair_share = -(-(self.sync_queue.qsize() + 1) // self.num_workers)
+        limit = min(self.batch_size, fair_share)
+        
+        entity_ids = [entity_id]
+        while len(entity_ids) < limit:
             try:
-                # Get next entity from queue with 1-second timeout
-                try:
-                    priority, entity_id = self.sync_queue.get(timeout=1)
-                except Queue.Empty:
-                    continue
-                
-                # Get entity from database
-                entity = self.db.get_entity(entity_id)
-                if not entity:
-                    logger.warning(f"Entity {entity_id} not found in database")
-                    self.sync_queue.task_done()
-                    continue
-                
-                # Skip if entity is already being processed
-                if entity.sync_status == SyncStatus.IN_PROGRESS:
-                    logger.warning(f"Entity {entity_id} is already being processed")
-                    self.sync_queue.task_done()
-                    continue
-                
-                # Update entity status
-                entity.sync_status = SyncStatus.IN_PROGRESS
-                self.db.save_entity(entity)
+                _, entity_id = self.sync_queue.get_nowait()
+            except Empty:
+                break
+            entity_ids.append(entity_id)
+        
+        return entity_ids
+    
+    def _claim(self, entity_id: str) -> bool:
+        """Claim an entity for the current worker.
+        
+        Args:
+            entity_id: The entity ID
+            
+        Returns:
+            True if the entity was claimed, False if another worker holds it"""
+        with self._claimed_lock:
+            if entity_id in self._claimed:
+                return False
+            self._claimed.add(entity_id)
+            return True
+    
+    def _release(self, entity_ids: List[str]) -> None:
+        """Release entities claimed by the current worker.
+        
+        Args:
+            entity_ids: IDs of the claimed entities"""
+        with self._claimed_lock:
+            self._claimed.difference_update(entity_ids)
+    
+    def _remote_for(self, entity_type: EntityType) -> str:
+        """Get the remote system an entity type is synchronized with.
+        
+        Args:
+            entity_type: The entity type
+            
+        Returns:
+            Remote system name (jira or confluence)"""
+        return "jira" if entity_type.value.startswith("jira_") else "confluence"
+    
+    def _process_batch(self, entity_ids: List[str]) -> None:
+        """Synchronize a batch of entities.
+        
+        Entities are loaded in one query and marked IN_PROGRESS in one
+        transaction. Their results are saved in chunks of result_chunk_size as
+        they complete, so an interrupted batch loses little work, and entities
+        that were not reached are returned to PENDING. Jira issues pulled from
+        Jira are fetched together with a single JQL search.
+        
+        Args:
+            entity_ids: IDs of the entities to synchronize"""
+        entities = self.db.get_entities(entity_ids)
+        
+        batch = []
+        for entity_id in dict.fromkeys(entity_ids):
+            entity = entities.get(entity_id)
+            if not entity:
+                logger.warning(f"Entity {entity_id} not found in database")
+                continue
+            
+            # Skip if entity is already being processed
+            if entity.sync_status == SyncStatus.IN_PROGRESS or not self._claim(entity_id):
+                logger.warning(f"Entity {entity_id} is already being processed")
+                continue
+            
+            entity.sync_status = SyncStatus.IN_PROGRESS
+            batch.append(entity)
+        
+        processed = []
+        try:
+            self.db.save_entities(batch)
+            
+            bulk_issues = [entity for entity in batch if self._is_bulk_issue_pull(entity)]
+            errors = self._pull_jira_issues(bulk_issues)
+            
+            for entity in batch:
+                if entity.id in errors:
+                    error = errors[entity.id]
+                else:
+                    error = None
+                    try:
+                        logger.info(f"Processing entity {entity.id} of type {entity.entity_type.value}")
+                        with self._remote_slot(self._remote_for(entity.entity_type)):
+                            self._synchronize_entity(entity)
+                    except Exception as e:
+                        error = str(e)
                 
-                # Process entity
-                try:
-                    logger.info(f"Processing entity {entity_id} of type {entity.entity_type.value}")
-                    self._synchronize_entity(entity)
-                    
-                    # Update entity status
+                if error is None:
                     entity.sync_status = SyncStatus.COMPLETED
-                    entity.last_sync_time = datetime.now()
                     entity.sync_error = None
-                    self.db.save_entity(entity)
-                    
-                    logger.info(f"Successfully synchronized entity {entity_id}")
-                    
-                except Exception as e:
-                    logger.error(f"Error synchronizing entity {entity_id}: {str(e)}")
-                    
-                    # Update entity status
+                    logger.info(f"Successfully synchronized entity {entity.id}")
+                else:
+                    logger.error(f"Error synchronizing entity {entity.id}: {error}")
                     entity.sync_status = SyncStatus.FAILED
-                    entity.last_sync_time = datetime.now()
-                    entity.sync_error = str(e)
-                    self.db.save_entity(entity)
+                    entity.sync_error = error
                 
-                # Mark task as done
-                self.sync_queue.task_done()
+                entity.last_sync_time = datetime.now()
+                processed.append(entity)
                 
+                if len(processed) >= self.result_chunk_size:
+                    self._save_results(processed)
+                    processed = []
+            
+            self._record_metric("batches")
+        finally:
+            try:
+                # Entities not reached by an interrupted batch are synchronized again later
+                unprocessed = [entity for entity in batch if entity.sync_status == SyncStatus.IN_PROGRESS]
+                for entity in unprocessed:
+                    entity.sync_status = SyncStatus.PENDING
+                self._save_results(processed + unprocessed)
+            finally:
+                self._release([entity.id for entity in batch])
+    
+    def _save_results(self, entities: List[SyncEntity]) -> None:
+        """Save synchronization results and count them in the throughput metrics.
+        
+        Args:
+            entities: Entities whose synchronization finished or was abandoned"""
+        self.db.save_entities(entities)
+        
+        failed = sum(1 for entity in entities if entity.sync_status == SyncStatus.FAILED)
+        synced = sum(1 for entity in entities if entity.sync_status == SyncStatus.COMPLETED)
+        self._record_metric("synced", synced)
+        self._record_metric("failed", failed)
+    
+    def _search_page_size(self) -> int:
+        """Get the number of Jira issues to request per search page."""
+        return self.config.jira.search_page_size if self.config.jira else 100
+    
+    def _is_bulk_issue_pull(self, entity: SyncEntity) -> bool:
+        """Check whether an entity is a Jira issue that is pulled from Jira.
+        
+        Args:
+            entity: The entity
+            
+        Returns:
+            True if the entity can be fetched with a bulk JQL search"""
+        if entity.entity_type != EntityType.JIRA_ISSUE or not self.jira_client:
+            return False
+        if not (entity.key or entity.external_id):
+            return False
+        if entity.sync_direction == SyncDirection.FROM_EXTERNAL:
+            return True
+        # Mirrors _synchronize_entity, which pulls bidirectional entities known externally
+        return entity.sync_direction == SyncDirection.BIDIRECTIONAL and bool(entity.external_id)
+    
+    def _pull_jira_issues(self, entities: List[JiraIssue]) -> Dict[str, Optional[str]]:
+        """Pull several Jira issues from Jira with one JQL search.
+        
+        If the search fails, for example because JQL rejects an unknown key,
+        the issues are left to be synchronized one at a time.
+        
+        Args:
+            entities: Jira issue entities with a key or external ID
+            
+        Returns:
+            Dictionary mapping the IDs of handled entities to their error, or None on success"""
+        if not entities:
+            return {}
+        
+        keys = [entity.key or entity.external_id for entity in entities]
+        try:
+            with self._remote_slot("jira"):
+                responses = self.jira_client.get_issues_by_keys(keys, self._search_page_size())
+        except Exception as e:
+            logger.warning(f"Bulk fetch of {len(keys)} Jira issues failed, syncing individually: {str(e)}")
+            return {}
+        
+        found = {}
+        for response in responses:
+            found[response.get("key")] = response
+            found[response.get("id")] = response
+        
+        errors = {}
+        for entity, key in zip(entities, keys):
+            response = found.get(key)
+            if response is None:
+                errors[entity.id] = f"Jira issue {key} not found"
+                continue
+            
+            try:
+                self._apply_jira_issue(entity, self.jira_client.convert_from_jira_issue(response))
+                errors[entity.id] = None
+            except Exception as e:
+                errors[entity.id] = str(e)
+        
+        return errors
+    
+    def sync_jira_project_issues(self, project_key: str, full: bool = False) -> int:
+        """Pull the issues of a Jira project that changed since the last pull.
+        
+        Issues are fetched in JQL search pages ordered by their "updated" time
+        and saved one page per transaction. Pages are read by keyset: each page
+        starts at the "updated" minute of the last issue read, so issues that
+        change during the pull move later in the order instead of shifting the
+        pages and being skipped. The latest "updated" time is kept as a
+        watermark so the next pull only fetches issues changed since then.
+        While the manager is running, the projects of all Jira project entities
+        are pulled every sync_interval_minutes.
+        
+        Args:
+            project_key: The project key
+            full: Whether to ignore the watermark and pull every issue
+            
+        Returns:
+            Number of issues pulled
+            
+        Raises:
+            SyncError: If the Jira client is not available"""
+        if not self.jira_client:
+            raise SyncError("Jira client is not available")
+        
+        scope = f"jira_issues:{project_key}"
+        cursor = None if full else self.db.get_watermark(scope)
+        page_size = self._search_page_size()
+        
+        count = 0
+        latest = None
+        # Earliest cursor paged by offset; issues after it may have been skipped
+        unsafe_cursor = None
+        # Versions of issues already saved by this pull
+        seen = set()
+        start_at = 0
+        
+        while True:
+            jql = f'project = "{project_key}"'
+            if cursor:
+                jql += f' AND updated >= "{cursor}"'
+            jql += ' ORDER BY updated ASC, id ASC'
+            
+            with self._remote_slot("jira"):
+                page = self.jira_client.search_issues(jql, start_at, page_size)
+            issues = page.get("issues", [])
+            
+            # Issues of the cursor minute are read again by the next page
+            new_issues = []
+            for issue in issues:
+                version = (issue.get("id"), issue.get("fields", {}).get("updated"))
+                if version not in seen:
+                    seen.add(version)
+                    new_issues.append(issue)
+            
+            page_count, page_latest = self._store_pulled_jira_issues(new_issues)
+            count += page_count
+            if page_latest and (not latest or page_latest > latest):
+                latest = page_latest
+            
+            if not issues or start_at + len(issues) >= page.get("total", 0):
+                break
+            
+            next_cursor = self._format_jql_watermark(page_latest) if page_latest else cursor
+            if cursor and next_cursor <= cursor:
+                # The whole page shares the cursor minute, so continue by offset
+                start_at += len(issues)
+                if not unsafe_cursor:
+                    unsafe_cursor = cursor
+            else:
+                cursor = next_cursor
+                start_at = 0
+        
+        # JQL compares "updated" at minute precision in the Jira user's timezone, so
+        # the next pull re-reads issues updated in the same minute; they are saved
+        # idempotently
+        if latest:
+            watermark = self._format_jql_watermark(latest)
+            if unsafe_cursor and unsafe_cursor < watermark:
+                watermark = unsafe_cursor
+            self.db.set_watermark(scope, watermark)
+        
+        logger.info(f"Pulled {count} issues of Jira project {project_key}")
+        return count
+    
+    def _get_jira_timezone(self):
+        """Get the timezone Jira reads JQL dates in.
+        
+        JQL dates are interpreted in the timezone of the Jira user, which is read
+        once from the "myself" endpoint.
+        
+        Returns:
+            The user's timezone, or None if it is unknown"""
+        if not self._jira_timezone_resolved:
+            try:
+                with self._remote_slot("jira"):
+                    time_zone = self.jira_client.get_current_user().get("timeZone")
+                if time_zone and ZONEINFO_AVAILABLE:
+                    self._jira_timezone = ZoneInfo(time_zone)
+            except Exception as e:
+                logger.warning(f"Error getting the Jira user's timezone: {str(e)}")
+            
+            if self._jira_timezone is None:
+                logger.warning("Jira user's timezone is unknown, incremental pulls will re-read recent issues")
+            self._jira_timezone_resolved = True
+        
+        return self._jira_timezone
+    
+    def _format_jql_watermark(self, updated: datetime) -> str:
+        """Format an "updated" time as a JQL date in the Jira user's timezone.
+        
+        Args:
+            updated: The "updated" time, assumed to be UTC if it has no timezone
+            
+        Returns:
+            The JQL date at minute precision"""
+        if updated.tzinfo is None:
+            updated = updated.replace(tzinfo=timezone.utc)
+        
+        jira_timezone = self._get_jira_timezone()
+        if jira_timezone is None:
+            # Move back far enough to cover any timezone; re-read issues are saved idempotently
+            local_time = updated.astimezone(timezone.utc) - JQL_TIMEZONE_FALLBACK_OVERLAP
+        else:
+            local_time = updated.astimezone(jira_timezone)
+        
+        return local_time.strftime("%Y-%m-%d %H:%M")
+    
+    def _jira_pull_loop(self) -> None:
+        """Scheduler loop pulling the issues of known Jira projects incrementally."""
+        interval = max(1, self.config.jira.sync_interval_minutes) * 60
+        
+        while not self.stop_event.is_set():
+            project_keys = sorted({
+                project.key for project in self.db.get_entities_by_type(EntityType.JIRA_PROJECT)
+                if project.key
+            })
+            for project_key in project_keys:
+                if self.stop_event.is_set():
+                    break
+                try:
+                    self.sync_jira_project_issues(project_key)
+                except Exception as e:
+                    logger.error(f"Error pulling issues of Jira project {project_key}: {str(e)}")
+            
+            self.stop_event.wait(interval)
+    
+    def _store_pulled_jira_issues(self, issues: List[Dict[str, Any]]) -> Tuple[int, Optional[datetime]]:
+        """Save a page of issues pulled from Jira in one transaction.
+        
+        Args:
+            issues: Jira API issue data
+            
+        Returns:
+            Tuple of (number of issues saved, latest "updated" time of the page)"""
+        if not issues:
+            return 0, None
+        
+        pulled = [self.jira_client.convert_from_jira_issue(issue) for issue in issues]
+        existing = self.db.get_entities_by_external_ids(
+            EntityType.JIRA_ISSUE, [issue.external_id for issue in pulled]
+        )
+        
+        entities = []
+        latest = None
+        for updated_entity in pulled:
+            entity = existing.get(updated_entity.external_id)
+            if entity:
+                self._apply_jira_issue(entity, updated_entity)
+                entity.sync_status = SyncStatus.COMPLETED
+                entity.sync_error = None
+                entity.last_sync_time = updated_entity.last_sync_time
+            else:
+                entity = updated_entity
+                entity.sync_direction = SyncDirection.FROM_EXTERNAL
+            entities.append(entity)
+            
+            if updated_entity.updated and (not latest or updated_entity.updated > latest):
+                latest = updated_entity.updated
+        
+        self.db.save_entities(entities)
+        self._record_metric("pulled", len(entities))
+        return len(entities), latest
+    
+    def _worker_loop(self) -> None:
+        """Worker loop for processing the synchronization queue."""
+        logger.info("Synchronization worker thread started")
+        
+        while not self.stop_event.is_set():
+            entity_ids = self._next_batch()
+            if not entity_ids:
+                continue
+            
+            try:
+                self._process_batch(entity_ids)
             except Exception as e:
                 logger.error(f"Error in synchronization worker: {str(e)}")
                 # Continue processing
+            finally:
+                # Mark tasks as done
+                for _ in entity_ids:
+                    self.sync_queue.task_done()
         
         logger.info("Synchronization worker thread stopped")
     
@@ -1166,29 +1829,35 @@ class SynchronizationManager:
             
             # Update entity with data from Jira
             updated_entity = self.jira_client.convert_from_jira_issue(response)
-            
-            # Copy updated fields to entity
-            entity.key = updated_entity.key
-            entity.project_id = updated_entity.project_id
-            entity.summary = updated_entity.summary
-            entity.description = updated_entity.description
-            entity.issue_type = updated_entity.issue_type
-            entity.status = updated_entity.status
-            entity.priority = updated_entity.priority
-            entity.assignee = updated_entity.assignee
-            entity.reporter = updated_entity.reporter
-            entity.created = updated_entity.created
-            entity.updated = updated_entity.updated
-            entity.due_date = updated_entity.due_date
-            entity.resolution = updated_entity.resolution
-            entity.labels = updated_entity.labels
-            entity.components = updated_entity.components
-            entity.custom_fields = updated_entity.custom_fields
-            entity.external_id = updated_entity.external_id
-            entity.version = entity.version + 1
+            self._apply_jira_issue(entity, updated_entity)
         else:
             raise SyncError("Cannot sync Jira issue without external ID or key")
     
+    def _apply_jira_issue(self, entity: JiraIssue, updated_entity: JiraIssue) -> None:
+        """Copy the fields of an issue fetched from Jira to an entity.
+        
+        Args:
+            entity: The entity to update
+            updated_entity: The issue converted from Jira API data"""
+        entity.key = updated_entity.key
+        entity.project_id = updated_entity.project_id
+        entity.summary = updated_entity.summary
+        entity.description = updated_entity.description
+        entity.issue_type = updated_entity.issue_type
+        entity.status = updated_entity.status
+        entity.priority = updated_entity.priority
+        entity.assignee = updated_entity.assignee
+        entity.reporter = updated_entity.reporter
+        entity.created = updated_entity.created
+        entity.updated = updated_entity.updated
+        entity.due_date = updated_entity.due_date
+        entity.resolution = updated_entity.resolution
+        entity.labels = updated_entity.labels
+        entity.components = updated_entity.components
+        entity.custom_fields = updated_entity.custom_fields
+        entity.external_id = updated_entity.external_id
+        entity.version = entity.version + 1
+    
     # Additional sync methods would be implemented similarly
     
     def _sync_jira_comment_to_external(self, entity: JiraComment) -> None:
@@ -20,6 +20,8 @@ import random
 import math
 from concurrent.futures import ThreadPoolExecutor, Future
 
+from app.core.performance import PerformanceMetric
+
 
 class AgentRole(Enum):
     """Enum representing different agent roles in the system."""
@@ -61,6 +63,8 @@ class Agent:
     performance_metrics: Dict[str, float] = field(default_factory=dict)
     status: str = "available"
     last_heartbeat: float = field(default_factory=time.time)
+    # Called with the agent whenever its task load changes (set by LoadBalancer)
+    on_load_change: Optional[Callable[['Agent'], None]] = field(default=None, repr=False, compare=False)
     
     @property
     def is_available(self) -> bool:
@@ -97,6 +101,9 @@ class Agent:
         if len(self.current_tasks) >= self.max_concurrent_tasks:
             self.status = "busy"
         
+        if self.on_load_change:
+            self.on_load_change(self)
+        
         return True
     
     def remove_task(self, task_id: str) -> bool:
@@ -116,6 +123,9 @@ class Agent:
         if len(self.current_tasks) < self.max_concurrent_tasks:
             self.status = "available"
         
+        if self.on_load_change:
+            self.on_load_change(self)
+        
         return True
     
     def update_performance_metrics(self, task_type: str, execution_time: float, success: bool):
@@ -243,6 +253,12 @@ class LoadBalancer:
     
     This class provides functionality to distribute tasks among agents based on
     various load balancing strategies, ensuring optimal resource utilization.
+    
+    Agents are indexed by role and by capability, so candidate lookup only
+    touches agents that can take the task. Least-connections strategies keep
+    a per-role heap ordered by load that is updated whenever an agent's task
+    load changes. An agent's role and capabilities are indexed when it is
+    registered; re-register the agent after changing them.
     """
     
     def __init__(self, strategy: LoadBalancingStrategy = LoadBalancingStrategy.ADAPTIVE):
@@ -256,6 +272,19 @@ class LoadBalancer:
         self.agents: Dict[str, Agent] = {}
         self.agent_indices: Dict[AgentRole, int] = {}  # For round-robin strategy
         self.logger = logging.getLogger(__name__)
+        
+        # Agent IDs by role (in registration order) and by capability
+        self._role_index: Dict[AgentRole, Dict[str, Agent]] = {}
+        self._capability_index: Dict[str, set] = {}
+        self._capability_counts: Dict[str, int] = {}
+        self._registration_order: Dict[str, int] = {}
+        self._next_registration = 0
+        
+        # Per-role lazy-deletion heaps of (load, registration order, version, agent ID)
+        self._connection_heaps: Dict[AgentRole, List[Tuple[int, int, int, str]]] = {}
+        self._load_heaps: Dict[AgentRole, List[Tuple[float, int, int, str]]] = {}
+        self._load_versions: Dict[str, int] = {}
+        self._index_lock = threading.RLock()
     
     def register_agent(self, agent: Agent):
         """
@@ -264,7 +293,23 @@ class LoadBalancer:
         Args:
             agent: Agent to register
         """
-        self.agents[agent.id] = agent
+        with self._index_lock:
+            if agent.id in self.agents:
+                self._unindex_agent(self.agents[agent.id])
+            
+            self.agents[agent.id] = agent
+            self._registration_order[agent.id] = self._next_registration
+            self._next_registration += 1
+            
+            self._role_index.setdefault(agent.role, {})[agent.id] = agent
+            capabilities = set(agent.capabilities)
+            for capability in capabilities:
+                self._capability_index.setdefault(capability, set()).add(agent.id)
+            self._capability_counts[agent.id] = len(capabilities)
+            
+            agent.on_load_change = self._update_load
+            self._update_load(agent)
+        
         self.logger.info(f"Registered agent {agent.id} with role {agent.role}")
     
     def unregister_agent(self, agent_id: str):
@@ -274,9 +319,104 @@ class LoadBalancer:
         Args:
             agent_id: ID of the agent to unregister
         """
-        if agent_id in self.agents:
+        with self._index_lock:
+            if agent_id not in self.agents:
+                return
             agent = self.agents.pop(agent_id)
-            self.logger.info(f"Unregistered agent {agent_id} with role {agent.role}")
+            self._unindex_agent(agent)
+        
+        self.logger.info(f"Unregistered agent {agent_id} with role {agent.role}")
+    
+    def _unindex_agent(self, agent: Agent):
+        """
+        Remove an agent from the role and capability indexes.
+        
+        Heap entries are discarded lazily once the agent's version is gone.
+        
+        Args:
+            agent: Agent to remove
+        """
+        role_agents = self._role_index.get(agent.role)
+        if role_agents is not None:
+            role_agents.pop(agent.id, None)
+        
+        for capability in set(agent.capabilities):
+            agent_ids = self._capability_index.get(capability)
+            if agent_ids is not None:
+                agent_ids.discard(agent.id)
+                if not agent_ids:
+                    del self._capability_index[capability]
+        
+        self._capability_counts.pop(agent.id, None)
+        self._registration_order.pop(agent.id, None)
+        self._load_versions.pop(agent.id, None)
+        if agent.on_load_change == self._update_load:
+            agent.on_load_change = None
+    
+    def _update_load(self, agent: Agent):
+        """
+        Push an agent's current load onto its role heaps.
+        
+        Args:
+            agent: Agent whose load changed
+        """
+        with self._index_lock:
+            if self.agents.get(agent.id) is not agent:
+                return
+            
+            version = self._load_versions.get(agent.id, 0) + 1
+            self._load_versions[agent.id] = version
+            order = self._registration_order[agent.id]
+            
+            connection_heap = self._connection_heaps.setdefault(agent.role, [])
+            load_heap = self._load_heaps.setdefault(agent.role, [])
+            heapq.heappush(connection_heap, (len(agent.current_tasks), order, version, agent.id))
+            heapq.heappush(load_heap, (agent.load_percentage, order, version, agent.id))
+            
+            # Drop stale entries once they outnumber live ones
+            live = len(self._role_index.get(agent.role, ()))
+            for heap in (connection_heap, load_heap):
+                if len(heap) > 2 * live + 16:
+                    heap[:] = [entry for entry in heap if self._load_versions.get(entry[3]) == entry[2]]
+                    heapq.heapify(heap)
+    
+    def _candidate_agents(self, role: Optional[AgentRole], capabilities: Optional[List[str]]) -> List[Agent]:
+        """
+        Look up agents matching a role and capabilities, in registration order.
+        
+        Args:
+            role: Role to filter by (None for any role)
+            capabilities: Capabilities to filter by (None for any)
+            
+        Returns:
+            Matching agents, regardless of availability
+        """
+        with self._index_lock:
+            if not capabilities:
+                if role is None:
+                    return list(self.agents.values())
+                return list(self._role_index.get(role, {}).values())
+            
+            # Intersect capability sets, smallest first
+            capability_sets = []
+            for capability in set(capabilities):
+                agent_ids = self._capability_index.get(capability)
+                if not agent_ids:
+                    return []
+                capability_sets.append(agent_ids)
+            capability_sets.sort(key=len)
+            
+            agent_ids = set(capability_sets[0])
+            for other in capability_sets[1:]:
+                agent_ids &= other
+                if not agent_ids:
+                    return []
+            
+            candidates = [self.agents[agent_id] for agent_id in agent_ids]
+            if role is not None:
+                candidates = [agent for agent in candidates if agent.role == role]
+            candidates.sort(key=lambda agent: self._registration_order[agent.id])
+            return candidates
     
     def get_available_agents(self, role: AgentRole = None, capabilities: List[str] = None) -> List[Agent]:
         """
@@ -289,14 +429,43 @@ class LoadBalancer:
         Returns:
             List of available agents
         """
-        available_agents = [
-            agent for agent in self.agents.values() 
-            if agent.is_available and 
-               (role is None or agent.role == role) and
-               (capabilities is None or all(cap in agent.capabilities for cap in capabilities))
-        ]
+        return [agent for agent in self._candidate_agents(role, capabilities) if agent.is_available]
+    
+    def _select_least_loaded(self, task: Task, weighted: bool) -> Optional[Agent]:
+        """
+        Select the least-loaded available agent for a task using the role heaps.
+        
+        Args:
+            task: Task to assign
+            weighted: Order by load percentage instead of number of tasks
+            
+        Returns:
+            Selected agent, or None if no suitable agent is available
+        """
+        required = set(task.required_capabilities or [])
         
-        return available_agents
+        with self._index_lock:
+            heaps = self._load_heaps if weighted else self._connection_heaps
+            heap = heaps.get(task.required_role, [])
+            skipped = []
+            selected = None
+            
+            while heap:
+                entry = heapq.heappop(heap)
+                if self._load_versions.get(entry[3]) != entry[2]:
+                    # Stale entry
+                    continue
+                
+                skipped.append(entry)
+                agent = self.agents[entry[3]]
+                if agent.is_available and required.issubset(agent.capabilities):
+                    selected = agent
+                    break
+            
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+            
+            return selected
     
     def select_agent_for_task(self, task: Task) -> Optional[Agent]:
         """
@@ -308,6 +477,16 @@ class LoadBalancer:
         Returns:
             Selected agent, or None if no suitable agent is available
         """
+        if self.strategy in (LoadBalancingStrategy.LEAST_CONNECTIONS,
+                             LoadBalancingStrategy.WEIGHTED_LEAST_CONNECTIONS):
+            selected_agent = self._select_least_loaded(
+                task,
+                weighted=self.strategy == LoadBalancingStrategy.WEIGHTED_LEAST_CONNECTIONS
+            )
+            if selected_agent is None:
+                self.logger.warning(f"No available agents for task {task.id} with role {task.required_role}")
+            return selected_agent
+        
         available_agents = self.get_available_agents(
             role=task.required_role,
             capabilities=task.required_capabilities
@@ -320,15 +499,9 @@ class LoadBalancer:
         if self.strategy == LoadBalancingStrategy.ROUND_ROBIN:
             return self._select_agent_round_robin(available_agents, task.required_role)
         
-        elif self.strategy == LoadBalancingStrategy.LEAST_CONNECTIONS:
-            return self._select_agent_least_connections(available_agents)
-        
         elif self.strategy == LoadBalancingStrategy.WEIGHTED_ROUND_ROBIN:
             return self._select_agent_weighted_round_robin(available_agents, task.required_role)
         
-        elif self.strategy == LoadBalancingStrategy.WEIGHTED_LEAST_CONNECTIONS:
-            return self._select_agent_weighted_least_connections(available_agents)
-        
         elif self.strategy == LoadBalancingStrategy.PERFORMANCE_BASED:
             return self._select_agent_performance_based(available_agents, task.type)
         
@@ -460,16 +633,35 @@ class LoadBalancer:
         Returns:
             Selected agent
         """
+        required_count = len(set(required_capabilities or []))
+        
         # Calculate capability match score for each agent
         def capability_match_score(agent: Agent) -> float:
             # Count how many capabilities the agent has beyond the required ones
-            extra_capabilities = len(set(agent.capabilities) - set(required_capabilities))
+            # (candidates have all required capabilities)
+            extra_capabilities = self._extra_capability_count(agent, required_count)
             # Prefer agents with more specialized capabilities
             return extra_capabilities
         
         # Select agent with best capability match
         return max(available_agents, key=capability_match_score)
     
+    def _extra_capability_count(self, agent: Agent, required_count: int) -> int:
+        """
+        Count an agent's capabilities beyond those required by a task.
+        
+        Args:
+            agent: Agent that has all required capabilities
+            required_count: Number of distinct required capabilities
+            
+        Returns:
+            Number of extra capabilities
+        """
+        capability_count = self._capability_counts.get(agent.id)
+        if capability_count is None:
+            capability_count = len(set(agent.capabilities))
+        return capability_count - required_count
+    
     def _select_agent_adaptive(self, available_agents: List[Agent], task: Task) -> Agent:
         """
         Select an agent using an adaptive strategy that considers multiple factors.
@@ -481,6 +673,8 @@ class LoadBalancer:
         Returns:
             Selected agent
         """
+        required_count = len(set(task.required_capabilities or []))
+        
         # Calculate adaptive score for each agent
         def adaptive_score(agent: Agent) -> float:
             # Start with base score
@@ -497,7 +691,7 @@ class LoadBalancer:
                 score += perf_factor * 0.4  # 40% weight
             
             # Factor 3: Capability match (higher is better)
-            extra_capabilities = len(set(agent.capabilities) - set(task.required_capabilities))
+            extra_capabilities = self._extra_capability_count(agent, required_count)
             cap_factor = min(extra_capabilities / 5.0, 1.0)  # Normalize to [0, 1]
             score += cap_factor * 0.2  # 20% weight
             
@@ -648,13 +842,20 @@ class LoadBalancingSystem:
     """
     
     def __init__(self, strategy: LoadBalancingStrategy = LoadBalancingStrategy.ADAPTIVE,
-               max_workers: int = 10):
+               max_workers: int = 10, idle_timeout: float = 1.0):
         """
         Initialize the load balancing system.
         
+        The scheduler sleeps until a task is submitted, a task finishes or an
+        agent is registered, then dispatches as many queued tasks as there is
+        agent capacity for.
+        
         Args:
             strategy: Load balancing strategy to use
             max_workers: Maximum number of worker threads
+            idle_timeout: Maximum time in seconds the scheduler sleeps without
+                being woken, so agents whose availability changes without an
+                event (e.g. a heartbeat) are picked up
         """
         self.load_balancer = LoadBalancer(strategy)
         self.task_queues: Dict[AgentRole, TaskQueue] = {role: TaskQueue() for role in AgentRole}
@@ -663,7 +864,16 @@ class LoadBalancingSystem:
         self.running = False
         self.scheduler_thread = None
         self.lock = threading.Lock()
+        self.idle_timeout = idle_timeout
         self.logger = logging.getLogger(__name__)
+        
+        # Scheduler wake-up signal and dispatch metrics
+        self._wakeup = threading.Event()
+        self._submitted_at: Dict[str, float] = {}
+        self._dispatch_latency = PerformanceMetric("dispatch_latency", "load_balancing")
+        self._max_queue_depth: Dict[AgentRole, int] = {role: 0 for role in AgentRole}
+        self._dispatched_count = 0
+        self._wakeup_count = 0
     
     def register_agent(self, agent: Agent):
         """
@@ -673,6 +883,7 @@ class LoadBalancingSystem:
             agent: Agent to register
         """
         self.load_balancer.register_agent(agent)
+        self.notify()
     
     def unregister_agent(self, agent_id: str):
         """
@@ -694,11 +905,53 @@ class LoadBalancingSystem:
             ID of the submitted task
         """
         # Add task to the appropriate queue
-        self.task_queues[task.required_role].push(task)
+        task_queue = self.task_queues[task.required_role]
+        with self.lock:
+            self._submitted_at[task.id] = time.time()
+        task_queue.push(task)
+        
+        depth = task_queue.size()
+        if depth > self._max_queue_depth[task.required_role]:
+            self._max_queue_depth[task.required_role] = depth
+        
         self.logger.info(f"Submitted task {task.id} with priority {task.priority}")
         
+        # Wake the scheduler
+        self.notify()
+        
         return task.id
     
+    def notify(self):
+        """
+        Wake the scheduler to dispatch queued tasks.
+        
+        Call this after changing agent state outside the load balancing system,
+        e.g. after raising an agent's capacity or marking it available again.
+        """
+        self._wakeup.set()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get scheduler metrics.
+        
+        Returns:
+            Dictionary with dispatch latency statistics (time from submission
+            to assignment, in seconds), current and maximum queue depth per
+            role, the number of dispatched tasks and the number of wake-ups
+        """
+        with self.lock:
+            dispatch_latency = self._dispatch_latency.get_stats()
+            dispatched_count = self._dispatched_count
+            wakeup_count = self._wakeup_count
+        
+        return {
+            "dispatch_latency": dispatch_latency,
+            "queue_depth": {role.value: task_queue.size() for role, task_queue in self.task_queues.items()},
+            "max_queue_depth": {role.value: depth for role, depth in self._max_queue_depth.items()},
+            "dispatched_count": dispatched_count,
+            "wakeup_count": wakeup_count
+        }
+    
     def get_task_status(self, task_id: str) -> Optional[TaskStatus]:
         """
         Get the status of a task.
@@ -782,6 +1035,8 @@ class LoadBalancingSystem:
         # Check all queues for the task
         for queue in self.task_queues.values():
             if queue.remove(task_id):
+                with self.lock:
+                    self._submitted_at.pop(task_id, None)
                 self.logger.info(f"Cancelled task {task_id} (removed from queue)")
                 return True
         
@@ -810,6 +1065,7 @@ class LoadBalancingSystem:
                 return
             
             self.running = True
+            self._wakeup.set()
             self.scheduler_thread = threading.Thread(target=self._scheduler_loop)
             self.scheduler_thread.daemon = True
             self.scheduler_thread.start()
@@ -823,11 +1079,15 @@ class LoadBalancingSystem:
                 return
             
             self.running = False
-            
-            # Wait for scheduler thread to terminate
-            if self.scheduler_thread:
-                self.scheduler_thread.join(timeout=5.0)
-            
+            scheduler_thread = self.scheduler_thread
+        
+        # Wake the scheduler so it notices the shutdown, and wait for it
+        # without holding the lock it needs to record assignments
+        self._wakeup.set()
+        if scheduler_thread:
+            scheduler_thread.join(timeout=5.0)
+        
+        with self.lock:
             # Cancel all running tasks
             for future in self.futures.values():
                 future.cancel()
@@ -840,53 +1100,103 @@ class LoadBalancingSystem:
     def _scheduler_loop(self):
         """Main scheduler loop."""
         while self.running:
-            try:
-                # Process each role's task queue
-                for role, queue in self.task_queues.items():
-                    if queue.is_empty():
-                        continue
-                    
-                    # Get the highest-priority task
-                    task = queue.peek()
-                    if not task:
-                        continue
-                    
-                    # Check if the task is ready to be executed
-                    if not task.is_ready:
-                        continue
-                    
-                    # Try to assign the task to an agent
-                    agent = self.load_balancer.select_agent_for_task(task)
-                    if not agent:
-                        # No available agent, try again later
-                        continue
-                    
-                    # Remove the task from the queue
-                    queue.pop()
-                    
-                    # Assign the task to the agent
-                    if not agent.add_task(task.id):
-                        # Agent couldn't accept the task, put it back in the queue
-                        queue.push(task)
-                        continue
-                    
-                    # Mark the task as assigned
-                    task.status = TaskStatus.ASSIGNED
-                    task.assigned_agent_id = agent.id
-                    
-                    # Submit the task for execution
-                    future = self.executor.submit(self._execute_task, task, agent)
-                    
-                    with self.lock:
-                        self.futures[task.id] = future
-                    
-                    self.logger.info(f"Assigned task {task.id} to agent {agent.id}")
+            # Sleep until there is something to do
+            self._wakeup.wait(self.idle_timeout)
             
+            # Clear before dispatching so events raised meanwhile are not lost
+            self._wakeup.clear()
+            if not self.running:
+                break
+            
+            with self.lock:
+                self._wakeup_count += 1
+            
+            try:
+                self._dispatch_pending()
             except Exception as e:
                 self.logger.error(f"Error in scheduler loop: {e}")
-            
-            # Sleep for a short time to avoid busy-waiting
-            time.sleep(0.1)
+    
+    def _dispatch_pending(self) -> int:
+        """
+        Dispatch queued tasks until the queues are empty or agents are at capacity.
+        
+        Returns:
+            Number of tasks dispatched
+        """
+        dispatched = 0
+        
+        # Process each role's task queue
+        for role, task_queue in self.task_queues.items():
+            while self.running:
+                # Get the highest-priority task
+                task = task_queue.peek()
+                if not task:
+                    break
+                
+                # Check if the task is ready to be executed
+                if not task.is_ready:
+                    break
+                
+                # Try to assign the task to an agent
+                agent = self.load_balancer.select_agent_for_task(task)
+                if not agent:
+                    # No capacity for this role until an agent frees up
+                    break
+                
+                # Remove the task from the queue
+                task_queue.pop()
+                
+                # Assign the task to the agent
+                if not agent.add_task(task.id):
+                    # Agent couldn't accept the task, put it back in the queue
+                    task_queue.push(task)
+                    break
+                
+                self._dispatch(task, agent)
+                dispatched += 1
+        
+        return dispatched
+    
+    def _dispatch(self, task: Task, agent: Agent):
+        """
+        Submit an assigned task for execution.
+        
+        Args:
+            task: Task to execute
+            agent: Agent the task was assigned to
+        """
+        # Mark the task as assigned
+        task.status = TaskStatus.ASSIGNED
+        task.assigned_agent_id = agent.id
+        
+        # Submit the task for execution
+        future = self.executor.submit(self._execute_task, task, agent)
+        
+        with self.lock:
+            self.futures[task.id] = future
+            submitted_at = self._submitted_at.pop(task.id, None)
+            if submitted_at is not None:
+                self._dispatch_latency.record_call(time.time() - submitted_at)
+            self._dispatched_count += 1
+        
+        future.add_done_callback(lambda done: self._on_task_done(task.id, done))
+        
+        self.logger.info(f"Assigned task {task.id} to agent {agent.id}")
+    
+    def _on_task_done(self, task_id: str, future: Future):
+        """
+        Clean up after a task finishes and wake the scheduler.
+        
+        Args:
+            task_id: ID of the finished task
+            future: Future of the finished task
+        """
+        with self.lock:
+            if self.futures.get(task_id) is future:
+                self.futures.pop(task_id)
+        
+        # Freed agent capacity may allow further dispatches
+        self._wakeup.set()
     
     def _execute_task(self, task: Task, agent: Agent) -> Any:
         """
@@ -8,6 +8,7 @@ from typing import Dict, List, Any, Optional, Union, Tuple
 import logging
 
 from app.models.providers.grok3_provider import Grok3Provider
+from app.models.providers.response_cache import ResponseCache, CachedProvider
 from app.models.providers.auth_utils import get_grok3_api_key, get_grok3_api_base
 
 # Set up logging
@@ -28,7 +29,9 @@ class Grok3Adapter:
         default_model: str = "grok-3",
         max_retries: int = 3,
         timeout: int = 60,
-        secure_mode: bool = True
+        secure_mode: bool = True,
+        provider: Optional[Any] = None,
+        response_cache: Optional[ResponseCache] = None
     ):
         """
         Initialize the Grok3Adapter.
@@ -40,14 +43,22 @@ class Grok3Adapter:
             max_retries: Maximum number of retries for failed requests.
             timeout: Timeout in seconds for API requests.
             secure_mode: Whether to enable secure mode for API requests.
+            provider: Optional provider to use instead of a Grok3Provider
+                    (e.g. a StubProvider for offline use).
+            response_cache: Optional response cache. If provided, identical
+                    concurrent requests are deduplicated and deterministic
+                    completions and embeddings are cached.
         """
-        self.provider = Grok3Provider(
+        self.provider = provider or Grok3Provider(
             api_key=api_key,
             api_base=api_base,
             max_retries=max_retries,
             timeout=timeout,
             secure_mode=secure_mode
         )
+        if response_cache is not None:
+            self.provider = CachedProvider(self.provider, response_cache)
+        self.response_cache = response_cache
         self.default_model = default_model
         
         logger.info(f"Initialized Grok3Adapter with default model: {default_model}")
@@ -172,3 +183,14 @@ class Grok3Adapter:
             List of available models with their details.
         """
         return self.provider.list_models()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache statistics.
+        
+        Returns:
+            Cache statistics, or an empty dictionary if no response cache is used.
+        """
+        if self.response_cache is None:
+            return {}
+        return self.response_cache.get_stats()
@@ -6,5 +6,14 @@ This module contains the provider classes for interacting with the Grok 3 API.
 
 from .grok3_provider import Grok3Provider
 from .auth_utils import set_grok3_api_key, get_grok3_api_key
+from .response_cache import ResponseCache, CachedProvider
+from .stub_provider import StubProvider
 
-__all__ = ["Grok3Provider", "set_grok3_api_key", "get_grok3_api_key"]
+__all__ = [
+    "Grok3Provider",
+    "set_grok3_api_key",
+    "get_grok3_api_key",
+    "ResponseCache",
+    "CachedProvider",
+    "StubProvider"
+]
@@ -23,6 +23,27 @@ _api_key = None
 _api_base = None
 
 
+class APIKeyNotFoundError(Exception):
+    """Exception raised when a provider API key is not configured."""
+    pass
+
+
+def get_api_key(env_var: str) -> Optional[str]:
+    """
+    Get a provider API key from the environment.
+    
+    Args:
+        env_var: Name of the environment variable holding the API key.
+    
+    Returns:
+        The API key if set, otherwise None.
+    """
+    api_key = os.environ.get(env_var)
+    if not api_key:
+        logger.warning(f"API key not found in environment variable {env_var}")
+    return api_key
+
+
 def set_grok3_api_key(api_key: str) -> None:
     """
     Set the Grok 3 API key for authentication.
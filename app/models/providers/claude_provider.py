@@ -10,19 +10,21 @@ Features:
 - High-quality text generation with nuanced understanding
 - Secure API key management
 - Robust error handling with retries
+- Pooled keep-alive connections, rate limiting and async variants
 """
 
 import os
-import time
 import json
 import logging
-import requests
 from typing import Dict, List, Optional, Union, Any, Callable
 from dataclasses import dataclass
 from enum import Enum
 
+from app.core.tokenizer import get_tokenizer
+
 # Import auth utilities
 from .auth_utils import get_api_key, APIKeyNotFoundError
+from .http_client import ProviderHTTPClient, HTTPResponse, get_http_client
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -80,7 +82,8 @@ class ClaudeProvider:
                  model: ClaudeModel = ClaudeModel.CLAUDE_3_OPUS,
                  max_retries: int = 3,
                  retry_delay: float = 1.0,
-                 base_url: str = "https://api.anthropic.com/v1"):
+                 base_url: str = "https://api.anthropic.com/v1",
+                 http_client: Optional[ProviderHTTPClient] = None):
         """
         Initialize the Claude provider.
         
@@ -90,6 +93,8 @@ class ClaudeProvider:
             max_retries: Maximum number of retries for API calls
             retry_delay: Initial delay between retries (in seconds)
             base_url: Base URL for the Anthropic API
+            http_client: HTTP client to use (defaults to the client shared by all
+                Claude providers)
         """
         self.api_key = api_key or get_api_key("ANTHROPIC_API_KEY")
         if not self.api_key:
@@ -99,6 +104,8 @@ class ClaudeProvider:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.base_url = base_url
+        self.http_client = http_client or get_http_client("anthropic")
+        self.tokenizer = get_tokenizer("claude")
     
     def _prepare_headers(self) -> Dict[str, str]:
         """Prepare headers for API requests."""
@@ -108,7 +115,7 @@ class ClaudeProvider:
             "anthropic-version": "2023-06-01"
         }
     
-    def _handle_error(self, response: requests.Response) -> None:
+    def _handle_error(self, response: HTTPResponse) -> None:
         """Handle error responses from the API."""
         try:
             error_data = response.json()
@@ -128,6 +135,9 @@ class ClaudeProvider:
         """
         Make a request to the Claude API with retry logic.
         
+        Retries, rate limiting and connection pooling are handled by the shared
+        HTTP client.
+        
         Args:
             endpoint: API endpoint
             data: Request data
@@ -135,45 +145,44 @@ class ClaudeProvider:
         Returns:
             API response as a dictionary
         """
-        url = f"{self.base_url}/{endpoint}"
-        headers = self._prepare_headers()
+        response = self.http_client.request(
+            "POST",
+            f"{self.base_url}/{endpoint}",
+            headers=self._prepare_headers(),
+            json=data,
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay
+        )
+        
+        if response.status_code != 200:
+            self._handle_error(response)
         
-        for attempt in range(self.max_retries):
-            try:
-                response = requests.post(url, headers=headers, json=data)
-                
-                if response.status_code == 200:
-                    return response.json()
-                
-                # Handle rate limiting with specific retry logic
-                if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After")
-                    if retry_after and retry_after.isdigit():
-                        sleep_time = int(retry_after)
-                    else:
-                        sleep_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                    
-                    logger.warning(f"Rate limited. Retrying in {sleep_time} seconds...")
-                    time.sleep(sleep_time)
-                    continue
-                
-                # Handle other errors
-                self._handle_error(response)
+        return response.json()
+    
+    async def _amake_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make a request to the Claude API with retry logic, without blocking the event loop.
+        
+        Args:
+            endpoint: API endpoint
+            data: Request data
             
-            except (requests.RequestException, ClaudeRateLimitError) as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                
-                if isinstance(e, ClaudeRateLimitError) and e.retry_after:
-                    sleep_time = e.retry_after
-                else:
-                    sleep_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                
-                logger.warning(f"Request failed: {str(e)}. Retrying in {sleep_time} seconds...")
-                time.sleep(sleep_time)
+        Returns:
+            API response as a dictionary
+        """
+        response = await self.http_client.arequest(
+            "POST",
+            f"{self.base_url}/{endpoint}",
+            headers=self._prepare_headers(),
+            json=data,
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay
+        )
+        
+        if response.status_code != 200:
+            self._handle_error(response)
         
-        # This should not be reached due to the raise in the loop
-        raise ClaudeError("Maximum retries exceeded")
+        return response.json()
     
     def generate_text(self, 
                      prompt: str, 
@@ -197,6 +206,28 @@ class ClaudeProvider:
         messages = [ClaudeMessage(role="user", content=prompt)]
         return self.chat_completion(messages, max_tokens, temperature, reasoning_mode, system_prompt)
     
+    async def agenerate_text(self, 
+                             prompt: str, 
+                             max_tokens: int = 1000,
+                             temperature: float = 0.7,
+                             reasoning_mode: Optional[ClaudeReasoningMode] = None,
+                             system_prompt: Optional[str] = None) -> str:
+        """
+        Generate text using Claude asynchronously.
+        
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0)
+            reasoning_mode: Optional reasoning mode to use
+            system_prompt: Optional system prompt
+            
+        Returns:
+            Generated text
+        """
+        messages = [ClaudeMessage(role="user", content=prompt)]
+        return await self.achat_completion(messages, max_tokens, temperature, reasoning_mode, system_prompt)
+    
     def chat_completion(self,
                        messages: List[ClaudeMessage],
                        max_tokens: int = 1000,
@@ -216,6 +247,48 @@ class ClaudeProvider:
         Returns:
             Generated assistant response
         """
+        data = self._build_chat_request(messages, max_tokens, temperature, reasoning_mode, system_prompt)
+        
+        # Make the API request
+        response = self._make_request("messages", data)
+        
+        # Extract and return the assistant's message
+        return response.get("content", [{"text": ""}])[0]["text"]
+    
+    async def achat_completion(self,
+                               messages: List[ClaudeMessage],
+                               max_tokens: int = 1000,
+                               temperature: float = 0.7,
+                               reasoning_mode: Optional[ClaudeReasoningMode] = None,
+                               system_prompt: Optional[str] = None) -> str:
+        """
+        Generate a chat completion using Claude asynchronously.
+        
+        Args:
+            messages: List of messages in the conversation
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0)
+            reasoning_mode: Optional reasoning mode to use
+            system_prompt: Optional system prompt
+            
+        Returns:
+            Generated assistant response
+        """
+        data = self._build_chat_request(messages, max_tokens, temperature, reasoning_mode, system_prompt)
+        
+        # Make the API request
+        response = await self._amake_request("messages", data)
+        
+        # Extract and return the assistant's message
+        return response.get("content", [{"text": ""}])[0]["text"]
+    
+    def _build_chat_request(self,
+                            messages: List[ClaudeMessage],
+                            max_tokens: int,
+                            temperature: float,
+                            reasoning_mode: Optional[ClaudeReasoningMode],
+                            system_prompt: Optional[str]) -> Dict[str, Any]:
+        """Build the request data for a chat completion."""
         # Prepare the request data
         data = {
             "model": self.model.value,
@@ -237,11 +310,7 @@ class ClaudeProvider:
             else:
                 data["system"] = reasoning_prompt
         
-        # Make the API request
-        response = self._make_request("messages", data)
-        
-        # Extract and return the assistant's message
-        return response.get("content", [{"text": ""}])[0]["text"]
+        return data
     
     def _get_reasoning_prompt(self, reasoning_mode: ClaudeReasoningMode) -> str:
         """Get the system prompt for a specific reasoning mode."""
@@ -270,16 +339,28 @@ class ClaudeProvider:
         """
         Count the number of tokens in a text.
         
+        Uses the tokenizer registered as "claude" in app.core.tokenizer, or the
+        default tokenizer. Counts of repeated texts are cached.
+        
         Args:
             text: Input text
             
         Returns:
-            Approximate token count
+            Token count
+        """
+        return self.tokenizer.count_tokens(text)
+    
+    def count_tokens_many(self, texts: List[str]) -> List[int]:
+        """
+        Count the number of tokens in several texts.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            Token count of each text
         """
-        # This is a simple approximation - Claude doesn't provide a token counting endpoint
-        # A more accurate implementation would use a tokenizer like tiktoken
-        words = text.split()
-        return int(len(words) * 1.3)  # Rough approximation
+        return self.tokenizer.count_tokens_many(texts)
     
     def set_model(self, model: ClaudeModel) -> None:
         """
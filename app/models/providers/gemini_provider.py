@@ -10,20 +10,22 @@ Features:
 - Advanced reasoning modes
 - Robust error handling with retries
 - Secure API key management
+- Pooled keep-alive connections, rate limiting and async variants
 """
 
 import os
-import time
 import json
 import logging
-import requests
 from typing import Dict, List, Optional, Union, Any, Callable
 from dataclasses import dataclass
 from enum import Enum
 import base64
 
+from app.core.tokenizer import get_tokenizer
+
 # Import auth utilities
 from .auth_utils import get_api_key, APIKeyNotFoundError
+from .http_client import ProviderHTTPClient, HTTPResponse, get_http_client
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -90,7 +92,8 @@ class GeminiProvider:
                  model: GeminiModel = GeminiModel.GEMINI_PRO,
                  max_retries: int = 3,
                  retry_delay: float = 1.0,
-                 base_url: str = "https://generativelanguage.googleapis.com/v1beta"):
+                 base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+                 http_client: Optional[ProviderHTTPClient] = None):
         """
         Initialize the Gemini provider.
         
@@ -100,6 +103,8 @@ class GeminiProvider:
             max_retries: Maximum number of retries for API calls
             retry_delay: Initial delay between retries (in seconds)
             base_url: Base URL for the Gemini API
+            http_client: HTTP client to use (defaults to the client shared by all
+                Gemini providers)
         """
         self.api_key = api_key or get_api_key("GOOGLE_API_KEY")
         if not self.api_key:
@@ -109,6 +114,8 @@ class GeminiProvider:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.base_url = base_url
+        self.http_client = http_client or get_http_client("gemini")
+        self.tokenizer = get_tokenizer("gemini")
     
     def _prepare_headers(self) -> Dict[str, str]:
         """Prepare headers for API requests."""
@@ -116,7 +123,7 @@ class GeminiProvider:
             "Content-Type": "application/json"
         }
     
-    def _handle_error(self, response: requests.Response) -> None:
+    def _handle_error(self, response: HTTPResponse) -> None:
         """Handle error responses from the API."""
         try:
             error_data = response.json()
@@ -136,6 +143,9 @@ class GeminiProvider:
         """
         Make a request to the Gemini API with retry logic.
         
+        Retries, rate limiting and connection pooling are handled by the shared
+        HTTP client.
+        
         Args:
             endpoint: API endpoint
             data: Request data
@@ -143,46 +153,46 @@ class GeminiProvider:
         Returns:
             API response as a dictionary
         """
-        # Add API key to URL
-        url = f"{self.base_url}/{endpoint}?key={self.api_key}"
-        headers = self._prepare_headers()
-        
-        for attempt in range(self.max_retries):
-            try:
-                response = requests.post(url, headers=headers, json=data)
-                
-                if response.status_code == 200:
-                    return response.json()
-                
-                # Handle rate limiting with specific retry logic
-                if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After")
-                    if retry_after and retry_after.isdigit():
-                        sleep_time = int(retry_after)
-                    else:
-                        sleep_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                    
-                    logger.warning(f"Rate limited. Retrying in {sleep_time} seconds...")
-                    time.sleep(sleep_time)
-                    continue
-                
-                # Handle other errors
-                self._handle_error(response)
+        response = self.http_client.request(
+            "POST",
+            f"{self.base_url}/{endpoint}",
+            headers=self._prepare_headers(),
+            json=data,
+            params={"key": self.api_key},
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay
+        )
+        
+        if response.status_code != 200:
+            self._handle_error(response)
+        
+        return response.json()
+    
+    async def _amake_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make a request to the Gemini API with retry logic, without blocking the event loop.
+        
+        Args:
+            endpoint: API endpoint
+            data: Request data
             
-            except (requests.RequestException, GeminiRateLimitError) as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                
-                if isinstance(e, GeminiRateLimitError) and e.retry_after:
-                    sleep_time = e.retry_after
-                else:
-                    sleep_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                
-                logger.warning(f"Request failed: {str(e)}. Retrying in {sleep_time} seconds...")
-                time.sleep(sleep_time)
-        
-        # This should not be reached due to the raise in the loop
-        raise GeminiError("Maximum retries exceeded")
+        Returns:
+            API response as a dictionary
+        """
+        response = await self.http_client.arequest(
+            "POST",
+            f"{self.base_url}/{endpoint}",
+            headers=self._prepare_headers(),
+            json=data,
+            params={"key": self.api_key},
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay
+        )
+        
+        if response.status_code != 200:
+            self._handle_error(response)
+        
+        return response.json()
     
     def generate_text(self, 
                      prompt: str, 
@@ -201,22 +211,134 @@ class GeminiProvider:
         Returns:
             Generated text
         """
-        # Check if model supports text-only generation
-        if self.model in [GeminiModel.GEMINI_PRO_VISION, GeminiModel.GEMINI_ULTRA_VISION]:
-            logger.warning(f"Using vision model {self.model.value} for text-only generation")
+        data = self._build_text_request(prompt, max_tokens, temperature, reasoning_mode)
+        return self._extract_text(self._make_request(self._generate_endpoint(), data))
+    
+    async def agenerate_text(self, 
+                             prompt: str, 
+                             max_tokens: int = 1000,
+                             temperature: float = 0.7,
+                             reasoning_mode: Optional[GeminiReasoningMode] = None) -> str:
+        """
+        Generate text using Gemini asynchronously.
         
+        Args:
+            prompt: User prompt
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0)
+            reasoning_mode: Optional reasoning mode to use
+            
+        Returns:
+            Generated text
+        """
+        data = self._build_text_request(prompt, max_tokens, temperature, reasoning_mode)
+        return self._extract_text(await self._amake_request(self._generate_endpoint(), data))
+    
+    def generate_multimodal(self, 
+                           prompt: str, 
+                           images: List[GeminiImage],
+                           max_tokens: int = 1000,
+                           temperature: float = 0.7,
+                           reasoning_mode: Optional[GeminiReasoningMode] = None) -> str:
+        """
+        Generate text based on text and images using Gemini.
+        
+        Args:
+            prompt: User prompt
+            images: List of images
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0)
+            reasoning_mode: Optional reasoning mode to use
+            
+        Returns:
+            Generated text
+        """
+        data = self._build_multimodal_request(prompt, images, max_tokens, temperature, reasoning_mode)
+        return self._extract_text(self._make_request(self._generate_endpoint(), data))
+    
+    async def agenerate_multimodal(self, 
+                                   prompt: str, 
+                                   images: List[GeminiImage],
+                                   max_tokens: int = 1000,
+                                   temperature: float = 0.7,
+                                   reasoning_mode: Optional[GeminiReasoningMode] = None) -> str:
+        """
+        Generate text based on text and images using Gemini asynchronously.
+        
+        Args:
+            prompt: User prompt
+            images: List of images
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0)
+            reasoning_mode: Optional reasoning mode to use
+            
+        Returns:
+            Generated text
+        """
+        data = self._build_multimodal_request(prompt, images, max_tokens, temperature, reasoning_mode)
+        return self._extract_text(await self._amake_request(self._generate_endpoint(), data))
+    
+    def chat_completion(self,
+                       messages: List[GeminiMessage],
+                       max_tokens: int = 1000,
+                       temperature: float = 0.7,
+                       reasoning_mode: Optional[GeminiReasoningMode] = None) -> str:
+        """
+        Generate a chat completion using Gemini.
+        
+        Args:
+            messages: List of messages in the conversation
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0)
+            reasoning_mode: Optional reasoning mode to use
+            
+        Returns:
+            Generated model response
+        """
+        data = self._build_chat_request(messages, max_tokens, temperature, reasoning_mode)
+        return self._extract_text(self._make_request(self._generate_endpoint(), data))
+    
+    async def achat_completion(self,
+                               messages: List[GeminiMessage],
+                               max_tokens: int = 1000,
+                               temperature: float = 0.7,
+                               reasoning_mode: Optional[GeminiReasoningMode] = None) -> str:
+        """
+        Generate a chat completion using Gemini asynchronously.
+        
+        Args:
+            messages: List of messages in the conversation
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0)
+            reasoning_mode: Optional reasoning mode to use
+            
+        Returns:
+            Generated model response
+        """
+        data = self._build_chat_request(messages, max_tokens, temperature, reasoning_mode)
+        return self._extract_text(await self._amake_request(self._generate_endpoint(), data))
+    
+    def _generate_endpoint(self) -> str:
+        """Get the content generation endpoint of the current model."""
+        return f"models/{self.model.value}:generateContent"
+    
+    def _extract_text(self, response: Dict[str, Any]) -> str:
+        """Extract the generated text from a response."""
+        try:
+            return response["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError):
+            logger.error(f"Unexpected response format: {response}")
+            return ""
+    
+    def _build_request(self,
+                       contents: List[Dict[str, Any]],
+                       max_tokens: int,
+                       temperature: float,
+                       reasoning_mode: Optional[GeminiReasoningMode]) -> Dict[str, Any]:
+        """Build the request data for a content generation request."""
         # Prepare the request data
         data = {
-            "contents": [
-                {
-                    "role": "user",
-                    "parts": [
-                        {
-                            "text": prompt
-                        }
-                    ]
-                }
-            ],
+            "contents": contents,
             "generationConfig": {
                 "temperature": temperature,
                 "maxOutputTokens": max_tokens,
@@ -237,36 +359,38 @@ class GeminiProvider:
                     ]
                 }
         
-        # Make the API request
-        endpoint = f"models/{self.model.value}:generateContent"
-        response = self._make_request(endpoint, data)
-        
-        # Extract and return the generated text
-        try:
-            return response["candidates"][0]["content"]["parts"][0]["text"]
-        except (KeyError, IndexError):
-            logger.error(f"Unexpected response format: {response}")
-            return ""
+        return data
     
-    def generate_multimodal(self, 
-                           prompt: str, 
-                           images: List[GeminiImage],
-                           max_tokens: int = 1000,
-                           temperature: float = 0.7,
-                           reasoning_mode: Optional[GeminiReasoningMode] = None) -> str:
-        """
-        Generate text based on text and images using Gemini.
+    def _build_text_request(self,
+                            prompt: str,
+                            max_tokens: int,
+                            temperature: float,
+                            reasoning_mode: Optional[GeminiReasoningMode]) -> Dict[str, Any]:
+        """Build the request data for text generation."""
+        # Check if model supports text-only generation
+        if self.model in [GeminiModel.GEMINI_PRO_VISION, GeminiModel.GEMINI_ULTRA_VISION]:
+            logger.warning(f"Using vision model {self.model.value} for text-only generation")
         
-        Args:
-            prompt: User prompt
-            images: List of images
-            max_tokens: Maximum number of tokens to generate
-            temperature: Sampling temperature (0.0 to 1.0)
-            reasoning_mode: Optional reasoning mode to use
-            
-        Returns:
-            Generated text
-        """
+        contents = [
+            {
+                "role": "user",
+                "parts": [
+                    {
+                        "text": prompt
+                    }
+                ]
+            }
+        ]
+        
+        return self._build_request(contents, max_tokens, temperature, reasoning_mode)
+    
+    def _build_multimodal_request(self,
+                                  prompt: str,
+                                  images: List[GeminiImage],
+                                  max_tokens: int,
+                                  temperature: float,
+                                  reasoning_mode: Optional[GeminiReasoningMode]) -> Dict[str, Any]:
+        """Build the request data for multimodal generation, switching to a vision model if needed."""
         # Check if model supports multimodal generation
         if self.model not in [GeminiModel.GEMINI_PRO_VISION, GeminiModel.GEMINI_ULTRA_VISION]:
             logger.warning(f"Model {self.model.value} does not support multimodal generation, switching to vision model")
@@ -297,62 +421,21 @@ class GeminiProvider:
                     }
                 })
         
-        # Prepare the request data
-        data = {
-            "contents": [
-                {
-                    "role": "user",
-                    "parts": parts
-                }
-            ],
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens,
-                "topP": 0.95,
-                "topK": 40
+        contents = [
+            {
+                "role": "user",
+                "parts": parts
             }
-        }
+        ]
         
-        # Add reasoning mode if provided
-        if reasoning_mode:
-            system_instruction = self._get_reasoning_prompt(reasoning_mode)
-            if system_instruction:
-                data["systemInstruction"] = {
-                    "parts": [
-                        {
-                            "text": system_instruction
-                        }
-                    ]
-                }
-        
-        # Make the API request
-        endpoint = f"models/{self.model.value}:generateContent"
-        response = self._make_request(endpoint, data)
-        
-        # Extract and return the generated text
-        try:
-            return response["candidates"][0]["content"]["parts"][0]["text"]
-        except (KeyError, IndexError):
-            logger.error(f"Unexpected response format: {response}")
-            return ""
+        return self._build_request(contents, max_tokens, temperature, reasoning_mode)
     
-    def chat_completion(self,
-                       messages: List[GeminiMessage],
-                       max_tokens: int = 1000,
-                       temperature: float = 0.7,
-                       reasoning_mode: Optional[GeminiReasoningMode] = None) -> str:
-        """
-        Generate a chat completion using Gemini.
-        
-        Args:
-            messages: List of messages in the conversation
-            max_tokens: Maximum number of tokens to generate
-            temperature: Sampling temperature (0.0 to 1.0)
-            reasoning_mode: Optional reasoning mode to use
-            
-        Returns:
-            Generated model response
-        """
+    def _build_chat_request(self,
+                            messages: List[GeminiMessage],
+                            max_tokens: int,
+                            temperature: float,
+                            reasoning_mode: Optional[GeminiReasoningMode]) -> Dict[str, Any]:
+        """Build the request data for a chat completion."""
         # Convert messages to Gemini format
         contents = []
         
@@ -368,39 +451,7 @@ class GeminiProvider:
                     "parts": message.content
                 })
         
-        # Prepare the request data
-        data = {
-            "contents": contents,
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens,
-                "topP": 0.95,
-                "topK": 40
-            }
-        }
-        
-        # Add reasoning mode if provided
-        if reasoning_mode:
-            system_instruction = self._get_reasoning_prompt(reasoning_mode)
-            if system_instruction:
-                data["systemInstruction"] = {
-                    "parts": [
-                        {
-                            "text": system_instruction
-                        }
-                    ]
-                }
-        
-        # Make the API request
-        endpoint = f"models/{self.model.value}:generateContent"
-        response = self._make_request(endpoint, data)
-        
-        # Extract and return the generated text
-        try:
-            return response["candidates"][0]["content"]["parts"][0]["text"]
-        except (KeyError, IndexError):
-            logger.error(f"Unexpected response format: {response}")
-            return ""
+        return self._build_request(contents, max_tokens, temperature, reasoning_mode)
     
     def _get_reasoning_prompt(self, reasoning_mode: GeminiReasoningMode) -> str:
         """Get the system prompt for a specific reasoning mode."""
@@ -429,15 +480,28 @@ class GeminiProvider:
         """
         Count the number of tokens in a text.
         
+        Uses the tokenizer registered as "gemini" in app.core.tokenizer, or the
+        default tokenizer. Counts of repeated texts are cached.
+        
         Args:
             text: Input text
             
         Returns:
-            Approximate token count
+            Token count
+        """
+        return self.tokenizer.count_tokens(text)
+    
+    def count_tokens_many(self, texts: List[str]) -> List[int]:
+        """
+        Count the number of tokens in several texts.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            Token count of each text
         """
-        # This is a simple approximation - Gemini doesn't provide a token counting endpoint
-        words = text.split()
-        return int(len(words) * 1.3)  # Rough approximation
+        return self.tokenizer.count_tokens_many(texts)
     
     def set_model(self, model: GeminiModel) -> None:
         """
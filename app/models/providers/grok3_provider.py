@@ -5,13 +5,15 @@ This module provides the core provider class for interacting with the Grok 3 API
 """
 
 import os
-import time
 import logging
 import json
 import requests
 from typing import Dict, List, Any, Optional, Union, Tuple
 
+from app.core.tokenizer import get_tokenizer
+
 from .auth_utils import get_grok3_api_key, get_grok3_api_base
+from .http_client import ProviderHTTPClient, HTTPResponse, get_http_client
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -30,7 +32,8 @@ class Grok3Provider:
         api_base: Optional[str] = None,
         max_retries: int = 3,
         timeout: int = 60,
-        secure_mode: bool = True
+        secure_mode: bool = True,
+        http_client: Optional[ProviderHTTPClient] = None
     ):
         """
         Initialize the Grok3Provider.
@@ -42,12 +45,16 @@ class Grok3Provider:
             max_retries: Maximum number of retries for failed requests.
             timeout: Timeout in seconds for API requests.
             secure_mode: Whether to enable secure mode for API requests.
+            http_client: Optional HTTP client. If not provided, the client shared
+                    by all Grok 3 providers is used.
         """
         self.api_key = api_key or get_grok3_api_key()
         self.api_base = api_base or get_grok3_api_base()
         self.max_retries = max_retries
         self.timeout = timeout
         self.secure_mode = secure_mode
+        self.http_client = http_client or get_http_client("grok3")
+        self.tokenizer = get_tokenizer("grok3")
         
         if not self.api_key:
             logger.warning("No API key provided. API calls will likely fail.")
@@ -89,33 +96,81 @@ class Grok3Provider:
             Exception: If the API request fails after max_retries.
         """
         url = f"{self.api_base}/{endpoint.lstrip('/')}"
-        headers = self._get_headers()
-        
-        for attempt in range(self.max_retries):
-            try:
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    json=data,
-                    params=params,
-                    timeout=self.timeout
-                )
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"API request failed (attempt {attempt+1}/{self.max_retries}): {str(e)}")
-                
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff with jitter
-                    backoff_time = 2 ** attempt + (0.1 * attempt)
-                    logger.info(f"Retrying in {backoff_time:.2f} seconds...")
-                    time.sleep(backoff_time)
-                else:
-                    logger.error(f"API request failed after {self.max_retries} attempts")
-                    raise Exception(f"Failed to call Grok 3 API: {str(e)}")
+        
+        try:
+            response = self.http_client.request(
+                method,
+                url,
+                headers=self._get_headers(),
+                json=data,
+                params=params,
+                timeout=self.timeout,
+                max_retries=self.max_retries
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"API request failed after {self.max_retries} attempts")
+            raise Exception(f"Failed to call Grok 3 API: {str(e)}")
+        
+        return self._parse_response(response)
+    
+    async def _amake_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Make a request to the Grok 3 API without blocking the event loop.
+        
+        Args:
+            method: HTTP method (GET, POST, etc.).
+            endpoint: API endpoint to call.
+            data: Optional data to send in the request body.
+            params: Optional query parameters.
+        
+        Returns:
+            API response as a dictionary.
+        
+        Raises:
+            Exception: If the API request fails after max_retries.
+        """
+        url = f"{self.api_base}/{endpoint.lstrip('/')}"
+        
+        try:
+            response = await self.http_client.arequest(
+                method,
+                url,
+                headers=self._get_headers(),
+                json=data,
+                params=params,
+                timeout=self.timeout,
+                max_retries=self.max_retries
+            )
+        except Exception as e:
+            logger.error(f"API request failed after {self.max_retries} attempts")
+            raise Exception(f"Failed to call Grok 3 API: {str(e)}")
+        
+        return self._parse_response(response)
+    
+    def _parse_response(self, response: HTTPResponse) -> Dict[str, Any]:
+        """
+        Parse a response from the Grok 3 API.
+        
+        Args:
+            response: Response from the HTTP client.
+        
+        Returns:
+            API response as a dictionary.
+        
+        Raises:
+            Exception: If the response has an error status.
+        """
+        if not 200 <= response.status_code < 300:
+            logger.error(f"API request failed with status {response.status_code}")
+            raise Exception(f"Failed to call Grok 3 API: {response.status_code} {response.text}")
+        
+        return response.json()
     
     def list_models(self) -> List[Dict[str, Any]]:
         """
@@ -127,6 +182,33 @@ class Grok3Provider:
         response = self._make_request("GET", "/models")
         return response.get("data", [])
     
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the number of tokens in a text.
+        
+        Uses the tokenizer registered as "grok3" in app.core.tokenizer, or the
+        default tokenizer. Counts of repeated texts are cached.
+        
+        Args:
+            text: Input text.
+        
+        Returns:
+            Token count.
+        """
+        return self.tokenizer.count_tokens(text)
+    
+    def count_tokens_many(self, texts: List[str]) -> List[int]:
+        """
+        Count the number of tokens in several texts.
+        
+        Args:
+            texts: Input texts.
+        
+        Returns:
+            Token count of each text.
+        """
+        return self.tokenizer.count_tokens_many(texts)
+    
     def generate_completion(
         self,
         model: str = "grok-3",
@@ -158,6 +240,106 @@ class Grok3Provider:
         Returns:
             API response as a dictionary.
         
+        Raises:
+            ValueError: If neither prompt nor messages are provided.
+        """
+        endpoint, data = self._build_completion_request(
+            model=model,
+            prompt=prompt,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop,
+            stream=stream,
+            system_message=system_message,
+            reasoning_mode=reasoning_mode
+        )
+        
+        # Make the API request
+        return self._make_request("POST", endpoint, data=data)
+    
+    async def agenerate_completion(
+        self,
+        model: str = "grok-3",
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: Optional[float] = None,
+        stop: Optional[Union[str, List[str]]] = None,
+        stream: bool = False,
+        system_message: Optional[str] = None,
+        reasoning_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a completion from the Grok 3 API asynchronously.
+        
+        Args:
+            model: Model to use for completion.
+            prompt: Text prompt for completion (for text completion).
+            messages: List of messages for chat completion.
+            max_tokens: Maximum number of tokens to generate.
+            temperature: Sampling temperature.
+            top_p: Nucleus sampling parameter.
+            stop: Stop sequences to end generation.
+            stream: Whether to stream the response.
+            system_message: System message for chat completion.
+            reasoning_mode: Reasoning mode to use (auto, think, big_brain).
+        
+        Returns:
+            API response as a dictionary.
+        
+        Raises:
+            ValueError: If neither prompt nor messages are provided.
+        """
+        endpoint, data = self._build_completion_request(
+            model=model,
+            prompt=prompt,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop,
+            stream=stream,
+            system_message=system_message,
+            reasoning_mode=reasoning_mode
+        )
+        
+        # Make the API request
+        return await self._amake_request("POST", endpoint, data=data)
+    
+    def _build_completion_request(
+        self,
+        model: str = "grok-3",
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: Optional[float] = None,
+        stop: Optional[Union[str, List[str]]] = None,
+        stream: bool = False,
+        system_message: Optional[str] = None,
+        reasoning_mode: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the endpoint and request data for a completion.
+        
+        Args:
+            model: Model to use for completion.
+            prompt: Text prompt for completion (for text completion).
+            messages: List of messages for chat completion.
+            max_tokens: Maximum number of tokens to generate.
+            temperature: Sampling temperature.
+            top_p: Nucleus sampling parameter.
+            stop: Stop sequences to end generation.
+            stream: Whether to stream the response.
+            system_message: System message for chat completion.
+            reasoning_mode: Reasoning mode to use (auto, think, big_brain).
+        
+        Returns:
+            Tuple of (endpoint, request data).
+        
         Raises:
             ValueError: If neither prompt nor messages are provided.
         """
@@ -212,8 +394,7 @@ class Grok3Provider:
             
             endpoint = "/chat/completions"
         
-        # Make the API request
-        return self._make_request("POST", endpoint, data=data)
+        return endpoint, data
     
     def generate_embeddings(
         self,
@@ -236,3 +417,25 @@ class Grok3Provider:
         }
         
         return self._make_request("POST", "/embeddings", data=data)
+    
+    async def agenerate_embeddings(
+        self,
+        input: Union[str, List[str]],
+        model: str = "grok-3-embedding"
+    ) -> Dict[str, Any]:
+        """
+        Generate embeddings from the Grok 3 API asynchronously.
+        
+        Args:
+            input: Text or list of texts to generate embeddings for.
+            model: Model to use for embeddings.
+        
+        Returns:
+            API response with embeddings.
+        """
+        data = {
+            "model": model,
+            "input": input if isinstance(input, list) else [input]
+        }
+        
+        return await self._amake_request("POST", "/embeddings", data=data)
@@ -0,0 +1,494 @@
+"""
+Shared HTTP client for model providers.
+
+This module provides the pooled HTTP client used by the model providers. Each
+provider shares one client across all its instances and callers, so they reuse
+keep-alive connections, share a concurrency limit, and share a token-bucket
+rate limiter that pauses every caller when the API answers with Retry-After.
+"""
+
+import asyncio
+import email.utils
+import json
+import logging
+import threading
+import time
+import weakref
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Status codes that are retried
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HTTPResponse:
+    """Transport-independent HTTP response."""
+    
+    def __init__(self, status_code: int, headers: Dict[str, str], text: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+    
+    def json(self) -> Any:
+        """
+        Decode the response body as JSON.
+        
+        Returns:
+            Decoded JSON
+            
+        Raises:
+            ValueError: If the body is not valid JSON
+        """
+        return json.loads(self.text)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value: Header value, either seconds or an HTTP date
+        
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+    
+    Tokens refill at `rate` per second up to `capacity`. Calling block_for pauses
+    all callers, e.g. to honor a Retry-After header.
+    """
+    
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[float] = None):
+        """
+        Initialize the TokenBucket.
+        
+        Args:
+            rate: Tokens added per second (None for no rate limit)
+            capacity: Maximum number of tokens (defaults to max(1, rate))
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate or 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """
+        Take a token, returning how long the caller must wait before using it.
+        
+        Returns:
+            Seconds to wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            
+            if self.rate:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                
+                # Tokens may go negative; the debt is paid by waiting
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+            
+            return wait
+    
+    def acquire(self) -> float:
+        """
+        Wait for a token.
+        
+        Returns:
+            Seconds waited
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self) -> float:
+        """
+        Wait for a token without blocking the event loop.
+        
+        Returns:
+            Seconds waited
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def block_for(self, seconds: float) -> None:
+        """
+        Pause all callers.
+        
+        Args:
+            seconds: Seconds to pause for
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class ProviderHTTPClient:
+    """
+    Pooled HTTP client shared by the instances of a model provider.
+    
+    Synchronous requests use a keep-alive requests.Session; asynchronous requests
+    use one aiohttp.ClientSession per event loop. Both are limited to
+    max_concurrency requests in flight and share the provider's rate limiter.
+    Requests failing with 429, a 5xx status or a connection error are retried;
+    on 429 every caller waits for the Retry-After delay.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        max_connections: int = 10,
+        max_concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ):
+        """
+        Initialize the ProviderHTTPClient.
+        
+        Args:
+            name: Provider name, used in logs
+            max_connections: Maximum number of pooled keep-alive connections
+            max_concurrency: Maximum number of requests in flight
+            requests_per_second: Sustained request rate (None for no limit)
+            burst: Number of requests allowed in a burst above the sustained rate
+            timeout: Default request timeout in seconds
+            max_retries: Default maximum number of attempts per request
+            retry_delay: Default initial backoff delay in seconds
+        """
+        self.name = name
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        
+        # Synchronous transport
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        
+        # Asynchronous transport, one session and semaphore per event loop
+        self._async_sessions = weakref.WeakKeyDictionary()
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
+        
+        # Statistics
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "rate_limited": 0, "errors": 0, "in_flight": 0}
+    
+    def _record(self, key: str, amount: int = 1) -> None:
+        """Update a request statistic."""
+        with self._stats_lock:
+            self._stats[key] += amount
+    
+    def _backoff(self, response: Optional[HTTPResponse], attempt: int, retry_delay: float) -> float:
+        """
+        Compute the delay before retrying, pausing all callers on 429.
+        
+        Args:
+            response: Failed response, or None for a connection error
+            attempt: Zero-based attempt number
+            retry_delay: Initial backoff delay
+            
+        Returns:
+            Seconds this caller should wait before retrying
+        """
+        delay = retry_delay * (2 ** attempt)  # Exponential backoff
+        
+        if response is not None and response.status_code == 429:
+            self._record("rate_limited")
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = retry_after
+            
+            # The rate limiter makes every caller wait, so no extra sleep is needed
+            self.rate_limiter.block_for(delay)
+            logger.warning(f"{self.name} rate limited. Pausing requests for {delay} seconds...")
+            return 0.0
+        
+        return delay
+    
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None
+    ) -> HTTPResponse:
+        """
+        Make a request with retries.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            headers: Request headers
+            json: JSON request body
+            params: Query parameters
+            timeout: Request timeout in seconds (defaults to the client timeout)
+            max_retries: Maximum number of attempts (defaults to the client setting)
+            retry_delay: Initial backoff delay (defaults to the client setting)
+            
+        Returns:
+            Last response received; the caller handles non-success statuses
+            
+        Raises:
+            requests.RequestException: If the last attempt failed to connect
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        max_retries = max(1, max_retries if max_retries is not None else self.max_retries)
+        retry_delay = retry_delay if retry_delay is not None else self.retry_delay
+        
+        for attempt in range(max_retries):
+            self.rate_limiter.acquire()
+            
+            try:
+                with self._semaphore:
+                    self._record("requests")
+                    self._record("in_flight")
+                    try:
+                        raw = self.session.request(
+                            method, url, headers=headers, json=json, params=params, timeout=timeout
+                        )
+                    finally:
+                        self._record("in_flight", -1)
+                response = HTTPResponse(raw.status_code, dict(raw.headers), raw.text)
+            
+            except requests.RequestException as e:
+                self._record("errors")
+                if attempt == max_retries - 1:
+                    raise
+                delay = self._backoff(None, attempt, retry_delay)
+                logger.warning(f"{self.name} request failed: {str(e)}. Retrying in {delay} seconds...")
+                self._record("retries")
+                time.sleep(delay)
+                continue
+            
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries - 1:
+                return response
+            
+            delay = self._backoff(response, attempt, retry_delay)
+            self._record("retries")
+            if delay > 0:
+                logger.warning(f"{self.name} returned {response.status_code}. Retrying in {delay} seconds...")
+                time.sleep(delay)
+        
+        # Not reached: the last attempt returns or raises
+        raise RuntimeError("Maximum retries exceeded")
+    
+    def _get_async_session(self) -> Tuple[Any, asyncio.Semaphore]:
+        """
+        Get the aiohttp session and semaphore of the running event loop.
+        
+        Returns:
+            Tuple of (session, semaphore)
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for async requests. Please install with 'pip install aiohttp'")
+        
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            session = self._async_sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(limit=self.max_connections)
+                session = aiohttp.ClientSession(connector=connector)
+                self._async_sessions[loop] = session
+                self._async_semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return session, self._async_semaphores[loop]
+    
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None
+    ) -> HTTPResponse:
+        """
+        Make a request with retries without blocking the event loop.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            headers: Request headers
+            json: JSON request body
+            params: Query parameters
+            timeout: Request timeout in seconds (defaults to the client timeout)
+            max_retries: Maximum number of attempts (defaults to the client setting)
+            retry_delay: Initial backoff delay (defaults to the client setting)
+            
+        Returns:
+            Last response received; the caller handles non-success statuses
+            
+        Raises:
+            aiohttp.ClientError: If the last attempt failed to connect
+            asyncio.TimeoutError: If the last attempt timed out
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        max_retries = max(1, max_retries if max_retries is not None else self.max_retries)
+        retry_delay = retry_delay if retry_delay is not None else self.retry_delay
+        session, semaphore = self._get_async_session()
+        
+        for attempt in range(max_retries):
+            await self.rate_limiter.acquire_async()
+            
+            try:
+                async with semaphore:
+                    self._record("requests")
+                    self._record("in_flight")
+                    try:
+                        async with session.request(
+                            method,
+                            url,
+                            headers=headers,
+                            json=json,
+                            params=params,
+                            timeout=aiohttp.ClientTimeout(total=timeout)
+                        ) as raw:
+                            text = await raw.text()
+                            response = HTTPResponse(raw.status, dict(raw.headers), text)
+                    finally:
+                        self._record("in_flight", -1)
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._record("errors")
+                if attempt == max_retries - 1:
+                    raise
+                delay = self._backoff(None, attempt, retry_delay)
+                logger.warning(f"{self.name} request failed: {str(e)}. Retrying in {delay} seconds...")
+                self._record("retries")
+                await asyncio.sleep(delay)
+                continue
+            
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries - 1:
+                return response
+            
+            delay = self._backoff(response, attempt, retry_delay)
+            self._record("retries")
+            if delay > 0:
+                logger.warning(f"{self.name} returned {response.status_code}. Retrying in {delay} seconds...")
+                await asyncio.sleep(delay)
+        
+        # Not reached: the last attempt returns or raises
+        raise RuntimeError("Maximum retries exceeded")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get request statistics.
+        
+        Returns:
+            Dictionary with request, retry, rate-limit and error counts
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["name"] = self.name
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+    
+    async def aclose(self) -> None:
+        """Close the aiohttp session of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            session = self._async_sessions.pop(loop, None)
+            self._async_semaphores.pop(loop, None)
+        if session is not None:
+            await session.close()
+    
+    def close(self) -> None:
+        """Close the pooled synchronous connections."""
+        self.session.close()
+
+
+# Shared clients, one per provider
+_clients: Dict[str, ProviderHTTPClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(name: str, **kwargs) -> ProviderHTTPClient:
+    """
+    Get the shared HTTP client of a provider, creating it if needed.
+    
+    Args:
+        name: Provider name
+        **kwargs: ProviderHTTPClient settings, used when the client is created
+        
+    Returns:
+        Shared HTTP client
+    """
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = ProviderHTTPClient(name, **kwargs)
+            _clients[name] = client
+        elif kwargs:
+            logger.debug(f"HTTP client for {name} already exists; ignoring new settings")
+        return client
+
+
+def configure_http_client(name: str, **kwargs) -> ProviderHTTPClient:
+    """
+    Replace the shared HTTP client of a provider with one using new settings.
+    
+    Args:
+        name: Provider name
+        **kwargs: ProviderHTTPClient settings
+        
+    Returns:
+        New shared HTTP client
+    """
+    client = ProviderHTTPClient(name, **kwargs)
+    with _clients_lock:
+        previous = _clients.get(name)
+        _clients[name] = client
+    if previous is not None:
+        previous.close()
+    return client
@@ -0,0 +1,451 @@
+"""
+Response cache middleware for model providers.
+
+This module provides a provider-agnostic layer that sits in front of any model
+provider. Concurrent identical requests are coalesced into one provider call,
+and deterministic requests (temperature 0 completions and embeddings) are
+cached on their normalized payload with LRU and TTL eviction, optionally
+persisted to disk.
+"""
+
+import asyncio
+import copy
+import dataclasses
+import hashlib
+import inspect
+import json
+import logging
+import threading
+from enum import Enum
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from app.core.cache import Cache, PersistentCache
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Provider methods handled by the middleware: name -> (kind, operation)
+# Async variants share the operation, and therefore the cache, of their sync variant.
+CACHED_METHODS = {
+    "generate_completion": ("completion", "generate_completion"),
+    "agenerate_completion": ("completion", "generate_completion"),
+    "generate_text": ("completion", "generate_text"),
+    "agenerate_text": ("completion", "generate_text"),
+    "chat_completion": ("completion", "chat_completion"),
+    "achat_completion": ("completion", "chat_completion"),
+    "generate_multimodal": ("completion", "generate_multimodal"),
+    "agenerate_multimodal": ("completion", "generate_multimodal"),
+    "generate_embeddings": ("embedding", "generate_embeddings"),
+    "agenerate_embeddings": ("embedding", "generate_embeddings"),
+}
+
+# Sentinel distinguishing a cache miss from a cached None
+_MISSING = object()
+
+
+def normalize_payload(value: Any) -> Any:
+    """
+    Convert a request payload into a canonical JSON-compatible structure.
+    
+    Dataclasses and enums are converted to plain values, None values are dropped
+    from mappings, line endings and surrounding whitespace of strings are
+    normalized, and binary data is replaced by its digest.
+    
+    Args:
+        value: Request payload
+        
+    Returns:
+        Canonical representation of the payload
+    """
+    if isinstance(value, Enum):
+        return normalize_payload(value.value)
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n").strip()
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return normalize_payload({field.name: getattr(value, field.name) for field in dataclasses.fields(value)})
+    if isinstance(value, dict):
+        return {str(key): normalize_payload(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize_payload(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(normalize_payload(item) for item in value)
+    return repr(value)
+
+
+def make_request_key(provider_name: str, operation: str, payload: Dict[str, Any]) -> str:
+    """
+    Derive the cache key of a request.
+    
+    Args:
+        provider_name: Name of the provider
+        operation: Provider operation
+        payload: Request arguments
+        
+    Returns:
+        Cache key
+    """
+    canonical = json.dumps(normalize_payload(payload), sort_keys=True, separators=(",", ":"), default=repr)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"{provider_name}.{operation}:{digest}"
+
+
+def estimate_tokens(payload: Dict[str, Any], result: Any) -> int:
+    """
+    Estimate the number of tokens consumed by a request.
+    
+    Uses the usage reported by the provider when the response includes it, and
+    a four-characters-per-token estimate of the request and response otherwise.
+    
+    Args:
+        payload: Request arguments
+        result: Provider response
+        
+    Returns:
+        Estimated number of tokens
+    """
+    if isinstance(result, dict) and isinstance(result.get("usage"), dict):
+        usage = result["usage"]
+        if "total_tokens" in usage:
+            return int(usage["total_tokens"])
+        if "input_tokens" in usage or "output_tokens" in usage:
+            return int(usage.get("input_tokens", 0)) + int(usage.get("output_tokens", 0))
+    
+    request_text = json.dumps(normalize_payload(payload), default=repr)
+    response_text = result if isinstance(result, str) else json.dumps(normalize_payload(result), default=repr)
+    return (len(request_text) + len(response_text)) // 4
+
+
+class _InFlightRequest:
+    """A synchronous provider call in progress that identical requests wait on."""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.tokens = 0
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    Deduplicating response cache shared by model provider callers.
+    
+    Identical requests issued while one is already in flight wait for its result
+    instead of calling the provider again. Results of cacheable requests are
+    stored with a TTL in an LRU cache, which is persisted to disk when a cache
+    directory is given.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: Optional[int] = 3600,
+        cache_dir: Optional[str] = None,
+        cache: Optional[Cache] = None
+    ):
+        """
+        Initialize the ResponseCache.
+        
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl: Time to live of cached responses in seconds (None for no expiry)
+            cache_dir: Directory to persist cached responses in (None to keep them in memory)
+            cache: Cache instance to use instead of creating one
+        """
+        if cache is None:
+            cache = PersistentCache(cache_dir, max_size=max_entries) if cache_dir else Cache(max_size=max_entries)
+        self.cache = cache
+        self.ttl = ttl
+        
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _InFlightRequest] = {}
+        self._async_inflight: Dict[Tuple[int, str], asyncio.Task] = {}
+        
+        # Statistics
+        self._stats = {
+            "requests": 0,
+            "hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "uncacheable": 0,
+            "saved_tokens": 0
+        }
+    
+    def _record(self, key: str, amount: int = 1) -> None:
+        """Update a request statistic."""
+        with self._lock:
+            self._stats[key] += amount
+    
+    def _lookup(self, key: str) -> Tuple[Any, int]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Tuple of (response or _MISSING, tokens saved by the hit)
+        """
+        stored = self.cache.get(key, _MISSING)
+        if stored is _MISSING:
+            return _MISSING, 0
+        result, tokens = stored
+        return copy.deepcopy(result), tokens
+    
+    def call(
+        self,
+        key: str,
+        payload: Dict[str, Any],
+        fn: Callable[[], Any],
+        cacheable: bool = True
+    ) -> Any:
+        """
+        Get the response to a request, calling the provider only if needed.
+        
+        Args:
+            key: Cache key of the request
+            payload: Request arguments, used to estimate tokens
+            fn: Function calling the provider
+            cacheable: Whether the response may be cached
+            
+        Returns:
+            Provider response
+        """
+        self._record("requests")
+        
+        if cacheable:
+            result, tokens = self._lookup(key)
+            if result is not _MISSING:
+                self._record("hits")
+                self._record("saved_tokens", tokens)
+                return result
+        
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlightRequest()
+        
+        if not leader:
+            # Wait for the identical request already in progress
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            self._record("coalesced")
+            self._record("saved_tokens", flight.tokens)
+            return copy.deepcopy(flight.result)
+        
+        self._record("misses" if cacheable else "uncacheable")
+        try:
+            result = fn()
+            flight.tokens = estimate_tokens(payload, result)
+            flight.result = result
+            if cacheable:
+                self.cache.set(key, (copy.deepcopy(result), flight.tokens), self.ttl)
+            return result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+    
+    async def acall(
+        self,
+        key: str,
+        payload: Dict[str, Any],
+        fn: Callable[[], Awaitable[Any]],
+        cacheable: bool = True
+    ) -> Any:
+        """
+        Get the response to a request asynchronously, calling the provider only if needed.
+        
+        Args:
+            key: Cache key of the request
+            payload: Request arguments, used to estimate tokens
+            fn: Coroutine function calling the provider
+            cacheable: Whether the response may be cached
+            
+        Returns:
+            Provider response
+        """
+        self._record("requests")
+        
+        if cacheable:
+            result, tokens = self._lookup(key)
+            if result is not _MISSING:
+                self._record("hits")
+                self._record("saved_tokens", tokens)
+                return result
+        
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        
+        with self._lock:
+            task = self._async_inflight.get(flight_key)
+            leader = task is None
+            if leader:
+                task = loop.create_task(self._acall_provider(payload, fn, key if cacheable else None))
+                self._async_inflight[flight_key] = task
+                task.add_done_callback(lambda done: self._finish_async(flight_key, done))
+        
+        if leader:
+            self._record("misses" if cacheable else "uncacheable")
+            result, _ = await asyncio.shield(task)
+            return result
+        
+        # Shield so one cancelled caller does not cancel the shared call
+        result, tokens = await asyncio.shield(task)
+        self._record("coalesced")
+        self._record("saved_tokens", tokens)
+        return copy.deepcopy(result)
+    
+    async def _acall_provider(
+        self,
+        payload: Dict[str, Any],
+        fn: Callable[[], Awaitable[Any]],
+        key: Optional[str]
+    ) -> Tuple[Any, int]:
+        """
+        Call the provider and cache the response.
+        
+        Args:
+            payload: Request arguments, used to estimate tokens
+            fn: Coroutine function calling the provider
+            key: Cache key, or None if the response may not be cached
+            
+        Returns:
+            Tuple of (provider response, estimated tokens)
+        """
+        result = await fn()
+        tokens = estimate_tokens(payload, result)
+        if key is not None:
+            self.cache.set(key, (copy.deepcopy(result), tokens), self.ttl)
+        return result, tokens
+    
+    def _finish_async(self, flight_key: Tuple[int, str], task: asyncio.Task) -> None:
+        """Forget a finished asynchronous call."""
+        with self._lock:
+            if self._async_inflight.get(flight_key) is task:
+                del self._async_inflight[flight_key]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with request, hit, coalesced and saved token counts
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        served = stats["hits"] + stats["coalesced"]
+        stats["hit_ratio"] = served / stats["requests"] if stats["requests"] else 0.0
+        stats["saved_calls"] = served
+        stats["cache"] = self.cache.stats()
+        return stats
+    
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self.cache.clear()
+    
+    def close(self) -> None:
+        """Flush and close the persistent cache, if any."""
+        if isinstance(self.cache, PersistentCache):
+            self.cache.close()
+
+
+class CachedProvider:
+    """
+    Model provider wrapper routing requests through a ResponseCache.
+    
+    Completion and embedding methods of the wrapped provider (see CACHED_METHODS)
+    are deduplicated and, when deterministic, cached. Temperature 0 completions
+    and all embeddings are deterministic; streamed completions are never cached.
+    Every other attribute is delegated to the wrapped provider.
+    """
+    
+    def __init__(self, provider: Any, cache: Optional[ResponseCache] = None):
+        """
+        Initialize the CachedProvider.
+        
+        Args:
+            provider: Provider to wrap
+            cache: Response cache to use (defaults to a new in-memory cache)
+        """
+        self.provider = provider
+        self.cache = cache or ResponseCache()
+        self.provider_name = type(provider).__name__
+        self._signatures: Dict[str, inspect.Signature] = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.provider, name)
+        if name not in CACHED_METHODS or not callable(attribute):
+            return attribute
+        
+        kind, operation = CACHED_METHODS[name]
+        signature = self._signatures.get(name)
+        if signature is None:
+            signature = self._signatures[name] = inspect.signature(attribute)
+        
+        if asyncio.iscoroutinefunction(attribute):
+            async def async_method(*args, **kwargs):
+                key, payload, cacheable = self._prepare(signature, kind, operation, args, kwargs)
+                return await self.cache.acall(key, payload, lambda: attribute(*args, **kwargs), cacheable)
+            
+            return async_method
+        
+        def method(*args, **kwargs):
+            key, payload, cacheable = self._prepare(signature, kind, operation, args, kwargs)
+            return self.cache.call(key, payload, lambda: attribute(*args, **kwargs), cacheable)
+        
+        return method
+    
+    def _prepare(
+        self,
+        signature: inspect.Signature,
+        kind: str,
+        operation: str,
+        args: Tuple,
+        kwargs: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any], bool]:
+        """
+        Build the cache key of a provider call.
+        
+        Args:
+            signature: Signature of the provider method
+            kind: "completion" or "embedding"
+            operation: Provider operation
+            args: Positional arguments of the call
+            kwargs: Keyword arguments of the call
+            
+        Returns:
+            Tuple of (cache key, request arguments, whether the response may be cached)
+        """
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        payload = dict(bound.arguments)
+        
+        # Providers selecting the model at construction time include it in the key
+        model = getattr(self.provider, "model", None)
+        if model is not None:
+            payload.setdefault("model", model)
+        
+        if kind == "embedding":
+            cacheable = True
+        else:
+            cacheable = payload.get("temperature") == 0 and not payload.get("stream", False)
+        
+        return make_request_key(self.provider_name, operation, payload), payload, cacheable
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of the response cache.
+        
+        Returns:
+            Cache statistics
+        """
+        return self.cache.get_stats()
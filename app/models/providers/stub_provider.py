@@ -0,0 +1,209 @@
+"""
+Stub provider for offline use.
+
+This module provides a local provider with the interface of Grok3Provider. It
+returns deterministic completions and embeddings after a configurable delay,
+so adapters, agents and the response cache can be exercised and benchmarked
+without network access or API keys.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, List, Any, Optional, Union
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class StubProvider:
+    """
+    Offline provider returning deterministic, Grok 3-shaped responses.
+    """
+    
+    def __init__(self, latency: float = 0.0, embedding_dimension: int = 8):
+        """
+        Initialize the StubProvider.
+        
+        Args:
+            latency: Simulated request latency in seconds
+            embedding_dimension: Dimension of generated embeddings
+        """
+        self.latency = latency
+        self.embedding_dimension = embedding_dimension
+        self.call_count = 0
+        self._lock = threading.Lock()
+    
+    def _count_call(self) -> None:
+        """Count a simulated provider call."""
+        with self._lock:
+            self.call_count += 1
+    
+    def list_models(self) -> List[Dict[str, Any]]:
+        """
+        List the models of the stub provider.
+        
+        Returns:
+            List of available models
+        """
+        return [{"id": "stub"}, {"id": "stub-embedding"}]
+    
+    def generate_completion(
+        self,
+        model: str = "grok-3",
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: Optional[float] = None,
+        stop: Optional[Union[str, List[str]]] = None,
+        stream: bool = False,
+        system_message: Optional[str] = None,
+        reasoning_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a completion.
+        
+        Args:
+            model: Model to use for completion
+            prompt: Text prompt for completion
+            messages: List of messages for chat completion
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature
+            top_p: Nucleus sampling parameter
+            stop: Stop sequences to end generation
+            stream: Whether to stream the response
+            system_message: System message for chat completion
+            reasoning_mode: Reasoning mode to use
+            
+        Returns:
+            Completion response in the Grok 3 format
+        """
+        self._count_call()
+        if self.latency:
+            time.sleep(self.latency)
+        return self._build_completion(model, prompt, messages, max_tokens, system_message)
+    
+    async def agenerate_completion(
+        self,
+        model: str = "grok-3",
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.7,
+        top_p: Optional[float] = None,
+        stop: Optional[Union[str, List[str]]] = None,
+        stream: bool = False,
+        system_message: Optional[str] = None,
+        reasoning_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a completion asynchronously.
+        
+        Args:
+            model: Model to use for completion
+            prompt: Text prompt for completion
+            messages: List of messages for chat completion
+            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature
+            top_p: Nucleus sampling parameter
+            stop: Stop sequences to end generation
+            stream: Whether to stream the response
+            system_message: System message for chat completion
+            reasoning_mode: Reasoning mode to use
+            
+        Returns:
+            Completion response in the Grok 3 format
+        """
+        self._count_call()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._build_completion(model, prompt, messages, max_tokens, system_message)
+    
+    def generate_embeddings(
+        self,
+        input: Union[str, List[str]],
+        model: str = "grok-3-embedding"
+    ) -> Dict[str, Any]:
+        """
+        Generate embeddings.
+        
+        Args:
+            input: Text or list of texts to generate embeddings for
+            model: Model to use for embeddings
+            
+        Returns:
+            Embedding response in the Grok 3 format
+        """
+        self._count_call()
+        if self.latency:
+            time.sleep(self.latency)
+        return self._build_embeddings(input, model)
+    
+    async def agenerate_embeddings(
+        self,
+        input: Union[str, List[str]],
+        model: str = "grok-3-embedding"
+    ) -> Dict[str, Any]:
+        """
+        Generate embeddings asynchronously.
+        
+        Args:
+            input: Text or list of texts to generate embeddings for
+            model: Model to use for embeddings
+            
+        Returns:
+            Embedding response in the Grok 3 format
+        """
+        self._count_call()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._build_embeddings(input, model)
+    
+    def _build_completion(
+        self,
+        model: str,
+        prompt: Optional[str],
+        messages: Optional[List[Dict[str, str]]],
+        max_tokens: Optional[int],
+        system_message: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build a completion response echoing the last user input."""
+        if prompt is not None:
+            text = prompt
+        else:
+            user_messages = [m.get("content", "") for m in messages or [] if m.get("role") == "user"]
+            text = user_messages[-1] if user_messages else ""
+        
+        words = f"Response to: {text}".split()
+        if max_tokens is not None:
+            words = words[:max_tokens]
+        content = " ".join(words)
+        
+        prompt_tokens = len(((system_message or "") + " " + text).split())
+        completion_tokens = len(words)
+        return {
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+    
+    def _build_embeddings(self, input: Union[str, List[str]], model: str) -> Dict[str, Any]:
+        """Build an embedding response with vectors derived from text hashes."""
+        texts = input if isinstance(input, list) else [input]
+        data = []
+        for index, text in enumerate(texts):
+            digest = hashlib.sha256(text.encode("utf-8")).digest()
+            embedding = [digest[i % len(digest)] / 255.0 for i in range(self.embedding_dimension)]
+            data.append({"index": index, "embedding": embedding})
+        return {
+            "model": model,
+            "data": data,
+            "usage": {"total_tokens": sum(len(text.split()) for text in texts)}
+        }
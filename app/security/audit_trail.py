@@ -11,6 +11,8 @@ import logging
 import time
 import uuid
 import hashlib
+import gzip
+import shutil
 import threading
 from typing import Dict, List, Optional, Union, Any, Tuple
 from enum import Enum
@@ -222,6 +224,18 @@ class AuditEventStorage:
         """
         raise NotImplementedError("Subclasses must implement this method")
     
+    def store_events(self, events: List[AuditEvent]) -> int:
+        """
+        Store several audit events.
+        
+        Args:
+            events: Audit events to store
+            
+        Returns:
+            Number of events stored successfully
+        """
+        return sum(1 for event in events if self.store_event(event))
+    
     def get_event(self, event_id: str) -> Optional[AuditEvent]:
         """
         Get an audit event by ID.
@@ -303,18 +317,178 @@ class AuditEventStorage:
         pass
 
 
+def _matches_filters(event_data: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """
+    Check whether event data matches all filters.
+    
+    Args:
+        event_data: Dictionary representation of an audit event
+        filters: Field values that must match
+        
+    Returns:
+        True if every filter matches, False otherwise
+    """
+    for key, value in filters.items():
+        if key not in event_data or event_data[key] != value:
+            return False
+    return True
+
+
+class _AuditLogSegment:
+    """A segment file of the file-based audit log and the index of its events."""
+    
+    def __init__(self, path: str, sequence: Optional[int] = None, compressed: bool = False):
+        """
+        Initialize the segment.
+        
+        Args:
+            path: Path to the segment file
+            sequence: Sequence number of a sealed segment, None for the active segment
+            compressed: Whether the segment file is gzip-compressed
+        """
+        self.path = path
+        self.sequence = sequence
+        self.compressed = compressed
+        self.size = 0
+        # Incremented whenever the segment file is rewritten
+        self.generation = 0
+        # Event ID -> (offset, length, timestamp), in file order
+        self.entries: Dict[str, Tuple[int, int, float]] = {}
+        self.min_time: Optional[float] = None
+        self.max_time: Optional[float] = None
+    
+    @property
+    def index_path(self) -> str:
+        """Get the path of the sidecar index of a sealed segment."""
+        base = self.path[:-3] if self.compressed else self.path
+        return base + ".idx"
+    
+    def add(self, event_id: str, offset: int, length: int, timestamp: float):
+        """
+        Add an event to the index.
+        
+        Args:
+            event_id: ID of the event
+            offset: Offset of the event line in the uncompressed segment
+            length: Length of the event line in bytes
+            timestamp: Timestamp of the event
+        """
+        self.entries[event_id] = (offset, length, timestamp)
+        if self.min_time is None or timestamp < self.min_time:
+            self.min_time = timestamp
+        if self.max_time is None or timestamp > self.max_time:
+            self.max_time = timestamp
+    
+    def reset(self):
+        """Clear the index."""
+        self.size = 0
+        self.entries = {}
+        self.min_time = None
+        self.max_time = None
+    
+    def overlaps(self, start_time: Optional[float], end_time: Optional[float]) -> bool:
+        """
+        Check whether the segment may hold events in a time range.
+        
+        Args:
+            start_time: Start time (inclusive)
+            end_time: End time (exclusive)
+            
+        Returns:
+            True if the segment has events in the range, False otherwise
+        """
+        if not self.entries:
+            return False
+        if start_time is not None and self.max_time < start_time:
+            return False
+        if end_time is not None and self.min_time >= end_time:
+            return False
+        return True
+    
+    def open(self):
+        """Open the segment file for binary reading."""
+        if self.compressed:
+            return gzip.open(self.path, "rb")
+        return open(self.path, "rb")
+    
+    def scan(self):
+        """Rebuild the index by reading the segment file."""
+        self.reset()
+        with self.open() as f:
+            for line in f:
+                try:
+                    event_data = json.loads(line)
+                    self.add(event_data["id"], self.size, len(line), event_data.get("timestamp", 0))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    pass
+                self.size += len(line)
+    
+    def save_index(self):
+        """Write the sidecar index of a sealed segment."""
+        index = {
+            "size": self.size,
+            "entries": [[event_id] + list(entry) for event_id, entry in self.entries.items()]
+        }
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(temp_path, self.index_path)
+    
+    def load_index(self) -> bool:
+        """
+        Load the sidecar index of a sealed segment.
+        
+        Returns:
+            True if the index was loaded, False if it is missing or invalid
+        """
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            self.reset()
+            for event_id, offset, length, timestamp in index["entries"]:
+                self.add(event_id, offset, length, timestamp)
+            self.size = index["size"]
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+
 class FileAuditEventStorage(AuditEventStorage):
-    """File-based audit event storage backend."""
+    """
+    File-based audit event storage backend.
+    
+    Events are appended as JSON lines to the active segment at ``file_path``.
+    When it grows past ``max_segment_bytes`` it is sealed as
+    ``<file_path>.<sequence>``, optionally gzip-compressed, next to a sidecar
+    ``.idx`` index of event offsets and timestamps. Lookups by ID seek directly
+    to the event, queries skip segments outside the requested time range, and
+    deletes only rewrite the segments they touch.
+    """
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, max_segment_bytes: int = 64 * 1024 * 1024,
+               compress_sealed: bool = False, batch_size: int = 1,
+               flush_interval: float = 1.0, fsync: bool = False):
         """
         Initialize the file-based audit event storage.
         
         Args:
             file_path: Path to the audit log file
+            max_segment_bytes: Size at which the active segment is sealed
+            compress_sealed: Whether to gzip-compress sealed segments
+            batch_size: Number of events buffered before they are written together
+            flush_interval: Maximum time in seconds an event stays buffered
+            fsync: Whether to fsync the active segment after each write
         """
         self.file_path = file_path
-        self.lock = threading.Lock()
+        self.max_segment_bytes = max_segment_bytes
+        self.compress_sealed = compress_sealed
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        
+        self._buffer: List[AuditEvent] = []
+        self._flush_timer: Optional[threading.Timer] = None
         
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
@@ -323,6 +497,51 @@ class FileAuditEventStorage(AuditEventStorage):
         if not os.path.exists(file_path):
             with open(file_path, "w") as f:
                 f.write("")
+        
+        self._segments = self._load_sealed_segments()
+        self._locations: Dict[str, _AuditLogSegment] = {}
+        for segment in self._segments:
+            for event_id in segment.entries:
+                self._locations[event_id] = segment
+        
+        self._active = _AuditLogSegment(file_path)
+        self._active.scan()
+        for event_id in self._active.entries:
+            self._locations[event_id] = self._active
+        self._active_file = open(file_path, "ab")
+    
+    def _load_sealed_segments(self) -> List['_AuditLogSegment']:
+        """
+        Find the sealed segments of the audit log and load their indexes.
+        
+        Returns:
+            Sealed segments ordered by sequence number
+        """
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        prefix = os.path.basename(self.file_path) + "."
+        
+        segments = []
+        for name in os.listdir(directory):
+            if not name.startswith(prefix):
+                continue
+            suffix = name[len(prefix):]
+            compressed = suffix.endswith(".gz")
+            if compressed:
+                suffix = suffix[:-3]
+            if not suffix.isdigit():
+                continue
+            
+            segment = _AuditLogSegment(os.path.join(directory, name), int(suffix), compressed)
+            if not segment.load_index():
+                segment.scan()
+                segment.save_index()
+            segments.append(segment)
+        
+        # A segment may exist both plain and compressed if compression was interrupted
+        unique = {}
+        for segment in sorted(segments, key=lambda s: (s.sequence, not s.compressed)):
+            unique.setdefault(segment.sequence, segment)
+        return [unique[sequence] for sequence in sorted(unique)]
     
     def store_event(self, event: AuditEvent) -> bool:
         """
@@ -334,14 +553,182 @@ class FileAuditEventStorage(AuditEventStorage):
         Returns:
             True if the event was stored successfully, False otherwise
         """
+        return self.store_events([event]) == 1
+    
+    def store_events(self, events: List[AuditEvent]) -> int:
+        """
+        Store several audit events with a single write.
+        
+        Args:
+            events: Audit events to store
+            
+        Returns:
+            Number of events stored or buffered
+        """
         try:
             with self.lock:
-                with open(self.file_path, "a") as f:
-                    f.write(json.dumps(event.to_dict()) + "\n")
-            return True
+                self._buffer.extend(events)
+                if len(self._buffer) >= self.batch_size:
+                    sealed = self._flush_locked()
+                elif self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                    sealed = None
+                else:
+                    sealed = None
+            
+            if sealed is not None and self.compress_sealed:
+                self._compress_segment(sealed)
+            return len(events)
         except Exception as e:
             logging.error(f"Error storing audit event: {e}")
-            return False
+            return 0
+    
+    def flush(self):
+        """Write buffered events to the active segment."""
+        try:
+            with self.lock:
+                sealed = self._flush_locked()
+            if sealed is not None and self.compress_sealed:
+                self._compress_segment(sealed)
+        except Exception as e:
+            logging.error(f"Error flushing audit events: {e}")
+    
+    def _flush_locked(self) -> Optional['_AuditLogSegment']:
+        """
+        Write buffered events to the active segment. The lock must be held.
+        
+        Returns:
+            The segment sealed to make room for the events, if any
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        
+        if not self._buffer:
+            return None
+        
+        lines = [(event, (json.dumps(event.to_dict()) + "\n").encode("utf-8")) for event in self._buffer]
+        
+        sealed = None
+        batch_bytes = sum(len(line) for _, line in lines)
+        if self._active.size and self._active.size + batch_bytes > self.max_segment_bytes:
+            sealed = self._seal_active_locked()
+        
+        self._active_file.write(b"".join(line for _, line in lines))
+        self._active_file.flush()
+        if self.fsync:
+            os.fsync(self._active_file.fileno())
+        
+        for event, line in lines:
+            self._active.add(event.id, self._active.size, len(line), event.timestamp)
+            self._active.size += len(line)
+            self._locations[event.id] = self._active
+        
+        self._buffer = []
+        return sealed
+    
+    def _seal_active_locked(self) -> '_AuditLogSegment':
+        """
+        Seal the active segment and start a new one. The lock must be held.
+        
+        Returns:
+            The sealed segment
+        """
+        self._active_file.close()
+        
+        sequence = self._segments[-1].sequence + 1 if self._segments else 1
+        sealed = self._active
+        sealed.sequence = sequence
+        sealed.path = f"{self.file_path}.{sequence:06d}"
+        os.replace(self.file_path, sealed.path)
+        sealed.save_index()
+        self._segments.append(sealed)
+        
+        self._active = _AuditLogSegment(self.file_path)
+        self._active_file = open(self.file_path, "ab")
+        return sealed
+    
+    def _compress_segment(self, segment: '_AuditLogSegment'):
+        """
+        Gzip-compress a sealed segment without holding the lock while compressing.
+        
+        Args:
+            segment: The sealed segment
+        """
+        plain_path = segment.path
+        generation = segment.generation
+        compressed_path = plain_path + ".gz"
+        temp_path = compressed_path + ".tmp"
+        try:
+            with open(plain_path, "rb") as source, gzip.open(temp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            
+            with self.lock:
+                # Skip if the segment was rewritten or deleted in the meantime
+                if segment.generation != generation or segment not in self._segments:
+                    os.remove(temp_path)
+                    return
+                os.replace(temp_path, compressed_path)
+                segment.path = compressed_path
+                segment.compressed = True
+                os.remove(plain_path)
+        except Exception as e:
+            logging.error(f"Error compressing audit log segment {plain_path}: {e}")
+    
+    def _snapshot(self, start_time: Optional[float],
+                end_time: Optional[float]) -> List[Tuple[Any, List[Tuple[str, Tuple[int, int, float]]]]]:
+        """
+        Open the segments overlapping a time range and copy their indexes.
+        
+        Open files keep their contents even if a segment is rewritten, so the
+        snapshot can be read without holding the lock.
+        
+        Args:
+            start_time: Start time (inclusive)
+            end_time: End time (exclusive)
+            
+        Returns:
+            List of (open file, index entries) pairs in log order
+        """
+        with self.lock:
+            self._flush_locked()
+            snapshot = []
+            for segment in self._segments + [self._active]:
+                if segment.overlaps(start_time, end_time):
+                    snapshot.append((segment.open(), list(segment.entries.items())))
+            return snapshot
+    
+    def _iter_events(self, filters: Dict[str, Any], start_time: Optional[float],
+                   end_time: Optional[float]):
+        """
+        Iterate over the data of events matching a query, in log order.
+        
+        Args:
+            filters: Filters to apply to the query
+            start_time: Start time (inclusive)
+            end_time: End time (exclusive)
+            
+        Yields:
+            Dictionary representations of matching events
+        """
+        snapshot = self._snapshot(start_time, end_time)
+        try:
+            for handle, entries in snapshot:
+                for event_id, (offset, length, timestamp) in entries:
+                    if start_time is not None and timestamp < start_time:
+                        continue
+                    if end_time is not None and timestamp >= end_time:
+                        continue
+                    
+                    handle.seek(offset)
+                    event_data = json.loads(handle.read(length))
+                    if _matches_filters(event_data, filters):
+                        yield event_data
+        finally:
+            for handle, _ in snapshot:
+                handle.close()
     
     def get_event(self, event_id: str) -> Optional[AuditEvent]:
         """
@@ -355,15 +742,16 @@ class FileAuditEventStorage(AuditEventStorage):
         """
         try:
             with self.lock:
-                with open(self.file_path, "r") as f:
-                    for line in f:
-                        try:
-                            event_data = json.loads(line.strip())
-                            if event_data.get("id") == event_id:
-                                return AuditEvent.from_dict(event_data)
-                        except json.JSONDecodeError:
-                            continue
-            return None
+                self._flush_locked()
+                segment = self._locations.get(event_id)
+                if segment is None:
+                    return None
+                offset, length, _ = segment.entries[event_id]
+                handle = segment.open()
+            
+            with handle:
+                handle.seek(offset)
+                return AuditEvent.from_dict(json.loads(handle.read(length)))
         except Exception as e:
             logging.error(f"Error getting audit event: {e}")
             return None
@@ -393,42 +781,18 @@ class FileAuditEventStorage(AuditEventStorage):
         skipped = 0
         
         try:
-            with self.lock:
-                with open(self.file_path, "r") as f:
-                    for line in f:
-                        try:
-                            event_data = json.loads(line.strip())
-                            
-                            # Apply time filters
-                            timestamp = event_data.get("timestamp", 0)
-                            if start_time is not None and timestamp < start_time:
-                                continue
-                            if end_time is not None and timestamp >= end_time:
-                                continue
-                            
-                            # Apply other filters
-                            match = True
-                            for key, value in filters.items():
-                                if key not in event_data or event_data[key] != value:
-                                    match = False
-                                    break
-                            
-                            if not match:
-                                continue
-                            
-                            # Apply offset
-                            if offset is not None and skipped < offset:
-                                skipped += 1
-                                continue
-                            
-                            # Add event to results
-                            events.append(AuditEvent.from_dict(event_data))
-                            
-                            # Apply limit
-                            if limit is not None and len(events) >= limit:
-                                break
-                        except json.JSONDecodeError:
-                            continue
+            for event_data in self._iter_events(filters, start_time, end_time):
+                # Apply offset
+                if offset is not None and skipped < offset:
+                    skipped += 1
+                    continue
+                
+                # Add event to results
+                events.append(AuditEvent.from_dict(event_data))
+                
+                # Apply limit
+                if limit is not None and len(events) >= limit:
+                    break
             
             return events
         except Exception as e:
@@ -449,40 +813,27 @@ class FileAuditEventStorage(AuditEventStorage):
         Returns:
             Number of audit events matching the query
         """
-        if filters is None:
-            filters = {}
-        
-        count = 0
-        
         try:
+            if filters:
+                return sum(1 for _ in self._iter_events(filters, start_time, end_time))
+            
+            # Without filters the indexes alone answer the query
+            count = 0
             with self.lock:
-                with open(self.file_path, "r") as f:
-                    for line in f:
-                        try:
-                            event_data = json.loads(line.strip())
-                            
-                            # Apply time filters
-                            timestamp = event_data.get("timestamp", 0)
-                            if start_time is not None and timestamp < start_time:
-                                continue
-                            if end_time is not None and timestamp >= end_time:
-                                continue
-                            
-                            # Apply other filters
-                            match = True
-                            for key, value in filters.items():
-                                if key not in event_data or event_data[key] != value:
-                                    match = False
-                                    break
-                            
-                            if not match:
-                                continue
-                            
-                            # Increment count
-                            count += 1
-                        except json.JSONDecodeError:
+                self._flush_locked()
+                for segment in self._segments + [self._active]:
+                    if not segment.overlaps(start_time, end_time):
+                        continue
+                    if ((start_time is None or segment.min_time >= start_time) and
+                            (end_time is None or segment.max_time < end_time)):
+                        count += len(segment.entries)
+                        continue
+                    for _, _, timestamp in segment.entries.values():
+                        if start_time is not None and timestamp < start_time:
                             continue
-            
+                        if end_time is not None and timestamp >= end_time:
+                            continue
+                        count += 1
             return count
         except Exception as e:
             logging.error(f"Error counting audit events: {e}")
@@ -500,22 +851,16 @@ class FileAuditEventStorage(AuditEventStorage):
         """
         try:
             with self.lock:
-                # Read all events
-                events = []
-                with open(self.file_path, "r") as f:
-                    for line in f:
-                        try:
-                            event_data = json.loads(line.strip())
-                            if event_data.get("id") != event_id:
-                                events.append(line)
-                        except json.JSONDecodeError:
-                            events.append(line)
+                self._flush_locked()
+                segment = self._locations.get(event_id)
+                if segment is None:
+                    return False
                 
-                # Write back all events except the one to delete
-                with open(self.file_path, "w") as f:
-                    f.writelines(events)
+                deleted = self._rewrite_segment_locked(
+                    segment, lambda event_data: event_data.get("id") == event_id
+                )
             
-            return True
+            return deleted > 0
         except Exception as e:
             logging.error(f"Error deleting audit event: {e}")
             return False
@@ -537,50 +882,111 @@ class FileAuditEventStorage(AuditEventStorage):
         if filters is None:
             filters = {}
         
+        def should_delete(event_data: Dict[str, Any]) -> bool:
+            timestamp = event_data.get("timestamp", 0)
+            if start_time is not None and timestamp < start_time:
+                return False
+            if end_time is not None and timestamp >= end_time:
+                return False
+            return _matches_filters(event_data, filters)
+        
         deleted_count = 0
         
         try:
             with self.lock:
-                # Read all events
-                events_to_keep = []
-                with open(self.file_path, "r") as f:
-                    for line in f:
-                        try:
-                            event_data = json.loads(line.strip())
-                            
-                            # Apply time filters
-                            timestamp = event_data.get("timestamp", 0)
-                            if start_time is not None and timestamp < start_time:
-                                events_to_keep.append(line)
-                                continue
-                            if end_time is not None and timestamp >= end_time:
-                                events_to_keep.append(line)
-                                continue
-                            
-                            # Apply other filters
-                            match = True
-                            for key, value in filters.items():
-                                if key not in event_data or event_data[key] != value:
-                                    match = False
-                                    break
-                            
-                            if not match:
-                                events_to_keep.append(line)
-                                continue
-                            
-                            # Event matches filters, don't keep it
-                            deleted_count += 1
-                        except json.JSONDecodeError:
-                            events_to_keep.append(line)
-                
-                # Write back events to keep
-                with open(self.file_path, "w") as f:
-                    f.writelines(events_to_keep)
+                self._flush_locked()
+                for segment in list(self._segments) + [self._active]:
+                    if not segment.overlaps(start_time, end_time):
+                        continue
+                    
+                    # Sealed segments entirely inside the range are dropped without reading them
+                    covered = ((start_time is None or segment.min_time >= start_time) and
+                               (end_time is None or segment.max_time < end_time))
+                    if covered and not filters and segment is not self._active:
+                        deleted_count += len(segment.entries)
+                        self._drop_segment_locked(segment)
+                        continue
+                    
+                    deleted_count += self._rewrite_segment_locked(segment, should_delete)
             
             return deleted_count
         except Exception as e:
             logging.error(f"Error deleting audit events: {e}")
+            return deleted_count
+    
+    def _drop_segment_locked(self, segment: '_AuditLogSegment'):
+        """
+        Remove a sealed segment and its index. The lock must be held.
+        
+        Args:
+            segment: The sealed segment
+        """
+        for event_id in segment.entries:
+            if self._locations.get(event_id) is segment:
+                del self._locations[event_id]
+        self._segments.remove(segment)
+        os.remove(segment.path)
+        if os.path.exists(segment.index_path):
+            os.remove(segment.index_path)
+    
+    def _rewrite_segment_locked(self, segment: '_AuditLogSegment', should_delete) -> int:
+        """
+        Rewrite a segment without the events selected for deletion. The lock must be held.
+        
+        Lines that cannot be parsed are kept. The new file replaces the old one
+        atomically, so readers holding the old file are not affected.
+        
+        Args:
+            segment: The segment to rewrite
+            should_delete: Function of event data returning True for events to delete
+            
+        Returns:
+            Number of events deleted
+        """
+        is_active = segment is self._active
+        temp_path = segment.path + ".tmp"
+        deleted_ids = []
+        
+        with segment.open() as source:
+            target = gzip.open(temp_path, "wb") if segment.compressed else open(temp_path, "wb")
+            with target:
+                for line in source:
+                    try:
+                        event_data = json.loads(line)
+                        if should_delete(event_data):
+                            deleted_ids.append(event_data.get("id"))
+                            continue
+                    except json.JSONDecodeError:
+                        pass
+                    target.write(line)
+        
+        if not deleted_ids:
+            os.remove(temp_path)
             return 0
+        
+        if is_active:
+            self._active_file.close()
+        os.replace(temp_path, segment.path)
+        segment.generation += 1
+        
+        for event_id in deleted_ids:
+            if self._locations.get(event_id) is segment:
+                del self._locations[event_id]
+        
+        segment.scan()
+        if is_active:
+            self._active_file = open(segment.path, "ab")
+        else:
+            segment.save_index()
+        
+        return len(deleted_ids)
+    
+    def close(self):
+        """Flush buffered events and close the active segment."""
+        self.flush()
+        with self.lock:
+            if not self._active_file.closed:
+                self._active_file.close()
 
 
 class SQLiteAuditEventStorage(AuditEventStorage):
@@ -979,7 +1385,7 @@ class AuditTrailSystem:
     """
     
     def __init__(self, storage: AuditEventStorage, async_mode: bool = True,
-               max_queue_size: int = 1000):
+               max_queue_size: int = 1000, max_batch_size: int = 100):
         """
         Initialize the audit trail system.
         
@@ -987,10 +1393,12 @@ class AuditTrailSystem:
             storage: Storage backend for audit events
             async_mode: Whether to log events asynchronously
             max_queue_size: Maximum size of the event queue in async mode
+            max_batch_size: Maximum number of queued events stored together in async mode
         """
         self.storage = storage
         self.async_mode = async_mode
         self.max_queue_size = max_queue_size
+        self.max_batch_size = max(1, max_batch_size)
         self.logger = logging.getLogger(__name__)
         
         # Initialize async processing if needed
@@ -1240,16 +1648,22 @@ class AuditTrailSystem:
         """Process events from the queue (async mode)."""
         while self.running:
             try:
-                # Get event from queue
-                event = self.event_queue.get(block=True, timeout=1.0)
+                # Get event from queue, then whatever else is already queued
+                events = [self.event_queue.get(block=True, timeout=1.0)]
+                while len(events) < self.max_batch_size:
+                    try:
+                        events.append(self.event_queue.get(block=False))
+                    except queue.Empty:
+                        break
                 
-                # Store event
-                success = self.storage.store_event(event)
-                if not success:
-                    self.logger.error(f"Failed to store audit event: {event.id}")
+                # Store events together so that file storage writes them at once
+                stored = self.storage.store_events(events)
+                if stored < len(events):
+                    self.logger.error(f"Failed to store {len(events) - stored} of {len(events)} audit events")
                 
-                # Mark task as done
-                self.event_queue.task_done()
+                # Mark tasks as done
+                for _ in events:
+                    self.event_queue.task_done()
             except queue.Empty:
                 # Queue is empty, continue waiting
                 pass
@@ -36,6 +36,7 @@ from PIL import Image
 import io
 import base64
 
+from app.core.embedding_service import EmbeddingService, EmbeddingCache
 from .vector_db import VectorDatabaseFactory
 
 # Configure logging
@@ -63,6 +64,15 @@ class KnowledgeExtractionPipeline:
         self.enable_image_extraction = self.config.get("enable_image_extraction", True)
         self.image_model = self.config.get("image_model", "clip")
         
+        # Embeddings are batched and cached by content hash. They are simulated,
+        # so they are cached apart from those of the real model.
+        self.embedding_service = EmbeddingService(
+            self._embed_batch,
+            f"mock:{self.embedding_model}",
+            batch_size=self.config.get("embedding_batch_size", 32),
+            cache=EmbeddingCache(self.config.get("embedding_cache_dir"))
+        )
+        
         # Initialize vector database
         self._initialize_vector_db()
         
@@ -854,6 +864,18 @@ class KnowledgeExtractionPipeline:
     def _get_embeddings(self, texts: List[str]) -> List[np.ndarray]:
         """Get embeddings for a list of texts.
         
+        Cached embeddings are reused; the remaining texts are embedded in batches.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            List of embeddings"""
+        return self.embedding_service.embed(texts)
+    
+    def _embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed a batch of texts with the embedding model.
+        
         Args:
             texts: List of texts to embed
             
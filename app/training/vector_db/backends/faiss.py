@@ -17,9 +17,11 @@
 This module provides a FAISS implementation of the vector database interface."""
 
 import logging
+import math
 import uuid
 import os
 import pickle
+import shutil
 import numpy as np
 from typing import Dict, List, Any, Optional, Union, Tuple
 import json
@@ -32,10 +34,32 @@ from ..models import Document, QueryResult, SearchParams
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MANIFEST_FILE = 'manifest.json'
+SEGMENT_FORMAT_VERSION = 2
+
+# Manifest fields copied to and from the collection state
+MANIFEST_STATE_KEYS = ('next_label', 'trained', 'trained_count', 'removed_since_train', 'generation',
+                       'index_file', 'index_labels', 'index_removed', 'index_checkpoint_size',
+                       'log_file', 'log_size', 'offsets_file', 'offsets_size',
+                       'total_records', 'dead_records')
+
 class FAISSVectorDB(VectorDBInterface):
     """FAISS implementation of the vector database interface.
     
-    This implementation uses FAISS as the backend for vector storage and retrieval."""
+    This implementation uses FAISS as the backend for vector storage and retrieval.
+    
+    Each collection is persisted as a directory of segment files: a native
+    FAISS index checkpoint, memory-mapped ``.npy`` embedding segments, an
+    append-only JSONL document log with a sidecar offset index, and a
+    ``manifest.json`` that is atomically replaced on every flush. Writes are
+    batched in memory until ``flush()`` and collections are only loaded on
+    first access.
+    
+    The FAISS index is only rewritten once the vectors added and removed
+    since the last checkpoint exceed ``index_checkpoint_ratio`` of it; on
+    load, the checkpoint is brought up to date from the embedding segments.
+    Embedding segments of similar size are merged in tiers of
+    ``segment_merge_factor``, dropping rows of deleted documents."""
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize the FAISS vector database.
@@ -61,15 +85,23 @@ class FAISSVectorDB(VectorDBInterface):
         self.metric_type = config.get('metric_type', 'cosine')
         self.nlist = config.get('nlist', 100)
         self.nprobe = config.get('nprobe', 10)
+        self.retrain_threshold = config.get('retrain_threshold', 0.3)
+        self.flush_batch_size = config.get('flush_batch_size', 1000)
+        self.max_embedding_segments = config.get('max_embedding_segments', 16)
+        self.segment_merge_factor = max(2, config.get('segment_merge_factor', 4))
+        self.index_checkpoint_ratio = config.get('index_checkpoint_ratio', 0.5)
+        self.compaction_ratio = config.get('compaction_ratio', 0.5)
+        self.compaction_min_records = config.get('compaction_min_records', 1000)
         
         # Create persist directory if it doesn't exist
         os.makedirs(self.persist_directory, exist_ok=True)
         
-        # Initialize collections
+        # Initialize collections; loaded lazily on first access
         self.collections: Dict[str, Dict[str, Any]] = {}
+        self._collection_names: set = set()
         
-        # Load existing collections
-        self._load_collections()
+        # Discover existing collections
+        self._discover_collections()
         
         logger.info(f"Initialized FAISS vector database with persist directory: {self.persist_directory}")
     
@@ -88,42 +120,15 @@ class FAISSVectorDB(VectorDBInterface):
                 return False
             
             # Create FAISS index
-            if self.metric_type == 'cosine':
-                # For cosine similarity, we need to normalize vectors
-                index = self._faiss.IndexFlatIP(self.dimension)
-            elif self.metric_type == 'l2':
-                index = self._faiss.IndexFlatL2(self.dimension)
-            else:
-                # Default to inner product
-                index = self._faiss.IndexFlatIP(self.dimension)
-            
-            # Create IVF index if specified
-            if self.index_type == 'IVF':
-                # Create quantizer
-                quantizer = index
-                
-                # Create IVF index
-                if self.metric_type == 'cosine':
-                    index = self._faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, self._faiss.METRIC_INNER_PRODUCT)
-                elif self.metric_type == 'l2':
-                    index = self._faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, self._faiss.METRIC_L2)
-                else:
-                    index = self._faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, self._faiss.METRIC_INNER_PRODUCT)
-                
-                # Set search parameters
-                index.nprobe = self.nprobe
+            index = self._create_index()
             
             # Initialize collection data
-            self.collections[collection_name] = {
-                'index': index,
-                'documents': {},
-                'document_ids': [],
-                'embeddings': [],
-                'trained': False
-            }
+            collection = self._new_collection(self._collection_path(collection_name), index)
+            self.collections[collection_name] = collection
+            self._collection_names.add(collection_name)
             
-            # Save collection
-            self._save_collection(collection_name)
+            # Persist the empty collection
+            self._flush_collection(collection)
             
             logger.info(f"Created collection: {collection_name}")
             return True
@@ -146,13 +151,16 @@ class FAISSVectorDB(VectorDBInterface):
                 return False
             
             # Remove collection from memory
-            if collection_name in self.collections:
-                del self.collections[collection_name]
+            collection = self.collections.pop(collection_name, None)
+            if collection is not None:
+                self._close_reader(collection)
+            self._collection_names.discard(collection_name)
             
             # Remove collection files
-            collection_path = os.path.join(self.persist_directory, f"{collection_name}.pkl")
-            if os.path.exists(collection_path):
-                os.remove(collection_path)
+            shutil.rmtree(self._collection_path(collection_name), ignore_errors=True)
+            legacy_path = os.path.join(self.persist_directory, f"{collection_name}.pkl")
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
             
             logger.info(f"Deleted collection: {collection_name}")
             return True
@@ -166,7 +174,7 @@ class FAISSVectorDB(VectorDBInterface):
         Returns:
             List of collection names"""
         try:
-            return list(self.collections.keys())
+            return sorted(self._collection_names)
         except Exception as e:
             logger.error(f"Error listing collections: {str(e)}")
             return []
@@ -180,7 +188,7 @@ class FAISSVectorDB(VectorDBInterface):
         Returns:
             True if the collection exists, False otherwise"""
         try:
-            return collection_name in self.collections
+            return collection_name in self._collection_names
         except Exception as e:
             logger.error(f"Error checking if collection {collection_name} exists: {str(e)}")
             return False
@@ -188,6 +196,11 @@ class FAISSVectorDB(VectorDBInterface):
     def add_documents(self, collection_name: str, documents: List[Document]) -> List[str]:
         """Add documents to a collection.
         
+        Documents whose ID already exists in the collection replace the
+        stored version. Documents without an embedding of the collection's
+        dimension are skipped, so a stored document is never replaced by one
+        that cannot be indexed.
+        
         Args:
             collection_name: Name of the collection
             documents: List of documents to add
@@ -201,51 +214,33 @@ class FAISSVectorDB(VectorDBInterface):
                 self.create_collection(collection_name)
             
             # Get collection
-            collection = self.collections[collection_name]
+            collection = self._get_collection(collection_name)
             
-            # Prepare data
-            document_ids = []
-            new_embeddings = []
+            # Keep only the last occurrence of each ID within the batch
+            latest = {document.id: position for position, document in enumerate(documents) if document.id is not None}
+            documents = [document for position, document in enumerate(documents)
+                         if document.id is None or latest[document.id] == position]
             
-            for document in documents:
-                # Skip documents without embeddings
-                if document.embedding is None:
-                    logger.warning(f"Document has no embedding, skipping")
-                    continue
-                
-                # Generate ID if not provided
-                doc_id = document.id or str(uuid.uuid4())
-                document_ids.append(doc_id)
-                
-                # Store document
-                collection['documents'][doc_id] = document
-                collection['document_ids'].append(doc_id)
-                
-                # Prepare embedding
-                embedding = np.array(document.embedding, dtype=np.float32)
-                
-                # Normalize for cosine similarity
-                if self.metric_type == 'cosine':
-                    embedding = embedding / np.linalg.norm(embedding)
-                
-                # Add to embeddings list
-                new_embeddings.append(embedding)
-                collection['embeddings'].append(embedding)
+            # Documents without a usable embedding cannot be indexed; keep any stored version
+            skipped = [document for document in documents if not self._has_valid_embedding(document)]
+            if skipped:
+                logger.warning(f"Skipping {len(skipped)} documents without embeddings of dimension {self.dimension}")
+                documents = [document for document in documents if self._has_valid_embedding(document)]
             
-            # Convert to numpy array
-            if new_embeddings:
-                new_embeddings_array = np.array(new_embeddings, dtype=np.float32)
-                
-                # Train index if needed
-                if not collection['trained'] and hasattr(collection['index'], 'train'):
-                    collection['index'].train(new_embeddings_array)
-                    collection['trained'] = True
-                
-                # Add to index
-                collection['index'].add(new_embeddings_array)
+            # Replace any documents that are already stored under the same ID
+            existing_ids = [document.id for document in documents
+                            if document.id is not None and document.id in collection['id_map']]
+            if existing_ids:
+                self._remove_from_index(collection, existing_ids)
+            
+            document_ids = self._add_to_index(collection, documents)
             
-            # Save collection
-            self._save_collection(collection_name)
+            # Replacements remove vectors the IVF index was trained on
+            if existing_ids and self._needs_retrain(collection):
+                self._retrain_index(collection)
+            
+            # Batch the write to disk
+            self._mark_dirty(collection, len(existing_ids) + len(document_ids))
             
             logger.info(f"Added {len(document_ids)} documents to collection: {collection_name}")
             return document_ids
@@ -253,6 +248,20 @@ class FAISSVectorDB(VectorDBInterface):
             logger.error(f"Error adding documents to collection {collection_name}: {str(e)}")
             return []
     
+    def upsert_documents(self, collection_name: str, documents: List[Document]) -> List[str]:
+        """Insert or replace a batch of documents in a collection.
+        
+        Existing vectors are removed by ID and the new versions are added in
+        a single index operation, with one save for the whole batch.
+        
+        Args:
+            collection_name: Name of the collection
+            documents: List of documents to upsert
+            
+        Returns:
+            List of document IDs"""
+        return self.add_documents(collection_name, documents)
+    
     def get_document(self, collection_name: str, document_id: str) -> Optional[Document]:
         """Get a document by ID.
         
@@ -269,14 +278,10 @@ class FAISSVectorDB(VectorDBInterface):
                 return None
             
             # Get collection
-            collection = self.collections[collection_name]
-            
-            # Check if document exists
-            if document_id not in collection['documents']:
-                return None
+            collection = self._get_collection(collection_name)
             
             # Return document
-            return collection['documents'][document_id]
+            return self._read_document(collection, document_id, include_embedding=True)
         except Exception as e:
             logger.error(f"Error getting document {document_id} from collection {collection_name}: {str(e)}")
             return None
@@ -290,89 +295,55 @@ class FAISSVectorDB(VectorDBInterface):
             
         Returns:
             True if successful, False otherwise"""
+        if not self.collection_exists(collection_name):
+            logger.warning(f"Collection does not exist: {collection_name}")
+            return False
+        
+        if document_id not in self._get_collection(collection_name)['id_map']:
+            logger.warning(f"Document does not exist: {document_id}")
+            return False
+        
+        return document_id in self.delete_documents(collection_name, [document_id])
+    
+    def delete_documents(self, collection_name: str, document_ids: List[str]) -> List[str]:
+        """Delete a batch of documents by ID.
+        
+        Vectors are removed from the ID-mapped index in place. IVF indexes are
+        only retrained once the share of vectors removed since the last
+        training exceeds ``retrain_threshold``.
+        
+        Args:
+            collection_name: Name of the collection
+            document_ids: IDs of the documents to delete
+            
+        Returns:
+            List of IDs that were deleted"""
         try:
             # Check if collection exists
             if not self.collection_exists(collection_name):
                 logger.warning(f"Collection does not exist: {collection_name}")
-                return False
+                return []
             
             # Get collection
-            collection = self.collections[collection_name]
-            
-            # Check if document exists
-            if document_id not in collection['documents']:
-                logger.warning(f"Document does not exist: {document_id}")
-                return False
-            
-            # FAISS doesn't support removing individual vectors
-            # We need to rebuild the index without the deleted document
+            collection = self._get_collection(collection_name)
             
-            # Get document index
-            doc_index = collection['document_ids'].index(document_id)
+            deleted_ids = [doc_id for doc_id in dict.fromkeys(document_ids) if doc_id in collection['id_map']]
+            if not deleted_ids:
+                return []
             
-            # Remove document
-            del collection['documents'][document_id]
-            collection['document_ids'].pop(doc_index)
-            collection['embeddings'].pop(doc_index)
+            self._remove_from_index(collection, deleted_ids)
             
-            # Rebuild index
-            if collection['embeddings']:
-                # Create new index
-                if self.metric_type == 'cosine':
-                    index = self._faiss.IndexFlatIP(self.dimension)
-                elif self.metric_type == 'l2':
-                    index = self._faiss.IndexFlatL2(self.dimension)
-                else:
-                    index = self._faiss.IndexFlatIP(self.dimension)
-                
-                # Create IVF index if specified
-                if self.index_type == 'IVF':
-                    # Create quantizer
-                    quantizer = index
-                    
-                    # Create IVF index
-                    if self.metric_type == 'cosine':
-                        index = self._faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, self._faiss.METRIC_INNER_PRODUCT)
-                    elif self.metric_type == 'l2':
-                        index = self._faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, self._faiss.METRIC_L2)
-                    else:
-                        index = self._faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, self._faiss.METRIC_INNER_PRODUCT)
-                    
-                    # Set search parameters
-                    index.nprobe = self.nprobe
-                
-                # Convert embeddings to numpy array
-                embeddings_array = np.array(collection['embeddings'], dtype=np.float32)
-                
-                # Train index if needed
-                if hasattr(index, 'train'):
-                    index.train(embeddings_array)
-                    collection['trained'] = True
-                
-                # Add to index
-                index.add(embeddings_array)
-                
-                # Update index
-                collection['index'] = index
-            else:
-                # No documents left, reset index
-                if self.metric_type == 'cosine':
-                    collection['index'] = self._faiss.IndexFlatIP(self.dimension)
-                elif self.metric_type == 'l2':
-                    collection['index'] = self._faiss.IndexFlatL2(self.dimension)
-                else:
-                    collection['index'] = self._faiss.IndexFlatIP(self.dimension)
-                
-                collection['trained'] = False
+            if self._needs_retrain(collection):
+                self._retrain_index(collection)
             
-            # Save collection
-            self._save_collection(collection_name)
+            # Batch the write to disk
+            self._mark_dirty(collection, len(deleted_ids))
             
-            logger.info(f"Deleted document {document_id} from collection: {collection_name}")
-            return True
+            logger.info(f"Deleted {len(deleted_ids)} documents from collection: {collection_name}")
+            return deleted_ids
         except Exception as e:
-            logger.error(f"Error deleting document {document_id} from collection {collection_name}: {str(e)}")
-            return False
+            logger.error(f"Error deleting documents from collection {collection_name}: {str(e)}")
+            return []
     
     def search(self, collection_name: str, query: str, params: SearchParams) -> List[QueryResult]:
         """Search for documents in a collection.
@@ -394,13 +365,14 @@ class FAISSVectorDB(VectorDBInterface):
                 return []
             
             # Get collection
-            collection = self.collections[collection_name]
+            collection = self._get_collection(collection_name)
             
             # Process results
             query_results = []
             
-            # Search through documents
-            for doc_id, document in collection['documents'].items():
+            # Search through the documents whose text may contain the query
+            candidates = self._keyword_candidates(collection, query)
+            for document in self._iter_documents(collection, candidates):
                 # Check if text contains query
                 if query.lower() in document.text.lower():
                     # Check filters
@@ -447,10 +419,10 @@ class FAISSVectorDB(VectorDBInterface):
                 return []
             
             # Get collection
-            collection = self.collections[collection_name]
+            collection = self._get_collection(collection_name)
             
             # Check if collection is empty
-            if not collection['embeddings']:
+            if not collection['id_map']:
                 return []
             
             # Prepare query vector
@@ -461,7 +433,7 @@ class FAISSVectorDB(VectorDBInterface):
                 query_vector = query_vector / np.linalg.norm(query_vector)
             
             # Search
-            k = min(len(collection['document_ids']), params.limit + params.offset)
+            k = min(len(collection['id_map']), params.limit + params.offset)
             distances, indices = collection['index'].search(query_vector, k)
             
             # Process results
@@ -476,8 +448,8 @@ class FAISSVectorDB(VectorDBInterface):
                     continue
                 
                 # Get document
-                doc_id = collection['document_ids'][idx]
-                document = collection['documents'][doc_id]
+                doc_id = collection['labels'][int(idx)]
+                document = self._read_document(collection, doc_id, params.include_embeddings)
                 
                 # Check filters
                 if params.filters and not self._check_filters(document.metadata, params.filters):
@@ -580,10 +552,10 @@ class FAISSVectorDB(VectorDBInterface):
                 return 0
             
             # Get collection
-            collection = self.collections[collection_name]
+            collection = self._get_collection(collection_name)
             
             # Return count
-            return len(collection['document_ids'])
+            return len(collection['id_map'])
         except Exception as e:
             logger.error(f"Error counting documents in collection {collection_name}: {str(e)}")
             return 0
@@ -603,10 +575,10 @@ class FAISSVectorDB(VectorDBInterface):
                 return {}
             
             # Get collection
-            collection = self.collections[collection_name]
+            collection = self._get_collection(collection_name)
             
             # Get count
-            count = len(collection['document_ids'])
+            count = len(collection['id_map'])
             
             return {
                 "document_count": count,
@@ -627,7 +599,7 @@ class FAISSVectorDB(VectorDBInterface):
             True if successful, False otherwise"""
         try:
             # Get all collections
-            collections = list(self.collections.keys())
+            collections = list(self._collection_names)
             
             # Delete each collection
             for collection_name in collections:
@@ -642,53 +614,888 @@ class FAISSVectorDB(VectorDBInterface):
     def close(self) -> None:
         """Close the connection to the vector database."""
         try:
-            # Save all collections
-            for collection_name in self.collections:
-                self._save_collection(collection_name)
+            # Persist any pending writes
+            self.flush()
+            
+            for collection in self.collections.values():
+                self._close_reader(collection)
             
             logger.info("Closed FAISS vector database")
         except Exception as e:
             logger.error(f"Error closing FAISS vector database: {str(e)}")
     
-    def _load_collections(self) -> None:
-        """Load collections from disk."""
-        try:
-            # Get collection files
-            collection_files = [f for f in os.listdir(self.persist_directory) if f.endswith('.pkl')]
+    def flush(self, collection_name: Optional[str] = None) -> bool:
+        """Persist pending writes to disk.
+        
+        Writes are batched in memory and only reach disk on flush, which
+        happens automatically every ``flush_batch_size`` operations and on
+        ``close``. Call this explicitly when a batch must be durable.
+        
+        Args:
+            collection_name: Collection to flush, or None to flush all loaded collections
             
-            # Load each collection
-            for file_name in collection_files:
-                collection_name = file_name[:-4]  # Remove .pkl extension
-                collection_path = os.path.join(self.persist_directory, file_name)
-                
-                # Load collection
-                with open(collection_path, 'rb') as f:
-                    self.collections[collection_name] = pickle.load(f)
-                
-                logger.info(f"Loaded collection: {collection_name}")
+        Returns:
+            True if successful, False otherwise"""
+        names = [collection_name] if collection_name is not None else list(self.collections.keys())
+        success = True
+        for name in names:
+            collection = self.collections.get(name)
+            if collection is None or not collection['dirty']:
+                continue
+            try:
+                self._flush_collection(collection)
+            except Exception as e:
+                logger.error(f"Error flushing collection {name}: {str(e)}")
+                success = False
+        return success
+    
+    def _discover_collections(self) -> None:
+        """Find collections on disk without loading them."""
+        try:
+            for entry in os.listdir(self.persist_directory):
+                entry_path = os.path.join(self.persist_directory, entry)
+                if os.path.isfile(os.path.join(entry_path, MANIFEST_FILE)):
+                    self._collection_names.add(entry)
+                elif entry.endswith('.pkl'):
+                    # Collections pickled by earlier versions are migrated on first access
+                    self._collection_names.add(entry[:-4])
         except Exception as e:
-            logger.error(f"Error loading collections: {str(e)}")
+            logger.error(f"Error discovering collections: {str(e)}")
     
-    def _save_collection(self, collection_name: str) -> None:
-        """Save a collection to disk.
+    def _get_collection(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        """Get a collection, loading it from disk on first access.
         
         Args:
-            collection_name: Name of the collection to save"""
-        try:
-            # Check if collection exists
-            if collection_name not in self.collections:
+            collection_name: Name of the collection
+            
+        Returns:
+            Collection state, or None if the collection does not exist"""
+        collection = self.collections.get(collection_name)
+        if collection is None and collection_name in self._collection_names:
+            legacy_path = os.path.join(self.persist_directory, f"{collection_name}.pkl")
+            manifest_path = os.path.join(self._collection_path(collection_name), MANIFEST_FILE)
+            if not os.path.exists(manifest_path) and os.path.exists(legacy_path):
+                collection = self._migrate_legacy_collection(collection_name, legacy_path)
+            else:
+                collection = self._load_collection(collection_name)
+            self.collections[collection_name] = collection
+            logger.info(f"Loaded collection: {collection_name}")
+        return collection
+    
+    def _collection_path(self, collection_name: str) -> str:
+        """Get the directory holding a collection's segment files.
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            Directory path"""
+        return os.path.join(self.persist_directory, collection_name)
+    
+    def _load_collection(self, collection_name: str) -> Dict[str, Any]:
+        """Load a collection from its manifest and segment files.
+        
+        Anything appended after the last committed manifest (for example by a
+        flush interrupted by a crash) is truncated away.
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            Collection state"""
+        path = self._collection_path(collection_name)
+        with open(os.path.join(path, MANIFEST_FILE), 'r') as f:
+            manifest = json.load(f)
+        
+        index = self._faiss.read_index(os.path.join(path, manifest['index_file']))
+        if self.index_type == 'IVF':
+            index.nprobe = self.nprobe
+        
+        collection = self._new_collection(path, index)
+        # Version 1 manifests rewrote the index on every flush
+        defaults = {'index_labels': manifest['next_label'], 'index_removed': 0, 'index_checkpoint_size': index.ntotal}
+        for key in MANIFEST_STATE_KEYS:
+            collection[key] = manifest[key] if key in manifest else defaults[key]
+        collection['persisted_labels'] = manifest['next_label']
+        collection['index_stale'] = False
+        
+        # Memory-map embedding segments
+        for segment in manifest['segments']:
+            self._attach_segment(collection, segment['file'], segment.get('labels_file'), segment['count'],
+                                 segment.get('start', 0))
+        
+        # Drop uncommitted tails and replay the offset index
+        self._truncate(os.path.join(path, collection['log_file']), collection['log_size'])
+        offsets_path = os.path.join(path, collection['offsets_file'])
+        self._truncate(offsets_path, collection['offsets_size'])
+        with open(offsets_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t', 4)
+                if fields[0] == 'P':
+                    label, offset, length, doc_id = int(fields[1]), int(fields[2]), int(fields[3]), fields[4]
+                    collection['id_map'][doc_id] = label
+                    collection['labels'][label] = doc_id
+                    collection['offsets'][doc_id] = (offset, length)
+                elif fields[0] == 'D':
+                    label = collection['id_map'].pop(fields[1], None)
+                    collection['labels'].pop(label, None)
+                    collection['offsets'].pop(fields[1], None)
+        
+        self._apply_index_delta(collection)
+        
+        # The loaded state matches the committed manifest
+        collection['dirty'] = False
+        return collection
+    
+    def _apply_index_delta(self, collection: Dict[str, Any]) -> None:
+        """Bring a loaded index checkpoint up to date with the committed documents.
+        
+        Vectors removed since the checkpoint are removed from the index and
+        vectors added since are read from the embedding segments.
+        
+        Args:
+            collection: Collection state with its documents and segments loaded"""
+        index = collection['index']
+        live = np.fromiter(collection['labels'].keys(), dtype=np.int64, count=len(collection['labels']))
+        
+        if collection['index_removed']:
+            removed = np.setdiff1d(np.arange(collection['index_labels'], dtype=np.int64), live)
+            if len(removed):
+                index.remove_ids(removed)
+        
+        added = np.sort(live[live >= collection['index_labels']])
+        if len(added):
+            if not index.is_trained:
+                # The checkpoint predates training, so train on all live vectors
+                self._retrain_index(collection)
                 return
+            index.add_with_ids(self._get_embeddings(collection, added.tolist()), added)
+    
+    def _truncate(self, file_path: str, size: int) -> None:
+        """Truncate a file to its committed size, creating it if missing.
+        
+        Args:
+            file_path: Path of the file
+            size: Committed size in bytes"""
+        with open(file_path, 'ab') as f:
+            if f.tell() > size:
+                f.truncate(size)
+    
+    def _attach_segment(self, collection: Dict[str, Any], file_name: str, labels_file: Optional[str],
+                        count: int, start: int = 0) -> None:
+        """Memory-map an embedding segment and register it with a collection.
+        
+        Args:
+            collection: Collection state
+            file_name: Segment file name
+            labels_file: File holding the sorted labels of the segment rows, or None
+                for segments of consecutive labels written by earlier versions
+            count: Number of rows in the segment
+            start: Label of the first row of a segment without a labels file"""
+        array = np.load(os.path.join(collection['path'], file_name), mmap_mode='r')
+        if labels_file is None:
+            labels = np.arange(start, start + count, dtype=np.int64)
+        else:
+            labels = np.load(os.path.join(collection['path'], labels_file), mmap_mode='r')
+        collection['segments'].append({
+            'file': file_name,
+            'labels_file': labels_file,
+            'start': start,
+            'count': count,
+            'array': array,
+            'labels': labels
+        })
+    
+    def _flush_collection(self, collection: Dict[str, Any]) -> None:
+        """Write a collection's pending changes and commit a new manifest.
+        
+        Every file a manifest refers to is complete before the manifest is
+        atomically replaced, so a crash mid-flush leaves the previous
+        committed state intact.
+        
+        Args:
+            collection: Collection state"""
+        path = collection['path']
+        os.makedirs(path, exist_ok=True)
+        collection['generation'] += 1
+        generation = collection['generation']
+        
+        self._append_pending_records(collection)
+        self._write_embedding_segment(collection)
+        
+        if (collection['dead_records'] >= self.compaction_min_records and
+                collection['dead_records'] > self.compaction_ratio * collection['total_records']):
+            self._compact_document_log(collection)
+        else:
+            self._merge_embedding_segments(collection)
+        
+        if self._needs_index_checkpoint(collection):
+            # Write the index under a new name so the committed one stays valid
+            index_file = f"index-{generation:08d}.faiss"
+            self._faiss.write_index(collection['index'], os.path.join(path, index_file))
+            collection.update({
+                'index_file': index_file,
+                'index_labels': collection['next_label'],
+                'index_removed': 0,
+                'index_checkpoint_size': collection['index'].ntotal,
+                'index_stale': False
+            })
+        
+        manifest = {
+            'version': SEGMENT_FORMAT_VERSION,
+            'dimension': self.dimension,
+            'index_type': self.index_type,
+            'metric_type': self.metric_type,
+            'segments': [
+                {'file': s['file'], 'labels_file': s['labels_file'], 'start': s['start'], 'count': s['count']}
+                for s in collection['segments']
+            ]
+        }
+        for key in MANIFEST_STATE_KEYS:
+            manifest[key] = collection[key]
+        
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        with open(f"{manifest_path}.tmp", 'w') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        
+        # Remove files no longer referenced by the committed manifest
+        referenced = {MANIFEST_FILE, collection['index_file'], collection['log_file'], collection['offsets_file']}
+        for segment in collection['segments']:
+            referenced.update(name for name in (segment['file'], segment['labels_file']) if name)
+        for file_name in os.listdir(path):
+            if file_name not in referenced:
+                os.remove(os.path.join(path, file_name))
+        
+        collection['pending_ops'] = 0
+        collection['dirty'] = False
+        logger.info(f"Flushed collection to {path} (generation {generation})")
+    
+    def _needs_index_checkpoint(self, collection: Dict[str, Any]) -> bool:
+        """Check whether the FAISS index must be written on this flush.
+        
+        Args:
+            collection: Collection state
+            
+        Returns:
+            True if the index was never written or rebuilt, or if the vectors
+            added and removed since the checkpoint exceed index_checkpoint_ratio"""
+        if collection['index_file'] is None or collection['index_stale']:
+            return True
+        
+        changed = collection['next_label'] - collection['index_labels'] + collection['index_removed']
+        return changed > self.index_checkpoint_ratio * collection['index_checkpoint_size']
+    
+    def _append_pending_records(self, collection: Dict[str, Any]) -> None:
+        """Append pending document writes to the document log and offset index.
+        
+        Args:
+            collection: Collection state"""
+        if not collection['pending']:
+            return
+        
+        path = collection['path']
+        offset = collection['log_size']
+        with open(os.path.join(path, collection['log_file']), 'ab') as log_file, \
+                open(os.path.join(path, collection['offsets_file']), 'ab') as offsets_file:
+            for record in collection['pending']:
+                if record[0] == 'put':
+                    _, doc_id, label = record
+                    # Skip documents that were replaced or deleted before this flush
+                    if collection['labels'].get(label) != doc_id:
+                        continue
+                    document = collection['pending_documents'].pop(doc_id)
+                    line = json.dumps({'id': doc_id, 'text': document.text, 'metadata': document.metadata},
+                                      default=str).encode('utf-8') + b'\n'
+                    log_file.write(line)
+                    offsets_file.write(f"P\t{label}\t{offset}\t{len(line)}\t{doc_id}\n".encode('utf-8'))
+                    collection['offsets'][doc_id] = (offset, len(line))
+                    collection['total_records'] += 1
+                    offset += len(line)
+                else:
+                    offsets_file.write(f"D\t{record[1]}\n".encode('utf-8'))
+            
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            offsets_file.flush()
+            os.fsync(offsets_file.fileno())
+            collection['offsets_size'] = offsets_file.tell()
+        
+        collection['log_size'] = offset
+        collection['pending'] = []
+    
+    def _write_embedding_segment(self, collection: Dict[str, Any]) -> None:
+        """Write embeddings added since the last flush as a new segment.
+        
+        Only embeddings of documents still present are written, together
+        with their sorted labels.
+        
+        Args:
+            collection: Collection state"""
+        pending = collection['pending_embeddings']
+        if pending:
+            labels = np.array(sorted(pending), dtype=np.int64)
+            block = np.array([pending[label] for label in labels.tolist()], dtype=np.float32)
+            self._add_segment(collection, f"{collection['generation']:08d}", block, labels)
+        
+        collection['persisted_labels'] = collection['next_label']
+        collection['pending_embeddings'] = {}
+    
+    def _add_segment(self, collection: Dict[str, Any], name: str, block: np.ndarray, labels: np.ndarray) -> None:
+        """Durably write an embedding segment and attach it to a collection.
+        
+        Args:
+            collection: Collection state
+            name: Unique name of the segment within the collection
+            block: Embeddings, one row per label
+            labels: Sorted labels of the rows"""
+        file_name = f"embeddings-{name}.npy"
+        labels_file = f"labels-{name}.npy"
+        self._write_array(os.path.join(collection['path'], file_name), block)
+        self._write_array(os.path.join(collection['path'], labels_file), labels)
+        self._attach_segment(collection, file_name, labels_file, len(labels))
+    
+    def _select_segments_to_merge(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pick embedding segments to merge.
+        
+        Segments are grouped in size tiers of segment_merge_factor, and
+        segment_merge_factor segments of the smallest full tier are merged,
+        so each row is rewritten about once per tier. If there are still more
+        than max_embedding_segments segments, the smallest ones are merged.
+        
+        Args:
+            segments: Segments of a collection
             
-            # Get collection path
-            collection_path = os.path.join(self.persist_directory, f"{collection_name}.pkl")
+        Returns:
+            Segments to merge, empty if none need merging"""
+        factor = self.segment_merge_factor
+        tiers: Dict[int, List[Dict[str, Any]]] = {}
+        for segment in segments:
+            tiers.setdefault(int(math.log(max(1, segment['count']), factor)), []).append(segment)
+        
+        for tier in sorted(tiers):
+            if len(tiers[tier]) >= factor:
+                return tiers[tier][:factor]
+        
+        if len(segments) > self.max_embedding_segments:
+            return sorted(segments, key=lambda segment: segment['count'])[:factor]
+        
+        return []
+    
+    def _merge_embedding_segments(self, collection: Dict[str, Any]) -> None:
+        """Merge embedding segments of similar size.
+        
+        Args:
+            collection: Collection state"""
+        merges = 0
+        while True:
+            segments = self._select_segments_to_merge(collection['segments'])
+            if not segments:
+                break
+            self._rewrite_segments(collection, segments, f"{collection['generation']:08d}-merged-{merges}")
+            merges += 1
+    
+    def _rewrite_segments(self, collection: Dict[str, Any], segments: List[Dict[str, Any]], name: str) -> None:
+        """Replace embedding segments with one segment holding their live rows.
+        
+        Args:
+            collection: Collection state
+            segments: Segments to replace
+            name: Unique name of the new segment within the collection"""
+        labels = np.concatenate([segment['labels'] for segment in segments])
+        live = np.fromiter(collection['labels'].keys(), dtype=np.int64, count=len(collection['labels']))
+        keep = np.isin(labels, live)
+        
+        # Rows of deleted documents are dropped
+        order = np.argsort(labels[keep], kind='stable')
+        labels = labels[keep][order]
+        block = np.concatenate([np.asarray(segment['array']) for segment in segments])[keep][order]
+        
+        replaced = {id(segment) for segment in segments}
+        collection['segments'] = [segment for segment in collection['segments'] if id(segment) not in replaced]
+        if len(labels):
+            self._add_segment(collection, name, block, labels)
+    
+    def _write_array(self, file_path: str, array: np.ndarray) -> None:
+        """Durably write a numpy array file.
+        
+        Args:
+            file_path: Destination path
+            array: Array to write"""
+        with open(file_path, 'wb') as f:
+            np.save(f, array)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _compact_document_log(self, collection: Dict[str, Any]) -> None:
+        """Rewrite the document log and offset index without dead records.
+        
+        Args:
+            collection: Collection state"""
+        path = collection['path']
+        generation = collection['generation']
+        log_file_name = f"documents-{generation:08d}.log"
+        offsets_file_name = f"offsets-{generation:08d}.idx"
+        
+        offsets = {}
+        position = 0
+        reader = self._get_reader(collection)
+        with open(os.path.join(path, log_file_name), 'wb') as log_file, \
+                open(os.path.join(path, offsets_file_name), 'wb') as offsets_file:
+            for doc_id, (offset, length) in sorted(collection['offsets'].items(), key=lambda item: item[1][0]):
+                reader.seek(offset)
+                log_file.write(reader.read(length))
+                offsets_file.write(f"P\t{collection['id_map'][doc_id]}\t{position}\t{length}\t{doc_id}\n".encode('utf-8'))
+                offsets[doc_id] = (position, length)
+                position += length
+            
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            offsets_file.flush()
+            os.fsync(offsets_file.fileno())
+            offsets_size = offsets_file.tell()
+        
+        self._close_reader(collection)
+        collection.update({
+            'offsets': offsets,
+            'log_file': log_file_name,
+            'log_size': position,
+            'offsets_file': offsets_file_name,
+            'offsets_size': offsets_size,
+            'total_records': len(offsets),
+            'dead_records': 0
+        })
+        
+        # Drop the embedding rows of deleted documents as well
+        live = np.fromiter(collection['labels'].keys(), dtype=np.int64, count=len(collection['labels']))
+        with_dead_rows = [segment for segment in collection['segments']
+                          if not np.isin(segment['labels'], live).all()]
+        if with_dead_rows:
+            self._rewrite_segments(collection, with_dead_rows, f"{generation:08d}-compacted")
+        
+        logger.info(f"Compacted document log for {path}")
+    
+    def _get_reader(self, collection: Dict[str, Any]) -> Any:
+        """Get an open read handle on a collection's document log.
+        
+        Args:
+            collection: Collection state
             
-            # Save collection
-            with open(collection_path, 'wb') as f:
-                pickle.dump(self.collections[collection_name], f)
+        Returns:
+            Binary file object"""
+        if collection['reader'] is None:
+            collection['reader'] = open(os.path.join(collection['path'], collection['log_file']), 'rb')
+        return collection['reader']
+    
+    def _close_reader(self, collection: Dict[str, Any]) -> None:
+        """Close a collection's document log read handle.
+        
+        Args:
+            collection: Collection state"""
+        if collection['reader'] is not None:
+            collection['reader'].close()
+            collection['reader'] = None
+    
+    def _read_document(self, collection: Dict[str, Any], doc_id: str, include_embedding: bool = False) -> Optional[Document]:
+        """Read a document from the pending buffer or the document log.
+        
+        Args:
+            collection: Collection state
+            doc_id: ID of the document
+            include_embedding: Whether to attach the stored (normalized) embedding
             
-            logger.info(f"Saved collection: {collection_name}")
-        except Exception as e:
-            logger.error(f"Error saving collection {collection_name}: {str(e)}")
+        Returns:
+            Document if found, None otherwise"""
+        document = collection['pending_documents'].get(doc_id)
+        if document is None:
+            location = collection['offsets'].get(doc_id)
+            if location is None:
+                return None
+            
+            reader = self._get_reader(collection)
+            reader.seek(location[0])
+            record = json.loads(reader.read(location[1]))
+            document = Document(text=record['text'], metadata=record['metadata'], id=record['id'])
+        
+        if include_embedding and document.embedding is None:
+            document.embedding = self._get_embeddings(collection, [collection['id_map'][doc_id]])[0].tolist()
+        
+        return document
+    
+    def _iter_documents(self, collection: Dict[str, Any], doc_ids: Optional[set] = None):
+        """Iterate over the documents of a collection in log order.
+        
+        Args:
+            collection: Collection state
+            doc_ids: IDs of the documents to read, or None for all documents
+            
+        Yields:
+            Documents"""
+        offsets = collection['offsets']
+        if doc_ids is None:
+            locations = offsets.items()
+        else:
+            locations = [(doc_id, offsets[doc_id]) for doc_id in doc_ids if doc_id in offsets]
+        
+        for doc_id, _ in sorted(locations, key=lambda item: item[1][0]):
+            yield self._read_document(collection, doc_id)
+        for doc_id, document in list(collection['pending_documents'].items()):
+            if doc_ids is None or doc_id in doc_ids:
+                yield document
+    
+    def _trigrams(self, text: str) -> set:
+        """Get the character trigrams of a lowercased text.
+        
+        Args:
+            text: Lowercased text
+            
+        Returns:
+            Set of trigrams"""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def _get_text_index(self, collection: Dict[str, Any]) -> Dict[str, set]:
+        """Get the trigram index of a collection's document texts.
+        
+        The index is built from the document log on the first keyword search
+        and kept up to date by later writes. Removed documents are left in
+        the index until they outnumber the live documents, when it is rebuilt.
+        
+        Args:
+            collection: Collection state
+            
+        Returns:
+            Dictionary mapping trigrams to the IDs of documents containing them"""
+        if collection['text_index'] is None or collection['text_index_stale'] > len(collection['id_map']):
+            collection['text_index'] = {}
+            collection['text_index_stale'] = 0
+            for document in self._iter_documents(collection):
+                self._index_text(collection, document.id, document.text)
+        return collection['text_index']
+    
+    def _index_text(self, collection: Dict[str, Any], doc_id: str, text: str) -> None:
+        """Add a document's text to the trigram index.
+        
+        Args:
+            collection: Collection state
+            doc_id: ID of the document
+            text: Document text"""
+        text_index = collection['text_index']
+        for trigram in self._trigrams(text.lower()):
+            text_index.setdefault(trigram, set()).add(doc_id)
+    
+    def _keyword_candidates(self, collection: Dict[str, Any], query: str) -> Optional[set]:
+        """Find the documents whose text may contain a query string.
+        
+        Args:
+            collection: Collection state
+            query: Query string
+            
+        Returns:
+            IDs of documents containing every trigram of the query, or None if
+            the query is too short to use the trigram index"""
+        trigrams = self._trigrams(query.lower())
+        if not trigrams:
+            return None
+        
+        text_index = self._get_text_index(collection)
+        postings = sorted((text_index.get(trigram, set()) for trigram in trigrams), key=len)
+        return set(postings[0]).intersection(*postings[1:])
+    
+    def _get_embeddings(self, collection: Dict[str, Any], labels: List[int]) -> np.ndarray:
+        """Gather stored embeddings for a list of labels.
+        
+        Args:
+            collection: Collection state
+            labels: Labels to look up
+            
+        Returns:
+            Matrix of embeddings, one row per label"""
+        result = np.zeros((len(labels), self.dimension), dtype=np.float32)
+        if not labels:
+            return result
+        
+        label_array = np.asarray(labels, dtype=np.int64)
+        persisted = label_array < collection['persisted_labels']
+        
+        for segment in collection['segments']:
+            if not segment['count']:
+                continue
+            # Segment labels are sorted, so rows are found by binary search
+            positions = np.minimum(np.searchsorted(segment['labels'], label_array), segment['count'] - 1)
+            in_segment = persisted & (segment['labels'][positions] == label_array)
+            if in_segment.any():
+                result[in_segment] = segment['array'][positions[in_segment]]
+        
+        for position in np.flatnonzero(~persisted):
+            result[position] = collection['pending_embeddings'][labels[position]]
+        
+        return result
+    
+    def _mark_dirty(self, collection: Dict[str, Any], operations: int) -> None:
+        """Record pending operations, flushing once a batch is full.
+        
+        Args:
+            collection: Collection state
+            operations: Number of operations performed"""
+        collection['dirty'] = True
+        collection['pending_ops'] += operations
+        if collection['pending_ops'] >= self.flush_batch_size:
+            self._flush_collection(collection)
+    
+    def _create_index(self) -> Any:
+        """Create an empty ID-mapped FAISS index for the configured settings.
+        
+        Returns:
+            FAISS index supporting ``add_with_ids`` and ``remove_ids``"""
+        if self.metric_type == 'l2':
+            index = self._faiss.IndexFlatL2(self.dimension)
+        else:
+            # Cosine similarity uses inner product over normalized vectors
+            index = self._faiss.IndexFlatIP(self.dimension)
+        
+        # Create IVF index if specified
+        if self.index_type == 'IVF':
+            quantizer = index
+            metric = self._faiss.METRIC_L2 if self.metric_type == 'l2' else self._faiss.METRIC_INNER_PRODUCT
+            index = self._faiss.IndexIVFFlat(quantizer, self.dimension, self.nlist, metric)
+            
+            # Set search parameters
+            index.nprobe = self.nprobe
+            
+            # IVF indexes store external IDs in their inverted lists natively
+            return index
+        
+        return self._faiss.IndexIDMap2(index)
+    
+    def _new_collection(self, path: str, index: Any) -> Dict[str, Any]:
+        """Create the in-memory state for an empty collection.
+        
+        Args:
+            path: Directory holding the collection's segment files
+            index: FAISS index for the collection
+            
+        Returns:
+            Collection state dictionary"""
+        return {
+            'path': path,
+            'index': index,
+            # Document ID <-> int64 FAISS label maps for O(1) lookups
+            'id_map': {},
+            'labels': {},
+            'next_label': 0,
+            'trained': False,
+            'trained_count': 0,
+            'removed_since_train': 0,
+            # Document ID -> (offset, length) in the document log
+            'offsets': {},
+            # Writes not yet flushed to disk
+            'pending': [],
+            'pending_documents': {},
+            'pending_embeddings': {},
+            'pending_ops': 0,
+            'dirty': True,
+            # Trigram index of document texts, built on the first keyword search
+            'text_index': None,
+            'text_index_stale': 0,
+            # Committed on-disk state
+            'segments': [],
+            'persisted_labels': 0,
+            'generation': 0,
+            'index_file': None,
+            # Labels and removals since the index checkpoint, which is rewritten once they add up
+            'index_labels': 0,
+            'index_removed': 0,
+            'index_checkpoint_size': 0,
+            'index_stale': True,
+            'log_file': 'documents-00000000.log',
+            'log_size': 0,
+            'offsets_file': 'offsets-00000000.idx',
+            'offsets_size': 0,
+            'total_records': 0,
+            'dead_records': 0,
+            'reader': None
+        }
+    
+    def _prepare_embedding(self, embedding: List[float]) -> np.ndarray:
+        """Convert an embedding to float32, normalizing it for cosine similarity.
+        
+        Args:
+            embedding: Raw embedding
+            
+        Returns:
+            Prepared embedding"""
+        embedding = np.array(embedding, dtype=np.float32)
+        if self.metric_type == 'cosine':
+            norm = np.linalg.norm(embedding)
+            if norm > 0:
+                embedding = embedding / norm
+        return embedding
+    
+    def _has_valid_embedding(self, document: Document) -> bool:
+        """Check whether a document has an embedding of the configured dimension.
+        
+        Args:
+            document: Document to check
+            
+        Returns:
+            True if the embedding can be added to the index, False otherwise"""
+        return document.embedding is not None and len(document.embedding) == self.dimension
+    
+    def _add_to_index(self, collection: Dict[str, Any], documents: List[Document]) -> List[str]:
+        """Assign labels to documents and add their embeddings to the index.
+        
+        Args:
+            collection: Collection state
+            documents: Documents whose IDs are not yet in the collection
+            
+        Returns:
+            List of document IDs that were added"""
+        document_ids = []
+        labels = []
+        new_embeddings = []
+        
+        for document in documents:
+            # Skip documents that cannot be indexed before changing any state
+            if not self._has_valid_embedding(document):
+                logger.warning(f"Document has no embedding of dimension {self.dimension}, skipping")
+                continue
+            
+            # Generate ID if not provided
+            doc_id = document.id or str(uuid.uuid4())
+            document.id = doc_id
+            label = collection['next_label']
+            collection['next_label'] += 1
+            
+            embedding = self._prepare_embedding(document.embedding)
+            
+            collection['id_map'][doc_id] = label
+            collection['labels'][label] = doc_id
+            collection['pending_documents'][doc_id] = document
+            collection['pending_embeddings'][label] = embedding
+            collection['pending'].append(('put', doc_id, label))
+            if collection['text_index'] is not None:
+                self._index_text(collection, doc_id, document.text)
+            
+            document_ids.append(doc_id)
+            labels.append(label)
+            new_embeddings.append(embedding)
+        
+        if new_embeddings:
+            new_embeddings_array = np.array(new_embeddings, dtype=np.float32)
+            
+            # Train index if needed
+            if not collection['trained'] and not collection['index'].is_trained:
+                collection['index'].train(new_embeddings_array)
+                collection['trained'] = True
+                collection['trained_count'] = len(new_embeddings_array)
+                collection['removed_since_train'] = 0
+            
+            collection['index'].add_with_ids(new_embeddings_array, np.array(labels, dtype=np.int64))
+        
+        return document_ids
+    
+    def _remove_from_index(self, collection: Dict[str, Any], document_ids: List[str]) -> None:
+        """Remove documents and their vectors from a collection.
+        
+        Args:
+            collection: Collection state
+            document_ids: IDs of documents present in the collection"""
+        labels = []
+        for doc_id in document_ids:
+            label = collection['id_map'].pop(doc_id)
+            del collection['labels'][label]
+            collection['pending_documents'].pop(doc_id, None)
+            collection['pending_embeddings'].pop(label, None)
+            
+            # Only documents already in the log need a delete record
+            if collection['offsets'].pop(doc_id, None) is not None:
+                collection['pending'].append(('delete', doc_id))
+                collection['dead_records'] += 1
+            
+            labels.append(label)
+        
+        if labels:
+            collection['index'].remove_ids(np.array(labels, dtype=np.int64))
+            collection['removed_since_train'] += len(labels)
+            collection['index_removed'] += len(labels)
+            collection['text_index_stale'] += len(labels)
+    
+    def _needs_retrain(self, collection: Dict[str, Any]) -> bool:
+        """Check whether enough vectors were removed to warrant retraining.
+        
+        Only IVF indexes depend on training data; flat indexes never retrain.
+        
+        Args:
+            collection: Collection state
+            
+        Returns:
+            True if the index should be retrained"""
+        if self.index_type != 'IVF' or not collection['trained']:
+            return False
+        
+        trained_count = max(1, collection['trained_count'])
+        return collection['removed_since_train'] / trained_count > self.retrain_threshold
+    
+    def _retrain_index(self, collection: Dict[str, Any]) -> None:
+        """Rebuild and retrain a collection index from its live embeddings.
+        
+        Args:
+            collection: Collection state"""
+        index = self._create_index()
+        
+        if collection['labels']:
+            labels = list(collection['labels'].keys())
+            embeddings_array = self._get_embeddings(collection, labels)
+            index.train(embeddings_array)
+            index.add_with_ids(embeddings_array, np.array(labels, dtype=np.int64))
+            collection['trained'] = True
+            collection['trained_count'] = len(labels)
+        else:
+            collection['trained'] = False
+            collection['trained_count'] = 0
+        
+        collection['index'] = index
+        collection['removed_since_train'] = 0
+        collection['index_stale'] = True
+    
+    def _migrate_legacy_collection(self, collection_name: str, legacy_path: str) -> Dict[str, Any]:
+        """Convert a pickled collection to the segment format.
+        
+        Args:
+            collection_name: Name of the collection
+            legacy_path: Path of the pickle file
+            
+        Returns:
+            Collection state"""
+        with open(legacy_path, 'rb') as f:
+            data = pickle.load(f)
+        
+        if 'id_map' in data:
+            entries = [(doc_id, data['documents'][doc_id], data['embeddings'].get(label))
+                       for doc_id, label in data['id_map'].items()]
+        else:
+            entries = [(doc_id, data['documents'][doc_id], embedding)
+                       for doc_id, embedding in zip(data.get('document_ids', []), data.get('embeddings', []))]
+        
+        documents = [
+            Document(
+                text=document.text,
+                embedding=list(embedding) if embedding is not None else document.embedding,
+                metadata=document.metadata,
+                id=doc_id
+            )
+            for doc_id, document, embedding in entries
+        ]
+        
+        collection = self._new_collection(self._collection_path(collection_name), self._create_index())
+        self._add_to_index(collection, documents)
+        self._flush_collection(collection)
+        os.remove(legacy_path)
+        
+        logger.info(f"Migrated pickled collection {collection_name} to segment format")
+        return collection
     
     def _check_filters(self, metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """Check if metadata matches filters.
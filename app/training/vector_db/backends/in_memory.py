@@ -35,7 +35,15 @@ class InMemoryVectorDB(VectorDBInterface):
     
     This implementation stores all data in memory and is intended for
     testing and development purposes. It should not be used in production
-    for large datasets."""
+    for large datasets.
+    
+    Embeddings of each collection are stored L2-normalized in a float32
+    matrix with an ID-to-row index, so a vector search is a single
+    matrix-vector product and ``query_many`` scores a batch of queries with
+    one matrix product. Metadata filters are evaluated through a per-field
+    index of the rows. The matrix is allocated on the first insert and
+    grown geometrically. Deletes mark their row dead and the matrix is
+    compacted once the fraction of dead rows exceeds ``compaction_threshold``."""
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize the in-memory vector database.
@@ -43,7 +51,9 @@ class InMemoryVectorDB(VectorDBInterface):
         Args:
             config: Configuration settings"""
         self.config = config
+        self.compaction_threshold = config.get('compaction_threshold', 0.25)
         self.collections: Dict[str, Dict[str, Document]] = defaultdict(dict)
+        self.vector_indexes: Dict[str, Dict[str, Any]] = {}
         logger.info("Initialized in-memory vector database")
     
     def create_collection(self, collection_name: str) -> bool:
@@ -75,6 +85,7 @@ class InMemoryVectorDB(VectorDBInterface):
             return False
         
         del self.collections[collection_name]
+        self.vector_indexes.pop(collection_name, None)
         logger.info(f"Deleted collection: {collection_name}")
         return True
     
@@ -109,12 +120,18 @@ class InMemoryVectorDB(VectorDBInterface):
             self.create_collection(collection_name)
         
         document_ids = []
+        batch: Dict[str, Document] = {}
         for document in documents:
             doc_id = document.id or str(uuid.uuid4())
             document.id = doc_id
-            self.collections[collection_name][doc_id] = document
+            # A repeated ID replaces the earlier document of the batch
+            batch.pop(doc_id, None)
+            batch[doc_id] = document
             document_ids.append(doc_id)
         
+        self.collections[collection_name].update(batch)
+        self._add_vectors(collection_name, list(batch.values()))
+        
         logger.info(f"Added {len(documents)} documents to collection: {collection_name}")
         return document_ids
     
@@ -151,6 +168,7 @@ class InMemoryVectorDB(VectorDBInterface):
             return False
         
         del self.collections[collection_name][document_id]
+        self._remove_vectors(collection_name, [document_id])
         logger.info(f"Deleted document {document_id} from collection: {collection_name}")
         return True
     
@@ -182,25 +200,8 @@ class InMemoryVectorDB(VectorDBInterface):
             if params.min_score is not None and score < params.min_score:
                 continue
             
-            # Create a copy of the document without embeddings if not requested
-            result_doc = document
-            if not params.include_embeddings and document.embedding is not None:
-                result_doc = Document(
-                    id=document.id,
-                    text=document.text,
-                    embedding=None,
-                    metadata=document.metadata.copy() if params.include_metadata else {}
-                )
-            elif not params.include_metadata:
-                result_doc = Document(
-                    id=document.id,
-                    text=document.text,
-                    embedding=document.embedding,
-                    metadata={}
-                )
-            
             results.append(QueryResult(
-                document=result_doc,
+                document=self._result_document(document, params),
                 score=score,
                 distance=None
             ))
@@ -225,58 +226,32 @@ class InMemoryVectorDB(VectorDBInterface):
             logger.warning(f"Collection does not exist: {collection_name}")
             return []
         
-        # Convert query vector to numpy array
-        query_vector = np.array(vector)
+        index = self.vector_indexes.get(collection_name)
+        if index is None:
+            return []
+        
+        # Cosine similarity of every row with a single matrix-vector product
+        scores = self._similarities(index, vector)
+        if scores is None:
+            return []
+        distances = 1.0 - scores  # Convert similarity score to distance
+        
+        mask = self._filter_mask(collection_name, index, params.filters)
+        if params.min_score is not None:
+            mask &= scores >= params.min_score
+        if params.max_distance is not None:
+            mask &= distances <= params.max_distance
         
         results = []
-        for doc_id, document in self.collections[collection_name].items():
-            # Skip documents without embeddings
-            if document.embedding is None:
-                continue
-            
-            # Skip documents that don't match filters
-            if not self._matches_filters(document, params.filters):
-                continue
-            
-            # Calculate cosine similarity
-            doc_vector = np.array(document.embedding)
-            distance = self._calculate_distance(doc_vector, query_vector)
-            score = 1.0 - distance  # Convert distance to similarity score
-            
-            # Skip documents below minimum score or above maximum distance
-            if params.min_score is not None and score < params.min_score:
-                continue
-            if params.max_distance is not None and distance > params.max_distance:
-                continue
-            
-            # Create a copy of the document without embeddings if not requested
-            result_doc = document
-            if not params.include_embeddings and document.embedding is not None:
-                result_doc = Document(
-                    id=document.id,
-                    text=document.text,
-                    embedding=None,
-                    metadata=document.metadata.copy() if params.include_metadata else {}
-                )
-            elif not params.include_metadata:
-                result_doc = Document(
-                    id=document.id,
-                    text=document.text,
-                    embedding=document.embedding,
-                    metadata={}
-                )
-            
+        for row in self._top_rows(scores, mask, params.offset + params.limit)[params.offset:]:
+            document = self.collections[collection_name][index['row_ids'][row]]
             results.append(QueryResult(
-                document=result_doc,
-                score=score,
-                distance=distance
+                document=self._result_document(document, params),
+                score=float(scores[row]),
+                distance=float(distances[row])
             ))
         
-        # Sort by score in descending order
-        results.sort(key=lambda x: x.score, reverse=True)
-        
-        # Apply limit and offset
-        return results[params.offset:params.offset + params.limit]
+        return results
     
     def hybrid_search(self, collection_name: str, query: str, vector: List[float], params: SearchParams) -> List[QueryResult]:
         """Perform a hybrid search combining vector similarity and keyword matching.
@@ -293,68 +268,88 @@ class InMemoryVectorDB(VectorDBInterface):
             logger.warning(f"Collection does not exist: {collection_name}")
             return []
         
-        # Convert query vector to numpy array
-        query_vector = np.array(vector)
+        index = self.vector_indexes.get(collection_name)
+        if index is None:
+            return []
+        
+        # Calculate vector and text similarity for every row at once
+        vector_scores = self._similarities(index, vector)
+        if vector_scores is None:
+            return []
+        distances = 1.0 - vector_scores  # Convert similarity score to distance
+        text_scores = self._text_scores(index, query)
+        
+        # Combine scores using hybrid_alpha parameter
+        scores = (1 - params.hybrid_alpha) * vector_scores + params.hybrid_alpha * text_scores
+        
+        mask = self._filter_mask(collection_name, index, params.filters)
+        if params.min_score is not None:
+            mask &= scores >= params.min_score
+        if params.max_distance is not None:
+            mask &= distances <= params.max_distance
         
         results = []
-        for doc_id, document in self.collections[collection_name].items():
-            # Skip documents without embeddings
-            if document.embedding is None:
-                continue
-            
-            # Skip documents that don't match filters
-            if not self._matches_filters(document, params.filters):
-                continue
-            
-            # Calculate vector similarity
-            doc_vector = np.array(document.embedding)
-            distance = self._calculate_distance(doc_vector, query_vector)
-            vector_score = 1.0 - distance  # Convert distance to similarity score
-            
-            # Calculate text similarity
-            text_score = self._calculate_text_score(document.text, query)
-            
-            # Combine scores using hybrid_alpha parameter
-            score = (1 - params.hybrid_alpha) * vector_score + params.hybrid_alpha * text_score
-            
-            # Skip documents below minimum score or above maximum distance
-            if params.min_score is not None and score < params.min_score:
-                continue
-            if params.max_distance is not None and distance > params.max_distance:
-                continue
-            
-            # Create a copy of the document without embeddings if not requested
-            result_doc = document
-            if not params.include_embeddings and document.embedding is not None:
-                result_doc = Document(
-                    id=document.id,
-                    text=document.text,
-                    embedding=None,
-                    metadata=document.metadata.copy() if params.include_metadata else {}
-                )
-            elif not params.include_metadata:
-                result_doc = Document(
-                    id=document.id,
-                    text=document.text,
-                    embedding=document.embedding,
-                    metadata={}
-                )
-            
+        for row in self._top_rows(scores, mask, params.offset + params.limit)[params.offset:]:
+            document = self.collections[collection_name][index['row_ids'][row]]
             results.append(QueryResult(
-                document=result_doc,
-                score=score,
-                distance=distance,
+                document=self._result_document(document, params),
+                score=float(scores[row]),
+                distance=float(distances[row]),
                 metadata={
-                    "vector_score": vector_score,
-                    "text_score": text_score
+                    "vector_score": float(vector_scores[row]),
+                    "text_score": float(text_scores[row])
                 }
             ))
         
-        # Sort by score in descending order
-        results.sort(key=lambda x: x.score, reverse=True)
+        return results
+    
+    def query_many(self, collection_name: str, query_matrix: np.ndarray, top_k: int = 5,
+                   filters: Optional[Dict[str, Any]] = None) -> List[List[QueryResult]]:
+        """Search for documents with a batch of query vectors.
         
-        # Apply limit and offset
-        return results[params.offset:params.offset + params.limit]
+        All queries are scored with a single matrix product, which is
+        considerably faster than calling ``search_by_vector`` once per vector.
+        
+        Args:
+            collection_name: Name of the collection
+            query_matrix: Matrix of query vectors, one per row
+            top_k: Number of results to return per query
+            filters: Optional filters applied to every query
+            
+        Returns:
+            List of query results, one list per query row"""
+        queries = np.asarray(query_matrix, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        
+        if collection_name not in self.collections:
+            logger.warning(f"Collection does not exist: {collection_name}")
+            return [[] for _ in range(len(queries))]
+        
+        index = self.vector_indexes.get(collection_name)
+        if index is None:
+            return [[] for _ in range(len(queries))]
+        if queries.shape[1] != index['matrix'].shape[1]:
+            logger.warning(f"Query vectors do not have dimension {index['matrix'].shape[1]}")
+            return [[] for _ in range(len(queries))]
+        
+        params = SearchParams(limit=top_k, filters=filters or {})
+        mask = self._filter_mask(collection_name, index, params.filters)
+        scores = self._normalize(queries) @ index['matrix'][:index['size']].T
+        
+        documents = self.collections[collection_name]
+        all_results = []
+        for similarities in scores:
+            all_results.append([
+                QueryResult(
+                    document=self._result_document(documents[index['row_ids'][row]], params),
+                    score=float(similarities[row]),
+                    distance=float(1.0 - similarities[row])
+                )
+                for row in self._top_rows(similarities, mask, top_k)
+            ])
+        
+        return all_results
     
     def count_documents(self, collection_name: str) -> int:
         """Count the number of documents in a collection.
@@ -394,6 +389,7 @@ class InMemoryVectorDB(VectorDBInterface):
         Returns:
             True if successful, False otherwise"""
         self.collections.clear()
+        self.vector_indexes.clear()
         logger.info("Cleared all collections from in-memory vector database")
         return True
     
@@ -402,24 +398,286 @@ class InMemoryVectorDB(VectorDBInterface):
         # No connection to close for in-memory database
         logger.info("Closed in-memory vector database")
     
-    def _calculate_distance(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate the cosine distance between two vectors.
+    def _add_vectors(self, collection_name: str, documents: List[Document]) -> None:
+        """Add the embeddings of documents to a collection's matrix.
+        
+        Rows of documents that are replaced are marked dead first.
+        
+        Args:
+            collection_name: Name of the collection
+            documents: Documents with unique IDs"""
+        self._remove_vectors(collection_name, [document.id for document in documents])
+        
+        documents = [document for document in documents if document.embedding is not None]
+        if not documents:
+            return
+        
+        index = self.vector_indexes.get(collection_name)
+        dimension = len(documents[0].embedding) if index is None else index['matrix'].shape[1]
+        vectors = [document for document in documents if len(document.embedding) == dimension]
+        if len(vectors) < len(documents):
+            logger.warning(f"Skipping {len(documents) - len(vectors)} embeddings without dimension {dimension}")
+        if not vectors:
+            return
+        
+        block = self._normalize(np.array([document.embedding for document in vectors], dtype=np.float32))
+        if index is None:
+            # Allocate on the first insert, sized for the batch
+            index = {
+                'matrix': np.empty((len(vectors), dimension), dtype=np.float32),
+                'alive': np.zeros(len(vectors), dtype=bool),
+                'row_ids': [],
+                'id_to_row': {},
+                # Row-aligned lowercased texts and metadata; dead rows hold '' and None
+                'row_texts': [],
+                'row_metadata': [],
+                'text_array': None,
+                # Field -> value -> rows whose metadata has that value
+                'field_index': {},
+                'size': 0,
+                'deleted': 0
+            }
+            self.vector_indexes[collection_name] = index
+        self._ensure_capacity(index, index['size'] + len(vectors))
+        
+        start = index['size']
+        index['matrix'][start:start + len(vectors)] = block
+        index['alive'][start:start + len(vectors)] = True
+        for row, document in enumerate(vectors, start):
+            index['row_ids'].append(document.id)
+            index['id_to_row'][document.id] = row
+            index['row_texts'].append((document.text or '').lower())
+            index['row_metadata'].append(document.metadata)
+            self._index_metadata(index, row, document.metadata)
+        index['size'] += len(vectors)
+        index['text_array'] = None
+    
+    def _remove_vectors(self, collection_name: str, document_ids: List[str]) -> None:
+        """Mark the rows of documents dead, compacting the matrix if needed.
+        
+        Args:
+            collection_name: Name of the collection
+            document_ids: IDs of the documents"""
+        index = self.vector_indexes.get(collection_name)
+        if index is None:
+            return
+        
+        for document_id in document_ids:
+            row = index['id_to_row'].pop(document_id, None)
+            if row is not None:
+                self._unindex_metadata(index, row, index['row_metadata'][row])
+                index['alive'][row] = False
+                index['row_ids'][row] = None
+                index['row_texts'][row] = ''
+                index['row_metadata'][row] = None
+                index['text_array'] = None
+                index['deleted'] += 1
+        
+        if index['deleted'] > self.compaction_threshold * index['size']:
+            self._compact(index)
+    
+    def _ensure_capacity(self, index: Dict[str, Any], capacity: int) -> None:
+        """Grow a collection's matrix geometrically to hold at least capacity rows.
+        
+        Args:
+            index: Vector index of the collection
+            capacity: Required number of rows"""
+        current = len(index['matrix'])
+        if capacity <= current:
+            return
+        
+        new_capacity = max(capacity, current * 2)
+        matrix = np.empty((new_capacity, index['matrix'].shape[1]), dtype=np.float32)
+        matrix[:index['size']] = index['matrix'][:index['size']]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:index['size']] = index['alive'][:index['size']]
+        index['matrix'] = matrix
+        index['alive'] = alive
+    
+    def _compact(self, index: Dict[str, Any]) -> None:
+        """Drop dead rows from a collection's matrix.
+        
+        Args:
+            index: Vector index of the collection"""
+        live_rows = np.flatnonzero(index['alive'][:index['size']])
+        index['matrix'] = index['matrix'][live_rows]
+        index['alive'] = np.ones(len(live_rows), dtype=bool)
+        index['row_ids'] = [index['row_ids'][row] for row in live_rows]
+        index['id_to_row'] = {document_id: row for row, document_id in enumerate(index['row_ids'])}
+        index['row_texts'] = [index['row_texts'][row] for row in live_rows]
+        index['row_metadata'] = [index['row_metadata'][row] for row in live_rows]
+        index['text_array'] = None
+        index['size'] = len(live_rows)
+        index['deleted'] = 0
+        
+        index['field_index'] = {}
+        for row, metadata in enumerate(index['row_metadata']):
+            self._index_metadata(index, row, metadata)
+    
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        """L2-normalize the rows of a matrix, leaving zero rows untouched.
+        
+        Args:
+            matrix: Matrix of vectors, one per row
+            
+        Returns:
+            Normalized matrix"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def _similarities(self, index: Dict[str, Any], vector: List[float]) -> Optional[np.ndarray]:
+        """Calculate the cosine similarity of a query vector with every row.
         
         Args:
-            vec1: First vector
-            vec2: Second vector
+            index: Vector index of the collection
+            vector: Query vector
             
         Returns:
-            Cosine distance (1 - cosine similarity)"""
-        # Normalize vectors
-        vec1_norm = vec1 / np.linalg.norm(vec1)
-        vec2_norm = vec2 / np.linalg.norm(vec2)
+            Array of similarities, or None if the query has the wrong dimension"""
+        query = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        if query.shape[1] != index['matrix'].shape[1]:
+            logger.warning(f"Query vector does not have dimension {index['matrix'].shape[1]}")
+            return None
+        
+        return index['matrix'][:index['size']] @ self._normalize(query)[0]
+    
+    def _index_metadata(self, index: Dict[str, Any], row: int, metadata: Dict[str, Any]) -> None:
+        """Add a row to the field index under its top-level metadata values.
+        
+        Unhashable values are not indexed; they never equal a hashable filter value.
+        
+        Args:
+            index: Vector index of the collection
+            row: Row number
+            metadata: Metadata of the row's document"""
+        for key, value in metadata.items():
+            try:
+                index['field_index'].setdefault(key, {}).setdefault(value, set()).add(row)
+            except TypeError:
+                continue
+    
+    def _unindex_metadata(self, index: Dict[str, Any], row: int, metadata: Dict[str, Any]) -> None:
+        """Remove a row from the field index.
+        
+        Args:
+            index: Vector index of the collection
+            row: Row number
+            metadata: Metadata the row was indexed with"""
+        for key, value in metadata.items():
+            try:
+                rows = index['field_index'][key][value]
+            except (KeyError, TypeError):
+                continue
+            rows.discard(row)
+            if not rows:
+                del index['field_index'][key][value]
+    
+    def _filter_mask(self, collection_name: str, index: Dict[str, Any], filters: Dict[str, Any]) -> np.ndarray:
+        """Build a mask of the live rows whose documents match the filters.
         
-        # Calculate cosine similarity
-        similarity = np.dot(vec1_norm, vec2_norm)
+        Top-level filters with hashable values are looked up in the field
+        index; nested keys and unhashable values are checked row by row
+        among the rows that are still candidates.
         
-        # Convert to distance (1 - similarity)
-        return 1.0 - similarity
+        Args:
+            collection_name: Name of the collection
+            index: Vector index of the collection
+            filters: Dictionary of filters
+            
+        Returns:
+            Boolean array with one entry per row"""
+        mask = index['alive'][:index['size']].copy()
+        if not filters:
+            return mask
+        
+        unindexed = {}
+        for key, value in filters.items():
+            try:
+                rows = index['field_index'].get(key, {}).get(value, ()) if '.' not in key else None
+            except TypeError:
+                rows = None
+            if rows is None:
+                unindexed[key] = value
+                continue
+            
+            field_mask = np.zeros(index['size'], dtype=bool)
+            field_mask[list(rows)] = True
+            mask &= field_mask
+        
+        if unindexed:
+            for row in np.flatnonzero(mask):
+                mask[row] = self._matches_filters(Document(text='', metadata=index['row_metadata'][row]), unindexed)
+        return mask
+    
+    def _text_scores(self, index: Dict[str, Any], query: str) -> np.ndarray:
+        """Calculate the text match score of every row, as _calculate_text_score does.
+        
+        Args:
+            index: Vector index of the collection
+            query: Query string
+            
+        Returns:
+            Array of text match scores between 0 and 1"""
+        scores = np.zeros(index['size'], dtype=np.float32)
+        query_words = query.lower().split()
+        if not query_words or not index['size']:
+            return scores
+        
+        if index['text_array'] is None:
+            index['text_array'] = np.array(index['row_texts'], dtype=str)
+        
+        # Count matching words, each word checked against all rows at once
+        for word in query_words:
+            scores += np.char.find(index['text_array'], word) >= 0
+        
+        return scores / len(query_words)
+    
+    def _top_rows(self, scores: np.ndarray, mask: np.ndarray, count: int) -> List[int]:
+        """Get the rows with the highest scores among the masked rows.
+        
+        Args:
+            scores: Score of every row
+            mask: Rows that may be returned
+            count: Maximum number of rows
+            
+        Returns:
+            Row numbers ordered by descending score"""
+        rows = np.flatnonzero(mask)
+        if count <= 0 or len(rows) == 0:
+            return []
+        
+        if count < len(rows):
+            rows = rows[np.argpartition(-scores[rows], count - 1)[:count]]
+            rows.sort()
+        
+        # Stable sort keeps insertion order between equal scores
+        return rows[np.argsort(-scores[rows], kind='stable')].tolist()
+    
+    def _result_document(self, document: Document, params: SearchParams) -> Document:
+        """Create a copy of a document without embeddings or metadata if not requested.
+        
+        Args:
+            document: Stored document
+            params: Search parameters
+            
+        Returns:
+            Document to return in a query result"""
+        if not params.include_embeddings and document.embedding is not None:
+            return Document(
+                id=document.id,
+                text=document.text,
+                embedding=None,
+                metadata=document.metadata.copy() if params.include_metadata else {}
+            )
+        elif not params.include_metadata:
+            return Document(
+                id=document.id,
+                text=document.text,
+                embedding=document.embedding,
+                metadata={}
+            )
+        return document
     
     def _calculate_text_score(self, text: str, query: str) -> float:
         """Calculate a simple text match score.
@@ -0,0 +1,102 @@
+"""
+Benchmark the model provider response cache.
+
+This script sends a workload of repeated prompts and embedding queries from
+several threads through a Grok3Adapter backed by the offline StubProvider,
+once without and once with a ResponseCache, and reports provider calls, wall
+time, hit ratio and saved tokens.
+
+Usage:
+    python scripts/benchmark_response_cache.py [--requests 500] [--threads 16] [--latency 0.02]
+"""
+
+import sys
+import os
+import time
+import random
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.adapters.model_adapter import Grok3Adapter
+from app.models.providers.response_cache import ResponseCache
+from app.models.providers.stub_provider import StubProvider
+
+ROLE_PREAMBLES = [
+    "You are a software developer on the team.",
+    "You are the project manager of the team.",
+    "You are a data scientist on the team.",
+    "You are the system architect of the team."
+]
+
+def build_workload(count: int, unique_prompts: int, deterministic_ratio: float, seed: int) -> list:
+    """Create (kind, arguments) requests drawn from a small pool of prompts."""
+    rng = random.Random(seed)
+    prompts = [f"Summarize the status of work item {i}." for i in range(unique_prompts)]
+    workload = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            workload.append(("embedding", {"texts": [rng.choice(prompts)]}))
+        else:
+            workload.append(("completion", {
+                "prompt": rng.choice(prompts),
+                "system_message": rng.choice(ROLE_PREAMBLES),
+                "temperature": 0.0 if rng.random() < deterministic_ratio else 0.7
+            }))
+    return workload
+
+def run_benchmark(workload: list, threads: int, latency: float, use_cache: bool) -> dict:
+    """Run the workload and collect statistics."""
+    provider = StubProvider(latency=latency)
+    response_cache = ResponseCache(max_entries=10000) if use_cache else None
+    adapter = Grok3Adapter(provider=provider, response_cache=response_cache)
+    
+    def send(request):
+        kind, arguments = request
+        if kind == "embedding":
+            return adapter.get_embeddings(**arguments)
+        return adapter.generate_text(**arguments)
+    
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(send, workload))
+    elapsed = time.perf_counter() - start_time
+    
+    stats = adapter.get_cache_stats()
+    return {
+        "cache": "on" if use_cache else "off",
+        "requests": len(workload),
+        "provider_calls": provider.call_count,
+        "seconds": elapsed,
+        "hit_ratio": stats.get("hit_ratio", 0.0),
+        "saved_tokens": stats.get("saved_tokens", 0)
+    }
+
+def main():
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description="Benchmark the model provider response cache")
+    parser.add_argument("--requests", type=int, default=500, help="Number of requests")
+    parser.add_argument("--threads", type=int, default=16, help="Number of concurrent callers")
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated provider latency in seconds")
+    parser.add_argument("--unique-prompts", type=int, default=50, help="Number of distinct prompts")
+    parser.add_argument("--deterministic-ratio", type=float, default=0.8, help="Share of temperature 0 completions")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.ERROR)
+    
+    workload = build_workload(args.requests, args.unique_prompts, args.deterministic_ratio, args.seed)
+    
+    print(f"{'cache':<8}{'requests':>10}{'calls':>8}{'seconds':>10}{'hit ratio':>11}{'saved tokens':>14}")
+    for use_cache in (False, True):
+        result = run_benchmark(workload, args.threads, args.latency, use_cache)
+        print(
+            f"{result['cache']:<8}{result['requests']:>10}{result['provider_calls']:>8}"
+            f"{result['seconds']:>10.2f}{result['hit_ratio']:>11.2f}{result['saved_tokens']:>14}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Tests for the segmented file-based audit event storage.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.security.audit_trail import (
+    AuditEvent, AuditEventType, AuditEventSeverity, FileAuditEventStorage, AuditTrailSystem
+)
+
+def make_event(index, actor="agent1"):
+    """Create an audit event with a timestamp derived from its index."""
+    return AuditEvent(
+        id=f"event-{index}",
+        event_type=AuditEventType.AGENT_ACTION,
+        timestamp=1000.0 + index,
+        actor=actor,
+        action="action",
+        resource=f"resource-{index}",
+        status="success",
+        severity=AuditEventSeverity.INFO,
+        details={"index": index}
+    )
+
+class TestFileAuditEventStorage(unittest.TestCase):
+    """Test cases for the FileAuditEventStorage class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "audit.log")
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def segment_files(self):
+        """List the sealed segment files."""
+        return sorted(name for name in os.listdir(self.temp_dir) if name != "audit.log" and not name.endswith(".idx"))
+    
+    def test_rotation_and_reload(self):
+        """Test that segments rotate and their indexes survive a restart."""
+        storage = FileAuditEventStorage(self.file_path, max_segment_bytes=2000)
+        for index in range(50):
+            self.assertTrue(storage.store_event(make_event(index, "agent1" if index % 2 else "agent2")))
+        storage.close()
+        
+        self.assertGreater(len(self.segment_files()), 2)
+        
+        storage = FileAuditEventStorage(self.file_path, max_segment_bytes=2000)
+        self.assertEqual(storage.get_event("event-3").resource, "resource-3")
+        self.assertIsNone(storage.get_event("missing"))
+        self.assertEqual(storage.count_events(), 50)
+        self.assertEqual(storage.count_events(start_time=1010.0, end_time=1020.0), 10)
+        self.assertEqual(storage.count_events(filters={"actor": "agent1"}), 25)
+        
+        events = storage.query_events(filters={"actor": "agent2"}, start_time=1010.0, limit=3, offset=1)
+        self.assertEqual([event.id for event in events], ["event-12", "event-14", "event-16"])
+        storage.close()
+    
+    def test_time_range_pruning(self):
+        """Test that queries do not open segments outside the time range."""
+        storage = FileAuditEventStorage(self.file_path, max_segment_bytes=2000)
+        storage.store_events([make_event(index) for index in range(60)])
+        for index in range(60, 80):
+            storage.store_event(make_event(index))
+        
+        opened = []
+        for segment in storage._segments + [storage._active]:
+            original_open = segment.open
+            segment.open = lambda original_open=original_open, segment=segment: opened.append(segment) or original_open()
+        
+        events = storage.query_events(start_time=1075.0)
+        self.assertEqual([event.id for event in events], [f"event-{i}" for i in range(75, 80)])
+        self.assertEqual(len(opened), 2)
+        self.assertTrue(all(segment.max_time >= 1075.0 for segment in opened))
+        self.assertGreater(len(storage._segments), 2)
+        storage.close()
+    
+    def test_delete(self):
+        """Test deleting single events and time ranges."""
+        storage = FileAuditEventStorage(self.file_path, max_segment_bytes=2000)
+        for index in range(50):
+            storage.store_event(make_event(index))
+        sealed_before = len(self.segment_files())
+        
+        self.assertTrue(storage.delete_event("event-5"))
+        self.assertFalse(storage.delete_event("event-5"))
+        self.assertIsNone(storage.get_event("event-5"))
+        self.assertEqual(storage.get_event("event-6").resource, "resource-6")
+        
+        self.assertEqual(storage.delete_events(end_time=1030.0), 29)
+        self.assertLess(len(self.segment_files()), sealed_before)
+        self.assertEqual(storage.count_events(), 20)
+        self.assertEqual(storage.delete_events(filters={"resource": "resource-49"}), 1)
+        storage.close()
+        
+        storage = FileAuditEventStorage(self.file_path, max_segment_bytes=2000)
+        self.assertEqual(storage.count_events(), 19)
+        self.assertEqual(storage.query_events(limit=1)[0].id, "event-30")
+        storage.close()
+    
+    def test_compressed_segments(self):
+        """Test that sealed segments can be compressed and still read."""
+        storage = FileAuditEventStorage(self.file_path, max_segment_bytes=2000, compress_sealed=True)
+        for index in range(50):
+            storage.store_event(make_event(index))
+        
+        self.assertTrue(all(name.endswith(".gz") for name in self.segment_files()))
+        self.assertEqual(storage.get_event("event-2").resource, "resource-2")
+        self.assertTrue(storage.delete_event("event-1"))
+        self.assertEqual(len(storage.query_events(end_time=1010.0)), 9)
+        storage.close()
+    
+    def test_buffered_writes(self):
+        """Test that buffered events are written together and visible to reads."""
+        storage = FileAuditEventStorage(self.file_path, batch_size=10, flush_interval=0.05)
+        storage.store_event(make_event(0))
+        self.assertEqual(os.path.getsize(self.file_path), 0)
+        
+        # Reads flush the buffer
+        self.assertEqual(storage.count_events(), 1)
+        
+        storage.store_event(make_event(1))
+        time.sleep(0.2)
+        self.assertGreater(os.path.getsize(self.file_path), 0)
+        self.assertEqual(storage.count_events(), 2)
+        storage.close()
+    
+    def test_async_audit_trail(self):
+        """Test that the async audit trail stores queued events in batches."""
+        storage = FileAuditEventStorage(self.file_path)
+        with AuditTrailSystem(storage, async_mode=True) as audit_trail:
+            for index in range(200):
+                audit_trail.log_event(make_event(index))
+            audit_trail.event_queue.join()
+            self.assertEqual(audit_trail.count_events(), 200)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,11 +3,14 @@ from unittest.mock import Mock, patch
 import sys
 import os
 import tempfile
+import asyncio
+import threading
+import time
 
 # Add parent directory to path to import app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.cache import Cache, PersistentCache, cached, get_default_cache
+from app.core.cache import Cache, PersistentCache, cached, get_default_cache, make_cache_key
 
 class CacheTests(unittest.TestCase):
     """
@@ -112,7 +115,73 @@ class CacheTests(unittest.TestCase):
         # Assert
         self.assertEqual(stats["size"], 2)
         self.assertEqual(stats["max_size"], 10)
-        self.assertEqual(stats["hit_count"], 3)
+        self.assertEqual(stats["hit_count"], 2)
+    
+    def test_miss_and_eviction_counts(self):
+        """Test miss and eviction counters."""
+        # Miss once, then overflow the cache by five entries
+        self.cache.get("missing")
+        for i in range(15):
+            self.cache.set(f"key{i}", f"value{i}")
+        
+        # Get stats
+        stats = self.cache.stats()
+        
+        # Assert
+        self.assertEqual(stats["miss_count"], 1)
+        self.assertEqual(stats["eviction_count"], 5)
+        self.assertEqual(stats["size"], 10)
+    
+    def test_lru_eviction_order(self):
+        """Test that the least recently used entry is evicted."""
+        for i in range(10):
+            self.cache.set(f"key{i}", f"value{i}")
+        
+        # Touch key0 so key1 becomes least recently used
+        self.cache.get("key0")
+        self.cache.set("key10", "value10")
+        
+        # Assert
+        self.assertEqual(self.cache.get("key0"), "value0")
+        self.assertIsNone(self.cache.get("key1"))
+    
+    def test_max_bytes(self):
+        """Test bounding the cache by value size."""
+        cache = Cache(max_size=100, max_bytes=10, size_fn=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        cache.set("c", "xxxx")
+        cache.set("huge", "x" * 11)
+        
+        # Assert
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual(cache.stats()["bytes"], 8)
+    
+    def test_default_shard_count(self):
+        """Test that the default cache is striped over several locks."""
+        self.assertEqual(Cache().stats()["num_shards"], 15)
+        self.assertEqual(Cache(max_size=10).stats()["num_shards"], 1)
+        self.assertEqual(Cache(max_size=100000).stats()["num_shards"], 16)
+    
+    def test_sharded_concurrent_access(self):
+        """Test that a sharded cache stays within bounds under concurrency."""
+        cache = Cache(max_size=200, num_shards=8)
+        
+        def worker(offset):
+            for i in range(500):
+                cache.set(f"key{offset}-{i}", i)
+                cache.get(f"key{offset}-{i // 2}")
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # Assert
+        self.assertEqual(len(cache), 200)
+        self.assertEqual(len(cache._cache), 200)
 
 class PersistentCacheTests(unittest.TestCase):
     """
@@ -159,6 +228,73 @@ class PersistentCacheTests(unittest.TestCase):
         
         # Assert
         self.assertIsNone(value)
+    
+    def test_delete_persistence(self):
+        """Test that deletes are persisted."""
+        self.cache.set("test_key", "test_value")
+        self.cache.delete("test_key")
+        
+        # Create new cache instance
+        new_cache = PersistentCache(self.temp_dir)
+        
+        # Assert
+        self.assertIsNone(new_cache.get("test_key"))
+    
+    def test_torn_log_tail(self):
+        """Test that a partially written record is discarded on load."""
+        self.cache.set("key1", "value1")
+        self.cache.set("key2", "value2")
+        self.cache.close()
+        
+        # Simulate a crash halfway through the last append
+        log_file = os.path.join(self.temp_dir, "cache.log")
+        with open(log_file, "r+b") as f:
+            f.truncate(os.path.getsize(log_file) - 3)
+        
+        new_cache = PersistentCache(self.temp_dir)
+        
+        # Assert
+        self.assertEqual(new_cache.get("key1"), "value1")
+        self.assertIsNone(new_cache.get("key2"))
+        new_cache.set("key3", "value3")
+        self.assertEqual(PersistentCache(self.temp_dir).get("key3"), "value3")
+    
+    def test_coalesced_writes(self):
+        """Test that coalesced writes only reach disk on flush."""
+        cache = PersistentCache(self.temp_dir, flush_interval=60)
+        for i in range(5):
+            cache.set("test_key", f"value{i}")
+        
+        # Assert
+        self.assertIsNone(PersistentCache(self.temp_dir).get("test_key"))
+        cache.flush()
+        self.assertEqual(PersistentCache(self.temp_dir).get("test_key"), "value4")
+    
+    def test_compaction(self):
+        """Test folding the log into a snapshot."""
+        for i in range(5):
+            self.cache.set(f"key{i}", f"value{i}")
+        self.cache.delete("key0")
+        
+        self.cache.compact()
+        
+        # Assert
+        self.assertEqual(os.path.getsize(os.path.join(self.temp_dir, "cache.log")), 0)
+        new_cache = PersistentCache(self.temp_dir)
+        self.assertIsNone(new_cache.get("key0"))
+        self.assertEqual(new_cache.get("key4"), "value4")
+    
+    def test_interrupted_compaction(self):
+        """Test recovery when a crash interrupts compaction after log rotation."""
+        self.cache.set("key1", "value1")
+        self.cache.close()
+        os.replace(os.path.join(self.temp_dir, "cache.log"), os.path.join(self.temp_dir, "cache.log.old"))
+        
+        new_cache = PersistentCache(self.temp_dir)
+        
+        # Assert
+        self.assertEqual(new_cache.get("key1"), "value1")
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "cache.log.old")))
 
 class CachedDecoratorTests(unittest.TestCase):
     """
@@ -231,6 +367,126 @@ class CachedDecoratorTests(unittest.TestCase):
         
         # Check that custom key was used
         self.assertIsNotNone(self.cache.get("custom_key:1:2"))
+    
+    def test_cached_none_result(self):
+        """Test that None results are cached unless disabled."""
+        call_count = [0]
+        
+        @cached(ttl=60, cache_instance=self.cache)
+        def cached_none():
+            call_count[0] += 1
+            return None
+        
+        @cached(ttl=60, cache_instance=self.cache, cache_none=False)
+        def uncached_none():
+            call_count[0] += 1
+            return None
+        
+        cached_none()
+        cached_none()
+        self.assertEqual(call_count[0], 1)
+        
+        uncached_none()
+        uncached_none()
+        self.assertEqual(call_count[0], 3)
+    
+    def test_cached_stable_key(self):
+        """Test that keys are stable for equal arguments and distinguish types."""
+        def test_function(*args, **kwargs):
+            return None
+        
+        key1 = make_cache_key(test_function, (1, "a"), {"x": 1, "y": [1, 2]})
+        key2 = make_cache_key(test_function, (1, "a"), {"y": [1, 2], "x": 1})
+        key3 = make_cache_key(test_function, ("1", "a"), {"x": 1, "y": [1, 2]})
+        
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+        self.assertTrue(key1.startswith(f"{test_function.__module__}.{test_function.__qualname__}:"))
+    
+    def test_cached_single_flight(self):
+        """Test that concurrent misses share a single call."""
+        call_count = [0]
+        release = threading.Event()
+        
+        @cached(ttl=60, cache_instance=self.cache)
+        def slow_function(arg):
+            call_count[0] += 1
+            release.wait(5)
+            return arg * 2
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow_function(21))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(call_count[0], 1)
+    
+    def test_cached_stale_while_revalidate(self):
+        """Test that stale values are served while refreshing in the background."""
+        call_count = [0]
+        
+        @cached(ttl=0.05, stale_ttl=60, cache_instance=self.cache)
+        def test_function():
+            call_count[0] += 1
+            return call_count[0]
+        
+        self.assertEqual(test_function(), 1)
+        time.sleep(0.1)
+        
+        # Stale value is returned immediately and refreshed once
+        self.assertEqual(test_function(), 1)
+        for _ in range(50):
+            if test_function() == 2:
+                break
+            time.sleep(0.01)
+        
+        self.assertEqual(test_function(), 2)
+        self.assertEqual(call_count[0], 2)
+    
+    def test_cached_async_function(self):
+        """Test caching results of coroutine functions with single-flight."""
+        call_count = [0]
+        
+        @cached(ttl=60, cache_instance=self.cache)
+        async def test_function(arg):
+            call_count[0] += 1
+            await asyncio.sleep(0.05)
+            return arg + 1
+        
+        async def run():
+            results = await asyncio.gather(*(test_function(1) for _ in range(5)))
+            results.append(await test_function(1))
+            return results
+        
+        results = asyncio.run(run())
+        
+        self.assertEqual(results, [2] * 6)
+        self.assertEqual(call_count[0], 1)
+    
+    def test_cached_async_exception_not_cached(self):
+        """Test that exceptions are shared with waiters but not cached."""
+        call_count = [0]
+        
+        @cached(ttl=60, cache_instance=self.cache)
+        async def failing_function():
+            call_count[0] += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        
+        async def run():
+            return await asyncio.gather(failing_function(), failing_function(), return_exceptions=True)
+        
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(call_count[0], 1)
+        
+        asyncio.run(run())
+        self.assertEqual(call_count[0], 2)
 
 class DefaultCacheTests(unittest.TestCase):
     """
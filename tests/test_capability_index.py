@@ -0,0 +1,161 @@
+"""
+Tests for the indexed capability search of the A2A capability registry.
+"""
+
+import os
+import sys
+import random
+import asyncio
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.collaboration.a2a_framework import Capability, CapabilityRegistry
+
+TAGS = ["nlp", "vision", "planning", "coding", "testing", "search"]
+WORDS = ["analysis", "data", "generation", "review", "image", "text", "code", "plan", "database", "summary"]
+
+def make_capability(rng, index):
+    """Create a random capability."""
+    capability = Capability(
+        capability_id=f"cap_{index}",
+        name=" ".join(rng.sample(WORDS, 2)).title(),
+        description=f"Performs {' '.join(rng.sample(WORDS, 4))}.",
+        parameters={"language": rng.choice(["python", "java", "go"])} if rng.random() < 0.5 else {},
+        performance_metrics={
+            "accuracy": round(rng.random(), 2),
+            "latency": rng.randint(1, 100),
+            "tier": rng.choice(["gold", "silver"])
+        }
+    )
+    for tag in rng.sample(TAGS, 2):
+        capability.add_semantic_tag(tag)
+    return capability
+
+def brute_force(registry, criteria):
+    """Find matching agents by checking every agent capability."""
+    results = {}
+    for agent_id, capability_ids in registry.agent_capabilities.items():
+        matches = []
+        for capability_id in capability_ids:
+            capability = registry.capabilities[capability_id]
+            if registry._capability_matches_criteria(
+                capability,
+                criteria.get("tags", []),
+                criteria.get("name_keywords", []),
+                criteria.get("description_keywords", []),
+                criteria.get("parameters", {}),
+                criteria.get("performance", {})
+            ):
+                matches.append({
+                    "capability_id": capability_id,
+                    "name": capability.name,
+                    "match_score": registry._calculate_match_score(capability, criteria)
+                })
+        if matches:
+            matches.sort(key=lambda x: x["match_score"], reverse=True)
+            results[agent_id] = matches
+    return results
+
+CRITERIA = [
+    {},
+    {"tags": ["nlp", "vision"]},
+    {"name_keywords": ["analy"]},
+    {"description_keywords": ["data", "image text"]},
+    {"description_keywords": ["."]},
+    {"parameters": {"language": ["python", "go"]}},
+    {"performance": {"accuracy": {"min": 0.5}, "latency": {"max": 40}}},
+    {"performance": {"tier": "gold", "latency": {"min": 10, "max": 60}}},
+    {"tags": ["coding"], "name_keywords": ["code", "review"], "performance": {"accuracy": {"min": 0.3}}},
+    {"tags": ["unknown"]}
+]
+
+class TestCapabilityIndex(unittest.TestCase):
+    """Test cases for the CapabilityIndex used by CapabilityRegistry."""
+    
+    def setUp(self):
+        """Set up a registry with random capabilities shared between agents."""
+        self.rng = random.Random(7)
+        self.registry = CapabilityRegistry()
+        
+        async def register():
+            for index in range(200):
+                capability = make_capability(self.rng, index)
+                for agent_id in self.rng.sample([f"agent_{i}" for i in range(20)], self.rng.randint(1, 2)):
+                    await self.registry.register_capability(agent_id, capability)
+        
+        asyncio.run(register())
+    
+    def assert_matches_brute_force(self):
+        """Check every criteria against a full scan of the registry."""
+        for criteria in CRITERIA:
+            result = asyncio.run(self.registry.find_agents_with_capability(criteria))
+            expected = brute_force(self.registry, criteria)
+            self.assertEqual(result["matching_agents"], expected, criteria)
+            self.assertEqual(list(result["matching_agents"]), list(expected), criteria)
+    
+    def test_search_matches_full_scan(self):
+        """Test that indexed searches return the same results as a full scan."""
+        self.assert_matches_brute_force()
+    
+    def test_index_maintenance(self):
+        """Test that the indexes follow updates, unregistrations and expiry."""
+        async def modify():
+            for index in range(0, 200, 3):
+                capability_id = f"cap_{index}"
+                agent_id = self.registry.capability_agents[capability_id][0]
+                await self.registry.update_capability(agent_id, capability_id, {
+                    "name": "Image Review",
+                    "semantic_tags": ["search"],
+                    "performance_metrics": {"latency": index, "accuracy": 0.99, "tier": "bronze"}
+                })
+            for index in range(1, 200, 4):
+                capability_id = f"cap_{index}"
+                for agent_id in list(self.registry.capability_agents.get(capability_id, [])):
+                    await self.registry.unregister_capability(agent_id, capability_id)
+            for index in range(2, 200, 10):
+                self.registry.capabilities[f"cap_{index}"].updated_at = "2000-01-01T00:00:00"
+            await self.registry.clean_expired_capabilities()
+        
+        asyncio.run(modify())
+        
+        self.assertNotIn("cap_1", self.registry.index.entries)
+        self.assertNotIn("cap_2", self.registry.index.entries)
+        self.assertEqual(set(self.registry.index.entries), set(self.registry.capabilities))
+        self.assert_matches_brute_force()
+    
+    def test_direct_capability_changes(self):
+        """Test that changing a registered capability directly keeps the indexes current."""
+        for index in range(0, 200, 5):
+            capability = self.registry.capabilities[f"cap_{index}"]
+            capability.add_semantic_tag("unknown")
+            capability.update_performance_metric("latency", 5)
+            capability.update_parameter("language", "go")
+        
+        self.assertEqual(self.registry.index.entries["cap_0"]["metrics"]["latency"], 5)
+        self.assert_matches_brute_force()
+        
+        # Capabilities removed from the registry no longer update its indexes
+        capability = self.registry.capabilities["cap_0"]
+        for agent_id in list(self.registry.capability_agents["cap_0"]):
+            asyncio.run(self.registry.unregister_capability(agent_id, "cap_0"))
+        capability.add_semantic_tag("removed")
+        self.assertNotIn("cap_0", self.registry.index.entries)
+    
+    def test_top_capabilities(self):
+        """Test that top-k queries return the best scored agent capabilities."""
+        criteria = {"tags": ["nlp", "planning"], "performance": {"accuracy": {"min": 0.2}}}
+        result = asyncio.run(self.registry.find_top_capabilities(criteria, top_k=5))
+        
+        expected = sorted(
+            (match["match_score"] for matches in brute_force(self.registry, criteria).values() for match in matches),
+            reverse=True
+        )[:5]
+        self.assertEqual(result["count"], 5)
+        self.assertEqual([match["match_score"] for match in result["matches"]], expected)
+        for match in result["matches"]:
+            self.assertIn(match["agent_id"], self.registry.capability_agents[match["capability_id"]])
+
+if __name__ == "__main__":
+    unittest.main()
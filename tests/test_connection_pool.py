@@ -3,12 +3,14 @@ from unittest.mock import Mock, patch
 import sys
 import os
 import threading
+import asyncio
+import queue
 import time
 
 # Add parent directory to path to import app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.connection_pool import ConnectionPool, ConnectionPoolManager, get_pool_manager
+from app.core.connection_pool import ConnectionPool, AsyncConnectionPool, ConnectionPoolManager, get_pool_manager
 
 class ConnectionPoolTests(unittest.TestCase):
     """
@@ -138,6 +140,122 @@ class ConnectionPoolTests(unittest.TestCase):
         # Try to get a connection (should raise exception)
         with self.assertRaises(RuntimeError):
             self.pool.get_connection()
+    
+    def test_connection_context_manager(self):
+        """Test checking out a connection with the context manager."""
+        with self.pool.connection() as connection:
+            self.assertEqual(connection, self.connection_factory.return_value)
+            self.assertEqual(self.pool.stats()["in_use"], 1)
+        
+        # Check that the connection was returned
+        stats = self.pool.stats()
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["available"], 2)
+        self.assertEqual(stats["checkout_latency"]["count"], 1)
+    
+    def test_wait_for_returned_connection(self):
+        """Test that a waiting caller receives a returned connection."""
+        pool = ConnectionPool(factory=object, min_size=0, max_size=1, timeout=5.0)
+        try:
+            held = pool.get_connection()
+            received = []
+            
+            thread = threading.Thread(target=lambda: received.append(pool.get_connection()))
+            thread.start()
+            time.sleep(0.1)
+            self.assertEqual(pool.stats()["waiting"], 1)
+            
+            pool.return_connection(held)
+            thread.join(timeout=2)
+            
+            # Assert
+            self.assertEqual(received, [held])
+            stats = pool.stats()
+            self.assertEqual(stats["total"], 1)
+            self.assertEqual(stats["wait_time"]["count"], 1)
+            self.assertGreater(stats["wait_time"]["max"], 0.05)
+        finally:
+            pool.shutdown()
+    
+    def test_non_blocking_pool_exhausted(self):
+        """Test that a non-blocking pool raises when exhausted."""
+        pool = ConnectionPool(factory=object, min_size=0, max_size=1, block=False)
+        try:
+            pool.get_connection()
+            with self.assertRaises(queue.Empty):
+                pool.get_connection()
+        finally:
+            pool.shutdown()
+
+class AsyncConnectionPoolTests(unittest.TestCase):
+    """
+    Unit tests for the async connection pool.
+    """
+    
+    def test_get_and_return_connection(self):
+        """Test checking out and returning connections."""
+        async def factory():
+            return object()
+        
+        async def run():
+            async with AsyncConnectionPool(factory=factory, min_size=2, max_size=3) as pool:
+                self.assertEqual(pool.stats()["available"], 2)
+                
+                async with pool.connection() as connection:
+                    self.assertIsNotNone(connection)
+                    self.assertEqual(pool.stats()["in_use"], 1)
+                
+                return pool.stats()
+        
+        stats = asyncio.run(run())
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["available"], 2)
+    
+    def test_invalid_connections_replaced(self):
+        """Test that connections failing validation are cleaned up."""
+        cleaned = []
+        
+        async def run():
+            pool = AsyncConnectionPool(
+                factory=object,
+                validator=lambda conn: False,
+                cleanup=cleaned.append,
+                min_size=1,
+                max_size=2
+            )
+            connection = await pool.get_connection()
+            stats = pool.stats()
+            await pool.shutdown()
+            return connection, stats
+        
+        connection, stats = asyncio.run(run())
+        self.assertEqual(len(cleaned), 2)
+        self.assertIsNot(cleaned[0], connection)
+        self.assertEqual(stats["total"], 1)
+    
+    def test_wait_and_timeout(self):
+        """Test waiting for a connection and timing out."""
+        async def run():
+            pool = AsyncConnectionPool(factory=object, min_size=0, max_size=1, timeout=0.2)
+            held = await pool.get_connection()
+            
+            # Wait for the held connection to be returned
+            waiter = asyncio.ensure_future(pool.get_connection())
+            await asyncio.sleep(0.05)
+            await pool.return_connection(held)
+            received = await waiter
+            
+            # Pool is exhausted again
+            with self.assertRaises(TimeoutError):
+                await pool.get_connection()
+            
+            stats = pool.stats()
+            await pool.shutdown()
+            return held, received, stats
+        
+        held, received, stats = asyncio.run(run())
+        self.assertIs(received, held)
+        self.assertEqual(stats["wait_time"]["count"], 2)
 
 class ConnectionPoolManagerTests(unittest.TestCase):
     """
@@ -0,0 +1,108 @@
+"""
+Tests for the ContextWindowManager document pipeline.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.context_extension.context_window_manager import ContextWindowManager
+
+class TestContextWindowManagerPipeline(unittest.TestCase):
+    """Test cases for the ContextWindowManager pipeline."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = ContextWindowManager(
+            memory_manager_config={"storage_dir": self.temp_dir.name},
+            recursive_summarizer_config={"target_size": 50, "min_size": 5}
+        )
+        self.document = "\n\n".join(
+            f"Paragraph {i} describes part {i} of the design. " + "detail " * 30 for i in range(8)
+        )
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.manager.close()
+        self.manager.memory_manager.index.close()
+        self.temp_dir.cleanup()
+    
+    def test_stages_share_prepared_document(self):
+        """Test that the document is split once and shared by all stages."""
+        manager = self.manager
+        with patch.object(manager.hierarchical_processor, "process_document",
+                          wraps=manager.hierarchical_processor.process_document) as hierarchical, \
+             patch.object(manager.recursive_summarizer, "get_hierarchical_summary",
+                          wraps=manager.recursive_summarizer.get_hierarchical_summary) as summarizer, \
+             patch.object(manager.vector_db, "store_document",
+                          wraps=manager.vector_db.store_document) as vector_db, \
+             patch.object(manager.multi_agent_distributor, "distribute_context",
+                          wraps=manager.multi_agent_distributor.distribute_context) as distributor:
+            result = manager.process_document(self.document)
+        
+        self.assertEqual(result["status"], "success")
+        paragraphs = hierarchical.call_args[0][2]
+        self.assertEqual(len(paragraphs), 8)
+        self.assertIs(summarizer.call_args[0][1], paragraphs)
+        self.assertIs(distributor.call_args[0][2], paragraphs)
+        self.assertEqual(vector_db.call_args[0][3], self.document.split())
+    
+    def test_document_id_shared_by_stages(self):
+        """Test that a generated document ID is used by every stage."""
+        result = self.manager.process_document(self.document)
+        
+        memory_item = self.manager.memory_manager.get_from_long_term_memory(result["components"]["memory_manager"]["memory_id"])
+        self.assertEqual(memory_item["document_id"], result["document_id"])
+        self.assertEqual(memory_item["metadata"]["document_id"], result["document_id"])
+    
+    def test_process_documents_bounded(self):
+        """Test that bulk processing preserves order and limits documents in flight."""
+        lock = threading.Lock()
+        state = {"active": 0, "max_active": 0, "read": 0}
+        
+        def fake_process_document(document, **kwargs):
+            with lock:
+                state["active"] += 1
+                state["max_active"] = max(state["max_active"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return {"status": "success", "document_id": document}
+        
+        def documents():
+            for i in range(10):
+                state["read"] += 1
+                yield {"document": str(i)}
+        
+        with patch.object(self.manager, "process_document", side_effect=fake_process_document):
+            results = self.manager.process_documents(documents(), max_in_flight=2)
+            first = next(results)
+            self.assertLessEqual(state["read"], 2)
+            rest = list(results)
+        
+        self.assertEqual([r["document_id"] for r in [first] + rest], [str(i) for i in range(10)])
+        self.assertLessEqual(state["max_active"], 2)
+    
+    def test_retrieve_context_token_budget(self):
+        """Test that retrieved context is trimmed to the token budget."""
+        self.manager.process_document(self.document, document_id="budget")
+        
+        full = self.manager.retrieve_context("design detail", context_type="vector", max_results=5)
+        budget = self.manager.retrieve_context("design detail", context_type="vector", max_results=5, max_tokens=60)
+        
+        self.assertGreater(full["token_count"], 60)
+        self.assertEqual(full["token_count"], self.manager.token_counter.count_tokens(full["context"]))
+        self.assertLessEqual(budget["token_count"], 60)
+        self.assertTrue(full["context"].startswith(budget["context"]))
+        self.assertEqual(budget["token_count"], self.manager.token_counter.count_tokens(budget["context"]))
+
+if __name__ == "__main__":
+    unittest.main()
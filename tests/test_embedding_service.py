@@ -0,0 +1,136 @@
+"""
+Tests for the embedding service module.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.embedding_service import EmbeddingService, EmbeddingCache, make_embedding_key
+
+class FakeModel:
+    """Embedding model recording its batches."""
+    
+    def __init__(self, dimension=4):
+        self.dimension = dimension
+        self.batches = []
+        self.lock = threading.Lock()
+    
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] + [1.0] * (self.dimension - 2) for text in texts]
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test cases for the EmbeddingCache class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.temp_dir.cleanup()
+    
+    def test_persistent_cache_survives_reopen(self):
+        """Test that embeddings are reloaded from the memory-mapped store."""
+        cache = EmbeddingCache(self.temp_dir.name, initial_capacity=2)
+        keys = [f"key{i}" for i in range(5)]
+        vectors = np.arange(20, dtype=np.float32).reshape(5, 4)
+        
+        # Storing more rows than the initial capacity grows the store
+        self.assertEqual(cache.put_many(keys, vectors), 5)
+        self.assertEqual(cache.put_many(keys[:1], vectors[:1]), 0)
+        cache.close()
+        
+        reopened = EmbeddingCache(self.temp_dir.name)
+        self.assertEqual(len(reopened), 5)
+        results = reopened.get_many(keys + ["missing"])
+        for vector, expected in zip(results, vectors):
+            np.testing.assert_array_equal(vector, expected)
+        self.assertIsNone(results[-1])
+    
+    def test_memory_cache_is_bounded(self):
+        """Test that the in-memory cache evicts the least recently used entries."""
+        cache = EmbeddingCache(max_memory_entries=2)
+        cache.put_many(["a", "b"], np.ones((2, 3)))
+        cache.get_many(["a"])
+        cache.put_many(["c"], np.ones((1, 3)))
+        
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get_many(["b"])[0])
+        self.assertIsNotNone(cache.get_many(["a"])[0])
+
+class TestEmbeddingService(unittest.TestCase):
+    """Test cases for the EmbeddingService class."""
+    
+    def test_cache_hits_and_batching(self):
+        """Test that repeated texts are served from the cache in batches."""
+        model = FakeModel()
+        service = EmbeddingService(model, "fake", batch_size=2)
+        
+        first = service.embed(["alpha", "beta", "gamma", "alpha"])
+        self.assertEqual([len(batch) for batch in model.batches], [2, 1])
+        np.testing.assert_array_equal(first[0], first[3])
+        
+        second = service.embed(["beta", "gamma", "delta"])
+        self.assertEqual(model.batches[-1], ["delta"])
+        np.testing.assert_array_equal(second[0], first[1])
+        
+        stats = service.get_stats()
+        self.assertEqual(stats["requests"], 7)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["embedded"], 4)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 7)
+    
+    def test_model_key_isolation(self):
+        """Test that cache keys depend on the model."""
+        self.assertNotEqual(make_embedding_key("a", "text"), make_embedding_key("b", "text"))
+    
+    def test_errors_are_not_cached(self):
+        """Test that a failing model call is retried on the next request."""
+        calls = []
+        
+        def flaky(texts):
+            calls.append(texts)
+            if len(calls) == 1:
+                raise RuntimeError("model unavailable")
+            return [[1.0, 2.0] for _ in texts]
+        
+        service = EmbeddingService(flaky, "flaky")
+        with self.assertRaises(RuntimeError):
+            service.embed(["text"])
+        
+        self.assertEqual(service.embed(["text"])[0].tolist(), [1.0, 2.0])
+        self.assertEqual(len(calls), 2)
+    
+    def test_micro_batching_coalesces_concurrent_requests(self):
+        """Test that concurrent requests are embedded in shared batches."""
+        model = FakeModel()
+        service = EmbeddingService(model, "fake", batch_size=16, max_batch_delay=0.2)
+        results = {}
+        
+        def worker(i):
+            results[i] = service.embed([f"text {i}", "shared"])
+        
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        service.close()
+        
+        self.assertEqual(len(results), 8)
+        self.assertLess(len(model.batches), 8)
+        self.assertEqual(sum(len(batch) for batch in model.batches), 9)
+        np.testing.assert_array_equal(results[0][1], results[7][1])
+
+if __name__ == "__main__":
+    unittest.main()
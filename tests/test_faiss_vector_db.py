@@ -0,0 +1,303 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.training.vector_db.backends.faiss import FAISSVectorDB
+from app.training.vector_db.models import Document, SearchParams
+
+class FAISSVectorDBTests(unittest.TestCase):
+    """
+    Unit tests for the FAISS vector database backend.
+    """
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = {
+            "persist_directory": self.temp_dir,
+            "dimension": 8
+        }
+        self.db = FAISSVectorDB(self.config)
+        
+        rng = np.random.default_rng(42)
+        self.embeddings = rng.normal(size=(50, 8))
+        self.documents = [
+            Document(text=f"document {i}", embedding=list(self.embeddings[i]), id=f"doc_{i}")
+            for i in range(50)
+        ]
+        self.db.add_documents("test", self.documents)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_search_by_vector(self):
+        """Test that a stored vector is its own nearest neighbour."""
+        results = self.db.search_by_vector("test", list(self.embeddings[7]), SearchParams(limit=1))
+        
+        self.assertEqual(results[0].document.id, "doc_7")
+    
+    def test_delete_documents(self):
+        """Test deleting a batch of documents."""
+        deleted = self.db.delete_documents("test", ["doc_1", "doc_2", "missing"])
+        
+        # Assert
+        self.assertEqual(deleted, ["doc_1", "doc_2"])
+        self.assertEqual(self.db.count_documents("test"), 48)
+        self.assertIsNone(self.db.get_document("test", "doc_1"))
+        
+        results = self.db.search_by_vector("test", list(self.embeddings[1]), SearchParams(limit=50))
+        self.assertNotIn("doc_1", [result.document.id for result in results])
+    
+    def test_delete_document(self):
+        """Test deleting a single document."""
+        self.assertTrue(self.db.delete_document("test", "doc_3"))
+        self.assertFalse(self.db.delete_document("test", "doc_3"))
+        self.assertEqual(self.db.count_documents("test"), 49)
+    
+    def test_upsert_documents(self):
+        """Test replacing a document by ID."""
+        replacement = Document(text="replacement", embedding=list(self.embeddings[9]), id="doc_0")
+        self.db.upsert_documents("test", [replacement])
+        
+        # Assert
+        self.assertEqual(self.db.count_documents("test"), 50)
+        self.assertEqual(self.db.get_document("test", "doc_0").text, "replacement")
+        
+        results = self.db.search_by_vector("test", list(self.embeddings[9]), SearchParams(limit=2))
+        self.assertEqual({result.document.id for result in results}, {"doc_0", "doc_9"})
+    
+    def test_upsert_without_embedding_keeps_document(self):
+        """Test that a replacement without an embedding does not remove the stored document."""
+        replacement = Document(text="no vector", embedding=None, id="doc_4")
+        self.assertEqual(self.db.upsert_documents("test", [replacement]), [])
+        
+        # Assert
+        self.assertEqual(self.db.count_documents("test"), 50)
+        self.assertEqual(self.db.get_document("test", "doc_4").text, "document 4")
+        results = self.db.search_by_vector("test", list(self.embeddings[4]), SearchParams(limit=1))
+        self.assertEqual(results[0].document.id, "doc_4")
+    
+    def test_wrong_dimension_is_skipped(self):
+        """Test that an embedding of the wrong dimension leaves the collection unchanged."""
+        self.db.flush()
+        wrong = [
+            Document(text="short", embedding=[1.0, 2.0], id="short"),
+            Document(text="short replacement", embedding=[1.0, 2.0], id="doc_6")
+        ]
+        self.assertEqual(self.db.add_documents("test", wrong), [])
+        self.assertEqual(self.db.collections["test"]["pending_documents"], {})
+        
+        # Assert
+        self.assertEqual(self.db.count_documents("test"), 50)
+        self.assertIsNone(self.db.get_document("test", "short"))
+        self.assertEqual(self.db.get_document("test", "doc_6").text, "document 6")
+        
+        extra = Document(text="extra", embedding=list(self.embeddings[0]), id="extra")
+        self.db.add_documents("test", [extra])
+        self.assertTrue(self.db.flush())
+        self.assertEqual(FAISSVectorDB(self.config).count_documents("test"), 51)
+    
+    def test_ivf_retrain_after_upserts(self):
+        """Test that replacing vectors counts towards IVF retraining."""
+        db = FAISSVectorDB({**self.config, "index_type": "IVF", "nlist": 2, "retrain_threshold": 0.5})
+        db.add_documents("ivf", self.documents)
+        
+        replacements = [
+            Document(text=f"replacement {i}", embedding=list(self.embeddings[49 - i]), id=f"doc_{i}")
+            for i in range(30)
+        ]
+        db.upsert_documents("ivf", replacements[:20])
+        self.assertEqual(db.collections["ivf"]["removed_since_train"], 20)
+        
+        db.upsert_documents("ivf", replacements[20:])
+        self.assertEqual(db.collections["ivf"]["removed_since_train"], 0)
+        self.assertEqual(db.collections["ivf"]["trained_count"], 50)
+        self.assertEqual(db.get_document("ivf", "doc_25").text, "replacement 25")
+    
+    def test_ivf_retrain_after_deletes(self):
+        """Test that IVF indexes retrain once enough vectors are removed."""
+        db = FAISSVectorDB({**self.config, "index_type": "IVF", "nlist": 2, "retrain_threshold": 0.5})
+        db.add_documents("ivf", self.documents)
+        
+        db.delete_documents("ivf", [f"doc_{i}" for i in range(10)])
+        self.assertEqual(db.collections["ivf"]["removed_since_train"], 10)
+        
+        db.delete_documents("ivf", [f"doc_{i}" for i in range(10, 30)])
+        self.assertEqual(db.collections["ivf"]["removed_since_train"], 0)
+        self.assertEqual(db.collections["ivf"]["trained_count"], 20)
+        self.assertEqual(db.count_documents("ivf"), 20)
+    
+    def test_persistence(self):
+        """Test that deletes survive reloading the database."""
+        self.db.delete_documents("test", ["doc_5"])
+        self.db.flush()
+        
+        reloaded = FAISSVectorDB(self.config)
+        
+        # Assert
+        self.assertEqual(reloaded.count_documents("test"), 49)
+        self.assertIsNone(reloaded.get_document("test", "doc_5"))
+        self.assertEqual(reloaded.get_document("test", "doc_6").text, "document 6")
+        results = reloaded.search_by_vector("test", list(self.embeddings[6]), SearchParams(limit=1))
+        self.assertEqual(results[0].document.id, "doc_6")
+    
+    def test_lazy_loading(self):
+        """Test that collections are only loaded on first access."""
+        self.db.close()
+        
+        reloaded = FAISSVectorDB(self.config)
+        
+        # Assert
+        self.assertEqual(reloaded.list_collections(), ["test"])
+        self.assertEqual(reloaded.collections, {})
+        self.assertEqual(reloaded.count_documents("test"), 50)
+        self.assertIn("test", reloaded.collections)
+    
+    def test_unflushed_writes_are_discarded(self):
+        """Test that a reload only sees the last flushed state."""
+        self.db.flush()
+        extra = Document(text="unflushed", embedding=list(self.embeddings[0]), id="extra")
+        self.db.add_documents("test", [extra])
+        self.db.delete_documents("test", ["doc_0"])
+        
+        # Simulate a crash: no flush, reload from disk
+        reloaded = FAISSVectorDB(self.config)
+        
+        # Assert
+        self.assertEqual(reloaded.count_documents("test"), 50)
+        self.assertIsNone(reloaded.get_document("test", "extra"))
+        self.assertIsNotNone(reloaded.get_document("test", "doc_0"))
+    
+    def test_document_log_compaction(self):
+        """Test that the document log is rewritten once mostly dead."""
+        db = FAISSVectorDB({**self.config, "compaction_min_records": 10})
+        db.add_documents("compact", self.documents)
+        db.flush()
+        db.delete_documents("compact", [f"doc_{i}" for i in range(40)])
+        db.flush()
+        
+        collection = db.collections["compact"]
+        
+        # Assert
+        self.assertEqual(collection["dead_records"], 0)
+        self.assertEqual(collection["total_records"], 10)
+        self.assertEqual(db.get_document("compact", "doc_45").text, "document 45")
+        
+        reloaded = FAISSVectorDB(self.config)
+        self.assertEqual(reloaded.count_documents("compact"), 10)
+        self.assertEqual(reloaded.get_document("compact", "doc_49").text, "document 49")
+    
+    def test_compaction_drops_dead_embeddings(self):
+        """Test that compaction also drops the embedding rows of deleted documents."""
+        db = FAISSVectorDB({**self.config, "compaction_min_records": 10})
+        db.add_documents("compact", self.documents)
+        db.flush()
+        db.delete_documents("compact", [f"doc_{i}" for i in range(40)])
+        db.flush()
+        
+        segments = db.collections["compact"]["segments"]
+        
+        # Assert
+        self.assertEqual(sum(segment["count"] for segment in segments), 10)
+        reloaded = FAISSVectorDB(self.config)
+        results = reloaded.search_by_vector("compact", list(self.embeddings[44]), SearchParams(limit=1))
+        self.assertEqual(results[0].document.id, "doc_44")
+    
+    def test_index_checkpoint(self):
+        """Test that small flushes do not rewrite the index and reloads replay the changes."""
+        self.db.flush()
+        index_file = self.db.collections["test"]["index_file"]
+        
+        extra = Document(text="extra", embedding=list(self.embeddings[0] + 10), id="extra")
+        self.db.add_documents("test", [extra])
+        self.db.delete_documents("test", ["doc_8"])
+        self.db.flush()
+        
+        # Assert
+        self.assertEqual(self.db.collections["test"]["index_file"], index_file)
+        reloaded = FAISSVectorDB(self.config)
+        results = reloaded.search_by_vector("test", list(self.embeddings[0] + 10), SearchParams(limit=1))
+        self.assertEqual(results[0].document.id, "extra")
+        self.assertEqual(reloaded.collections["test"]["index"].ntotal, 50)
+        results = reloaded.search_by_vector("test", list(self.embeddings[8]), SearchParams(limit=50))
+        self.assertNotIn("doc_8", [result.document.id for result in results])
+        
+        # Enough changes write a new checkpoint
+        self.db.delete_documents("test", [f"doc_{i}" for i in range(10, 40)])
+        self.db.flush()
+        self.assertNotEqual(self.db.collections["test"]["index_file"], index_file)
+        self.assertEqual(self.db.collections["test"]["index_removed"], 0)
+    
+    def test_tiered_segment_merges(self):
+        """Test that small segments are merged without rewriting larger ones."""
+        db = FAISSVectorDB({**self.config, "segment_merge_factor": 2})
+        db.add_documents("tiers", self.documents[:40])
+        db.flush()
+        large = db.collections["tiers"]["segments"][0]["file"]
+        
+        for i in range(40, 50):
+            db.add_documents("tiers", [self.documents[i]])
+            db.flush()
+        
+        segments = db.collections["tiers"]["segments"]
+        
+        # Assert
+        self.assertEqual(segments[0]["file"], large)
+        self.assertEqual(sum(segment["count"] for segment in segments), 50)
+        self.assertLessEqual(len(segments), 4)
+        reloaded = FAISSVectorDB(self.config)
+        for i in (3, 45, 49):
+            results = reloaded.search_by_vector("tiers", list(self.embeddings[i]), SearchParams(limit=1))
+            self.assertEqual(results[0].document.id, f"doc_{i}")
+    
+    def test_keyword_search_reads_candidates(self):
+        """Test that keyword search only reads documents containing the query trigrams."""
+        self.db.flush()
+        reloaded = FAISSVectorDB(self.config)
+        reloaded.search("test", "document", SearchParams(limit=1))
+        reloaded.add_documents("test", [Document(text="Document 7x", embedding=list(self.embeddings[0]), id="new")])
+        reloaded.delete_documents("test", ["doc_17"])
+        
+        with patch.object(reloaded, "_read_document", wraps=reloaded._read_document) as read_document:
+            results = reloaded.search("test", "ument 7", SearchParams(limit=10))
+        
+        # Assert
+        self.assertEqual({result.document.id for result in results}, {"doc_7", "new"})
+        self.assertLessEqual(read_document.call_count, 2)
+    
+    def test_keyword_search_finds_pending_documents_without_id(self):
+        """Test that a document added without an ID is found before it is flushed."""
+        self.db.search("test", "document", SearchParams(limit=1))
+        document_id = self.db.add_documents("test", [Document(text="noid text", embedding=list(self.embeddings[0]))])[0]
+        
+        results = self.db.search("test", "noid", SearchParams(limit=10))
+        
+        # Assert
+        self.assertEqual([result.document.id for result in results], [document_id])
+    
+    def test_reading_does_not_rewrite_manifest(self):
+        """Test that closing a database that was only read leaves the manifest alone."""
+        self.db.close()
+        manifest_path = os.path.join(self.temp_dir, "test", "manifest.json")
+        with open(manifest_path) as f:
+            manifest = f.read()
+        
+        reader = FAISSVectorDB(self.config)
+        reader.search("test", "document", SearchParams(limit=1))
+        reader.close()
+        
+        # Assert
+        with open(manifest_path) as f:
+            self.assertEqual(f.read(), manifest)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.training.vector_db.backends.in_memory import InMemoryVectorDB
+from app.training.vector_db.models import Document, SearchParams
+
+class InMemoryVectorDBTests(unittest.TestCase):
+    """
+    Unit tests for the in-memory vector database backend.
+    """
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.db = InMemoryVectorDB({})
+        
+        rng = np.random.default_rng(42)
+        self.embeddings = rng.normal(size=(50, 8))
+        self.documents = [
+            Document(text=f"document {i}", embedding=list(self.embeddings[i]), id=f"doc_{i}",
+                     metadata={"group": i % 3})
+            for i in range(50)
+        ]
+    
+    def brute_force(self, vector, filters=None):
+        """Rank the stored documents by cosine similarity to a vector."""
+        query = np.asarray(vector) / np.linalg.norm(vector)
+        scores = []
+        for document in self.db.collections["test"].values():
+            if document.embedding is None or not self.db._matches_filters(document, filters):
+                continue
+            embedding = np.asarray(document.embedding)
+            scores.append((float(np.dot(embedding / np.linalg.norm(embedding), query)), document.id))
+        scores.sort(key=lambda item: item[0], reverse=True)
+        return scores
+    
+    def test_lazy_allocation(self):
+        """Test that no matrix is allocated before the first insert."""
+        self.db.create_collection("test")
+        self.assertEqual(self.db.vector_indexes, {})
+        self.assertEqual(self.db.search_by_vector("test", [1.0] * 8, SearchParams()), [])
+        
+        self.db.add_documents("test", self.documents[:3])
+        
+        # Assert
+        self.assertEqual(self.db.vector_indexes["test"]["matrix"].shape, (3, 8))
+        self.db.add_documents("test", self.documents[3:])
+        self.assertGreaterEqual(len(self.db.vector_indexes["test"]["matrix"]), 50)
+    
+    def test_search_by_vector_matches_full_scan(self):
+        """Test that vector search returns the same ranking as a full scan."""
+        self.db.add_documents("test", self.documents)
+        self.db.delete_document("test", "doc_4")
+        query = list(self.embeddings[4] + self.embeddings[5])
+        
+        results = self.db.search_by_vector("test", query, SearchParams(limit=5, offset=2))
+        expected = self.brute_force(query)[2:7]
+        
+        # Assert
+        self.assertEqual([result.document.id for result in results], [doc_id for _, doc_id in expected])
+        for result, (score, _) in zip(results, expected):
+            self.assertAlmostEqual(result.score, score, places=5)
+            self.assertAlmostEqual(result.distance, 1.0 - score, places=5)
+        
+        results = self.db.search_by_vector("test", query, SearchParams(limit=50, filters={"group": 1}))
+        self.assertEqual([result.document.id for result in results],
+                         [doc_id for _, doc_id in self.brute_force(query, {"group": 1})])
+        
+        results = self.db.hybrid_search("test", "document 1", query, SearchParams(limit=3))
+        self.assertEqual(len(results), 3)
+        self.assertIsNone(results[0].document.embedding)
+    
+    def test_query_many(self):
+        """Test that a batch of queries returns the same results as one search per query."""
+        self.db.add_documents("test", self.documents)
+        queries = self.embeddings[:6] + 0.1
+        
+        batch = self.db.query_many("test", queries, top_k=4, filters={"group": 2})
+        
+        # Assert
+        self.assertEqual(len(batch), 6)
+        for query, results in zip(queries, batch):
+            expected = self.db.search_by_vector("test", list(query), SearchParams(limit=4, filters={"group": 2}))
+            self.assertEqual([result.document.id for result in results],
+                             [result.document.id for result in expected])
+            for result, other in zip(results, expected):
+                self.assertAlmostEqual(result.score, other.score, places=5)
+        self.assertEqual(self.db.query_many("missing", queries, top_k=4), [[] for _ in range(6)])
+    
+    def test_filters_follow_updates(self):
+        """Test that indexed, nested and unhashable filters match a full scan after changes."""
+        for i, document in enumerate(self.documents):
+            document.metadata.update({"tags": ["a"] if i % 2 else ["b"], "source": {"name": f"s{i % 4}"}})
+        self.db.add_documents("test", self.documents)
+        self.db.add_documents("test", [Document(text="moved", embedding=list(self.embeddings[0]), id="doc_1",
+                                                metadata={"group": 2, "tags": ["a"]})])
+        for i in range(10, 30):
+            self.db.delete_document("test", f"doc_{i}")
+        query = list(self.embeddings[3])
+        
+        # Assert
+        for filters in ({"group": 2}, {"group": 2, "tags": ["a"]}, {"source.name": "s1"}, {"missing": 1}):
+            results = self.db.search_by_vector("test", query, SearchParams(limit=50, filters=filters))
+            self.assertEqual([result.document.id for result in results],
+                             [doc_id for _, doc_id in self.brute_force(query, filters)], filters)
+    
+    def test_hybrid_search_matches_full_scan(self):
+        """Test that vectorized hybrid scores match scoring each document."""
+        self.db.add_documents("test", self.documents)
+        query = list(self.embeddings[12])
+        params = SearchParams(limit=10, hybrid_alpha=0.7, min_score=0.2, filters={"group": 0})
+        
+        results = self.db.hybrid_search("test", "Document 12 document", query, params)
+        
+        expected = []
+        for vector_score, doc_id in self.brute_force(query, {"group": 0}):
+            text_score = self.db._calculate_text_score(self.db.get_document("test", doc_id).text, "Document 12 document")
+            score = 0.3 * vector_score + 0.7 * text_score
+            if score >= 0.2:
+                expected.append((score, doc_id))
+        expected.sort(key=lambda item: item[0], reverse=True)
+        
+        # Assert
+        self.assertEqual([result.document.id for result in results], [doc_id for _, doc_id in expected[:10]])
+        for result, (score, _) in zip(results, expected):
+            self.assertAlmostEqual(result.score, score, places=5)
+        self.assertEqual(results[0].document.id, "doc_12")
+        self.assertAlmostEqual(results[0].metadata["text_score"], 1.0)
+    
+    def test_repeated_ids_in_batch(self):
+        """Test that the last document wins when a batch repeats an ID."""
+        self.db.add_documents("test", [
+            Document(text="first", embedding=list(self.embeddings[0]), id="x"),
+            Document(text="second", embedding=list(self.embeddings[1]), id="x")
+        ])
+        
+        # Assert
+        self.assertEqual(self.db.count_documents("test"), 1)
+        self.assertEqual(self.db.get_document("test", "x").text, "second")
+        results = self.db.search_by_vector("test", list(self.embeddings[0]), SearchParams(limit=10))
+        self.assertEqual([result.document.text for result in results], ["second"])
+        
+        self.assertTrue(self.db.delete_document("test", "x"))
+        self.assertEqual(self.db.search_by_vector("test", list(self.embeddings[1]), SearchParams(limit=10)), [])
+    
+    def test_replace_and_compact(self):
+        """Test that replaced and deleted rows are dropped once compacted."""
+        self.db.add_documents("test", self.documents)
+        replacement = Document(text="replacement", embedding=list(self.embeddings[9]), id="doc_0")
+        self.db.add_documents("test", [replacement])
+        for i in range(1, 20):
+            self.db.delete_document("test", f"doc_{i}")
+        
+        index = self.db.vector_indexes["test"]
+        
+        # Assert
+        self.assertEqual(index["size"] - index["deleted"], 31)
+        self.assertLessEqual(index["deleted"], 0.25 * index["size"])
+        results = self.db.search_by_vector("test", list(self.embeddings[9]), SearchParams(limit=1))
+        self.assertEqual(results[0].document.id, "doc_0")
+        results = self.db.search_by_vector("test", list(self.embeddings[30]), SearchParams(limit=1))
+        self.assertEqual(results[0].document.id, "doc_30")
+    
+    def test_documents_without_embeddings(self):
+        """Test that documents without embeddings are only found by keyword search."""
+        self.db.add_documents("test", [Document(text="plain text", id="plain")] + self.documents[:5])
+        
+        # Assert
+        self.assertEqual(self.db.count_documents("test"), 6)
+        results = self.db.search_by_vector("test", list(self.embeddings[0]), SearchParams(limit=10))
+        self.assertNotIn("plain", [result.document.id for result in results])
+        self.assertEqual(self.db.search("test", "plain", SearchParams(limit=1))[0].document.id, "plain")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.load_balancing.load_balancing import (
+    LoadBalancingSystem, LoadBalancer, LoadBalancingStrategy, Agent, Task, AgentRole, TaskPriority
+)
+
+def make_task(task_id, role=AgentRole.DEVELOPER, priority=TaskPriority.MEDIUM, capabilities=None):
+    """Create a short task for tests."""
+    return Task(
+        id=task_id,
+        type="coding",
+        description=f"Task {task_id}",
+        priority=priority,
+        required_role=role,
+        required_capabilities=capabilities or [],
+        estimated_duration=0.0
+    )
+
+def wait_for(condition, timeout=5.0):
+    """Wait until a condition holds or the timeout expires."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return condition()
+
+class LoadBalancerTests(unittest.TestCase):
+    """
+    Unit tests for indexed agent selection in the load balancer.
+    """
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.load_balancer = LoadBalancer(LoadBalancingStrategy.LEAST_CONNECTIONS)
+        self.python_dev = Agent(id="dev1", role=AgentRole.DEVELOPER, capabilities=["python", "sql"],
+                                max_concurrent_tasks=2)
+        self.java_dev = Agent(id="dev2", role=AgentRole.DEVELOPER, capabilities=["java"],
+                              max_concurrent_tasks=4)
+        self.full_stack_dev = Agent(id="dev3", role=AgentRole.DEVELOPER, capabilities=["python", "java", "sql"],
+                                    max_concurrent_tasks=4)
+        self.qa = Agent(id="qa1", role=AgentRole.QA_ENGINEER, capabilities=["python"])
+        for agent in (self.python_dev, self.java_dev, self.full_stack_dev, self.qa):
+            self.load_balancer.register_agent(agent)
+    
+    def test_get_available_agents_by_capability(self):
+        """Test looking up agents through the role and capability indexes."""
+        agents = self.load_balancer.get_available_agents(AgentRole.DEVELOPER, ["python", "sql"])
+        
+        # Assert agents are returned in registration order
+        self.assertEqual([agent.id for agent in agents], ["dev1", "dev3"])
+        self.assertEqual(self.load_balancer.get_available_agents(AgentRole.DEVELOPER, ["go"]), [])
+        self.assertEqual(len(self.load_balancer.get_available_agents(capabilities=["python"])), 3)
+        self.assertEqual(len(self.load_balancer.get_available_agents()), 4)
+    
+    def test_least_connections_follows_load_changes(self):
+        """Test that least-connections selection tracks add_task/remove_task."""
+        task = make_task("task1", capabilities=["python"])
+        
+        # Ties go to the earliest registered agent
+        self.assertIs(self.load_balancer.select_agent_for_task(task), self.python_dev)
+        
+        self.python_dev.add_task("a")
+        self.assertIs(self.load_balancer.select_agent_for_task(task), self.full_stack_dev)
+        
+        self.full_stack_dev.add_task("b")
+        self.full_stack_dev.add_task("c")
+        self.assertIs(self.load_balancer.select_agent_for_task(task), self.python_dev)
+        
+        # A full agent is never selected
+        self.python_dev.add_task("d")
+        self.assertIs(self.load_balancer.select_agent_for_task(task), self.full_stack_dev)
+        
+        self.python_dev.remove_task("a")
+        self.python_dev.remove_task("d")
+        self.assertIs(self.load_balancer.select_agent_for_task(task), self.python_dev)
+    
+    def test_weighted_least_connections(self):
+        """Test that weighted selection orders agents by load percentage."""
+        self.load_balancer.strategy = LoadBalancingStrategy.WEIGHTED_LEAST_CONNECTIONS
+        task = make_task("task1", capabilities=["java"])
+        
+        self.java_dev.add_task("a")
+        self.full_stack_dev.add_task("b")
+        self.full_stack_dev.add_task("c")
+        
+        # Assert 25% load is preferred over 50% load
+        self.assertIs(self.load_balancer.select_agent_for_task(task), self.java_dev)
+    
+    def test_unregister_agent_removes_from_indexes(self):
+        """Test that unregistered agents are no longer selected."""
+        self.load_balancer.unregister_agent("dev1")
+        task = make_task("task1", capabilities=["python"])
+        
+        # Assert
+        self.assertIs(self.load_balancer.select_agent_for_task(task), self.full_stack_dev)
+        self.assertEqual(
+            [agent.id for agent in self.load_balancer.get_available_agents(AgentRole.DEVELOPER, ["sql"])],
+            ["dev3"]
+        )
+        
+        # Load changes of the unregistered agent are ignored
+        self.python_dev.add_task("a")
+        self.assertIsNone(self.python_dev.on_load_change)
+    
+    def test_strategies_respect_capabilities(self):
+        """Test that every strategy only selects agents with the required capabilities."""
+        task = make_task("task1", capabilities=["java", "sql"])
+        
+        for strategy in LoadBalancingStrategy:
+            self.load_balancer.strategy = strategy
+            self.assertIs(self.load_balancer.select_agent_for_task(task), self.full_stack_dev, strategy)
+
+class LoadBalancingSystemSchedulerTests(unittest.TestCase):
+    """
+    Unit tests for the event-driven scheduler of the load balancing system.
+    """
+    
+    def setUp(self):
+        """Set up test environment."""
+        # Idle timeout far above test timings so only events wake the scheduler
+        self.system = LoadBalancingSystem(
+            strategy=LoadBalancingStrategy.LEAST_CONNECTIONS,
+            max_workers=8,
+            idle_timeout=60.0
+        )
+        self.system.start()
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.system.stop()
+    
+    def test_submission_wakes_scheduler(self):
+        """Test that a submitted task is dispatched without polling delay."""
+        self.system.register_agent(Agent(id="dev1", role=AgentRole.DEVELOPER, capabilities=[]))
+        
+        self.system.submit_task(make_task("task1"))
+        
+        # Assert
+        self.assertTrue(wait_for(lambda: self.system.get_metrics()["dispatched_count"] == 1))
+        latency = self.system.get_metrics()["dispatch_latency"]
+        self.assertEqual(latency["calls"], 1)
+        self.assertLess(latency["max_time"], 0.09)
+    
+    def block_tasks(self):
+        """Patch task execution so that tasks run until self.release is set."""
+        self.release = threading.Event()
+        original_sleep = time.sleep
+        
+        def blocking_sleep(seconds):
+            # Only worker threads block; the test thread sleeps normally
+            if threading.current_thread() is not threading.main_thread():
+                self.release.wait(5)
+            else:
+                original_sleep(seconds)
+        
+        patcher = patch("app.load_balancing.load_balancing.time.sleep", side_effect=blocking_sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.release.set)
+    
+    def test_dispatches_up_to_capacity_per_wakeup(self):
+        """Test that registering an agent dispatches as many tasks as it can take."""
+        self.block_tasks()
+        
+        # Queue tasks while no agent is registered
+        for i in range(6):
+            self.system.submit_task(make_task(f"task{i}"))
+        self.assertEqual(self.system.get_metrics()["queue_depth"]["developer"], 6)
+        
+        # Register an agent with capacity for four tasks
+        self.system.register_agent(Agent(id="dev1", role=AgentRole.DEVELOPER, capabilities=[],
+                                         max_concurrent_tasks=4))
+        
+        # Assert
+        self.assertTrue(wait_for(lambda: self.system.get_metrics()["dispatched_count"] == 4))
+        metrics = self.system.get_metrics()
+        self.assertEqual(metrics["queue_depth"]["developer"], 2)
+        self.assertEqual(metrics["max_queue_depth"]["developer"], 6)
+        
+        # Completing tasks dispatches the rest
+        self.release.set()
+        self.assertTrue(wait_for(lambda: self.system.get_metrics()["dispatched_count"] == 6))
+        self.assertEqual(self.system.get_metrics()["queue_depth"]["developer"], 0)
+    
+    def test_completion_wakes_scheduler(self):
+        """Test that finishing a task frees capacity for the next queued task."""
+        self.block_tasks()
+        
+        self.system.register_agent(Agent(id="dev1", role=AgentRole.DEVELOPER, capabilities=[]))
+        self.system.submit_task(make_task("task1"))
+        self.system.submit_task(make_task("task2"))
+        
+        self.assertTrue(wait_for(lambda: self.system.get_metrics()["dispatched_count"] == 1))
+        self.assertEqual(self.system.get_metrics()["queue_depth"]["developer"], 1)
+        
+        # Completing the first task dispatches the second
+        self.release.set()
+        self.assertTrue(wait_for(lambda: self.system.get_metrics()["dispatched_count"] == 2))
+    
+    def test_cancel_queued_task(self):
+        """Test cancelling a task that is still queued."""
+        self.system.submit_task(make_task("task1"))
+        
+        # Assert
+        self.assertTrue(self.system.cancel_task("task1"))
+        self.assertEqual(self.system.get_metrics()["queue_depth"]["developer"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
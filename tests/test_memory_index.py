@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.context_extension.memory_index import MemoryIndex, tokenize
+from app.context_extension.memory_manager import MemoryManager
+
+class MemoryIndexTests(unittest.TestCase):
+    """
+    Unit tests for the memory inverted index.
+    """
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = MemoryIndex(os.path.join(self.temp_dir.name, "index.sqlite3"))
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.index.close()
+        self.temp_dir.cleanup()
+    
+    def test_tokenize(self):
+        """Test tokenizing text."""
+        self.assertEqual(tokenize("Deploy the API-gateway, v2!"), ["deploy", "the", "api", "gateway", "v2"])
+    
+    def test_bm25_ranking(self):
+        """Test that rarer terms and title matches rank higher."""
+        now = time.time()
+        self.index.add("long_term", {"id": "a", "content": "database migration plan", "timestamp": now})
+        self.index.add("long_term", {"id": "b", "title": "database", "content": "notes", "timestamp": now})
+        self.index.add("working", {"id": "c", "content": "plan for the sprint", "timestamp": now})
+        self.index.add("short_term", {"id": "d", "content": "unrelated", "timestamp": now})
+        
+        results = self.index.search("database plan", ["long_term", "working", "short_term"], now=now)
+        
+        # Assert
+        self.assertEqual([item_id for _, item_id, _ in results], ["a", "b", "c"])
+        self.assertEqual(results[2][0], "working")
+        
+        # Restricting sources filters results
+        results = self.index.search("plan", ["working"], now=now)
+        self.assertEqual([item_id for _, item_id, _ in results], ["c"])
+    
+    def test_recency_decay(self):
+        """Test that newer items rank above older identical items."""
+        now = time.time()
+        self.index.add("long_term", {"id": "old", "content": "release notes", "timestamp": now - 30 * 86400})
+        self.index.add("long_term", {"id": "new", "content": "release notes", "timestamp": now})
+        
+        results = self.index.search("release", ["long_term"], now=now)
+        
+        # Assert
+        self.assertEqual([item_id for _, item_id, _ in results], ["new", "old"])
+    
+    def test_replace_and_remove(self):
+        """Test that re-adding replaces postings and removing drops them."""
+        self.index.add("long_term", {"id": "a", "content": "alpha"})
+        self.index.add("long_term", {"id": "a", "content": "beta"})
+        
+        # Assert
+        self.assertEqual(self.index.search("alpha", ["long_term"]), [])
+        self.assertEqual(len(self.index.search("beta", ["long_term"])), 1)
+        self.assertEqual(self.index.count(), 1)
+        
+        self.assertTrue(self.index.remove("long_term", "a"))
+        self.assertFalse(self.index.remove("long_term", "a"))
+        self.assertEqual(self.index.search("beta", ["long_term"]), [])
+        self.assertEqual(self.index.count(), 0)
+
+class MemoryManagerSearchTests(unittest.TestCase):
+    """
+    Unit tests for index-backed MemoryManager search.
+    """
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.memory_manager = MemoryManager(storage_dir=self.temp_dir.name, short_term_capacity=2)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.memory_manager.index.close()
+        self.temp_dir.cleanup()
+    
+    def test_search_across_memory_types(self):
+        """Test searching items in every memory type."""
+        self.memory_manager.add_to_short_term_memory({"content": "kubernetes rollout"})
+        self.memory_manager.add_to_working_memory({"content": "kubernetes task"})
+        self.memory_manager.add_to_long_term_memory({"content": "kubernetes runbook"})
+        self.memory_manager.add_to_episodic_memory({"content": "kubernetes incident"})
+        self.memory_manager.add_to_long_term_memory({"content": "unrelated"})
+        
+        results = self.memory_manager.search_memory("kubernetes")
+        
+        # Assert
+        self.assertEqual(sorted(result["source"] for result in results),
+                         ["episodic", "long_term", "short_term", "working"])
+        self.assertEqual(self.memory_manager.search_memory("kubernetes", memory_types=["working"])[0]["item"]["content"],
+                         "kubernetes task")
+    
+    def test_short_term_overflow_moves_index_entry(self):
+        """Test that items moved to long-term memory stay searchable once."""
+        first_id = self.memory_manager.add_to_short_term_memory({"content": "first note"})
+        self.memory_manager.add_to_short_term_memory({"content": "second note"})
+        self.memory_manager.add_to_short_term_memory({"content": "third note"})
+        
+        results = self.memory_manager.search_memory("first")
+        
+        # Assert
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["source"], "long_term")
+        self.assertEqual(results[0]["item"]["id"], first_id)
+    
+    def test_index_persists_and_syncs_with_storage(self):
+        """Test that a new manager reuses the index and picks up unindexed files."""
+        self.memory_manager.add_to_long_term_memory({"id": "kept", "content": "persistent fact"})
+        self.memory_manager.add_to_long_term_memory({"id": "deleted", "content": "persistent rumor"})
+        self.memory_manager.index.close()
+        
+        # Change storage behind the manager's back
+        os.remove(os.path.join(self.temp_dir.name, "long_term", "deleted.json"))
+        with open(os.path.join(self.temp_dir.name, "long_term", "legacy.json"), "w") as f:
+            json.dump({"id": "legacy", "content": "persistent legacy", "timestamp": time.time()}, f)
+        
+        self.memory_manager = MemoryManager(storage_dir=self.temp_dir.name)
+        results = self.memory_manager.search_memory("persistent")
+        
+        # Assert
+        self.assertEqual(sorted(result["item"]["id"] for result in results), ["kept", "legacy"])
+    
+    def test_search_loads_only_top_results(self):
+        """Test that searching reads only the files of returned items."""
+        for i in range(20):
+            self.memory_manager.add_to_long_term_memory({"content": f"report {i}" if i < 3 else f"other {i}"})
+        
+        with patch("builtins.open", wraps=open) as mock_open:
+            results = self.memory_manager.search_memory("report", max_results=2)
+        
+        # Assert
+        self.assertEqual(len(results), 2)
+        self.assertEqual(mock_open.call_count, 2)
+    
+    def test_clean_up_memory(self):
+        """Test that expired items are removed from storage and the index."""
+        old = time.time() - 60 * 86400
+        self.memory_manager.add_to_long_term_memory({"content": "stale fact", "timestamp": old})
+        self.memory_manager.add_to_long_term_memory({"content": "fresh fact"})
+        self.memory_manager.add_to_episodic_memory({"content": "stale episode", "timestamp": old})
+        
+        removed = self.memory_manager.clean_up_memory()
+        
+        # Assert
+        self.assertEqual(removed, (1, 1))
+        self.assertEqual(self.memory_manager.search_memory("stale"), [])
+        self.assertEqual(len(self.memory_manager.search_memory("fresh")), 1)
+        self.assertEqual(self.memory_manager.episodic_memory, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Tests for the bounded message store and the communication frameworks using it.
+"""
+
+import os
+import sys
+import shutil
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.collaboration.message_store import MessageStore, field_index
+from app.collaboration.communication_framework import AgentCommunicationFramework
+from app.collaboration.enhanced_communication_framework import EnhancedCommunicationFramework
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+def make_message(index, sender="a", recipient="b"):
+    """Create a message one minute after the previous one."""
+    return {
+        "id": index,
+        "from": sender,
+        "to": recipient,
+        "timestamp": (BASE_TIME + timedelta(minutes=index)).isoformat()
+    }
+
+class TestMessageStore(unittest.TestCase):
+    """Test cases for the MessageStore class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def create_store(self, capacity, **kwargs):
+        """Create a store indexed by sender and recipient."""
+        return MessageStore(
+            capacity=capacity,
+            indexes={"from": field_index("from"), "to": field_index("to")},
+            **kwargs
+        )
+    
+    def test_capacity_and_eviction(self):
+        """Test that the oldest messages are evicted and removed from the indexes."""
+        evicted = []
+        store = self.create_store(5, on_evict=evicted.append)
+        for i in range(12):
+            store.append(make_message(i, sender="a" if i % 2 else "c"))
+        
+        self.assertEqual(len(store), 5)
+        self.assertEqual([m["id"] for m in store], [7, 8, 9, 10, 11])
+        self.assertEqual([m["id"] for m in evicted], list(range(7)))
+        self.assertEqual(store.evicted_count, 7)
+        self.assertEqual(store.count({"from": "a"}), 3)
+        self.assertEqual(store.count({"from": "c"}), 2)
+        self.assertEqual(store.oldest("from", "c")["id"], 8)
+        self.assertEqual(store.newest("from", "a")["id"], 11)
+    
+    def test_query(self):
+        """Test filtered, time-ranged and paginated queries."""
+        store = self.create_store(100, bucket_seconds=600)
+        for i in range(60):
+            store.append(make_message(i, recipient=["b", "d"] if i % 3 == 0 else "b"))
+        
+        self.assertEqual(len(store.query({"to": ["b", "d"]})), 20)
+        
+        start = (BASE_TIME + timedelta(minutes=15)).isoformat()
+        end = (BASE_TIME + timedelta(minutes=24)).isoformat()
+        results = store.query(start_time=start, end_time=end)
+        self.assertEqual([m["id"] for m in results], list(range(15, 25)))
+        
+        results = store.query({"to": "b"}, start_time=start, end_time=end)
+        self.assertEqual([m["id"] for m in results], [16, 17, 19, 20, 22, 23])
+        
+        results = store.query(predicate=lambda m: m["id"] % 10 == 0, limit=2, offset=1)
+        self.assertEqual([m["id"] for m in results], [10, 20])
+        
+        results = store.query({"from": "a"}, limit=3, latest=True)
+        self.assertEqual([m["id"] for m in results], [57, 58, 59])
+        
+        with self.assertRaises(ValueError):
+            store.query({"topic": "x"})
+    
+    def test_spill_log(self):
+        """Test that evicted messages can be queried from the spill log by time range."""
+        spill_path = os.path.join(self.temp_dir, "history", "spill.jsonl")
+        store = self.create_store(10, spill_path=spill_path)
+        for i in range(1000):
+            store.append(make_message(i))
+        
+        start = (BASE_TIME + timedelta(minutes=700)).isoformat()
+        end = (BASE_TIME + timedelta(minutes=709)).isoformat()
+        results = store.query_spilled(start, end)
+        self.assertEqual([m["id"] for m in results], list(range(700, 710)))
+        self.assertEqual(len(store.query_spilled()), 990)
+        store.close()
+        
+        # The sparse index is rebuilt when the log is reopened
+        reopened = self.create_store(10, spill_path=spill_path)
+        self.assertEqual([m["id"] for m in reopened.query_spilled(start, end)], list(range(700, 710)))
+        reopened.close()
+
+class TestCommunicationFrameworkHistory(unittest.TestCase):
+    """Test cases for the bounded history of the communication frameworks."""
+    
+    def test_base_framework_history(self):
+        """Test that the base framework keeps bounded, queryable history."""
+        framework = AgentCommunicationFramework({"max_history_size": 10, "max_queue_size": 10})
+        
+        async def run():
+            for i in range(25):
+                await framework.send_message({
+                    "from": "a" if i % 2 else "b",
+                    "to": "c",
+                    "content": i,
+                    "response_expected": False
+                })
+            return await framework.get_message_history({"filters": {"from": "a"}, "limit": 3})
+        
+        result = asyncio.run(run())
+        self.assertEqual(len(framework.message_history), 10)
+        self.assertEqual(len(framework.message_queue), 10)
+        self.assertEqual([m["content"] for m in result["history"]], [19, 21, 23])
+    
+    def test_pending_responses_are_released(self):
+        """Test that answered and timed out requests stop being tracked."""
+        framework = AgentCommunicationFramework()
+        enhanced = EnhancedCommunicationFramework()
+        
+        async def run():
+            answered = await framework.send_message({"from": "a", "to": "b", "content": "question"})
+            await framework.send_message({"from": "a", "to": "b", "content": "late", "timeout": 0.01})
+            response = await framework.respond_to_message({
+                "request_id": answered["message_id"],
+                "from": "b",
+                "content": "answer"
+            })
+            await asyncio.sleep(0.05)
+            for i in range(20):
+                await enhanced.send_message("a", "b", {"i": i})
+            await enhanced.broadcast_message("a", ["b", "c"], {"i": 20})
+            return response
+        
+        response = asyncio.run(run())
+        self.assertTrue(response["success"])
+        self.assertEqual(framework.pending_responses, {})
+        self.assertEqual(len(framework.response_times), 1)
+        self.assertEqual(enhanced.pending_responses, {})
+    
+    def test_enhanced_framework_statistics(self):
+        """Test that incremental statistics match a rescan of the history."""
+        framework = EnhancedCommunicationFramework({"max_history_size": 20})
+        agents = ["a", "b", "c", "d"]
+        
+        async def run():
+            for i in range(50):
+                await framework.send_message(agents[i % 4], agents[(i * 3 + 1) % 4], {"text": f"message {i}"})
+            history = await framework.get_conversation_history({
+                "filters": {"agent_id": "a", "content_contains": "message 4"},
+                "limit": 2,
+                "offset": 1
+            })
+            statistics = {}
+            for grouping in ("agent", "conversation", "time"):
+                result = await framework.get_conversation_statistics({"grouping": grouping})
+                statistics[grouping] = result["statistics"]
+            return history, statistics
+        
+        history, statistics = asyncio.run(run())
+        messages = list(framework.message_history)
+        self.assertEqual(len(messages), 20)
+        
+        expected = [
+            m for m in messages
+            if "a" in (m["sender"], m["recipient"]) and "message 4" in m["content"]["text"]
+        ]
+        self.assertEqual(history["total"], len(expected))
+        self.assertEqual(history["history"], expected[1:3])
+        
+        self.assertEqual(statistics["agent"], framework._calculate_agent_statistics(messages))
+        self.assertEqual(statistics["time"], framework._calculate_time_statistics(messages))
+        
+        conversation_stats = framework._calculate_conversation_statistics(messages)
+        self.assertEqual(set(statistics["conversation"]), set(conversation_stats))
+        for conv_id, stats in conversation_stats.items():
+            actual = statistics["conversation"][conv_id]
+            self.assertEqual(sorted(actual.pop("participants")), sorted(stats.pop("participants")))
+            self.assertEqual(actual, stats)
+
+if __name__ == "__main__":
+    unittest.main()
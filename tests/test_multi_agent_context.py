@@ -0,0 +1,132 @@
+"""
+Tests for MultiAgentContextDistributor task processing.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.context_extension.multi_agent_context import MultiAgentContextDistributor
+
+class BlockingAgent:
+    """Agent whose tasks block until released."""
+    
+    def __init__(self):
+        self.release = threading.Event()
+        self.processed = []
+    
+    def process_task(self, task):
+        self.release.wait(timeout=5.0)
+        self.processed.append(task["id"])
+        return {"status": "completed", "agent": "slow"}
+
+class FastAgent:
+    """Agent completing tasks immediately."""
+    
+    def __init__(self):
+        self.processed = []
+    
+    def process_task(self, task):
+        self.processed.append(task["id"])
+        return {"status": "completed", "agent": "fast"}
+
+class AsyncAgent:
+    """Agent with a coroutine process_task."""
+    
+    async def process_task(self, task):
+        await asyncio.sleep(0.01)
+        return {"status": "completed", "agent": "async"}
+
+class FailingAgent:
+    """Agent raising from process_task."""
+    
+    def process_task(self, task):
+        raise RuntimeError("agent crashed")
+
+class TestMultiAgentTaskProcessing(unittest.TestCase):
+    """Test cases for the worker pool of the MultiAgentContextDistributor."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.distributor = MultiAgentContextDistributor(sync_interval=60.0, max_workers=4)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        if self.distributor.running:
+            self.distributor.stop_processing()
+    
+    def test_slow_agent_does_not_stall_others(self):
+        """Test that a blocked agent does not delay other agents' tasks."""
+        slow = BlockingAgent()
+        fast = FastAgent()
+        self.distributor.register_agent("slow", slow, ["slow"])
+        self.distributor.register_agent("fast", fast, ["fast"])
+        self.distributor.start_processing()
+        
+        slow_id = self.distributor.submit_task({"content": "slow"}, agent_id="slow")
+        fast_ids = [self.distributor.submit_task({"content": f"fast {i}"}, agent_id="fast") for i in range(20)]
+        
+        for task_id in fast_ids:
+            result = self.distributor.get_task_future(task_id).result(timeout=2.0)
+            self.assertEqual(result["agent"], "fast")
+        
+        self.assertFalse(self.distributor.get_task_future(slow_id).done())
+        status = self.distributor.get_system_status()
+        self.assertEqual(status["active_tasks"], 1)
+        self.assertEqual(status["processing_time"]["calls"], 20)
+        
+        slow.release.set()
+        self.assertEqual(self.distributor.get_task_result(slow_id, timeout=2.0)["agent"], "slow")
+        self.assertEqual(self.distributor.get_agent_load("slow"), 0)
+    
+    def test_tasks_submitted_before_start(self):
+        """Test that tasks queued while stopped run once processing starts."""
+        agent = FastAgent()
+        self.distributor.register_agent("fast", agent, ["fast"])
+        callbacks = []
+        
+        task_id = self.distributor.submit_task({"content": "x"}, callback=lambda tid, result: callbacks.append(tid))
+        self.assertEqual(self.distributor.get_system_status()["pending_tasks"], 1)
+        self.assertIsNone(self.distributor.get_task_result(task_id))
+        
+        self.distributor.start_processing()
+        self.assertEqual(self.distributor.get_task_result(task_id, timeout=2.0)["status"], "completed")
+        self.assertEqual(callbacks, [task_id])
+    
+    def test_agent_tasks_run_in_order(self):
+        """Test that each agent processes its tasks one at a time in submission order."""
+        agent = FastAgent()
+        self.distributor.register_agent("fast", agent, ["fast"])
+        self.distributor.start_processing()
+        
+        task_ids = [self.distributor.submit_task({"content": str(i)}, agent_id="fast") for i in range(10)]
+        self.distributor.get_task_future(task_ids[-1]).result(timeout=2.0)
+        
+        self.assertEqual(agent.processed, task_ids)
+    
+    def test_coroutine_agent(self):
+        """Test that coroutine agents are processed on the event loop."""
+        self.distributor.register_agent("async", AsyncAgent(), ["async"])
+        self.distributor.start_processing()
+        
+        task_id = self.distributor.submit_task({"content": "x"}, agent_id="async")
+        self.assertEqual(self.distributor.get_task_future(task_id).result(timeout=2.0)["agent"], "async")
+    
+    def test_failed_task(self):
+        """Test that agent errors resolve the task as failed."""
+        self.distributor.register_agent("failing", FailingAgent(), ["failing"])
+        self.distributor.start_processing()
+        
+        task_id = self.distributor.submit_task({"content": "x"}, agent_id="failing")
+        result = self.distributor.get_task_future(task_id).result(timeout=2.0)
+        
+        self.assertEqual(result["status"], "failed")
+        self.assertEqual(self.distributor.get_system_status()["failed_tasks"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,8 @@ from unittest.mock import Mock, patch
 import sys
 import os
 import time
+import json
+import tempfile
 
 # Add parent directory to path to import app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -87,6 +89,55 @@ class PerformanceMetricTests(unittest.TestCase):
         self.assertEqual(stats["errors"], 0)
         self.assertEqual(stats["error_rate"], 0)
         self.assertIsNotNone(stats["last_call_time"])
+    
+    def test_bounded_memory_percentiles(self):
+        """Test that percentiles are estimated without keeping every duration."""
+        # Record 10000 calls with durations 1ms..10s
+        for i in range(1, 10001):
+            self.metric.record_call(i / 1000.0)
+        
+        stats = self.metric.get_stats()
+        
+        # Assert raw samples are bounded and estimates are within 1%
+        self.assertEqual(len(self.metric.times), 100)
+        self.assertAlmostEqual(stats["median_time"], 5.0, delta=0.05)
+        self.assertAlmostEqual(stats["p95_time"], 9.5, delta=0.095)
+        self.assertAlmostEqual(stats["p99_time"], 9.9, delta=0.099)
+    
+    def test_sliding_windows(self):
+        """Test that window statistics only include recent calls."""
+        with patch("app.core.performance.time.time", return_value=1000.0):
+            self.metric.record_call(5.0)
+        with patch("app.core.performance.time.time", return_value=1200.0):
+            self.metric.record_call(0.1)
+            windows = self.metric.get_window_stats()
+        
+        # Assert
+        self.assertEqual(windows["1m"]["calls"], 1)
+        self.assertAlmostEqual(windows["1m"]["max_time"], 0.1)
+        self.assertEqual(windows["5m"]["calls"], 2)
+        self.assertEqual(windows["1h"]["calls"], 2)
+    
+    def test_merge_snapshot(self):
+        """Test merging a snapshot from another metric."""
+        other = PerformanceMetric("test_metric", "test_category")
+        for i in range(1, 51):
+            self.metric.record_call(i / 100.0)
+            other.record_call((i + 50) / 100.0)
+        other.record_call(0.01, Exception("Other error"))
+        
+        snapshot = json.loads(json.dumps(other.snapshot()))
+        self.metric.merge(snapshot)
+        stats = self.metric.get_stats()
+        
+        # Assert
+        self.assertEqual(stats["calls"], 101)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["min_time"], 0.01)
+        self.assertEqual(stats["max_time"], 1.0)
+        self.assertAlmostEqual(stats["median_time"], 0.5, delta=0.01)
+        self.assertEqual(stats["last_error"], "Other error")
+        self.assertEqual(stats["windows"]["1m"]["calls"], 101)
 
 class PerformanceMonitorTests(unittest.TestCase):
     """
@@ -248,6 +299,51 @@ class PerformanceMonitorTests(unittest.TestCase):
         self.assertEqual(len(summary["slowest_operations"]), 2)
         self.assertEqual(len(summary["most_error_prone"]), 2)
         self.assertEqual(len(summary["most_called"]), 2)
+    
+    def test_snapshot_round_trip(self):
+        """Test merging monitor snapshots from another process."""
+        self.monitor.record("metric1", 0.5, "category1")
+        
+        other = PerformanceMonitor()
+        other.record("metric1", 1.5, "category1")
+        other.record("metric2", 1.0, "category2")
+        
+        self.monitor.merge_snapshot(json.loads(json.dumps(other.snapshot())))
+        
+        # Assert
+        metric1 = self.monitor.get_metric("metric1")
+        self.assertEqual(metric1["calls"], 2)
+        self.assertEqual(metric1["total_time"], 2.0)
+        self.assertEqual(self.monitor.get_metric("metric2")["calls"], 1)
+    
+    def test_export_prometheus(self):
+        """Test exporting metrics in the Prometheus text format."""
+        self.monitor.record("metric1", 0.5, "category1")
+        self.monitor.record("metric1", 0.25, "category1", Exception("Test error"))
+        
+        text = self.monitor.export_prometheus()
+        
+        # Assert
+        self.assertIn("# TYPE app_operation_duration_seconds summary", text)
+        self.assertIn('app_operation_duration_seconds_count{name="metric1",category="category1"} 2', text)
+        self.assertIn('app_operation_duration_seconds_sum{name="metric1",category="category1"} 0.75', text)
+        self.assertIn('app_operation_errors_total{name="metric1",category="category1"} 1', text)
+        self.assertIn('window="1m",quantile="0.99"', text)
+        self.assertFalse(text.rstrip().endswith("# EOF"))
+        
+        # OpenMetrics output is terminated by EOF
+        self.assertTrue(self.monitor.export_prometheus(openmetrics=True).endswith("# EOF\n"))
+    
+    def test_export_to_prometheus(self):
+        """Test exporting metrics to a Prometheus text file."""
+        self.monitor.record("metric1", 0.5, "category1")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "metrics.prom")
+            self.monitor.export_to_prometheus(file_path)
+            
+            with open(file_path) as f:
+                self.assertEqual(f.read(), self.monitor.export_prometheus())
 
 class MonitorPerformanceDecoratorTests(unittest.TestCase):
     """
@@ -0,0 +1,160 @@
+"""
+Tests for the shared provider HTTP client.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.providers.http_client import (
+    ProviderHTTPClient, HTTPResponse, TokenBucket, parse_retry_after
+)
+from app.models.providers.claude_provider import ClaudeProvider
+
+class FakeRawResponse:
+    """Minimal stand-in for a requests.Response."""
+    
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = json.dumps(body)
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the TokenBucket class."""
+    
+    def test_unlimited_bucket_does_not_wait(self):
+        """Test that a bucket without a rate never waits."""
+        bucket = TokenBucket()
+        start = time.monotonic()
+        for _ in range(100):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.1)
+    
+    def test_rate_limit(self):
+        """Test that requests beyond the burst wait for new tokens."""
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.14)
+    
+    def test_block_for(self):
+        """Test that blocking the bucket pauses callers."""
+        bucket = TokenBucket()
+        bucket.block_for(0.2)
+        start = time.monotonic()
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+    
+    def test_parse_retry_after(self):
+        """Test parsing Retry-After headers."""
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+class TestProviderHTTPClient(unittest.TestCase):
+    """Test cases for the ProviderHTTPClient class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.client = ProviderHTTPClient("test", max_retries=3, retry_delay=0.01)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.client.close()
+    
+    def test_retry_after_pauses_all_callers(self):
+        """Test that a 429 is retried after Retry-After and blocks the rate limiter."""
+        responses = [
+            FakeRawResponse(429, {"error": "slow down"}, {"Retry-After": "0.2"}),
+            FakeRawResponse(200, {"ok": True})
+        ]
+        with mock.patch.object(self.client.session, "request", side_effect=responses) as request:
+            start = time.monotonic()
+            response = self.client.request("POST", "https://example.invalid/api", json={})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"ok": True})
+        self.assertEqual(request.call_count, 2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        
+        stats = self.client.get_stats()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(stats["in_flight"], 0)
+    
+    def test_returns_last_error_response(self):
+        """Test that non-retryable errors are returned to the caller."""
+        with mock.patch.object(self.client.session, "request", return_value=FakeRawResponse(400, {})) as request:
+            response = self.client.request("GET", "https://example.invalid/api")
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(request.call_count, 1)
+    
+    def test_async_request(self):
+        """Test async requests with retries against a local server."""
+        calls = []
+        
+        async def handler(request):
+            calls.append(await request.json())
+            if len(calls) == 1:
+                return web.json_response({"error": "unavailable"}, status=503)
+            return web.json_response({"echo": calls[-1]})
+        
+        async def run():
+            app = web.Application()
+            app.router.add_post("/echo", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                responses = await asyncio.gather(*[
+                    self.client.arequest("POST", f"http://127.0.0.1:{port}/echo", json={"n": i})
+                    for i in range(3)
+                ])
+            finally:
+                await self.client.aclose()
+                await runner.cleanup()
+            return responses
+        
+        responses = asyncio.run(run())
+        
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        self.assertEqual(sorted(response.json()["echo"]["n"] for response in responses), [0, 1, 2])
+        self.assertEqual(len(calls), 4)
+
+class TestClaudeProviderHTTPClient(unittest.TestCase):
+    """Test cases for the Claude provider using the shared client."""
+    
+    def test_sync_and_async_generate_text(self):
+        """Test that the sync and async variants send the same request."""
+        client = mock.Mock(spec=ProviderHTTPClient)
+        body = json.dumps({"content": [{"type": "text", "text": "hello"}]})
+        client.request.return_value = HTTPResponse(200, {}, body)
+        client.arequest = mock.AsyncMock(return_value=HTTPResponse(200, {}, body))
+        
+        provider = ClaudeProvider(api_key="test-key", http_client=client)
+        
+        self.assertEqual(provider.generate_text("hi", max_tokens=5), "hello")
+        self.assertEqual(asyncio.run(provider.agenerate_text("hi", max_tokens=5)), "hello")
+        
+        sync_kwargs = client.request.call_args.kwargs
+        async_kwargs = client.arequest.call_args.kwargs
+        self.assertEqual(sync_kwargs["json"], async_kwargs["json"])
+        self.assertEqual(sync_kwargs["headers"]["x-api-key"], "test-key")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for the RecursiveSummarizer map-reduce mode and chunk summary cache.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.context_extension.recursive_summarizer import (
+    RecursiveSummarizer, MockSummarizationModel, MockTokenizer
+)
+
+class CountingModel(MockSummarizationModel):
+    """Mock model that records the chunks it summarizes."""
+    
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self._lock = threading.Lock()
+    
+    def generate_summary(self, text, target_length):
+        with self._lock:
+            self.calls.append(text)
+            self.threads.add(threading.current_thread().name)
+        return super().generate_summary(text, target_length)
+
+def make_paragraph(index, words=40):
+    """Build a paragraph of short sentences that exceeds the target size."""
+    sentences = [f"Paragraph {index} sentence {i} covers topic {index * 10 + i}." for i in range(words // 6)]
+    return " ".join(sentences)
+
+class TestRecursiveSummarizer(unittest.TestCase):
+    """Test cases for the RecursiveSummarizer."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.document = "\n\n".join(make_paragraph(i) for i in range(6))
+    
+    def make_summarizer(self, model, **kwargs):
+        """Create a summarizer with small chunks."""
+        return RecursiveSummarizer(
+            model=model,
+            tokenizer=MockTokenizer(),
+            target_size=20,
+            min_size=5,
+            max_recursion_depth=2,
+            preserve_key_info=False,
+            **kwargs
+        )
+    
+    def test_map_reduce_matches_sequential(self):
+        """Test that map-reduce mode produces the same summary as sequential mode."""
+        sequential = self.make_summarizer(CountingModel())
+        model = CountingModel()
+        parallel = self.make_summarizer(model, map_reduce=True, max_workers=4)
+        
+        try:
+            self.assertEqual(
+                sequential.summarize(self.document)["summary"],
+                parallel.summarize(self.document)["summary"]
+            )
+            self.assertTrue(all(name.startswith("RecursiveSummarizer") for name in model.threads))
+        finally:
+            parallel.close()
+    
+    def test_edited_document_only_resummarizes_changed_chunks(self):
+        """Test that chunk summaries are reused across calls."""
+        model = CountingModel()
+        summarizer = self.make_summarizer(model)
+        
+        summarizer.summarize(self.document)
+        first_calls = len(model.calls)
+        self.assertGreater(first_calls, 0)
+        
+        # Summarizing the same document again hits the cache
+        summarizer.summarize(self.document)
+        self.assertEqual(len(model.calls), first_calls)
+        
+        # Edit a single paragraph
+        paragraphs = self.document.split("\n\n")
+        paragraphs[2] = make_paragraph(99)
+        edited = "\n\n".join(paragraphs)
+        
+        summarizer.summarize(edited)
+        new_calls = model.calls[first_calls:]
+        self.assertEqual(new_calls[0], paragraphs[2])
+        self.assertNotIn(paragraphs[0], new_calls)
+    
+    def test_level_timings(self):
+        """Test that timings are reported per level."""
+        summarizer = self.make_summarizer(CountingModel())
+        
+        result = summarizer.summarize(self.document)
+        timings = result["level_timings"]
+        
+        self.assertGreater(len(timings), 0)
+        self.assertEqual(timings[0]["level"], 0)
+        self.assertEqual(timings[0]["cached_chunks"], 0)
+        self.assertGreaterEqual(timings[0]["seconds"], 0)
+        self.assertEqual(summarizer.last_level_timings, timings)
+        
+        # Second run is served from the cache
+        result = summarizer.summarize(self.document)
+        self.assertEqual(result["level_timings"][0]["cached_chunks"], result["level_timings"][0]["chunks"])
+    
+    def test_cache_disabled(self):
+        """Test that a cache size of zero disables caching."""
+        model = CountingModel()
+        summarizer = self.make_summarizer(model, cache_size=0)
+        
+        summarizer.summarize(self.document)
+        first_calls = len(model.calls)
+        summarizer.summarize(self.document)
+        self.assertEqual(len(model.calls), first_calls * 2)
+
+if __name__ == "__main__":
+    unittest.main()
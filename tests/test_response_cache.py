@@ -0,0 +1,128 @@
+"""
+Tests for the model provider response cache.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.providers.response_cache import ResponseCache, CachedProvider, make_request_key
+from app.models.providers.stub_provider import StubProvider
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the ResponseCache and CachedProvider classes."""
+    
+    def test_deterministic_completions_are_cached(self):
+        """Test that only temperature 0 completions are cached."""
+        stub = StubProvider()
+        provider = CachedProvider(stub, ResponseCache())
+        
+        first = provider.generate_completion(prompt="hello", temperature=0)
+        second = provider.generate_completion(prompt="  hello\n", temperature=0)
+        self.assertEqual(first, second)
+        self.assertEqual(stub.call_count, 1)
+        
+        provider.generate_completion(prompt="hello", temperature=0.7)
+        provider.generate_completion(prompt="hello", temperature=0.7)
+        self.assertEqual(stub.call_count, 3)
+        
+        stats = provider.get_cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["uncacheable"], 2)
+        self.assertEqual(stats["saved_tokens"], first["usage"]["total_tokens"])
+        self.assertAlmostEqual(stats["hit_ratio"], 0.25)
+    
+    def test_cached_results_are_copies(self):
+        """Test that callers cannot modify cached responses."""
+        provider = CachedProvider(StubProvider(), ResponseCache())
+        
+        first = provider.generate_embeddings(["a", "b"])
+        first["data"].clear()
+        second = provider.generate_embeddings(["a", "b"])
+        self.assertEqual(len(second["data"]), 2)
+    
+    def test_request_key_normalization(self):
+        """Test that equivalent payloads share a key."""
+        key = make_request_key("stub", "generate_completion", {"prompt": "hi", "top_p": None, "temperature": 0})
+        same = make_request_key("stub", "generate_completion", {"temperature": 0, "prompt": "hi\r\n"})
+        different = make_request_key("stub", "generate_completion", {"temperature": 0, "prompt": "bye"})
+        self.assertEqual(key, same)
+        self.assertNotEqual(key, different)
+    
+    def test_concurrent_identical_requests_are_coalesced(self):
+        """Test that identical requests in flight share one provider call."""
+        stub = StubProvider(latency=0.2)
+        provider = CachedProvider(stub, ResponseCache())
+        results = []
+        barrier = threading.Barrier(5)
+        
+        def worker():
+            barrier.wait()
+            results.append(provider.generate_completion(prompt="same", temperature=0.7))
+        
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(stub.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(provider.get_cache_stats()["coalesced"], 4)
+    
+    def test_async_requests_are_coalesced(self):
+        """Test async deduplication and caching."""
+        stub = StubProvider(latency=0.1)
+        provider = CachedProvider(stub, ResponseCache())
+        
+        async def run():
+            results = await asyncio.gather(*[
+                provider.agenerate_completion(prompt="same", temperature=0) for _ in range(4)
+            ])
+            results.append(await provider.agenerate_completion(prompt="same", temperature=0))
+            return results
+        
+        results = asyncio.run(run())
+        
+        self.assertEqual(stub.call_count, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        stats = provider.get_cache_stats()
+        self.assertEqual(stats["coalesced"], 3)
+        self.assertEqual(stats["hits"], 1)
+    
+    def test_ttl_expiry(self):
+        """Test that cached responses expire."""
+        stub = StubProvider()
+        provider = CachedProvider(stub, ResponseCache(ttl=1))
+        
+        provider.generate_embeddings("text")
+        provider.generate_embeddings("text")
+        self.assertEqual(stub.call_count, 1)
+        
+        time.sleep(1.1)
+        provider.generate_embeddings("text")
+        self.assertEqual(stub.call_count, 2)
+    
+    def test_persistence(self):
+        """Test that cached responses survive a restart."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir=cache_dir)
+            CachedProvider(StubProvider(), cache).generate_embeddings("persisted")
+            cache.close()
+            
+            stub = StubProvider()
+            cache = ResponseCache(cache_dir=cache_dir)
+            CachedProvider(stub, cache).generate_embeddings("persisted")
+            cache.close()
+            
+            self.assertEqual(stub.call_count, 0)
+
+if __name__ == "__main__":
+    unittest.main()
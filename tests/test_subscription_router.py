@@ -0,0 +1,119 @@
+"""
+Tests for the conversation event subscription router.
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.collaboration.subscription_router import SubscriptionRouter
+from app.collaboration.enhanced_communication_framework import EnhancedCommunicationFramework
+
+def make_event(message_id, sender="a", recipient="b", event_type="sent"):
+    """Create a conversation event."""
+    agents = sorted([sender, recipient])
+    return {
+        "event_type": event_type,
+        "timestamp": "2025-01-01T12:00:00",
+        "message": {
+            "message_id": message_id,
+            "sender": sender,
+            "recipient": recipient,
+            "conversation_id": f"conv_{agents[0]}_{agents[1]}"
+        }
+    }
+
+class TestSubscriptionRouter(unittest.TestCase):
+    """Test cases for the SubscriptionRouter class."""
+    
+    def test_routing(self):
+        """Test that events only reach subscriptions with matching filters."""
+        router = SubscriptionRouter()
+        router.subscribe("all")
+        router.subscribe("agent_a", {"agent_id": "a"})
+        router.subscribe("conv_c_d", {"conversation_id": "conv_c_d"})
+        router.subscribe("delivered_b", {"agent_id": "b", "event_types": ["delivered"]})
+        router.subscribe("a_with_c", {"agent_id": "a", "conversation_id": "conv_a_c"})
+        
+        self.assertEqual(router.publish(make_event(1, "a", "b")), 2)
+        self.assertEqual(router.publish(make_event(1, "a", "b", "delivered")), 3)
+        self.assertEqual(router.publish(make_event(2, "d", "c")), 2)
+        self.assertEqual(router.publish(make_event(3, "c", "a")), 3)
+        
+        queued = {subscriber_id: stats["queued"] for subscriber_id, stats in router.get_stats().items()}
+        self.assertEqual(queued, {"all": 4, "agent_a": 3, "conv_c_d": 1, "delivered_b": 1, "a_with_c": 1})
+        
+        self.assertTrue(router.unsubscribe("agent_a"))
+        self.assertFalse(router.unsubscribe("agent_a"))
+        self.assertEqual(router.publish(make_event(4, "a", "b")), 1)
+        self.assertEqual(len(router), 4)
+    
+    def test_overflow_policies(self):
+        """Test the drop_oldest, drop_newest and coalesce policies."""
+        router = SubscriptionRouter(max_queue_size=3)
+        oldest = router.subscribe("oldest")
+        newest = router.subscribe("newest", overflow_policy="drop_newest")
+        coalesce = router.subscribe("coalesce", overflow_policy="coalesce")
+        
+        for message_id in range(5):
+            router.publish(make_event(message_id))
+            router.publish(make_event(message_id, event_type="delivered"))
+        
+        events = oldest.drain()
+        self.assertEqual([(e["message"]["message_id"], e["event_type"]) for e in events],
+                         [(3, "delivered"), (4, "sent"), (4, "delivered")])
+        self.assertEqual(oldest.dropped, 7)
+        
+        events = newest.drain()
+        self.assertEqual([(e["message"]["message_id"], e["event_type"]) for e in events],
+                         [(0, "sent"), (0, "delivered"), (1, "sent")])
+        self.assertEqual(newest.dropped, 7)
+        
+        events = coalesce.drain()
+        self.assertEqual([(e["message"]["message_id"], e["event_type"]) for e in events],
+                         [(2, "delivered"), (3, "delivered"), (4, "delivered")])
+        self.assertEqual(coalesce.coalesced, 5)
+        self.assertEqual(coalesce.dropped, 2)
+        
+        stats = router.get_stats()["coalesce"]
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["delivered"], 3)
+        self.assertEqual(stats["lag_seconds"], 0.0)
+        
+        with self.assertRaises(ValueError):
+            router.subscribe("invalid", overflow_policy="block")
+
+class TestEnhancedFrameworkSubscriptions(unittest.TestCase):
+    """Test cases for conversation subscriptions in the enhanced framework."""
+    
+    def test_slow_subscriber_does_not_block_sending(self):
+        """Test that sending continues while a subscriber is not consuming events."""
+        framework = EnhancedCommunicationFramework({"subscriber_queue_size": 4})
+        
+        async def run():
+            await framework.subscribe_to_conversations("slow")
+            await framework.subscribe_to_conversations("agent_c", {"agent_id": "c"}, overflow_policy="coalesce")
+            for i in range(10):
+                await asyncio.wait_for(framework.send_message("a", "b" if i % 2 else "c", {"i": i}), 1.0)
+            events = await framework.get_conversation_events("agent_c")
+            empty = await framework.get_conversation_events("agent_c", timeout=0.01)
+            invalid = await framework.subscribe_to_conversations("invalid", overflow_policy="block")
+            return events, empty, invalid
+        
+        events, empty, invalid = asyncio.run(run())
+        self.assertEqual([e["event_type"] for e in events], ["delivered"] * 4)
+        self.assertEqual(empty, [])
+        self.assertFalse(invalid["success"])
+        
+        statistics = framework.get_subscription_statistics()
+        self.assertEqual(statistics["subscriber_count"], 2)
+        self.assertEqual(statistics["subscribers"]["slow"]["queued"], 4)
+        self.assertEqual(statistics["subscribers"]["slow"]["dropped"], 16)
+        self.assertEqual(statistics["subscribers"]["agent_c"]["coalesced"], 5)
+
+if __name__ == "__main__":
+    unittest.main()
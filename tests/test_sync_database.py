@@ -0,0 +1,168 @@
+"""
+Tests for the synchronization database and manager.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.integration.config import IntegrationConfig
+from app.integration.models import EntityType, SyncStatus, JiraIssue
+from app.integration.sync_manager import SynchronizationDatabase, SynchronizationManager
+
+class TestSynchronizationDatabase(unittest.TestCase):
+    """Test cases for the SynchronizationDatabase class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = SynchronizationDatabase(os.path.join(self.temp_dir, "sync.db"))
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_wal_mode_and_indexes(self):
+        """Test that the database uses WAL mode and composite indexes."""
+        conn = self.db._get_connection()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT data FROM entities WHERE entity_type = ? AND external_id = ?",
+            ("jira_issue", "10001")
+        ).fetchall()
+        self.assertIn("idx_entities_type_external_id", " ".join(str(row) for row in plan))
+    
+    def test_upsert_and_batch_save(self):
+        """Test that saving updates existing rows instead of duplicating them."""
+        issues = [JiraIssue(external_id=str(i), key=f"PROJ-{i}") for i in range(10)]
+        self.assertEqual(self.db.save_entities(issues), 10)
+        
+        issues[0].summary = "Updated"
+        issues[0].sync_status = SyncStatus.COMPLETED
+        self.db.save_entity(issues[0])
+        
+        count = self.db._get_connection().execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+        self.assertEqual(count, 10)
+        
+        loaded = self.db.get_entity_by_external_id(EntityType.JIRA_ISSUE, "0")
+        self.assertEqual(loaded.summary, "Updated")
+        self.assertEqual(loaded.sync_status, SyncStatus.COMPLETED)
+        
+        entities = self.db.get_entities([issue.id for issue in issues] + ["missing"])
+        self.assertEqual(len(entities), 10)
+        self.assertEqual(len(self.db.get_entity_ids_by_status(SyncStatus.PENDING)), 9)
+    
+    def test_connection_per_thread(self):
+        """Test that threads reuse their own connection."""
+        connections = []
+        
+        def work():
+            conn = self.db._get_connection()
+            self.db.save_entity(JiraIssue(key="PROJ-T"))
+            connections.append((conn, self.db._get_connection()))
+        
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertTrue(all(first is second for first, second in connections))
+        self.assertEqual(len({id(first) for first, _ in connections}), 4)
+        self.assertEqual(len(self.db.get_entities_by_type(EntityType.JIRA_ISSUE)), 4)
+    
+    def test_in_memory_database_is_shared(self):
+        """Test that an in-memory database is visible to all threads."""
+        db = SynchronizationDatabase(":memory:")
+        issue = JiraIssue(key="PROJ-1")
+        db.save_entity(issue)
+        
+        found = []
+        thread = threading.Thread(target=lambda: found.append(db.get_entity(issue.id)))
+        thread.start()
+        thread.join()
+        
+        self.assertEqual(found[0].key, "PROJ-1")
+        db.close()
+
+class TestSynchronizationManagerBatching(unittest.TestCase):
+    """Test cases for batched processing in the SynchronizationManager."""
+    
+    def test_process_batch(self):
+        """Test that a queued batch is synchronized and saved."""
+        manager = SynchronizationManager(IntegrationConfig(
+            sync_database_path=":memory:", sync_batch_size=50, sync_workers=1
+        ))
+        issues = [JiraIssue(external_id=str(i), key=f"PROJ-{i}") for i in range(5)]
+        manager.db.save_entities(issues)
+        
+        self.assertEqual(manager.queue_all_entities_by_type(EntityType.JIRA_ISSUE), 5)
+        entity_ids = manager._next_batch()
+        self.assertEqual(len(entity_ids), 5)
+        
+        manager._process_batch(entity_ids)
+        
+        # No Jira client is configured, so every entity fails with an error
+        for issue in issues:
+            entity = manager.db.get_entity(issue.id)
+            self.assertEqual(entity.sync_status, SyncStatus.FAILED)
+            self.assertEqual(entity.sync_error, "Jira client is not available")
+            self.assertIsNotNone(entity.last_sync_time)
+        
+        manager.db.close()
+    
+    def test_interrupted_batch(self):
+        """Test that results are saved in chunks and unreached entities return to PENDING."""
+        manager = SynchronizationManager(IntegrationConfig(
+            sync_database_path=":memory:", sync_batch_size=50, sync_workers=1, sync_result_chunk_size=2
+        ))
+        issues = [JiraIssue(external_id=str(i), key=f"PROJ-{i}") for i in range(5)]
+        manager.db.save_entities(issues)
+        
+        calls = []
+        def synchronize(entity):
+            calls.append(entity.id)
+            if len(calls) == 4:
+                raise KeyboardInterrupt()
+            raise RuntimeError("remote error")
+        
+        manager._synchronize_entity = synchronize
+        with self.assertRaises(KeyboardInterrupt):
+            manager._process_batch([issue.id for issue in issues])
+        
+        statuses = [manager.db.get_entity(issue.id).sync_status for issue in issues]
+        self.assertEqual(statuses, [SyncStatus.FAILED] * 3 + [SyncStatus.PENDING] * 2)
+        self.assertEqual(manager._claimed, set())
+        manager.db.close()
+    
+    def test_recover_interrupted_entities(self):
+        """Test that entities left IN_PROGRESS by a previous run are reset on start."""
+        db_path = os.path.join(tempfile.mkdtemp(), "sync.db")
+        self.addCleanup(shutil.rmtree, os.path.dirname(db_path))
+        
+        db = SynchronizationDatabase(db_path)
+        issues = [JiraIssue(external_id=str(i), key=f"PROJ-{i}") for i in range(3)]
+        issues[0].sync_status = SyncStatus.IN_PROGRESS
+        issues[1].sync_status = SyncStatus.IN_PROGRESS
+        db.save_entities(issues)
+        db.close()
+        
+        manager = SynchronizationManager(IntegrationConfig(sync_database_path=db_path, sync_workers=1))
+        manager.start()
+        manager.stop()
+        
+        self.assertEqual(manager.db.get_entity_ids_by_status(SyncStatus.IN_PROGRESS), [])
+        self.assertEqual(len(manager.db.get_entity_ids_by_status(SyncStatus.PENDING)), 3)
+        self.assertEqual(manager.recover_interrupted_entities(), 0)
+        manager.db.close()
+
+if __name__ == "__main__":
+    unittest.main()
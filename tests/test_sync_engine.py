@@ -0,0 +1,299 @@
+"""
+Tests for the concurrent synchronization engine against a local fake Jira server.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.integration.config import IntegrationConfig, JiraConfig
+from app.integration.jira_client import JiraApiClient
+from app.integration.models import EntityType, SyncDirection, SyncStatus, JiraIssue, JiraProject
+from app.integration.sync_manager import SynchronizationManager
+
+BASE_TIME = datetime(2025, 1, 1, 10, 0)
+
+class FakeJira:
+    """In-memory Jira serving the search, issue and myself endpoints."""
+    
+    def __init__(self, issue_count, delay=0.0, time_zone="America/Toronto"):
+        self.delay = delay
+        self.time_zone = time_zone
+        self.issues = {}
+        for i in range(1, issue_count + 1):
+            self.set_issue(i, f"Issue {i}", BASE_TIME + timedelta(minutes=i))
+        self.requests = []
+        self.on_search = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                fake.handle(self)
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+    
+    def set_issue(self, number, summary, updated):
+        """Create or replace an issue."""
+        self.issues[f"PROJ-{number}"] = {
+            "id": str(10000 + number),
+            "key": f"PROJ-{number}",
+            "fields": {
+                "summary": summary,
+                "project": {"key": "PROJ"},
+                "issuetype": {"name": "Task"},
+                "status": {"name": "Open"},
+                "priority": {"name": "Medium"},
+                "assignee": {"accountId": "dev"},
+                "reporter": {"accountId": "pm"},
+                "resolution": {"name": ""},
+                "labels": [],
+                "components": [],
+                "updated": updated.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+            }
+        }
+    
+    def search(self, jql, start_at, max_results):
+        """Evaluate the subset of JQL used by the synchronization manager."""
+        issues = list(self.issues.values())
+        keys = re.match(r"issuekey in \((.*)\)", jql)
+        if keys:
+            wanted = set(key.strip() for key in keys.group(1).split(","))
+            issues = [issue for issue in issues if issue["key"] in wanted or issue["id"] in wanted]
+        since = re.search(r'updated >= "([^"]+)"', jql)
+        if since:
+            # JQL dates are in the user's timezone
+            threshold = datetime.strptime(since.group(1), "%Y-%m-%d %H:%M").replace(
+                tzinfo=ZoneInfo(self.time_zone) if self.time_zone else timezone.utc
+            )
+            issues = [
+                issue for issue in issues
+                if datetime.strptime(issue["fields"]["updated"], "%Y-%m-%dT%H:%M:%S.%f%z") >= threshold
+            ]
+        issues.sort(key=lambda issue: (issue["fields"]["updated"], int(issue["id"])))
+        page = {
+            "startAt": start_at,
+            "maxResults": max_results,
+            "total": len(issues),
+            "issues": issues[start_at:start_at + max_results]
+        }
+        if self.on_search:
+            self.on_search()
+        return page
+    
+    def handle(self, request):
+        """Serve one request."""
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            url = urlparse(request.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            path = url.path[len("/rest/api/3/"):]
+            with self.lock:
+                self.requests.append(path)
+            
+            status, body = 404, {}
+            if path == "myself":
+                status, body = 200, {"accountId": "sync"}
+                if self.time_zone:
+                    body["timeZone"] = self.time_zone
+            elif path == "search":
+                status, body = 200, self.search(
+                    query["jql"], int(query.get("startAt", 0)), int(query.get("maxResults", 50))
+                )
+            elif path.startswith("issue/") and path[len("issue/"):] in self.issues:
+                status, body = 200, self.issues[path[len("issue/"):]]
+            
+            payload = json.dumps(body).encode("utf-8")
+            request.send_response(status)
+            request.send_header("Content-Type", "application/json")
+            request.send_header("Content-Length", str(len(payload)))
+            request.end_headers()
+            request.wfile.write(payload)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+    
+    def count(self, path):
+        """Count requests to an endpoint."""
+        with self.lock:
+            return self.requests.count(path)
+    
+    def close(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestSynchronizationEngine(unittest.TestCase):
+    """Test cases for the concurrent synchronization engine."""
+    
+    def create_manager(self, fake, workers=4, max_concurrency=2, batch_size=10, page_size=100,
+                       sync_interval_minutes=15):
+        """Create a manager connected to the fake Jira server."""
+        jira_config = JiraConfig(
+            url=fake.url,
+            api_token="token",
+            username="sync",
+            project_key_mapping={},
+            sync_interval_minutes=sync_interval_minutes,
+            max_concurrency=max_concurrency,
+            search_page_size=page_size
+        )
+        config = IntegrationConfig(
+            jira=jira_config,
+            sync_database_path=":memory:",
+            sync_batch_size=batch_size,
+            sync_workers=workers
+        )
+        manager = SynchronizationManager(config, jira_client=JiraApiClient(jira_config))
+        self.addCleanup(manager.db.close)
+        return manager
+    
+    def test_incremental_pull(self):
+        """Test that a second pull only fetches issues changed after the watermark."""
+        fake = FakeJira(250)
+        self.addCleanup(fake.close)
+        manager = self.create_manager(fake)
+        myself_requests = fake.count("myself")
+        
+        self.assertEqual(manager.sync_jira_project_issues("PROJ"), 250)
+        self.assertEqual(fake.count("search"), 3)
+        self.assertEqual(len(manager.db.get_entities_by_type(EntityType.JIRA_ISSUE)), 250)
+        
+        for number in range(1, 6):
+            fake.set_issue(number, f"Changed {number}", BASE_TIME + timedelta(minutes=300 + number))
+        
+        # The last issue of the first pull shares the watermark minute and is re-read
+        self.assertEqual(manager.sync_jira_project_issues("PROJ"), 6)
+        self.assertEqual(len(manager.db.get_entities_by_type(EntityType.JIRA_ISSUE)), 250)
+        
+        changed = manager.db.get_entity_by_external_id(EntityType.JIRA_ISSUE, "10001")
+        self.assertEqual(changed.summary, "Changed 1")
+        # 15:05 UTC in the Jira user's timezone
+        self.assertEqual(manager.db.get_watermark("jira_issues:PROJ"), "2025-01-01 10:05")
+        self.assertEqual(manager.get_metrics()["pulled"], 256)
+        # The user's timezone is read once
+        self.assertEqual(fake.count("myself"), myself_requests + 1)
+    
+    def test_issue_updated_during_pull(self):
+        """Test that an issue moving to the end of the order during a pull skips no other issue."""
+        fake = FakeJira(250)
+        self.addCleanup(fake.close)
+        manager = self.create_manager(fake)
+        
+        def update_first_issue():
+            fake.on_search = None
+            fake.set_issue(1, "Changed 1", BASE_TIME + timedelta(minutes=400))
+        
+        fake.on_search = update_first_issue
+        manager.sync_jira_project_issues("PROJ")
+        
+        self.assertEqual(len(manager.db.get_entities_by_type(EntityType.JIRA_ISSUE)), 250)
+        changed = manager.db.get_entity_by_external_id(EntityType.JIRA_ISSUE, "10001")
+        self.assertEqual(changed.summary, "Changed 1")
+        # 16:40 UTC in the Jira user's timezone
+        self.assertEqual(manager.db.get_watermark("jira_issues:PROJ"), "2025-01-01 11:40")
+    
+    def test_pull_pages_within_one_minute(self):
+        """Test that pages of issues updated in the same minute are read by offset."""
+        fake = FakeJira(0)
+        self.addCleanup(fake.close)
+        for number in range(1, 26):
+            fake.set_issue(number, f"Issue {number}", BASE_TIME + timedelta(minutes=1, seconds=number))
+        manager = self.create_manager(fake, page_size=10)
+        
+        self.assertEqual(manager.sync_jira_project_issues("PROJ"), 25)
+        self.assertEqual(len(manager.db.get_entities_by_type(EntityType.JIRA_ISSUE)), 25)
+        # Offsets may shift while paging, so the watermark stays at the paged minute
+        self.assertEqual(manager.db.get_watermark("jira_issues:PROJ"), "2025-01-01 05:01")
+    
+    def test_incremental_pull_without_timezone(self):
+        """Test that the watermark is moved back when the user's timezone is unknown."""
+        fake = FakeJira(20, time_zone=None)
+        self.addCleanup(fake.close)
+        manager = self.create_manager(fake)
+        
+        self.assertEqual(manager.sync_jira_project_issues("PROJ"), 20)
+        self.assertEqual(manager.db.get_watermark("jira_issues:PROJ"), "2024-12-31 22:20")
+        
+        # Issues are re-read rather than missed
+        self.assertEqual(manager.sync_jira_project_issues("PROJ"), 20)
+    
+    def test_scheduled_pull(self):
+        """Test that a running manager pulls the issues of known Jira projects."""
+        fake = FakeJira(30)
+        self.addCleanup(fake.close)
+        manager = self.create_manager(fake, workers=1)
+        manager.db.save_entity(JiraProject(key="PROJ"))
+        
+        manager.start()
+        deadline = time.monotonic() + 10
+        while manager.db.get_watermark("jira_issues:PROJ") is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        manager.stop()
+        
+        self.assertEqual(len(manager.db.get_entities_by_type(EntityType.JIRA_ISSUE)), 30)
+        self.assertEqual(manager.db.get_watermark("jira_issues:PROJ"), "2025-01-01 05:30")
+    
+    def test_worker_pool_bulk_fetch(self):
+        """Test that workers sync queued issues in bulk within the concurrency limit."""
+        fake = FakeJira(40, delay=0.02)
+        self.addCleanup(fake.close)
+        manager = self.create_manager(fake, workers=4, max_concurrency=2, batch_size=10)
+        
+        issues = [
+            JiraIssue(key=f"PROJ-{number}", sync_direction=SyncDirection.FROM_EXTERNAL)
+            for number in range(1, 41)
+        ]
+        issues.append(JiraIssue(key="PROJ-999", sync_direction=SyncDirection.FROM_EXTERNAL))
+        manager.db.save_entities(issues)
+        
+        self.assertEqual(manager.queue_all_entities_by_type(EntityType.JIRA_ISSUE), 41)
+        manager.start()
+        manager.sync_queue.join()
+        manager.stop()
+        
+        synced = manager.db.get_entity_by_external_id(EntityType.JIRA_ISSUE, "10007")
+        self.assertEqual(synced.summary, "Issue 7")
+        self.assertEqual(synced.sync_status, SyncStatus.COMPLETED)
+        
+        missing = manager.db.get_entity(issues[-1].id)
+        self.assertEqual(missing.sync_status, SyncStatus.FAILED)
+        self.assertEqual(missing.sync_error, "Jira issue PROJ-999 not found")
+        
+        # One search per batch instead of one request per issue
+        self.assertLess(fake.count("search"), 41)
+        self.assertEqual(sum(1 for path in fake.requests if path.startswith("issue/")), 0)
+        self.assertLessEqual(fake.max_in_flight, 2)
+        
+        metrics = manager.get_metrics()
+        self.assertEqual(metrics["synced"], 40)
+        self.assertEqual(metrics["failed"], 1)
+        self.assertEqual(metrics["queue_size"], 0)
+        self.assertGreater(metrics["entities_per_second"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for the tokenizer module.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.tokenizer import (
+    ApproximateTokenizer, BPETokenizer, TiktokenTokenizer, TokenCounter, Tokenizer,
+    TOKENIZER_FILE_ENV, get_tokenizer, register_tokenizer, pretokenize, _create_default_tokenizer
+)
+
+def tiktoken_available():
+    """Check whether tiktoken is installed and its default encoding can be loaded."""
+    try:
+        TiktokenTokenizer()
+        return True
+    except Exception:
+        return False
+
+CORPUS = [
+    "The context window manager splits documents into chunks.",
+    "Each chunk is summarized, and the summaries are summarized again.",
+    "def count_tokens(text):\n    return len(tokenizer.encode(text))\n",
+    "Token counts of repeated strings are cached: 1234567 tokens, ¡olé! 你好"
+]
+
+class CountingTokenizer(Tokenizer):
+    """Tokenizer recording the texts it counts."""
+    
+    name = "counting"
+    
+    def __init__(self):
+        self.batches = []
+    
+    def encode(self, text):
+        return [0] * len(text.split())
+    
+    def count_batch(self, texts):
+        self.batches.append(list(texts))
+        return super().count_batch(texts)
+
+class TestTokenizer(unittest.TestCase):
+    """Test cases for the tokenizer module."""
+    
+    def test_pretokenize_preserves_text(self):
+        """Test that pre-tokenization pieces concatenate to the input."""
+        for text in CORPUS:
+            self.assertEqual("".join(pretokenize(text)), text)
+    
+    def test_bpe_round_trip(self):
+        """Test that a trained BPE vocabulary encodes and decodes losslessly."""
+        tokenizer = BPETokenizer.train(CORPUS * 3, vocab_size=400)
+        self.assertGreater(tokenizer.vocab_size, 256)
+        
+        for text in CORPUS:
+            ids = tokenizer.encode(text)
+            self.assertEqual(tokenizer.decode(ids), text)
+            self.assertLess(len(ids), len(text.encode("utf-8")))
+        
+        # Text outside the training corpus falls back to bytes
+        self.assertEqual(tokenizer.decode(tokenizer.encode("zebra §")), "zebra §")
+    
+    def test_bpe_rank_file(self):
+        """Test saving and loading a tiktoken-format rank file."""
+        tokenizer = BPETokenizer.train(CORPUS, vocab_size=300)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "vocab.tiktoken")
+            tokenizer.save(path)
+            loaded = BPETokenizer.from_file(path)
+        
+        self.assertEqual(loaded.name, "vocab")
+        self.assertEqual(loaded.encode(CORPUS[0]), tokenizer.encode(CORPUS[0]))
+        
+        with self.assertRaises(ValueError):
+            BPETokenizer({b"a": 0})
+    
+    def test_approximate_tokenizer(self):
+        """Test that the approximate tokenizer counts more than words for long words."""
+        tokenizer = ApproximateTokenizer()
+        self.assertEqual(tokenizer.count("the cat sat"), 3)
+        self.assertEqual(tokenizer.count("internationalization"), 4)
+        self.assertEqual(tokenizer.count(""), 0)
+        self.assertEqual(len(tokenizer.encode(CORPUS[3])), tokenizer.count(CORPUS[3]))
+    
+    def test_counter_cache_and_batches(self):
+        """Test that counts are cached and batches count each text once."""
+        tokenizer = CountingTokenizer()
+        counter = TokenCounter(tokenizer, cache_size=2)
+        
+        self.assertEqual(counter.count_tokens("a b c"), 3)
+        self.assertEqual(counter.count_tokens_many(["a b c", "d e", "d e", "", "f"]), [3, 2, 2, 0, 1])
+        self.assertEqual(tokenizer.batches, [["d e", "f"]])
+        
+        stats = counter.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 3)
+        self.assertEqual(stats["cache_size"], 2)
+    
+    def test_registry(self):
+        """Test registering tokenizers by name."""
+        self.assertIs(get_tokenizer("unregistered-provider"), get_tokenizer())
+        
+        tokenizer = BPETokenizer.train(CORPUS, vocab_size=300, name="test-bpe")
+        register_tokenizer("test-provider", tokenizer)
+        counter = get_tokenizer("test-provider")
+        self.assertEqual(counter.name, "test-bpe")
+        self.assertEqual(counter.count_tokens(CORPUS[0]), len(tokenizer.encode(CORPUS[0])))
+    
+    @unittest.skipUnless(tiktoken_available(), "tiktoken or its encoding is not available")
+    def test_default_tokenizer_is_exact(self):
+        """Test that the default tokenizer chain resolves to tiktoken rather than the approximation."""
+        environ = {key: value for key, value in os.environ.items() if key != TOKENIZER_FILE_ENV}
+        with patch.dict(os.environ, environ, clear=True):
+            tokenizer = _create_default_tokenizer()
+        
+        self.assertIsInstance(tokenizer, TiktokenTokenizer)
+        self.assertEqual(tokenizer.count(CORPUS[0]), len(tokenizer.encoding.encode_ordinary(CORPUS[0])))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tests for the incremental trust scoring of the A2A trust manager.
+"""
+
+import os
+import sys
+import random
+import shutil
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.collaboration.a2a_framework import TrustManager
+
+OUTCOME_SCORES = {"success": 1.0, "partial": 0.5, "failure": 0.0}
+
+def expected_score(outcomes, decay_factor=0.05, min_interactions=5, default_score=0.7):
+    """Compute an exponentially decayed trust score over all outcomes."""
+    weights = [(1 - decay_factor) ** (len(outcomes) - i - 1) for i in range(len(outcomes))]
+    score = sum(OUTCOME_SCORES[o] * w for o, w in zip(outcomes, weights)) / sum(weights)
+    if len(outcomes) < min_interactions:
+        blend_factor = len(outcomes) / min_interactions
+        score = score * blend_factor + default_score * (1 - blend_factor)
+    return score
+
+def make_interactions(count, seed=3):
+    """Create random interactions between a few agents."""
+    rng = random.Random(seed)
+    agents = ["a", "b", "c", "d"]
+    return [
+        {
+            "source_agent": rng.choice(agents),
+            "target_agent": rng.choice(agents),
+            "interaction_type": "task",
+            "outcome": rng.choice(list(OUTCOME_SCORES))
+        }
+        for _ in range(count)
+    ]
+
+class TestTrustManager(unittest.TestCase):
+    """Test cases for the TrustManager class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_incremental_scores(self):
+        """Test that running aggregates match a full recomputation."""
+        manager = TrustManager({"max_history_per_pair": 10})
+        outcomes = ["success", "failure", "partial"] * 20
+        
+        async def run():
+            scores = []
+            for outcome in outcomes:
+                await manager.record_interaction("a", "b", "task", outcome)
+                scores.append((await manager.get_trust_score("a", "b"))["trust_score"])
+            return scores
+        
+        scores = asyncio.run(run())
+        for count, score in enumerate(scores, start=1):
+            self.assertAlmostEqual(score, expected_score(outcomes[:count]))
+        
+        history = manager.get_interaction_history("a", "b")
+        self.assertEqual(len(history), 10)
+        self.assertEqual([h["outcome"] for h in history], outcomes[-10:])
+        self.assertEqual(manager.interaction_history["a:b"].count, 60)
+    
+    def test_bulk_recording_and_reputation(self):
+        """Test that bulk recording matches single recording and reputation is the mean trust score."""
+        interactions = make_interactions(300)
+        single = TrustManager()
+        bulk = TrustManager()
+        
+        async def run():
+            for interaction in interactions:
+                await single.record_interaction(**interaction)
+            result = await bulk.record_interactions(interactions + [{"source_agent": "a"}])
+            await bulk.get_trust_score("d", "e")
+            return result
+        
+        result = asyncio.run(run())
+        self.assertFalse(result["success"])
+        self.assertEqual(result["recorded"], 300)
+        self.assertEqual(result["errors"][0]["index"], 300)
+        
+        for source, targets in single.trust_scores.items():
+            for target, score in targets.items():
+                self.assertAlmostEqual(bulk.trust_scores[source][target], score)
+        
+        for agent_id in ["a", "b", "c", "d", "e", "unknown"]:
+            reputation = asyncio.run(bulk.get_agent_reputation(agent_id))
+            scores = [targets[agent_id] for targets in bulk.trust_scores.values() if agent_id in targets]
+            self.assertEqual(reputation["rating_count"], len(scores))
+            self.assertAlmostEqual(reputation["reputation"], sum(scores) / len(scores) if scores else 0.7)
+    
+    def test_snapshot_restore(self):
+        """Test that trust state survives a restart through the snapshot file."""
+        snapshot_path = os.path.join(self.temp_dir, "trust", "snapshot.json")
+        manager = TrustManager({"snapshot_path": snapshot_path})
+        
+        async def run():
+            await manager.record_interactions(make_interactions(100))
+            return await manager.update_trust_model()
+        
+        asyncio.run(run())
+        self.assertTrue(os.path.exists(snapshot_path))
+        
+        restored = TrustManager({"snapshot_path": snapshot_path})
+        self.assertEqual(restored.trust_scores, manager.trust_scores)
+        self.assertEqual(restored.reputation_counts, manager.reputation_counts)
+        self.assertEqual(restored.get_interaction_history("a", "b"), manager.get_interaction_history("a", "b"))
+        
+        # Recording continues from the restored aggregates
+        asyncio.run(manager.record_interaction("a", "b", "task", "failure"))
+        asyncio.run(restored.record_interaction("a", "b", "task", "failure"))
+        self.assertAlmostEqual(restored.trust_scores["a"]["b"], manager.trust_scores["a"]["b"])
+        
+        self.assertFalse(restored.restore({"version": 0}))
+        self.assertFalse(restored.load_snapshot(os.path.join(self.temp_dir, "missing.json")))
+    
+    def test_snapshot_with_unserializable_context(self):
+        """Test that contexts which are not JSON-serializable do not break snapshots."""
+        snapshot_path = os.path.join(self.temp_dir, "snapshot.json")
+        manager = TrustManager({"snapshot_path": snapshot_path})
+        asyncio.run(manager.record_interaction("a", "b", "task", "success", {"started": object()}))
+        
+        self.assertTrue(manager.save_snapshot())
+        restored = TrustManager({"snapshot_path": snapshot_path})
+        self.assertIsInstance(restored.get_interaction_history("a", "b")[0]["context"]["started"], str)
+        
+        # A failed save leaves no partial snapshot behind
+        with patch("json.dump", side_effect=ValueError("boom")):
+            self.assertFalse(manager.save_snapshot())
+        self.assertFalse(os.path.exists(f"{snapshot_path}.tmp"))
+        self.assertTrue(os.path.exists(snapshot_path))
+
+if __name__ == "__main__":
+    unittest.main()